@@ -26,6 +26,7 @@ import json
 from typing import List, Optional, Union, Dict, Any
 from agentops.client import Client
 from agentops.sdk.core import TraceContext, tracer
+from agentops.sdk.pipelines import use_pipeline
 from agentops.sdk.decorators import trace, session, agent, task, workflow, operation, tool, guardrail, track_endpoint
 from agentops.enums import TraceState, SUCCESS, ERROR, UNSET
 from opentelemetry.trace.status import StatusCode
@@ -106,7 +107,7 @@ def init(
             be read from the AGENTOPS_APP_URL environment variable. Defaults to 'https://app.agentops.ai'.
         max_wait_time (int, optional): The maximum time to wait in milliseconds before flushing the queue.
             Defaults to 5,000 (5 seconds)
-        max_queue_size (int, optional): The maximum size of the event queue. Defaults to 512.
+        max_queue_size (int, optional): The maximum number of spans queued for export. Defaults to 2048.
         tags (List[str], optional): [Deprecated] Use `default_tags` instead.
         default_tags (List[str], optional): Default tags for the sessions that can be used for grouping or sorting later (e.g. ["GPT-4"]).
         trace_name (str, optional): Name for the default trace/session. If none is provided, defaults to "default".
@@ -183,6 +184,8 @@ def configure(**kwargs):
             - app_url: The dashboard URL for the AgentOps app
             - max_wait_time: Maximum time to wait in milliseconds before flushing the queue
             - max_queue_size: Maximum size of the event queue
+            - max_export_batch_size: Maximum number of spans sent in one export request
+            - max_queue_bytes: Maximum estimated size in bytes of spans queued for export, enforced with adaptive batching
             - default_tags: Default tags for the sessions
             - instrument_llm_calls: Whether to instrument LLM calls
             - auto_start_session: Whether to start a session automatically
@@ -193,6 +196,39 @@ def configure(**kwargs):
             - exporter: Custom span exporter for OpenTelemetry trace data
             - processor: Custom span processor for OpenTelemetry trace data
             - exporter_endpoint: Endpoint for the exporter
+            - flush_on_trace_end: Whether ending a trace blocks until its spans are exported
+            - shutdown_flush_timeout: Deadline in milliseconds for flushing spans, metrics and logs at shutdown
+            - spill_directory: Directory for spilling span batches to disk when export fails
+            - spill_max_bytes: Maximum size in bytes of the spill directory
+            - export_workers: Number of span batches that may be exported concurrently
+            - async_export: Whether to export spans with the asyncio exporter
+            - system_metrics_interval: Seconds between background host resource samples (0 disables the sampler)
+            - system_metrics_gauges: Whether to publish sampled host resource usage as OTel gauges
+            - log_buffer_max_bytes: Byte budget for captured print and log output awaiting upload
+            - log_buffer_policy: What to drop when the log buffer is full: 'drop_oldest' or 'sample'
+            - log_upload_chunk_bytes: Upload a trace's captured output in chunks of this size while it runs (0 uploads only when the trace ends)
+            - log_upload_compression: Whether to gzip captured log uploads
+            - sampling_ratio: Fraction of new traces to record; child spans follow their parent
+            - sampling_ratios_by_kind: Head sampling ratio for new traces by span kind, overriding sampling_ratio
+            - tail_sampling: Whether to buffer traces and decide whether to export each one when its root span ends
+            - tail_sampling_ratio: Fraction of traces kept by tail sampling when no keep rule matches
+            - tail_sampling_latency_ms: Keep traces whose root span took at least this many milliseconds
+            - tail_sampling_min_cost: Keep traces whose recorded cost adds up to at least this much
+            - tail_sampling_min_tokens: Keep traces that used at least this many tokens
+            - tail_sampling_max_traces: Maximum number of traces buffered for tail sampling
+            - span_relay_socket: Unix socket path; processes on this host export spans through whichever process binds it first
+            - export_stats_metrics: Whether to publish span export pipeline stats as OTel metrics
+            - adaptive_batching: Whether to adapt export batch size and flush delay to span arrival rate and export latency
+            - export_reorder_window: Longest time in milliseconds a span is held back to be exported with the rest of its trace (adaptive batching only)
+            - span_store_max_spans: Number of finished spans kept in memory for local queries with `agentops.get_client().span_store()` (0 disables)
+            - file_export_directory: Directory to record spans to instead of sending them; upload them later with `agentops-replay`
+            - file_export_segment_bytes: Size in bytes at which a span file segment is finished
+            - file_export_compression: Whether to gzip span batches written to file
+            - file_export_fsync: When span files are synced to disk: 'always', 'rotate' or 'never'
+            - prompt_dedup: Whether to export each distinct prompt message body once per trace and reference it by hash afterwards
+            - deferred_extraction: Whether to extract LLM span attributes on the export thread instead of the calling thread
+            - stream_capture_chars: Characters of streamed completion content kept per stream, from its start and end (0 keeps everything)
+            - stream_capture_spill: Whether to upload the full content of streams over the capture budget as an object
     """
     global _client
 
@@ -203,6 +239,8 @@ def configure(**kwargs):
         "app_url",
         "max_wait_time",
         "max_queue_size",
+        "max_export_batch_size",
+        "max_queue_bytes",
         "default_tags",
         "instrument_llm_calls",
         "auto_start_session",
@@ -213,6 +251,39 @@ def configure(**kwargs):
         "exporter",
         "processor",
         "exporter_endpoint",
+        "flush_on_trace_end",
+        "shutdown_flush_timeout",
+        "spill_directory",
+        "spill_max_bytes",
+        "export_workers",
+        "async_export",
+        "system_metrics_interval",
+        "system_metrics_gauges",
+        "log_buffer_max_bytes",
+        "log_buffer_policy",
+        "log_upload_chunk_bytes",
+        "log_upload_compression",
+        "sampling_ratio",
+        "sampling_ratios_by_kind",
+        "tail_sampling",
+        "tail_sampling_ratio",
+        "tail_sampling_latency_ms",
+        "tail_sampling_min_cost",
+        "tail_sampling_min_tokens",
+        "tail_sampling_max_traces",
+        "span_relay_socket",
+        "export_stats_metrics",
+        "adaptive_batching",
+        "export_reorder_window",
+        "span_store_max_spans",
+        "file_export_directory",
+        "file_export_segment_bytes",
+        "file_export_compression",
+        "file_export_fsync",
+        "prompt_dedup",
+        "deferred_extraction",
+        "stream_capture_chars",
+        "stream_capture_spill",
     }
 
     # Check for invalid parameters
@@ -225,7 +296,9 @@ def configure(**kwargs):
 
 
 def start_trace(
-    trace_name: str = "session", tags: Optional[Union[Dict[str, Any], List[str]]] = None
+    trace_name: str = "session",
+    tags: Optional[Union[Dict[str, Any], List[str]]] = None,
+    project: Optional[str] = None,
 ) -> Optional[TraceContext]:
     """
     Starts a new trace (root span) and returns its context.
@@ -234,9 +307,12 @@ def start_trace(
     Args:
         trace_name: Name for the trace (e.g., "session", "my_custom_task").
         tags: Optional tags to attach to the trace span (list of strings or dict).
+        project: Name of a project registered with `add_project` to send the trace to.
+            Defaults to the project selected with `use_project`, if any.
 
     Returns:
-        A TraceContext object containing the span and context token, or None if SDK not initialized.
+        A TraceContext object containing the span and context token, or None if SDK not initialized
+        or the project is not registered.
     """
     if not tracer.initialized:
         # Optionally, attempt to initialize the client if not already, or log a more severe warning.
@@ -252,7 +328,39 @@ def start_trace(
             logger.error(f"SDK auto-initialization failed during start_trace: {e}. Cannot start trace.")
             return None
 
-    return tracer.start_trace(trace_name=trace_name, tags=tags)
+    if project is None:
+        return tracer.start_trace(trace_name=trace_name, tags=tags)
+    return tracer.start_trace(trace_name=trace_name, tags=tags, project=project)
+
+
+def add_project(name: str, api_key: str) -> bool:
+    """
+    Register another AgentOps project to send traces to from this process.
+
+    Args:
+        name: Name to select the project by in `start_trace` and `use_project`
+        api_key: API key of the project
+
+    Returns:
+        True if the project was registered
+    """
+    return get_client().add_project(name, api_key)
+
+
+def use_project(name: Optional[str]):
+    """
+    Send traces started in this context to a project registered with `add_project`.
+
+    Use as a context manager; it applies to the current thread or async task and
+    whatever they start, including traces started by decorators::
+
+        with agentops.use_project("acme"):
+            run_agent()
+
+    Args:
+        name: Name of the project, or None for the project passed to `init`
+    """
+    return use_pipeline(name)
 
 
 def end_trace(
@@ -464,6 +572,8 @@ __all__ = [
     "start_trace",
     "end_trace",
     "update_trace_metadata",
+    "add_project",
+    "use_project",
     "Client",
     "get_client",
     # Decorators
@@ -4,6 +4,8 @@ V4 API client for the AgentOps API.
 This module provides the client for the V4 version of the AgentOps API.
 """
 
+import gzip
+import json
 from typing import Optional, Union, Dict, Any
 
 import requests
@@ -51,7 +53,13 @@ class V4Client(BaseApiClient):
             headers.update(custom_headers)
         return headers
 
-    def post(self, path: str, body: Union[str, bytes], headers: Optional[Dict[str, str]] = None) -> requests.Response:
+    def post(
+        self,
+        path: str,
+        body: Union[str, bytes],
+        headers: Optional[Dict[str, str]] = None,
+        compress: bool = False,
+    ) -> requests.Response:
         """
         Make a POST request to the V4 API.
 
@@ -59,6 +67,7 @@ class V4Client(BaseApiClient):
             path: The API path to POST to
             body: The request body (string or bytes)
             headers: Optional headers to include
+            compress: Whether to gzip the JSON request body
 
         Returns:
             The response object
@@ -66,6 +75,11 @@ class V4Client(BaseApiClient):
         url = self._get_full_url(path)
         request_headers = headers or self.prepare_headers()
 
+        if compress:
+            data = gzip.compress(json.dumps({"body": body}).encode("utf-8"))
+            request_headers = {**request_headers, "Content-Type": "application/json", "Content-Encoding": "gzip"}
+            return HttpClient.get_session().post(url, data=data, headers=request_headers, timeout=30)
+
         return HttpClient.get_session().post(url, json={"body": body}, headers=request_headers, timeout=30)
 
     def upload_object(self, body: Union[str, bytes]) -> Dict[str, Any]:
@@ -105,13 +119,21 @@ class V4Client(BaseApiClient):
         except requests.exceptions.RequestException as e:
             raise ApiServerException(f"Failed to upload object: {e}")
 
-    def upload_logfile(self, body: Union[str, bytes], trace_id: str) -> Dict[str, Any]:
+    def upload_logfile(
+        self,
+        body: Union[str, bytes],
+        trace_id: str,
+        chunk_index: Optional[int] = None,
+        compress: bool = False,
+    ) -> Dict[str, Any]:
         """
         Upload a logfile to the V4 API.
 
         Args:
             body: The logfile content to upload
             trace_id: The trace ID associated with the logfile
+            chunk_index: Position of this chunk when a trace's log is uploaded in parts
+            compress: Whether to gzip the request body
 
         Returns:
             Dictionary containing upload response data
@@ -125,7 +147,13 @@ class V4Client(BaseApiClient):
                 body = body.decode("utf-8")
 
             headers = {**self.prepare_headers(), "Trace-Id": str(trace_id)}
-            response = self.post("/v4/logs/upload/", body, headers)
+            if chunk_index is not None:
+                headers["Log-Chunk"] = str(chunk_index)
+
+            if compress:
+                response = self.post("/v4/logs/upload/", body, headers, compress=True)
+            else:
+                response = self.post("/v4/logs/upload/", body, headers)
 
             if response.status_code != 200:
                 error_msg = f"Upload failed: {response.status_code}"
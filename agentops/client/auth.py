@@ -0,0 +1,181 @@
+"""
+JWT caching and proactive refresh for the AgentOps client.
+
+The TokenManager holds the current JWT and refreshes it on HttpClient's
+background event loop shortly before it expires. Exporters read the cached
+token on every request, so they never wait on (or trigger) an auth round trip.
+"""
+
+import asyncio
+import base64
+import json
+import threading
+import time
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Optional, Union
+
+from agentops.client.api.types import AuthTokenResponse
+from agentops.client.http.http_client import HttpClient
+from agentops.helpers.fork import register_after_fork
+from agentops.logging import logger
+
+
+def decode_jwt_expiry(token: str) -> Optional[float]:
+    """
+    Read the `exp` claim from a JWT without verifying its signature.
+
+    Args:
+        token: The encoded JWT
+
+    Returns:
+        The expiry as a Unix timestamp, or None if the token has no readable expiry
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        exp = claims.get("exp")
+        return float(exp) if exp is not None else None
+    except (IndexError, ValueError, TypeError, AttributeError):
+        return None
+
+
+class TokenManager:
+    """
+    Caches the AgentOps JWT and refreshes it ahead of expiry.
+
+    `get_token` is a plain attribute read and is safe to call from any thread
+    without locking. Refreshes run `fetch` on HttpClient's background loop
+    `refresh_margin` seconds before the token expires (or halfway through its
+    lifetime for short-lived tokens). A failed refresh keeps the current token
+    in place and is retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[Optional[AuthTokenResponse]]],
+        refresh_margin: float = 300.0,
+        retry_interval: float = 5.0,
+        max_retry_interval: float = 300.0,
+    ):
+        """
+        Initialize the token manager.
+
+        Args:
+            fetch: Coroutine function returning a fresh auth response, or None on failure
+            refresh_margin: Seconds before expiry at which to refresh
+            retry_interval: Initial delay before retrying a failed refresh
+            max_retry_interval: Upper bound for the retry delay
+        """
+        self._fetch = fetch
+        self._refresh_margin = refresh_margin
+        self._retry_interval = retry_interval
+        self._max_retry_interval = max_retry_interval
+
+        self._token: Optional[str] = None
+        self._expires_at: Optional[float] = None
+
+        self._lock = threading.Lock()  # Guards refresh scheduling, never token reads
+        self._pending: Optional[Union["asyncio.Task[Optional[str]]", "Future[Optional[str]]"]] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._failures = 0
+        self._closed = False
+
+        register_after_fork(self._at_fork_reinit)
+
+    def get_token(self) -> Optional[str]:
+        """Get the cached JWT without blocking."""
+        return self._token
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        """Expiry of the cached token as a Unix timestamp, if known."""
+        return self._expires_at
+
+    def set_token(self, token: str) -> None:
+        """
+        Replace the cached token and schedule its refresh.
+
+        Args:
+            token: The new JWT
+        """
+        self._expires_at = decode_jwt_expiry(token)
+        self._token = token
+        self._failures = 0
+
+        if self._expires_at is not None:
+            remaining = self._expires_at - time.time()
+            # Never spin on a token that is already (nearly) expired, e.g. under clock skew
+            self._schedule(max(remaining - min(self._refresh_margin, remaining / 2), self._retry_interval))
+
+    def refresh(self) -> Union["asyncio.Task[Optional[str]]", "Future[Optional[str]]"]:
+        """
+        Start a refresh unless one is already in flight.
+
+        The refresh runs on the caller's event loop if there is one, otherwise
+        on HttpClient's background loop.
+
+        Returns:
+            The task or future resolving to the new token (None if the refresh failed)
+        """
+        with self._lock:
+            if self._pending is not None and not self._pending.done():
+                return self._pending
+
+            try:
+                self._pending = asyncio.get_running_loop().create_task(self._refresh())
+            except RuntimeError:
+                self._pending = asyncio.run_coroutine_threadsafe(self._refresh(), HttpClient.get_background_loop())
+            return self._pending
+
+    async def _refresh(self) -> Optional[str]:
+        try:
+            response = await self._fetch()
+        except Exception as e:
+            logger.debug(f"Token refresh failed: {e}")
+            response = None
+
+        token = response.get("token") if response else None
+        if token:
+            self.set_token(token)
+            logger.debug("Authentication token refreshed")
+            return token
+
+        self._failures += 1
+        if self._token is not None:
+            delay = min(self._retry_interval * 2 ** (self._failures - 1), self._max_retry_interval)
+            logger.debug(f"Token refresh failed, keeping current token and retrying in {delay:.0f}s")
+            self._schedule(delay)
+        return None
+
+    def _schedule(self, delay: float) -> None:
+        """Arm the refresh timer on the background loop, replacing any earlier one."""
+        if self._closed:
+            return
+        loop = HttpClient.get_background_loop()
+        loop.call_soon_threadsafe(self._arm_timer, max(delay, 0.0))
+
+    def _arm_timer(self, delay: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        if not self._closed:
+            self.refresh()
+
+    def _at_fork_reinit(self) -> None:
+        """Re-arm the refresh timer in a forked child; the parent's timer and refresh lived on its loop thread."""
+        self._lock = threading.Lock()
+        self._pending = None
+        self._timer = None
+        if self._token is not None and not self._closed:
+            self.set_token(self._token)
+
+    def close(self) -> None:
+        """Stop scheduled refreshes."""
+        self._closed = True
+        timer = self._timer
+        if timer is not None:
+            HttpClient.get_background_loop().call_soon_threadsafe(timer.cancel)
@@ -1,38 +1,36 @@
-import atexit
 import asyncio
 import threading
-from typing import Optional, Any
+from typing import Any, Dict, Optional
 
 from agentops.client.api import ApiClient
+from agentops.client.auth import TokenManager
 from agentops.config import Config
+from agentops.helpers.packages import get_package_index
 from agentops.instrumentation import instrument_all
+from agentops.instrumentation.common.streaming import set_stream_capture
 from agentops.logging import logger
 from agentops.logging.config import configure_logging, intercept_opentelemetry_logging
 from agentops.sdk.core import TraceContext, tracer
+from agentops.sdk.span_store import SpanStore
 from agentops.legacy import Session
 
 # Global variables to hold the client's auto-started trace and its legacy session wrapper
 _client_init_trace_context: Optional[TraceContext] = None
 _client_legacy_session_for_init_trace: Optional[Session] = None
 
-# Single atexit handler registered flag
-_atexit_registered = False
 
+def _release_init_trace_at_shutdown():
+    """
+    Tracer shutdown hook releasing the client's auto-initialized trace.
 
-def _end_init_trace_atexit():
-    """Global atexit handler to end the client's auto-initialized trace during shutdown."""
+    The tracer ends the trace itself, in the same pass as all other active
+    traces, so that its export is part of the single bounded shutdown flush.
+    """
     global _client_init_trace_context, _client_legacy_session_for_init_trace
     if _client_init_trace_context is not None:
-        logger.debug("Auto-ending client's init trace during shutdown.")
-        try:
-            # Use global tracer to end the trace directly
-            if tracer.initialized and _client_init_trace_context.span.is_recording():
-                tracer.end_trace(_client_init_trace_context, end_state="Shutdown")
-        except Exception as e:
-            logger.warning(f"Error ending client's init trace during shutdown: {e}")
-        finally:
-            _client_init_trace_context = None
-            _client_legacy_session_for_init_trace = None  # Clear its legacy wrapper too
+        logger.debug("Client's init trace will be ended by tracer shutdown.")
+    _client_init_trace_context = None
+    _client_legacy_session_for_init_trace = None  # Clear its legacy wrapper too
 
 
 class Client:
@@ -48,10 +46,11 @@ class Client:
     __instance = None  # Class variable for singleton pattern
 
     api: ApiClient
-    _auth_token: Optional[str] = None
+    _token_manager: TokenManager
     _project_id: Optional[str] = None
     _auth_lock = threading.Lock()
     _auth_task: Optional[asyncio.Task] = None
+    _project_token_managers: Dict[str, TokenManager]
 
     def __new__(cls, *args: Any, **kwargs: Any) -> "Client":
         if cls.__instance is None:
@@ -59,10 +58,13 @@ class Client:
             # Initialize instance variables that should only be set once per instance
             cls.__instance._init_trace_context = None
             cls.__instance._legacy_session_for_init_trace = None
-            cls.__instance._auth_token = None
+            cls.__instance._token_manager = TokenManager(
+                lambda: cls.__instance._fetch_auth_async(cls.__instance.config.api_key)
+            )
             cls.__instance._project_id = None
             cls.__instance._auth_lock = threading.Lock()
             cls.__instance._auth_task = None
+            cls.__instance._project_token_managers = {}
         return cls.__instance
 
     def __init__(self):
@@ -78,14 +80,12 @@ class Client:
             # self._legacy_session_for_init_trace = None # Already done in __new__
 
     def get_current_jwt(self) -> Optional[str]:
-        """Get the current JWT token."""
-        with self._auth_lock:
-            return self._auth_token
+        """Get the current JWT token from the token cache without blocking."""
+        return self._token_manager.get_token()
 
     def _set_auth_data(self, token: str, project_id: str):
         """Set authentication data thread-safely."""
         with self._auth_lock:
-            self._auth_token = token
             self._project_id = project_id
 
         # Update the HTTP client's project ID
@@ -116,33 +116,13 @@ class Client:
             return None
 
     def _start_auth_task(self, api_key: str):
-        """Start the async authentication task."""
-        if self._auth_task and not self._auth_task.done():
-            return  # Task already running
-
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # Use existing event loop
-                self._auth_task = loop.create_task(self._fetch_auth_async(api_key))
-            else:
-                # Create new event loop in background thread
-                def run_async_auth():
-                    asyncio.run(self._fetch_auth_async(api_key))
-
-                import threading
+        """
+        Start the async authentication task.
 
-                auth_thread = threading.Thread(target=run_async_auth, daemon=True)
-                auth_thread.start()
-        except RuntimeError:
-            # Create new event loop in background thread
-            def run_async_auth():
-                asyncio.run(self._fetch_auth_async(api_key))
-
-            import threading
-
-            auth_thread = threading.Thread(target=run_async_auth, daemon=True)
-            auth_thread.start()
+        The token manager runs it on the current event loop if there is one, otherwise on the
+        shared HTTP loop, and keeps refreshing the token there ahead of its expiry.
+        """
+        self._auth_task = self._token_manager.refresh()
 
     def init(self, **kwargs: Any) -> None:  # Return type updated to None
         # Recreate the Config object to parse environment variables at the time of initialization
@@ -179,20 +159,25 @@ class Client:
         configure_logging(self.config)
         intercept_opentelemetry_logging()
 
+        # Index installed packages off the calling thread; instrumentor version checks reuse it
+        get_package_index().build_in_background()
+
         self.api = ApiClient(self.config.endpoint)
 
         # Initialize tracer with JWT provider for dynamic updates
         tracing_config = self.config.dict()
         tracing_config["project_id"] = "temporary"  # Will be updated when auth completes
 
-        # Create JWT provider function for dynamic updates
-        def jwt_provider():
-            return self.get_current_jwt()
-
-        # Initialize tracer with JWT provider
-        tracer.initialize_from_config(tracing_config, jwt_provider=jwt_provider)
+        # Exporters read the cached token per request; the token manager keeps it fresh
+        tracer.initialize_from_config(tracing_config, jwt_provider=self._token_manager.get_token)
 
         if self.config.instrument_llm_calls:
+            spill = self.config.stream_capture_spill
+            if spill and self.config.async_export:
+                # Spilled content is uploaded by the export pipeline, which async export replaces
+                logger.warning("stream_capture_spill is not supported with async_export; keeping capped content only")
+                spill = False
+            set_stream_capture(self.config.stream_capture_chars, spill)
             instrument_all()
 
         # Start authentication task only if we have an API key
@@ -201,10 +186,7 @@ class Client:
         else:
             logger.debug("No API key available - skipping authentication task")
 
-        global _atexit_registered
-        if not _atexit_registered:
-            atexit.register(_end_init_trace_atexit)  # Register new atexit handler
-            _atexit_registered = True
+        tracer.add_shutdown_hook(_release_init_trace_at_shutdown)
 
         # Auto-start trace if configured
         if self.config.auto_start_session:
@@ -255,6 +237,67 @@ class Client:
         """Update client configuration"""
         self.config.configure(**kwargs)
 
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get self-telemetry for the span export pipeline.
+
+        Use it to check whether the SDK keeps up with the application and to
+        size `max_queue_size` and the other export settings.
+
+        Returns:
+            Spans enqueued, dropped, exported and failed, queue depth and its
+            high-water mark, and histograms of export latency, batch size and
+            payload size. Empty until the client is initialized.
+        """
+        return tracer.stats()
+
+    def add_project(self, name: str, api_key: str) -> bool:
+        """
+        Register another AgentOps project to send traces to from this process.
+
+        Select it per trace with `agentops.start_trace(..., project=name)` or
+        `agentops.use_project(name)`. All projects share the client's export
+        worker and connections; each authenticates with its own API key, and
+        its JWT is refreshed in the background like the client's own.
+
+        Args:
+            name: Name to select the project by
+            api_key: API key of the project
+
+        Returns:
+            True if the project was registered
+        """
+        if not self.initialized:
+            logger.warning("AgentOps Client not initialized. Call agentops.init() before adding projects.")
+            return False
+
+        async def fetch_project_token():
+            response = await self.api.v3.fetch_auth_token(api_key)
+            if response:
+                tracer.set_pipeline_project_id(name, response["project_id"])
+            return response
+
+        token_manager = TokenManager(fetch_project_token)
+        if not tracer.add_pipeline(name, jwt_provider=token_manager.get_token):
+            return False
+
+        previous = self._project_token_managers.pop(name, None)
+        if previous is not None:
+            previous.close()
+        self._project_token_managers[name] = token_manager
+        token_manager.refresh()
+        return True
+
+    def span_store(self) -> Optional[SpanStore]:
+        """
+        Get the in-process span store.
+
+        Returns:
+            The store holding finished spans for local queries, or None unless
+            the client was initialized with `span_store_max_spans` above 0.
+        """
+        return tracer.span_store
+
     @property
     def initialized(self) -> bool:
         return self._initialized
@@ -272,8 +315,8 @@ class Client:
     # __instance = None # This was a class variable, should be defined once
 
     # Make _init_trace_context and _legacy_session_for_init_trace accessible
-    # to the atexit handler if it becomes a static/class method or needs access
-    # For now, the atexit handler is global and uses global vars copied from these.
+    # to the shutdown hook if it becomes a static/class method or needs access
+    # For now, the shutdown hook is global and uses global vars copied from these.
 
     # Deprecate and remove the old global _active_session from this module.
     # Consumers should use agentops.start_trace() or rely on the auto-init trace.
@@ -1,10 +1,13 @@
 from typing import Dict, Optional
+import asyncio
 import threading
+import weakref
 
 import requests
 
 from agentops.client.http.http_adapter import BaseHTTPAdapter
 from agentops.logging import logger
+from agentops.helpers.fork import register_after_fork
 from agentops.helpers.version import get_agentops_version
 
 # Import aiohttp for async requests
@@ -22,6 +25,10 @@ class HttpClient:
 
     _session: Optional[requests.Session] = None
     _async_session: Optional[aiohttp.ClientSession] = None
+    _loop_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = (
+        weakref.WeakKeyDictionary()
+    )
+    _background_loop: Optional[asyncio.AbstractEventLoop] = None
     _project_id: Optional[str] = None
     _session_lock = threading.Lock()
 
@@ -67,19 +74,42 @@ class HttpClient:
                     logger.debug(f"Agentops version: agentops-python/{get_agentops_version() or 'unknown'}")
         return cls._session
 
+    @classmethod
+    def get_background_loop(cls) -> asyncio.AbstractEventLoop:
+        """
+        Get or start the shared background event loop.
+
+        The loop runs on a daemon thread and hosts the async session for callers
+        that are not already inside an event loop, so API calls and telemetry
+        export share one connection pool.
+        """
+        if cls._background_loop is None or cls._background_loop.is_closed():
+            with cls._session_lock:
+                if cls._background_loop is None or cls._background_loop.is_closed():
+                    loop = asyncio.new_event_loop()
+                    thread = threading.Thread(target=loop.run_forever, name="agentops-http-loop", daemon=True)
+                    thread.start()
+                    cls._background_loop = loop
+        return cls._background_loop
+
     @classmethod
     async def get_async_session(cls) -> Optional[aiohttp.ClientSession]:
-        """Get or create the global async session with optimized connection pooling"""
+        """
+        Get or create the async session for the running event loop.
+
+        aiohttp sessions are bound to the loop they were created on, so one pooled
+        session is kept per live loop. Code running on the shared background loop
+        (see get_background_loop) therefore shares a single connection pool.
+        """
         if not AIOHTTP_AVAILABLE:
             logger.warning("aiohttp not available, cannot create async session")
             return None
 
-        # Always create a new session if the current one is None or closed
-        if cls._async_session is None or cls._async_session.closed:
-            # Close the old session if it exists but is closed
-            if cls._async_session is not None and cls._async_session.closed:
-                cls._async_session = None
+        current_loop = asyncio.get_running_loop()
+        session = cls._loop_sessions.get(current_loop)
 
+        # Always create a new session if the current one is None or closed
+        if session is None or session.closed:
             # Create connector with connection pooling
             connector = aiohttp.TCPConnector(
                 limit=100,  # Total connection pool size
@@ -95,17 +125,36 @@ class HttpClient:
                 "User-Agent": f"agentops-python/{get_agentops_version() or 'unknown'}",
             }
 
-            cls._async_session = aiohttp.ClientSession(
+            session = aiohttp.ClientSession(
                 connector=connector, headers=headers, timeout=aiohttp.ClientTimeout(total=30)
             )
+            cls._loop_sessions[current_loop] = session
 
-        return cls._async_session
+        cls._async_session = session
+        return session
+
+    @classmethod
+    def _at_fork_reinit(cls) -> None:
+        """
+        Drop sessions and the background loop inherited from the parent process.
+
+        Their connections are shared with the parent and the loop's thread did
+        not survive the fork, so the child builds its own on next use. The
+        inherited sessions are not closed, as that would touch the parent's sockets.
+        """
+        cls._session_lock = threading.Lock()
+        cls._session = None
+        cls._async_session = None
+        cls._loop_sessions = weakref.WeakKeyDictionary()
+        cls._background_loop = None
 
     @classmethod
     async def close_async_session(cls):
-        """Close the async session"""
-        if cls._async_session and not cls._async_session.closed:
-            await cls._async_session.close()
+        """Close the async session for the running event loop"""
+        session = cls._loop_sessions.pop(asyncio.get_running_loop(), None)
+        if session and not session.closed:
+            await session.close()
+        if cls._async_session is session:
             cls._async_session = None
 
     @classmethod
@@ -167,3 +216,6 @@ class HttpClient:
 
         except Exception:
             return None
+
+
+register_after_fork(HttpClient._at_fork_reinit)
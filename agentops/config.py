@@ -3,13 +3,13 @@ import logging
 import os
 import sys
 from dataclasses import dataclass, field
-from typing import List, Optional, Set, TypedDict, Union
+from typing import Dict, List, Optional, Set, TypedDict, Union
 from uuid import UUID
 
 from opentelemetry.sdk.trace import SpanProcessor
 from opentelemetry.sdk.trace.export import SpanExporter
 
-from agentops.helpers.env import get_env_bool, get_env_int, get_env_list
+from agentops.helpers.env import get_env_bool, get_env_float, get_env_float_map, get_env_int, get_env_list
 from agentops.helpers.serialization import AgentOpsJSONEncoder
 
 
@@ -20,6 +20,8 @@ class ConfigDict(TypedDict):
     max_wait_time: Optional[int]
     export_flush_interval: Optional[int]
     max_queue_size: Optional[int]
+    max_export_batch_size: Optional[int]
+    max_queue_bytes: Optional[int]
     default_tags: Optional[List[str]]
     trace_name: Optional[str]
     instrument_llm_calls: Optional[bool]
@@ -31,6 +33,39 @@ class ConfigDict(TypedDict):
     fail_safe: Optional[bool]
     prefetch_jwt_token: Optional[bool]
     log_session_replay_url: Optional[bool]
+    flush_on_trace_end: Optional[bool]
+    shutdown_flush_timeout: Optional[int]
+    spill_directory: Optional[str]
+    spill_max_bytes: Optional[int]
+    export_workers: Optional[int]
+    async_export: Optional[bool]
+    system_metrics_interval: Optional[int]
+    system_metrics_gauges: Optional[bool]
+    log_buffer_max_bytes: Optional[int]
+    log_buffer_policy: Optional[str]
+    log_upload_chunk_bytes: Optional[int]
+    log_upload_compression: Optional[bool]
+    sampling_ratio: Optional[float]
+    sampling_ratios_by_kind: Optional[Dict[str, float]]
+    tail_sampling: Optional[bool]
+    tail_sampling_ratio: Optional[float]
+    tail_sampling_latency_ms: Optional[int]
+    tail_sampling_min_cost: Optional[float]
+    tail_sampling_min_tokens: Optional[int]
+    tail_sampling_max_traces: Optional[int]
+    span_relay_socket: Optional[str]
+    export_stats_metrics: Optional[bool]
+    adaptive_batching: Optional[bool]
+    export_reorder_window: Optional[int]
+    span_store_max_spans: Optional[int]
+    file_export_directory: Optional[str]
+    file_export_segment_bytes: Optional[int]
+    file_export_compression: Optional[bool]
+    file_export_fsync: Optional[str]
+    prompt_dedup: Optional[bool]
+    deferred_extraction: Optional[bool]
+    stream_capture_chars: Optional[int]
+    stream_capture_spill: Optional[bool]
 
 
 @dataclass
@@ -61,8 +96,18 @@ class Config:
     )
 
     max_queue_size: int = field(
-        default_factory=lambda: get_env_int("AGENTOPS_MAX_QUEUE_SIZE", 512),
-        metadata={"description": "Maximum number of events to queue before forcing a flush"},
+        default_factory=lambda: get_env_int("AGENTOPS_MAX_QUEUE_SIZE", 2048),
+        metadata={"description": "Maximum number of spans queued for export before new spans are dropped"},
+    )
+
+    max_export_batch_size: int = field(
+        default_factory=lambda: get_env_int("AGENTOPS_MAX_EXPORT_BATCH_SIZE", 512),
+        metadata={"description": "Maximum number of spans sent in one export request"},
+    )
+
+    max_queue_bytes: int = field(
+        default_factory=lambda: get_env_int("AGENTOPS_MAX_QUEUE_BYTES", 16 * 1024 * 1024),
+        metadata={"description": "Maximum estimated size in bytes of spans queued for export (adaptive batching only)"},
     )
 
     default_tags: Set[str] = field(
@@ -120,6 +165,220 @@ class Config:
         metadata={"description": "Whether to log session replay URLs to the console"},
     )
 
+    flush_on_trace_end: bool = field(
+        default_factory=lambda: get_env_bool("AGENTOPS_FLUSH_ON_TRACE_END", True),
+        metadata={
+            "description": "Whether ending a trace blocks until its spans are exported. When disabled, root spans are "
+            "handed to the batch processor and the call returns immediately."
+        },
+    )
+
+    shutdown_flush_timeout: int = field(
+        default_factory=lambda: get_env_int("AGENTOPS_SHUTDOWN_FLUSH_TIMEOUT", 5000),
+        metadata={"description": "Maximum time in milliseconds to spend flushing telemetry at process shutdown"},
+    )
+
+    spill_directory: Optional[str] = field(
+        default_factory=lambda: os.getenv("AGENTOPS_SPILL_DIRECTORY"),
+        metadata={
+            "description": "Directory for spilling span batches to disk when export fails. Disabled when not set."
+        },
+    )
+
+    spill_max_bytes: int = field(
+        default_factory=lambda: get_env_int("AGENTOPS_SPILL_MAX_BYTES", 64 * 1024 * 1024),
+        metadata={
+            "description": "Maximum size in bytes of the span spill directory before the oldest batches are evicted"
+        },
+    )
+
+    export_workers: int = field(
+        default_factory=lambda: get_env_int("AGENTOPS_EXPORT_WORKERS", 1),
+        metadata={"description": "Number of span batches that may be exported concurrently"},
+    )
+
+    async_export: bool = field(
+        default_factory=lambda: get_env_bool("AGENTOPS_ASYNC_EXPORT", False),
+        metadata={
+            "description": "Whether to export spans with the asyncio exporter over the shared aiohttp session "
+            "instead of the threaded requests-based exporter"
+        },
+    )
+
+    system_metrics_interval: int = field(
+        default_factory=lambda: get_env_int("AGENTOPS_SYSTEM_METRICS_INTERVAL", 15),
+        metadata={
+            "description": "Seconds between background samples of host CPU, memory and disk usage "
+            "(0 disables the sampler)"
+        },
+    )
+
+    system_metrics_gauges: bool = field(
+        default_factory=lambda: get_env_bool("AGENTOPS_SYSTEM_METRICS_GAUGES", False),
+        metadata={"description": "Whether to publish sampled host resource usage as OpenTelemetry observable gauges"},
+    )
+
+    log_buffer_max_bytes: int = field(
+        default_factory=lambda: get_env_int("AGENTOPS_LOG_BUFFER_MAX_BYTES", 4 * 1024 * 1024),
+        metadata={"description": "Byte budget for captured print and log output awaiting upload"},
+    )
+
+    log_buffer_policy: str = field(
+        default_factory=lambda: os.getenv("AGENTOPS_LOG_BUFFER_POLICY", "drop_oldest"),
+        metadata={"description": "What to drop when the log buffer is full: 'drop_oldest' or 'sample'"},
+    )
+
+    log_upload_chunk_bytes: int = field(
+        default_factory=lambda: get_env_int("AGENTOPS_LOG_UPLOAD_CHUNK_BYTES", 1024 * 1024),
+        metadata={
+            "description": "Upload a trace's captured output in chunks of this size while it runs (0 uploads only when the trace ends)"
+        },
+    )
+
+    log_upload_compression: bool = field(
+        default_factory=lambda: get_env_bool("AGENTOPS_LOG_UPLOAD_COMPRESSION", False),
+        metadata={"description": "Whether to gzip captured log uploads"},
+    )
+
+    sampling_ratio: float = field(
+        default_factory=lambda: get_env_float("AGENTOPS_SAMPLING_RATIO", 1.0),
+        metadata={
+            "description": "Fraction of new traces to record (head sampling); child spans follow their parent's decision"
+        },
+    )
+
+    sampling_ratios_by_kind: Dict[str, float] = field(
+        default_factory=lambda: get_env_float_map("AGENTOPS_SAMPLING_RATIOS_BY_KIND"),
+        metadata={
+            "description": "Head sampling ratio for new traces by AgentOps span kind, e.g. {'llm': 0.1}; overrides sampling_ratio"
+        },
+    )
+
+    tail_sampling: bool = field(
+        default_factory=lambda: get_env_bool("AGENTOPS_TAIL_SAMPLING", False),
+        metadata={
+            "description": "Whether to buffer each trace until its root span ends and export it only if it is worth keeping"
+        },
+    )
+
+    tail_sampling_ratio: float = field(
+        default_factory=lambda: get_env_float("AGENTOPS_TAIL_SAMPLING_RATIO", 1.0),
+        metadata={"description": "Fraction of traces kept by tail sampling when no keep rule matches"},
+    )
+
+    tail_sampling_latency_ms: Optional[int] = field(
+        default_factory=lambda: get_env_int("AGENTOPS_TAIL_SAMPLING_LATENCY_MS", None),
+        metadata={"description": "Tail sampling keeps traces whose root span took at least this many milliseconds"},
+    )
+
+    tail_sampling_min_cost: Optional[float] = field(
+        default_factory=lambda: get_env_float("AGENTOPS_TAIL_SAMPLING_MIN_COST", None),
+        metadata={"description": "Tail sampling keeps traces whose recorded cost adds up to at least this much"},
+    )
+
+    tail_sampling_min_tokens: Optional[int] = field(
+        default_factory=lambda: get_env_int("AGENTOPS_TAIL_SAMPLING_MIN_TOKENS", None),
+        metadata={"description": "Tail sampling keeps traces that used at least this many tokens"},
+    )
+
+    tail_sampling_max_traces: int = field(
+        default_factory=lambda: get_env_int("AGENTOPS_TAIL_SAMPLING_MAX_TRACES", 1000),
+        metadata={
+            "description": "Maximum number of traces buffered for tail sampling; the oldest is decided early when exceeded"
+        },
+    )
+
+    span_relay_socket: Optional[str] = field(
+        default_factory=lambda: os.getenv("AGENTOPS_SPAN_RELAY_SOCKET", None),
+        metadata={
+            "description": "Unix socket through which all processes on this host relay spans to a single exporting process"
+        },
+    )
+
+    export_stats_metrics: bool = field(
+        default_factory=lambda: get_env_bool("AGENTOPS_EXPORT_STATS_METRICS", False),
+        metadata={
+            "description": "Whether to publish span export pipeline stats (queue depth, drops, export latency) as OTel metrics"
+        },
+    )
+
+    adaptive_batching: bool = field(
+        default_factory=lambda: get_env_bool("AGENTOPS_ADAPTIVE_BATCHING", False),
+        metadata={"description": "Whether to adapt export batch size and flush delay to the observed load"},
+    )
+
+    export_reorder_window: int = field(
+        default_factory=lambda: get_env_int("AGENTOPS_EXPORT_REORDER_WINDOW", 0),
+        metadata={
+            "description": "Longest time in milliseconds a span is held back to be exported with the rest of its "
+            "trace (adaptive batching only, 0 disables)"
+        },
+    )
+
+    span_store_max_spans: int = field(
+        default_factory=lambda: get_env_int("AGENTOPS_SPAN_STORE_MAX_SPANS", 0),
+        metadata={
+            "description": "Number of finished spans kept in an in-process span store for local queries (0 disables)"
+        },
+    )
+
+    file_export_directory: Optional[str] = field(
+        default_factory=lambda: os.getenv("AGENTOPS_FILE_EXPORT_DIRECTORY"),
+        metadata={
+            "description": "Directory to record spans to instead of sending them, for upload later with agentops-replay"
+        },
+    )
+
+    file_export_segment_bytes: int = field(
+        default_factory=lambda: get_env_int("AGENTOPS_FILE_EXPORT_SEGMENT_BYTES", 64 * 1024 * 1024),
+        metadata={"description": "Size in bytes at which a span file segment is finished and a new one started"},
+    )
+
+    file_export_compression: bool = field(
+        default_factory=lambda: get_env_bool("AGENTOPS_FILE_EXPORT_COMPRESSION", False),
+        metadata={"description": "Whether to gzip the span batches written to file segments"},
+    )
+
+    file_export_fsync: str = field(
+        default_factory=lambda: os.getenv("AGENTOPS_FILE_EXPORT_FSYNC", "rotate"),
+        metadata={
+            "description": "When span file segments are synced to disk: 'always' (every batch), 'rotate' (when a "
+            "segment is finished) or 'never'"
+        },
+    )
+
+    prompt_dedup: bool = field(
+        default_factory=lambda: get_env_bool("AGENTOPS_PROMPT_DEDUP", False),
+        metadata={
+            "description": "Whether to export each distinct prompt message body once per trace, with later spans "
+            "referencing it by hash"
+        },
+    )
+
+    deferred_extraction: bool = field(
+        default_factory=lambda: get_env_bool("AGENTOPS_DEFERRED_EXTRACTION", False),
+        metadata={
+            "description": "Whether to turn LLM requests and responses into span attributes on the export thread "
+            "instead of on the calling thread"
+        },
+    )
+
+    stream_capture_chars: int = field(
+        default_factory=lambda: get_env_int("AGENTOPS_STREAM_CAPTURE_CHARS", 1_000_000),
+        metadata={
+            "description": "Characters of streamed completion content kept per stream, half from its start and half "
+            "from its end (0 keeps everything)"
+        },
+    )
+
+    stream_capture_spill: bool = field(
+        default_factory=lambda: get_env_bool("AGENTOPS_STREAM_CAPTURE_SPILL", False),
+        metadata={
+            "description": "Whether to upload the full content of streams over the capture budget as an object "
+            "referenced from the span"
+        },
+    )
+
     exporter_endpoint: Optional[str] = field(
         default_factory=lambda: os.getenv("AGENTOPS_EXPORTER_ENDPOINT", "https://otlp.agentops.ai/v1/traces"),
         metadata={
@@ -143,6 +402,8 @@ class Config:
         max_wait_time: Optional[int] = None,
         export_flush_interval: Optional[int] = None,
         max_queue_size: Optional[int] = None,
+        max_export_batch_size: Optional[int] = None,
+        max_queue_bytes: Optional[int] = None,
         default_tags: Optional[List[str]] = None,
         trace_name: Optional[str] = None,
         instrument_llm_calls: Optional[bool] = None,
@@ -154,6 +415,39 @@ class Config:
         fail_safe: Optional[bool] = None,
         prefetch_jwt_token: Optional[bool] = None,
         log_session_replay_url: Optional[bool] = None,
+        flush_on_trace_end: Optional[bool] = None,
+        shutdown_flush_timeout: Optional[int] = None,
+        spill_directory: Optional[str] = None,
+        spill_max_bytes: Optional[int] = None,
+        export_workers: Optional[int] = None,
+        async_export: Optional[bool] = None,
+        system_metrics_interval: Optional[int] = None,
+        system_metrics_gauges: Optional[bool] = None,
+        log_buffer_max_bytes: Optional[int] = None,
+        log_buffer_policy: Optional[str] = None,
+        log_upload_chunk_bytes: Optional[int] = None,
+        log_upload_compression: Optional[bool] = None,
+        sampling_ratio: Optional[float] = None,
+        sampling_ratios_by_kind: Optional[Dict[str, float]] = None,
+        tail_sampling: Optional[bool] = None,
+        tail_sampling_ratio: Optional[float] = None,
+        tail_sampling_latency_ms: Optional[int] = None,
+        tail_sampling_min_cost: Optional[float] = None,
+        tail_sampling_min_tokens: Optional[int] = None,
+        tail_sampling_max_traces: Optional[int] = None,
+        span_relay_socket: Optional[str] = None,
+        export_stats_metrics: Optional[bool] = None,
+        adaptive_batching: Optional[bool] = None,
+        export_reorder_window: Optional[int] = None,
+        span_store_max_spans: Optional[int] = None,
+        file_export_directory: Optional[str] = None,
+        file_export_segment_bytes: Optional[int] = None,
+        file_export_compression: Optional[bool] = None,
+        file_export_fsync: Optional[str] = None,
+        prompt_dedup: Optional[bool] = None,
+        deferred_extraction: Optional[bool] = None,
+        stream_capture_chars: Optional[int] = None,
+        stream_capture_spill: Optional[bool] = None,
         exporter: Optional[SpanExporter] = None,
         processor: Optional[SpanProcessor] = None,
         exporter_endpoint: Optional[str] = None,
@@ -189,6 +483,12 @@ class Config:
         if max_queue_size is not None:
             self.max_queue_size = max_queue_size
 
+        if max_export_batch_size is not None:
+            self.max_export_batch_size = max_export_batch_size
+
+        if max_queue_bytes is not None:
+            self.max_queue_bytes = max_queue_bytes
+
         if default_tags is not None:
             self.default_tags = set(default_tags)
 
@@ -229,6 +529,105 @@ class Config:
         if log_session_replay_url is not None:
             self.log_session_replay_url = log_session_replay_url
 
+        if flush_on_trace_end is not None:
+            self.flush_on_trace_end = flush_on_trace_end
+
+        if shutdown_flush_timeout is not None:
+            self.shutdown_flush_timeout = shutdown_flush_timeout
+
+        if spill_directory is not None:
+            self.spill_directory = spill_directory
+
+        if spill_max_bytes is not None:
+            self.spill_max_bytes = spill_max_bytes
+
+        if export_workers is not None:
+            self.export_workers = export_workers
+
+        if async_export is not None:
+            self.async_export = async_export
+
+        if system_metrics_interval is not None:
+            self.system_metrics_interval = system_metrics_interval
+
+        if system_metrics_gauges is not None:
+            self.system_metrics_gauges = system_metrics_gauges
+
+        if log_buffer_max_bytes is not None:
+            self.log_buffer_max_bytes = log_buffer_max_bytes
+
+        if log_buffer_policy is not None:
+            self.log_buffer_policy = log_buffer_policy
+
+        if log_upload_chunk_bytes is not None:
+            self.log_upload_chunk_bytes = log_upload_chunk_bytes
+
+        if log_upload_compression is not None:
+            self.log_upload_compression = log_upload_compression
+
+        if sampling_ratio is not None:
+            self.sampling_ratio = sampling_ratio
+
+        if sampling_ratios_by_kind is not None:
+            self.sampling_ratios_by_kind = sampling_ratios_by_kind
+
+        if tail_sampling is not None:
+            self.tail_sampling = tail_sampling
+
+        if tail_sampling_ratio is not None:
+            self.tail_sampling_ratio = tail_sampling_ratio
+
+        if tail_sampling_latency_ms is not None:
+            self.tail_sampling_latency_ms = tail_sampling_latency_ms
+
+        if tail_sampling_min_cost is not None:
+            self.tail_sampling_min_cost = tail_sampling_min_cost
+
+        if tail_sampling_min_tokens is not None:
+            self.tail_sampling_min_tokens = tail_sampling_min_tokens
+
+        if tail_sampling_max_traces is not None:
+            self.tail_sampling_max_traces = tail_sampling_max_traces
+
+        if span_relay_socket is not None:
+            self.span_relay_socket = span_relay_socket
+
+        if export_stats_metrics is not None:
+            self.export_stats_metrics = export_stats_metrics
+
+        if adaptive_batching is not None:
+            self.adaptive_batching = adaptive_batching
+
+        if export_reorder_window is not None:
+            self.export_reorder_window = export_reorder_window
+
+        if span_store_max_spans is not None:
+            self.span_store_max_spans = span_store_max_spans
+
+        if file_export_directory is not None:
+            self.file_export_directory = file_export_directory
+
+        if file_export_segment_bytes is not None:
+            self.file_export_segment_bytes = file_export_segment_bytes
+
+        if file_export_compression is not None:
+            self.file_export_compression = file_export_compression
+
+        if file_export_fsync is not None:
+            self.file_export_fsync = file_export_fsync
+
+        if prompt_dedup is not None:
+            self.prompt_dedup = prompt_dedup
+
+        if deferred_extraction is not None:
+            self.deferred_extraction = deferred_extraction
+
+        if stream_capture_chars is not None:
+            self.stream_capture_chars = stream_capture_chars
+
+        if stream_capture_spill is not None:
+            self.stream_capture_spill = stream_capture_spill
+
         if exporter is not None:
             self.exporter = exporter
 
@@ -249,6 +648,8 @@ class Config:
             "max_wait_time": self.max_wait_time,
             "export_flush_interval": self.export_flush_interval,
             "max_queue_size": self.max_queue_size,
+            "max_export_batch_size": self.max_export_batch_size,
+            "max_queue_bytes": self.max_queue_bytes,
             "default_tags": self.default_tags,
             "trace_name": self.trace_name,
             "instrument_llm_calls": self.instrument_llm_calls,
@@ -260,6 +661,39 @@ class Config:
             "fail_safe": self.fail_safe,
             "prefetch_jwt_token": self.prefetch_jwt_token,
             "log_session_replay_url": self.log_session_replay_url,
+            "flush_on_trace_end": self.flush_on_trace_end,
+            "shutdown_flush_timeout": self.shutdown_flush_timeout,
+            "spill_directory": self.spill_directory,
+            "spill_max_bytes": self.spill_max_bytes,
+            "export_workers": self.export_workers,
+            "async_export": self.async_export,
+            "system_metrics_interval": self.system_metrics_interval,
+            "system_metrics_gauges": self.system_metrics_gauges,
+            "log_buffer_max_bytes": self.log_buffer_max_bytes,
+            "log_buffer_policy": self.log_buffer_policy,
+            "log_upload_chunk_bytes": self.log_upload_chunk_bytes,
+            "log_upload_compression": self.log_upload_compression,
+            "sampling_ratio": self.sampling_ratio,
+            "sampling_ratios_by_kind": self.sampling_ratios_by_kind,
+            "tail_sampling": self.tail_sampling,
+            "tail_sampling_ratio": self.tail_sampling_ratio,
+            "tail_sampling_latency_ms": self.tail_sampling_latency_ms,
+            "tail_sampling_min_cost": self.tail_sampling_min_cost,
+            "tail_sampling_min_tokens": self.tail_sampling_min_tokens,
+            "tail_sampling_max_traces": self.tail_sampling_max_traces,
+            "span_relay_socket": self.span_relay_socket,
+            "export_stats_metrics": self.export_stats_metrics,
+            "adaptive_batching": self.adaptive_batching,
+            "export_reorder_window": self.export_reorder_window,
+            "span_store_max_spans": self.span_store_max_spans,
+            "file_export_directory": self.file_export_directory,
+            "file_export_segment_bytes": self.file_export_segment_bytes,
+            "file_export_compression": self.file_export_compression,
+            "file_export_fsync": self.file_export_fsync,
+            "prompt_dedup": self.prompt_dedup,
+            "deferred_extraction": self.deferred_extraction,
+            "stream_capture_chars": self.stream_capture_chars,
+            "stream_capture_spill": self.stream_capture_spill,
             "exporter": self.exporter,
             "processor": self.processor,
             "exporter_endpoint": self.exporter_endpoint,
@@ -3,6 +3,7 @@ from agentops.helpers.serialization import (
     AgentOpsJSONEncoder,
     serialize_uuid,
     safe_serialize,
+    serialize_bounded,
     is_jsonable,
     filter_unjsonable,
 )
@@ -18,13 +19,16 @@ from agentops.helpers.system import (
     get_virtual_env,
 )
 from agentops.helpers.version import get_agentops_version, check_agentops_update
-from agentops.helpers.env import get_env_bool, get_env_int, get_env_list
+from agentops.helpers.env import get_env_bool, get_env_int, get_env_float, get_env_float_map, get_env_list
+from agentops.helpers.packages import get_package_index
+from agentops.helpers.fork import register_after_fork
 
 __all__ = [
     "get_ISO_time",
     "AgentOpsJSONEncoder",
     "serialize_uuid",
     "safe_serialize",
+    "serialize_bounded",
     "is_jsonable",
     "filter_unjsonable",
     "get_host_env",
@@ -40,5 +44,9 @@ __all__ = [
     "check_agentops_update",
     "get_env_bool",
     "get_env_int",
+    "get_env_float",
+    "get_env_float_map",
     "get_env_list",
+    "get_package_index",
+    "register_after_fork",
 ]
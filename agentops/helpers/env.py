@@ -1,7 +1,7 @@
 """Environment variable helper functions"""
 
 import os
-from typing import List, Optional, Set
+from typing import Dict, List, Optional, Set
 
 
 def get_env_bool(key: str, default: bool) -> bool:
@@ -36,6 +36,50 @@ def get_env_int(key: str, default: int) -> int:
         return default
 
 
+def get_env_float(key: str, default: Optional[float]) -> Optional[float]:
+    """Get float from environment variable
+
+    Args:
+        key: Environment variable name
+        default: Default value if not set
+
+    Returns:
+        float: Parsed float value
+    """
+    try:
+        return float(os.getenv(key, default))  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return default
+
+
+def get_env_float_map(key: str, default: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """Get a mapping of names to floats from an environment variable
+
+    The value is a comma-separated list of `name=value` pairs, e.g. `llm=0.1,tool=0.5`.
+    Malformed pairs are skipped.
+
+    Args:
+        key: Environment variable name
+        default: Default mapping if not set
+
+    Returns:
+        Dict[str, float]: Parsed mapping
+    """
+    val = os.getenv(key)
+    if val is None:
+        return dict(default or {})
+
+    result = {}
+    for pair in val.split(","):
+        name, sep, number = pair.partition("=")
+        try:
+            if sep:
+                result[name.strip()] = float(number)
+        except ValueError:
+            continue
+    return result
+
+
 def get_env_list(key: str, default: Optional[List[str]] = None) -> Set[str]:
     """Get comma-separated list from environment variable
 
@@ -0,0 +1,41 @@
+"""
+Hooks for reinitializing process-local state after `os.fork`.
+
+A forked child inherits the parent's memory but only the thread that called
+fork. Worker threads are gone, locks may be held by threads that no longer
+exist, and pooled connections are shared with the parent. Objects owning
+such state register a method here to rebuild it in the child.
+"""
+
+import os
+import weakref
+from typing import Any, Callable
+
+from agentops.logging import logger
+
+
+def register_after_fork(method: Callable[[], Any]) -> None:
+    """
+    Call a bound method in the child process after every fork.
+
+    Only a weak reference to the method's object is kept, so registering does
+    not keep the object alive. Does nothing on platforms without `os.fork`.
+
+    Args:
+        method: Bound method to call with no arguments in the child
+    """
+    if not hasattr(os, "register_at_fork"):
+        return
+
+    weak_method = weakref.WeakMethod(method)  # type: ignore[arg-type]
+
+    def after_in_child() -> None:
+        bound = weak_method()
+        if bound is None:
+            return
+        try:
+            bound()
+        except Exception as e:
+            logger.debug(f"Error reinitializing {bound.__qualname__} after fork: {e}")
+
+    os.register_at_fork(after_in_child=after_in_child)
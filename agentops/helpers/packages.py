@@ -0,0 +1,182 @@
+"""
+Process-wide index of installed package metadata.
+
+Looking up a distribution with `importlib.metadata.version()` scans every entry on
+`sys.path` for matching dist-info directories. Environment reporting and
+instrumentor version gating do this for hundreds of names, so instead the
+installed distributions are read once into an index that maps distribution
+names and top-level modules to versions.
+"""
+
+import importlib.metadata
+import os
+import threading
+from typing import Dict, List, Optional
+
+from packaging.utils import canonicalize_name
+
+from agentops.helpers.fork import register_after_fork
+from agentops.logging import logger
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a distribution name as described in PEP 503."""
+    return canonicalize_name(name)
+
+
+def _name_and_version(dist: importlib.metadata.Distribution) -> "tuple[Optional[str], Optional[str]]":
+    """
+    Read a distribution's name and version, preferring its dist-info directory name.
+
+    Parsing METADATA is by far the slowest part of reading a distribution, and
+    `<name>-<version>.dist-info` already carries both values. The name there is
+    escaped (`python_dateutil` for `python-dateutil`), so it is only good as a
+    lookup key once normalized; `PackageIndex` reads the distribution's own
+    spelling from METADATA when it reports names.
+    """
+    path = getattr(dist, "_path", None)
+    if path is not None:
+        stem, ext = os.path.splitext(os.path.basename(str(path)))
+        if ext in (".dist-info", ".egg-info") and "-" in stem:
+            name, version = stem.split("-", 1)
+            if ext == ".egg-info":
+                version = version.split("-py", 1)[0]
+            if name and version:
+                return name, version
+
+    try:
+        return dist.metadata.get("Name"), dist.version
+    except Exception:
+        return None, None
+
+
+class PackageIndex:
+    """
+    Lazily built index of installed distributions.
+
+    The index is built on first use, or ahead of time on a background thread
+    with `build_in_background()`. Lookups after that are dictionary reads.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._built = False
+        self._builder: Optional[threading.Thread] = None
+        self._names: Dict[str, str] = {}  # normalized name -> distribution name, read from METADATA on demand
+        self._dists: Dict[str, importlib.metadata.Distribution] = {}  # normalized name -> distribution
+        self._versions: Dict[str, str] = {}  # normalized name -> version
+        self._modules: Dict[str, List[str]] = {}  # top-level module -> normalized names
+
+        register_after_fork(self._at_fork_reinit)
+
+    def _at_fork_reinit(self) -> None:
+        # A build running in the parent may have held the lock; the child builds on demand instead
+        self._lock = threading.Lock()
+        self._builder = None
+
+    def _build(self) -> None:
+        dists: Dict[str, importlib.metadata.Distribution] = {}
+        versions: Dict[str, str] = {}
+        modules: Dict[str, List[str]] = {}
+
+        for dist in importlib.metadata.distributions():
+            name, version = _name_and_version(dist)
+            if not name or not version:
+                continue
+            key = normalize_name(name)
+            if key in versions:
+                # Like importlib.metadata.version(), the first match on sys.path wins
+                continue
+            dists[key] = dist
+            versions[key] = version
+
+            try:
+                top_level = (dist.read_text("top_level.txt") or "").split()
+            except Exception:
+                top_level = []
+            for module in top_level or [key.replace("-", "_")]:
+                modules.setdefault(module, []).append(key)
+
+        self._names, self._dists, self._versions, self._modules = {}, dists, versions, modules
+
+    def _name(self, key: str) -> str:
+        """Get the distribution name of a normalized name as its METADATA spells it."""
+        name = self._names.get(key)
+        if name is None:
+            try:
+                name = self._dists[key].metadata.get("Name") or key
+            except Exception:
+                name = key
+            self._names[key] = name
+        return name
+
+    def ensure_built(self) -> None:
+        """Build the index if it has not been built yet, waiting for a background build."""
+        if self._built:
+            return
+        with self._lock:
+            if self._built:
+                return
+            try:
+                self._build()
+            except Exception as e:
+                logger.debug(f"Failed to index installed packages: {e}")
+            self._built = True
+
+    def build_in_background(self) -> None:
+        """Start building the index on a daemon thread."""
+        if self._built or self._builder is not None:
+            return
+        self._builder = threading.Thread(target=self.ensure_built, name="agentops-package-index", daemon=True)
+        self._builder.start()
+
+    def invalidate(self) -> None:
+        """Drop the index so it is rebuilt on next use, e.g. after installing packages at runtime."""
+        with self._lock:
+            self._built = False
+            self._builder = None
+
+    def version(self, package_name: str) -> Optional[str]:
+        """
+        Get the installed version of a distribution.
+
+        Args:
+            package_name: Distribution name, in any PEP 503 spelling
+
+        Returns:
+            The version, or None if no such distribution is installed
+        """
+        self.ensure_built()
+        return self._versions.get(normalize_name(package_name))
+
+    def distributions_for_module(self, module_name: str) -> List[str]:
+        """
+        Get the distributions providing a top-level module.
+
+        Args:
+            module_name: Importable module name; only the top-level package is considered
+
+        Returns:
+            Distribution names, usually one
+        """
+        self.ensure_built()
+        keys = self._modules.get(module_name.split(".", 1)[0], [])
+        return [self._name(key) for key in keys]
+
+    def installed(self) -> Dict[str, str]:
+        """
+        Get all installed distributions.
+
+        Returns:
+            Mapping of distribution name to version
+        """
+        self.ensure_built()
+        return {self._name(key): version for key, version in self._versions.items()}
+
+
+_package_index = PackageIndex()
+
+
+def get_package_index() -> PackageIndex:
+    """Get the process-wide package index."""
+    return _package_index
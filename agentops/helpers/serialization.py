@@ -4,11 +4,19 @@ import json
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
-from typing import Any
+from typing import Any, List, Optional, Set, Tuple
 from uuid import UUID
 
 from agentops.logging import logger
 
+# Use orjson for encoding scalars when it is installed
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 def is_jsonable(x):
     try:
@@ -135,3 +143,294 @@ def safe_serialize(obj: Any) -> Any:
     except (TypeError, ValueError) as e:
         logger.warning(f"Failed to serialize object: {e}")
         return str(obj)
+
+
+# Containers nested deeper than this are represented by their string form
+_MAX_DEPTH = 32
+
+
+# Plain-JSON objects with more nodes than this are always serialized incrementally
+_MAX_ESTIMATED_NODES = 1000
+
+
+def _plain_json_size_bound(obj: Any, limit: int) -> int:
+    """
+    Upper bound on `len(json.dumps(obj))` for objects made only of plain JSON types.
+
+    Returns -1 as soon as the object turns out to need conversion, is too large
+    to estimate cheaply, or its bound exceeds `limit`.
+    """
+    size = 0
+    nodes = 0
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        nodes += 1
+        if nodes > _MAX_ESTIMATED_NODES:
+            return -1
+
+        value_type = type(value)
+        if value_type is str:
+            # ensure_ascii escapes take up to 6 bytes per character, 12 for astral characters
+            size += (6 if value.isascii() else 12) * len(value) + 2
+        elif value is None or value_type is bool:
+            size += 5
+        elif value_type is int:
+            if not -(2**63) <= value < 2**63:
+                return -1
+            size += 20
+        elif value_type is float:
+            size += 24
+        elif value_type is list or value_type is tuple:
+            size += 2 * len(value) + 2
+            stack.extend(value)
+        elif value_type is dict:
+            size += 4 * len(value) + 2
+            for key, item in value.items():
+                if type(key) is not str:
+                    return -1
+                stack.append(key)
+                stack.append(item)
+        else:
+            return -1
+
+        if size > limit:
+            return -1
+    return size
+
+
+def _encode_scalar(value: Any) -> str:
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(value).decode("utf-8")
+        except TypeError:
+            # e.g. integers wider than 64 bits
+            pass
+    return json.dumps(value)
+
+
+def _encode_key(key: Any) -> str:
+    if isinstance(key, str):
+        return _encode_scalar(key)
+    if key is None or isinstance(key, (bool, int, float)):
+        # Same coercions as json.dumps
+        return _encode_scalar(json.dumps(key))
+    return _encode_scalar(str(key))
+
+
+class _BoundedJSONWriter:
+    """
+    Writes JSON for an object graph until a byte budget is used up.
+
+    Containers that do not fit are closed early with a marker counting what
+    was left out, so the output is always valid JSON.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.parts: List[str] = []
+        self.remaining = max_bytes
+        self.truncated = False
+        self._encoder = AgentOpsJSONEncoder()
+        self._active: Set[int] = set()  # ids of the containers being written, for cycle detection
+
+    def write(self, text: str) -> None:
+        self.parts.append(text)
+        self.remaining -= len(text) if text.isascii() else len(text.encode("utf-8"))
+
+    def fits(self, text: str) -> bool:
+        return len(text) <= self.remaining and (text.isascii() or len(text.encode("utf-8")) <= self.remaining)
+
+    def value(self, obj: Any, depth: int = 0) -> bool:
+        """
+        Write a value.
+
+        Returns:
+            False if the budget ran out, in which case nothing more should be written
+        """
+        if obj is None or isinstance(obj, (bool, int, float)):
+            return self.scalar(_encode_scalar(obj))
+        if isinstance(obj, str):
+            return self.string(obj)
+        if isinstance(obj, (dict, list, tuple, set, frozenset)):
+            if depth >= _MAX_DEPTH or id(obj) in self._active:
+                return self.string(str(obj) if depth >= _MAX_DEPTH else "<circular reference>")
+            self._active.add(id(obj))
+            try:
+                if isinstance(obj, dict):
+                    return self.mapping(obj, depth)
+                return self.sequence(obj, depth)
+            finally:
+                self._active.discard(id(obj))
+
+        if hasattr(obj, "head") and hasattr(obj, "shape") and hasattr(obj, "to_json"):
+            return self.table(obj)
+
+        converted = self._encoder.default(obj)
+        if converted is obj:
+            return self.string(str(obj))
+        return self.value(converted, depth)
+
+    def table(self, obj: Any) -> bool:
+        """Write a DataFrame-like object, converting only as many rows as can fit."""
+        rows = value_size(obj) or 0
+        if rows > 1:
+            # Size the slice by the first row, so a huge frame costs no more than its preview
+            row_bytes = max(len(self._encoder.default(obj.head(1))), 1)
+            keep = min(rows, max(self.remaining // row_bytes, 1))
+            if keep < rows:
+                obj = obj.head(keep)
+                self.truncated = True
+        return self.string(self._encoder.default(obj))
+
+    def scalar(self, text: str) -> bool:
+        if not self.fits(text):
+            self.truncated = True
+            return False
+        self.write(text)
+        return True
+
+    def string(self, value: str) -> bool:
+        # Never encode more of a huge string than could possibly fit
+        if len(value) > self.remaining:
+            value = value[: max(self.remaining, 0)]
+            cut = True
+        else:
+            cut = False
+
+        text = _encode_scalar(value)
+        while not self.fits(text) and value:
+            value = value[: len(value) // 2]
+            text = _encode_scalar(value)
+            cut = True
+        if (not value and cut) or not self.fits(text):
+            self.truncated = True
+            return False
+
+        self.write(text)
+        if cut:
+            self.truncated = True
+            return False
+        return True
+
+    def empty(self, text: str) -> bool:
+        """Write an empty container in place of one too large for even its truncation marker."""
+        self.truncated = True
+        if self.fits(text):
+            self.write(text)
+        return False
+
+    def rollback(self, mark: Tuple[int, int]) -> None:
+        """Discard everything written since `mark` was taken."""
+        del self.parts[mark[0] :]
+        self.remaining = mark[1]
+
+    def sequence(self, items: Any, depth: int) -> bool:
+        # Hold back room for the closing bracket and a truncation marker
+        reserve = len(f', "... {len(items)} more items"]')
+        if self.remaining <= reserve:
+            return self.empty("[]") and not items
+        self.write("[")
+        self.remaining -= reserve
+        written = 0
+        for item in items:
+            mark = (len(self.parts), self.remaining)
+            if written and not self.scalar(", "):
+                break
+            written_before = len(self.parts)
+            if not self.value(item, depth + 1):
+                if len(self.parts) == written_before:
+                    # Nothing of the item fit, so drop its separator too
+                    self.rollback(mark)
+                else:
+                    written += 1
+                break
+            written += 1
+        self.remaining += reserve
+        if written < len(items):
+            self.write(f'{", " if written else ""}"... {len(items) - written} more items"')
+        self.write("]")
+        return written == len(items) and not self.truncated
+
+    def mapping(self, obj: dict, depth: int) -> bool:
+        reserve = len(f', "...": "{len(obj)} more items"}}')
+        if self.remaining <= reserve:
+            return self.empty("{}") and not obj
+        self.write("{")
+        self.remaining -= reserve
+        written = 0
+        for key, item in obj.items():
+            mark = (len(self.parts), self.remaining)
+            if not self.scalar(f"{', ' if written else ''}{_encode_key(key)}: "):
+                break
+            written_before = len(self.parts)
+            if not self.value(item, depth + 1):
+                if len(self.parts) == written_before:
+                    self.rollback(mark)
+                else:
+                    written += 1
+                break
+            written += 1
+        self.remaining += reserve
+        if written < len(obj):
+            self.write(f'{", " if written else ""}"...": "{len(obj) - written} more items"')
+        self.write("}")
+        return written == len(obj) and not self.truncated
+
+
+def value_size(obj: Any) -> Optional[int]:
+    """
+    Size of a value without serializing it: characters of a string, items of a
+    container, rows of a table. None if the value has no length.
+    """
+    try:
+        return len(obj)
+    except Exception:
+        return None
+
+
+def serialize_bounded(obj: Any, max_bytes: int) -> Tuple[str, bool]:
+    """Serialize an object like `safe_serialize`, but never produce more than `max_bytes`
+
+    The object graph is walked incrementally and the walk stops as soon as the
+    budget is used up, so oversized values cost no more than the preview that
+    is kept. DataFrame-like objects are sliced to the rows that can fit before
+    they are converted. A truncated result is still valid JSON: strings are cut short and
+    containers are closed with a marker counting the items left out. Containers
+    too large for even that marker become empty, and a value with no room at
+    all becomes `""`; only budgets under 2 bytes can produce an empty result.
+
+    Args:
+        obj: The object to serialize
+        max_bytes: Maximum size of the result in UTF-8 bytes
+
+    Returns:
+        Tuple of (serialized value, whether it was truncated). Strings are
+        returned untouched unless they exceed the budget, as with `safe_serialize`.
+    """
+    if isinstance(obj, str):
+        if len(obj) <= max_bytes and (obj.isascii() or len(obj.encode("utf-8")) <= max_bytes):
+            return obj, False
+        return obj.encode("utf-8")[:max_bytes].decode("utf-8", "ignore"), True
+
+    # Convert any model objects to dictionaries
+    if hasattr(obj, "model_dump") or hasattr(obj, "dict") or hasattr(obj, "parse"):
+        obj = model_to_dict(obj)
+
+    # Small plain values are certain to fit, so encode them in one call
+    if 0 <= _plain_json_size_bound(obj, max_bytes) <= max_bytes:
+        try:
+            return json.dumps(obj), False
+        except ValueError:
+            # Circular reference
+            pass
+
+    writer = _BoundedJSONWriter(max_bytes)
+    try:
+        writer.value(obj)
+    except (TypeError, ValueError) as e:
+        logger.warning(f"Failed to serialize object: {e}")
+        return serialize_bounded(str(obj), max_bytes)
+    if not writer.parts and max_bytes >= 2:
+        # Not even a preview fits; an empty string keeps the result valid JSON
+        return '""', True
+    return "".join(writer.parts), writer.truncated
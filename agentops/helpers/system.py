@@ -1,4 +1,3 @@
-import importlib.metadata
 import os
 import platform
 import socket
@@ -8,6 +7,7 @@ import psutil  # type: ignore
 
 from agentops.logging import logger
 from agentops.helpers.version import get_agentops_version
+from agentops.helpers.packages import get_package_index
 
 
 def get_imported_libraries():
@@ -62,14 +62,13 @@ def get_sdk_details():
 
 
 def get_sys_packages():
+    package_index = get_package_index()
     sys_packages = {}
-    for module in sys.modules:
-        try:
-            version = importlib.metadata.version(module)
+    for module in list(sys.modules):
+        version = package_index.version(module)
+        # Skip built-in modules and those without package metadata
+        if version is not None:
             sys_packages[module] = version
-        except importlib.metadata.PackageNotFoundError:
-            # Skip built-in modules and those without package metadata
-            continue
 
     return sys_packages
 
@@ -78,9 +77,7 @@ def get_installed_packages():
     try:
         return {
             # TODO: add to opt out
-            "Installed Packages": {
-                dist.metadata.get("Name"): dist.metadata.get("Version") for dist in importlib.metadata.distributions()
-            }
+            "Installed Packages": get_package_index().installed()
         }
     except:
         return {}
@@ -2,14 +2,16 @@
 AgentOps Instrumentation Module
 
 This module provides automatic instrumentation for various LLM providers and agentic libraries.
-It works by monitoring Python imports and automatically instrumenting packages as they are imported.
+It works by installing an import hook (a `sys.meta_path` finder) that instruments target packages
+once, right after they are first loaded.
 
 Key Features:
 - Automatic detection and instrumentation of LLM providers (OpenAI, Anthropic, etc.)
 - Support for agentic libraries (CrewAI, AutoGen, etc.)
 - Version-aware instrumentation (only activates for supported versions)
 - Smart handling of provider vs agentic library conflicts
-- Non-intrusive monitoring using Python's import system
+- Non-intrusive monitoring using Python's import system; imports of other modules, and re-imports
+  of already loaded modules, never reach AgentOps code
 """
 
 from typing import Optional, Set, TypedDict
@@ -21,9 +23,10 @@ except ImportError:
 from types import ModuleType
 from dataclasses import dataclass
 import importlib
+import importlib.abc
+import importlib.machinery
 import sys
 from packaging.version import Version, parse
-import builtins
 
 # Add os and site for path checking
 import os
@@ -134,7 +137,6 @@ TARGET_PACKAGES = set(PROVIDERS.keys()) | set(AGENTIC_LIBRARIES.keys())
 
 # Module-level state variables
 _active_instrumentors: list[BaseInstrumentor] = []
-_original_builtins_import = builtins.__import__  # Store original import
 _instrumenting_packages: Set[str] = set()
 _has_agentic_library: bool = False
 
@@ -372,80 +374,79 @@ def _perform_instrumentation(package_name: str):
         )
 
 
-def _import_monitor(name: str, globals_dict=None, locals_dict=None, fromlist=(), level=0):
+def _instrument_loaded_package(package_name: str) -> None:
+    """Instrument a target package that has just finished loading."""
+    if _has_agentic_library:
+        return
+    if package_name in _instrumenting_packages or _is_package_instrumented(package_name):
+        return
+
+    target_module_obj = sys.modules.get(package_name)
+    if target_module_obj and not _is_installed_package(target_module_obj, package_name):
+        logger.debug(
+            f"AgentOps: Target '{package_name}' appears to be a local module/directory. Skipping AgentOps SDK instrumentation for it."
+        )
+        return
+
+    _instrumenting_packages.add(package_name)
+    try:
+        _perform_instrumentation(package_name)
+    except Exception as e:
+        logger.error(f"Error instrumenting {package_name}: {str(e)}")
+    finally:
+        _instrumenting_packages.discard(package_name)
+
+
+class _InstrumentingLoader(importlib.abc.Loader):
     """
-    Monitor imports and instrument packages as they are imported.
-    This replaces the built-in import function to intercept package imports.
+    Wraps the real loader of a target package and instruments it after it executes.
+
+    The wrapper only exists for the duration of the load: the module's `__loader__`
+    and `__spec__.loader` are pointed back at the real loader before it runs.
     """
-    global _instrumenting_packages, _has_agentic_library
 
-    # If an agentic library is already instrumented, skip all further instrumentation
-    if _has_agentic_library:
-        return _original_builtins_import(name, globals_dict, locals_dict, fromlist, level)
+    def __init__(self, loader: importlib.abc.Loader, package_name: str):
+        self._loader = loader
+        self._package_name = package_name
 
-    # First, do the actual import
-    module = _original_builtins_import(name, globals_dict, locals_dict, fromlist, level)
+    def create_module(self, spec: importlib.machinery.ModuleSpec) -> Optional[ModuleType]:
+        return self._loader.create_module(spec)
 
-    # Check for exact matches first (handles package.module like google.adk)
-    packages_to_check = set()
+    def exec_module(self, module: ModuleType) -> None:
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        self._loader.exec_module(module)
+        _instrument_loaded_package(self._package_name)
 
-    # Check the imported module itself
-    if name in TARGET_PACKAGES:
-        packages_to_check.add(name)
-    else:
-        # Check if any target package is a prefix of the import name
-        for target in TARGET_PACKAGES:
-            if name.startswith(target + ".") or name == target:
-                packages_to_check.add(target)
-
-    # For "from X import Y" style imports, also check submodules
-    if fromlist:
-        for item in fromlist:
-            # Construct potential full name, e.g., "google.adk" from name="google", item="adk"
-            # Or if name="os", item="path", full_name="os.path"
-            # If the original name itself is a multi-part name like "a.b", and item is "c", then "a.b.c"
-            # This logic needs to correctly identify the root package if 'name' is already a sub-package.
-            # The existing TARGET_PACKAGES check is simpler: it checks against pre-defined full names.
-
-            # Check full name if item forms part of a target package name
-            full_item_name_candidate = f"{name}.{item}"
-
-            if full_item_name_candidate in TARGET_PACKAGES:
-                packages_to_check.add(full_item_name_candidate)
-            else:  # Fallback to checking if 'name' itself is a target
-                for target in TARGET_PACKAGES:
-                    if name == target or name.startswith(target + "."):
-                        packages_to_check.add(target)  # Check the base target if a submodule is imported from it.
 
-    # Instrument all matching packages
-    for package_to_check in packages_to_check:
-        if package_to_check not in _instrumenting_packages and not _is_package_instrumented(package_to_check):
-            target_module_obj = sys.modules.get(package_to_check)
+class _InstrumentationFinder(importlib.abc.MetaPathFinder):
+    """
+    Meta path finder that hooks the first load of each target package.
 
-            if target_module_obj:
-                is_sdk = _is_installed_package(target_module_obj, package_to_check)
-                if not is_sdk:
-                    logger.debug(
-                        f"AgentOps: Target '{package_to_check}' appears to be a local module/directory. Skipping AgentOps SDK instrumentation for it."
-                    )
-                    continue
-            else:
-                logger.debug(
-                    f"_import_monitor: No module object found in sys.modules for '{package_to_check}', proceeding with SDK instrumentation attempt."
-                )
+    Python consults `sys.meta_path` only when a module is not yet in `sys.modules`,
+    so re-imports cost nothing and non-target modules pay a single set lookup.
+    The real spec is found by the finders after this one; only its loader is wrapped.
+    """
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname not in TARGET_PACKAGES or _has_agentic_library:
+            return None
+
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is None or not hasattr(spec.loader, "exec_module"):
+                return spec
+            spec.loader = _InstrumentingLoader(spec.loader, fullname)
+            return spec
+        return None
 
-            _instrumenting_packages.add(package_to_check)
-            try:
-                _perform_instrumentation(package_to_check)
-                # If we just instrumented an agentic library, stop
-                if _has_agentic_library:
-                    break
-            except Exception as e:
-                logger.error(f"Error instrumenting {package_to_check}: {str(e)}")
-            finally:
-                _instrumenting_packages.discard(package_to_check)
 
-    return module
+_import_finder = _InstrumentationFinder()
 
 
 @dataclass
@@ -524,7 +525,8 @@ def instrument_all():
     """Start monitoring and instrumenting packages if not already started."""
     # Check if active_instrumentors is empty, as a proxy for not started.
     if not _active_instrumentors:
-        builtins.__import__ = _import_monitor
+        if _import_finder not in sys.meta_path:
+            sys.meta_path.insert(0, _import_finder)
         global _instrumenting_packages, _has_agentic_library
 
         # If an agentic library is already instrumented, don't instrument anything else
@@ -579,7 +581,8 @@ def instrument_all():
 def uninstrument_all():
     """Stop monitoring and uninstrument all packages."""
     global _active_instrumentors, _has_agentic_library
-    builtins.__import__ = _original_builtins_import
+    if _import_finder in sys.meta_path:
+        sys.meta_path.remove(_import_finder)
     for instrumentor in _active_instrumentors:
         instrumentor.uninstrument()
         logger.debug(f"Uninstrumented {instrumentor.__class__.__name__}")
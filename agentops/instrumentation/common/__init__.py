@@ -34,6 +34,11 @@ from agentops.instrumentation.common.streaming import (
     AsyncStreamWrapper,
     create_stream_wrapper_factory,
     StreamingResponseHandler,
+    StreamAccumulator,
+    InterTokenLatency,
+    CappedTextBuffer,
+    CHUNK_DECODERS,
+    set_stream_capture,
 )
 from agentops.instrumentation.common.version import (
     get_library_version,
@@ -76,6 +81,11 @@ __all__ = [
     "AsyncStreamWrapper",
     "create_stream_wrapper_factory",
     "StreamingResponseHandler",
+    "StreamAccumulator",
+    "InterTokenLatency",
+    "CappedTextBuffer",
+    "set_stream_capture",
+    "CHUNK_DECODERS",
     # Version
     "get_library_version",
     "LibraryInfo",
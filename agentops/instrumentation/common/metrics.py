@@ -6,7 +6,7 @@ across different instrumentations.
 
 from typing import Dict, Any, Optional
 from opentelemetry.metrics import Meter, Histogram, Counter
-from agentops.semconv import Meters
+from agentops.semconv import Meters, SpanAttributes
 
 
 class StandardMetrics:
@@ -26,6 +26,15 @@ class StandardMetrics:
             name=Meters.LLM_OPERATION_DURATION, unit="s", description="GenAI operation duration"
         )
 
+    @staticmethod
+    def create_inter_token_latency_histogram(meter: Meter) -> Histogram:
+        """Create a histogram for the gaps between tokens of streamed completions."""
+        return meter.create_histogram(
+            name=Meters.LLM_STREAMING_INTER_TOKEN_LATENCY,
+            unit="s",
+            description="Time between consecutive token-carrying chunks of streamed completions",
+        )
+
     @staticmethod
     def create_exception_counter(meter: Meter, name: str = Meters.LLM_COMPLETIONS_EXCEPTIONS) -> Counter:
         """Create a counter for exceptions."""
@@ -87,6 +96,33 @@ class MetricsRecorder:
         if duration_histogram:
             duration_histogram.record(duration, attributes=attributes or {})
 
+    def record_inter_token_latency(self, gap: float, attributes: Optional[Dict[str, Any]] = None):
+        """Record one gap between token-carrying chunks of a stream."""
+        latency_histogram = self.metrics.get("inter_token_latency_histogram")
+        if latency_histogram:
+            latency_histogram.record(gap, attributes=attributes or {})
+
+    def observe_inter_token_latency(self, accumulator: Any, attributes: Optional[Dict[str, Any]] = None):
+        """Record the inter-token gaps of a stream as its chunks arrive.
+
+        Args:
+            accumulator: The stream's StreamAccumulator
+            attributes: Metric attributes; the response model is added from
+                the accumulator once the first gap is recorded
+        """
+        latency_histogram = self.metrics.get("inter_token_latency_histogram")
+        if not latency_histogram:
+            return
+
+        attrs = dict(attributes or {})
+
+        def on_gap(gap: float) -> None:
+            if SpanAttributes.LLM_RESPONSE_MODEL not in attrs and accumulator.model:
+                attrs[SpanAttributes.LLM_RESPONSE_MODEL] = accumulator.model
+            latency_histogram.record(gap, attributes=attrs)
+
+        accumulator.on_gap = on_gap
+
     def record_exception(self, attributes: Optional[Dict[str, Any]] = None):
         """Record an exception occurrence."""
         exception_counter = self.metrics.get("exception_counter")
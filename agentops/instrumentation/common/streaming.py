@@ -4,13 +4,20 @@ This module provides utilities for instrumenting streaming API responses
 in a consistent way across different providers.
 """
 
-from typing import Optional, Any, Dict, Callable
+from typing import IO, Optional, Any, Deque, Dict, Callable, Iterator, List, Tuple
 from abc import ABC
+from array import array
+from bisect import bisect_left
+from collections import deque
+import math
+import tempfile
 import time
 
 from opentelemetry.trace import Tracer, Span, Status, StatusCode
 
 from agentops.logging import logger
+from agentops.sdk.deferred import defer_to_export
+from agentops.semconv import SpanAttributes
 from agentops.instrumentation.common.span_management import safe_set_attribute
 from agentops.instrumentation.common.token_counting import TokenUsage, TokenUsageExtractor
 
@@ -216,3 +223,542 @@ class StreamingResponseHandler:
         elif isinstance(chunk, str):
             return chunk
         return None
+
+
+# Characters of content, and of each tool call's arguments, kept per stream; 0 keeps everything
+DEFAULT_CAPTURE_CHARS = 1_000_000
+
+_capture_chars = DEFAULT_CAPTURE_CHARS
+_capture_spill = False
+
+
+def set_stream_capture(max_chars: int, spill: bool = False) -> None:
+    """Set the capture budget of streams wrapped from now on.
+
+    Args:
+        max_chars: Characters of content kept per stream, half from its start
+            and half from its end; 0 keeps everything
+        spill: Whether to upload the full content of streams over the budget
+            as an object, referenced from the span
+    """
+    global _capture_chars, _capture_spill
+    _capture_chars = max(max_chars, 0)
+    _capture_spill = spill and _capture_chars > 0
+
+
+class CappedTextBuffer:
+    """Text received in parts, keeping at most `limit` characters.
+
+    The first half of the budget keeps the start of the text, the second half
+    a sliding window over its end; everything between is counted but dropped.
+    With `keep_tail` False the whole budget keeps the start and nothing is
+    inserted into the text, for content such as JSON that a marker would
+    corrupt. With `limit` 0 all parts are kept. Full text can be copied to
+    `spill`, a file that moves to disk once it outgrows memory.
+    """
+
+    __slots__ = ("limit", "keep_tail", "length", "spill", "_head", "_head_length", "_tail", "_tail_length")
+
+    def __init__(self, limit: int = 0, spill: Optional[IO[str]] = None, keep_tail: bool = True):
+        self.limit = limit
+        self.keep_tail = keep_tail
+        self.length = 0
+        self.spill = spill
+        self._head: List[str] = []
+        self._head_length = 0
+        self._tail: Deque[str] = deque()
+        self._tail_length = 0
+
+    def append(self, text: str) -> None:
+        self.length += len(text)
+        if self.spill is not None:
+            self.spill.write(text)
+        if not self.limit:
+            self._head.append(text)
+            return
+
+        head_limit = self.limit - self.limit // 2 if self.keep_tail else self.limit
+        head_room = head_limit - self._head_length
+        if head_room > 0:
+            if len(text) <= head_room:
+                self._head.append(text)
+                self._head_length += len(text)
+                return
+            self._head.append(text[:head_room])
+            self._head_length += head_room
+            text = text[head_room:]
+        if not self.keep_tail:
+            return
+
+        tail = self._tail
+        tail.append(text)
+        self._tail_length += len(text)
+        # Drop whole parts from the front while the rest still fills the tail budget
+        while len(tail) > 1 and self._tail_length - len(tail[0]) >= self.limit // 2:
+            self._tail_length -= len(tail.popleft())
+
+    @property
+    def omitted(self) -> int:
+        """Characters received but not kept."""
+        return max(self.length - self.limit, 0) if self.limit else 0
+
+    def text(self) -> str:
+        """The kept text, with a marker where characters were omitted."""
+        if len(self._head) > 1:
+            self._head = ["".join(self._head)]
+        head = self._head[0] if self._head else ""
+        if not self._tail:
+            return head
+
+        tail = "".join(self._tail)
+        omitted = self.omitted
+        if not omitted:
+            return head + tail
+        return f"{head}\n[... {omitted} characters omitted ...]\n{tail[len(tail) - self.limit // 2 :]}"
+
+
+class ToolCallBuffer:
+    """Argument deltas of one streamed tool call, joined once when the stream ends.
+
+    Arguments over the capture budget are cut at the end rather than in the
+    middle, so no marker lands inside the JSON; `arguments_omitted` tells how
+    much was cut.
+    """
+
+    __slots__ = ("id", "name", "argument_buffer")
+
+    def __init__(self, limit: int = 0):
+        self.id = ""
+        self.name = ""
+        self.argument_buffer = CappedTextBuffer(limit, keep_tail=False)
+
+    @property
+    def arguments(self) -> str:
+        return self.argument_buffer.text()
+
+    @property
+    def arguments_omitted(self) -> int:
+        """Characters of arguments received but not kept."""
+        return self.argument_buffer.omitted
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the tool call in the OpenAI `tool_calls` shape."""
+        return {"id": self.id, "type": "function", "function": {"name": self.name, "arguments": self.arguments}}
+
+
+# Upper bounds of the inter-token latency buckets: 0.5ms to about 28s, each 10% wider than the last
+_LATENCY_BOUNDS: Tuple[float, ...] = tuple(0.0005 * 1.1**i for i in range(116))
+
+# Gaps between tokens longer than this count as stalls
+STALL_THRESHOLD_SECONDS = 1.0
+
+
+class InterTokenLatency:
+    """Distribution of the gaps between token-carrying chunks of one stream.
+
+    Gaps are counted in fixed logarithmic buckets, so memory stays constant
+    however long the stream runs; percentiles are accurate to one bucket
+    (10%). Throughput is sampled over windows of `window_seconds` and only
+    its lowest and highest window rates are kept.
+    """
+
+    __slots__ = (
+        "counts",
+        "count",
+        "max",
+        "stalls",
+        "stall_threshold",
+        "window_seconds",
+        "min_rate",
+        "max_rate",
+        "_last",
+        "_window_start",
+        "_window_chunks",
+    )
+
+    def __init__(self, stall_threshold: float = STALL_THRESHOLD_SECONDS, window_seconds: float = 1.0):
+        self.counts = array("I", bytes(4 * (len(_LATENCY_BOUNDS) + 1)))
+        self.count = 0
+        self.max = 0.0
+        self.stalls = 0
+        self.stall_threshold = stall_threshold
+        self.window_seconds = window_seconds
+        self.min_rate: Optional[float] = None
+        self.max_rate: Optional[float] = None
+        self._last = 0.0
+        self._window_start = 0.0
+        self._window_chunks = 0
+
+    def start(self, now: float) -> None:
+        """Start measuring at the first token."""
+        self._last = self._window_start = now
+
+    def record(self, now: float) -> float:
+        """Record a token-carrying chunk received at `now`, returning its gap to the previous one."""
+        gap = now - self._last
+        self._last = now
+        self.counts[bisect_left(_LATENCY_BOUNDS, gap)] += 1
+        self.count += 1
+        if gap > self.max:
+            self.max = gap
+        if gap > self.stall_threshold:
+            self.stalls += 1
+
+        self._window_chunks += 1
+        elapsed = now - self._window_start
+        if elapsed >= self.window_seconds:
+            rate = self._window_chunks / elapsed
+            if self.min_rate is None or rate < self.min_rate:
+                self.min_rate = rate
+            if self.max_rate is None or rate > self.max_rate:
+                self.max_rate = rate
+            self._window_start = now
+            self._window_chunks = 0
+        return gap
+
+    def _bucket_value(self, index: int) -> float:
+        # Geometric middle of the bucket, never past the largest gap seen
+        if index >= len(_LATENCY_BOUNDS):
+            return self.max
+        upper = _LATENCY_BOUNDS[index]
+        lower = _LATENCY_BOUNDS[index - 1] if index else 0.0
+        return min(math.sqrt(lower * upper) if lower else upper / 2, self.max)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the gap at quantile `q` (0-1), or None if no gaps were recorded."""
+        if not self.count:
+            return None
+        rank = max(math.ceil(q * self.count), 1)
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self._bucket_value(index)
+        return self.max
+
+    def buckets(self) -> Iterator[Tuple[float, int]]:
+        """Yield a representative gap and its count for each non-empty bucket."""
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count:
+                yield self._bucket_value(index), bucket_count
+
+
+def _upload_spilled_content(spill: IO[str]) -> Dict[str, Any]:
+    """Upload the full content of a stream over the capture budget as an object."""
+    from agentops import get_client
+    from agentops.instrumentation.common.objects import get_uploaded_object_attributes
+
+    try:
+        spill.seek(0)
+        uploaded_object = get_client().api.v4.upload_object(spill.read())
+        return get_uploaded_object_attributes(uploaded_object, SpanAttributes.LLM_STREAMING_CONTENT_OBJECT)
+    except Exception as e:
+        logger.debug(f"Failed to upload spilled stream content: {e}")
+        return {}
+    finally:
+        spill.close()
+
+
+# Decodes one chunk of a provider's stream into the accumulator
+ChunkDecoder = Callable[[Any, "StreamAccumulator"], None]
+
+
+class StreamAccumulator:
+    """Accumulates one streamed completion at constant cost per chunk.
+
+    Content and tool call argument deltas are appended to part buffers and
+    joined once at the end rather than concatenated per chunk, which copies
+    everything received so far. The buffers keep at most the capture budget
+    set with `set_stream_capture`, so memory per stream stays bounded. The provider's chunk decoder is resolved once
+    when the stream is wrapped, so each chunk costs one decoder call instead
+    of a chain of `hasattr` probes. The gaps between token-carrying chunks go
+    into a constant-size InterTokenLatency histogram and, when set, to the
+    `on_gap` callback as they arrive.
+    """
+
+    __slots__ = (
+        "decoder",
+        "start_time",
+        "first_token_time",
+        "first_token_kind",
+        "last_token_time",
+        "chunk_count",
+        "token_chunk_count",
+        "response_id",
+        "model",
+        "finish_reason",
+        "usage",
+        "final_response",
+        "latency",
+        "on_gap",
+        "_has_token",
+        "_content",
+        "_tool_calls",
+    )
+
+    def __init__(self, decoder: ChunkDecoder):
+        self.decoder = decoder
+        self.start_time = time.time()
+        self.first_token_time: Optional[float] = None
+        self.first_token_kind: Optional[str] = None
+        self.last_token_time: Optional[float] = None
+        self.chunk_count = 0
+        self.token_chunk_count = 0
+        self.response_id: Optional[str] = None
+        self.model: Optional[str] = None
+        self.finish_reason: Optional[str] = None
+        self.usage: Any = None
+        self.final_response: Any = None
+        self.latency = InterTokenLatency()
+        self.on_gap: Optional[Callable[[float], None]] = None
+        self._has_token = False
+        # Spilled content stays in memory up to the budget, then moves to a temporary file
+        spill = tempfile.SpooledTemporaryFile(_capture_chars, mode="w+", encoding="utf-8") if _capture_spill else None
+        self._content = CappedTextBuffer(_capture_chars, spill)
+        self._tool_calls: Dict[int, ToolCallBuffer] = {}
+
+    @classmethod
+    def for_provider(cls, provider: str) -> "StreamAccumulator":
+        """Create an accumulator using the registered decoder for `provider`."""
+        return cls(CHUNK_DECODERS[provider])
+
+    def add(self, chunk: Any) -> bool:
+        """Decode one chunk.
+
+        Returns:
+            True if the chunk carried the first token of the stream
+        """
+        self.chunk_count += 1
+        self._has_token = False
+        self.decoder(chunk, self)
+        if not self._has_token:
+            return False
+
+        now = time.time()
+        self.token_chunk_count += 1
+        self.last_token_time = now
+        if self.first_token_time is None:
+            self.first_token_time = now
+            self.latency.start(now)
+            return True
+        gap = self.latency.record(now)
+        if self.on_gap is not None:
+            self.on_gap(gap)
+        return False
+
+    def _mark_token(self, kind: str) -> None:
+        self._has_token = True
+        if self.first_token_kind is None:
+            self.first_token_kind = kind
+
+    def add_content(self, text: str) -> None:
+        self._mark_token("content")
+        self._content.append(text)
+
+    def add_tool_call_delta(
+        self, index: int, call_id: Optional[str] = None, name: Optional[str] = None, arguments: Optional[str] = None
+    ) -> None:
+        self._mark_token("tool_call")
+        buffer = self._tool_calls.get(index)
+        if buffer is None:
+            buffer = self._tool_calls[index] = ToolCallBuffer(self._content.limit)
+        if call_id:
+            buffer.id = call_id
+        if name:
+            buffer.name = name
+        if arguments:
+            buffer.argument_buffer.append(arguments)
+
+    def set_response_metadata(self, response_id: Optional[str] = None, model: Optional[str] = None) -> None:
+        """Record the response ID and model; the first non-empty value of each wins."""
+        if response_id and self.response_id is None:
+            self.response_id = response_id
+        if model and self.model is None:
+            self.model = model
+
+    @property
+    def content(self) -> str:
+        """The content received so far, within the capture budget."""
+        return self._content.text()
+
+    @property
+    def content_length(self) -> int:
+        """Characters of content received, including those over the capture budget."""
+        return self._content.length
+
+    @property
+    def tool_calls(self) -> List[ToolCallBuffer]:
+        """Tool calls received so far, in the order they started."""
+        return list(self._tool_calls.values())
+
+    def time_to_first_token(self) -> Optional[float]:
+        if self.first_token_time is None:
+            return None
+        return self.first_token_time - self.start_time
+
+    def latency_attributes(self, completion_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """Summarize the inter-token latency distribution as span attributes.
+
+        Args:
+            completion_tokens: Output tokens reported by the provider; without
+                them throughput is measured in token-carrying chunks
+
+        Returns:
+            Dictionary of streaming latency attributes
+        """
+        latency = self.latency
+        attributes: Dict[str, Any] = {SpanAttributes.LLM_STREAMING_STALL_COUNT: latency.stalls}
+        if latency.count:
+            attributes[SpanAttributes.LLM_STREAMING_INTER_TOKEN_LATENCY_P50] = latency.percentile(0.5)
+            attributes[SpanAttributes.LLM_STREAMING_INTER_TOKEN_LATENCY_P90] = latency.percentile(0.9)
+            attributes[SpanAttributes.LLM_STREAMING_INTER_TOKEN_LATENCY_P99] = latency.percentile(0.99)
+            attributes[SpanAttributes.LLM_STREAMING_INTER_TOKEN_LATENCY_MAX] = latency.max
+
+        if self.first_token_time is not None and self.last_token_time > self.first_token_time:
+            generation_time = self.last_token_time - self.first_token_time
+            tokens = completion_tokens if completion_tokens else self.token_chunk_count
+            attributes[SpanAttributes.LLM_STREAMING_TOKENS_PER_SECOND] = tokens / generation_time
+        if latency.min_rate is not None:
+            attributes[SpanAttributes.LLM_STREAMING_CHUNKS_PER_SECOND_MIN] = latency.min_rate
+            attributes[SpanAttributes.LLM_STREAMING_CHUNKS_PER_SECOND_MAX] = latency.max_rate
+        return attributes
+
+    def record_capture(self, span: Span) -> None:
+        """Record how much content was received and kept, spilling content over the budget if enabled.
+
+        The spilled content is uploaded on the export thread, never on the
+        caller's; without an export pipeline to hand it to, it is discarded.
+        """
+        buffer = self._content
+        span.set_attribute(SpanAttributes.LLM_STREAMING_CONTENT_LENGTH, buffer.length)
+        omitted = buffer.omitted
+        if omitted:
+            span.set_attribute(SpanAttributes.LLM_STREAMING_CONTENT_OMITTED, omitted)
+
+        spill, buffer.spill = buffer.spill, None
+        if spill is None:
+            return
+        if not omitted:
+            spill.close()
+            return
+
+        def upload() -> Dict[str, Any]:
+            return _upload_spilled_content(spill)
+
+        if not defer_to_export(span, upload):
+            logger.debug("No export pipeline to upload spilled stream content on; discarding it")
+            spill.close()
+
+
+def decode_openai_chat_chunk(chunk: Any, acc: StreamAccumulator) -> None:
+    """Decode an OpenAI Chat Completions `ChatCompletionChunk`."""
+    usage = getattr(chunk, "usage", None)
+    if usage is not None:
+        acc.usage = usage
+
+    choices = getattr(chunk, "choices", None)
+    if not choices:
+        # Usage-only chunks (stream_options.include_usage) carry no choices
+        return
+
+    if acc.response_id is None or acc.model is None:
+        acc.set_response_metadata(getattr(chunk, "id", None), getattr(chunk, "model", None))
+
+    for choice in choices:
+        delta = getattr(choice, "delta", None)
+        if delta is not None:
+            content = getattr(delta, "content", None)
+            if content:
+                acc.add_content(content)
+
+            tool_calls = getattr(delta, "tool_calls", None)
+            if tool_calls:
+                for tool_call in tool_calls:
+                    index = getattr(tool_call, "index", None)
+                    if index is None:
+                        continue
+                    function = getattr(tool_call, "function", None)
+                    acc.add_tool_call_delta(
+                        index,
+                        getattr(tool_call, "id", None),
+                        getattr(function, "name", None),
+                        getattr(function, "arguments", None),
+                    )
+
+        finish_reason = getattr(choice, "finish_reason", None)
+        if finish_reason:
+            acc.finish_reason = finish_reason
+
+
+def decode_openai_responses_event(event: Any, acc: StreamAccumulator) -> None:
+    """Decode an OpenAI Responses API stream event.
+
+    Text and function call argument deltas are accumulated; the response of
+    the `response.completed` event is kept as `final_response`.
+    """
+    event_type = getattr(event, "type", None)
+    if event_type == "response.output_text.delta":
+        delta = getattr(event, "delta", None)
+        if delta:
+            acc.add_content(delta)
+    elif event_type == "response.function_call_arguments.delta":
+        acc.add_tool_call_delta(getattr(event, "output_index", 0), arguments=getattr(event, "delta", None))
+    elif event_type == "response.created":
+        response = getattr(event, "response", None)
+        if response is not None:
+            acc.set_response_metadata(getattr(response, "id", None), getattr(response, "model", None))
+    elif event_type == "response.completed":
+        response = getattr(event, "response", None)
+        if response is not None:
+            acc.final_response = response
+            acc.usage = getattr(response, "usage", None)
+
+
+def decode_anthropic_event(event: Any, acc: StreamAccumulator) -> None:
+    """Decode an Anthropic Messages stream event.
+
+    The message of `message_start`, which carries the input token usage, is
+    kept as `final_response`; `usage` is that of the last `message_delta`.
+    """
+    event_type = getattr(event, "type", None)
+    if event_type == "content_block_delta":
+        delta = event.delta
+        delta_type = getattr(delta, "type", None)
+        if delta_type == "text_delta":
+            if delta.text:
+                acc.add_content(delta.text)
+        elif delta_type == "input_json_delta":
+            acc.add_tool_call_delta(event.index, arguments=delta.partial_json)
+    elif event_type == "content_block_start":
+        block = event.content_block
+        if getattr(block, "type", None) == "tool_use":
+            acc.add_tool_call_delta(event.index, block.id, block.name)
+    elif event_type == "message_start":
+        message = event.message
+        acc.set_response_metadata(getattr(message, "id", None), getattr(message, "model", None))
+        acc.final_response = message
+    elif event_type == "message_delta":
+        stop_reason = getattr(event.delta, "stop_reason", None)
+        if stop_reason:
+            acc.finish_reason = stop_reason
+        usage = getattr(event, "usage", None)
+        if usage is not None:
+            acc.usage = usage
+
+
+def decode_google_genai_chunk(chunk: Any, acc: StreamAccumulator) -> None:
+    """Decode a Google GenAI `GenerateContentResponse` chunk."""
+    usage = getattr(chunk, "usage_metadata", None)
+    if usage:
+        acc.usage = usage
+    text = getattr(chunk, "text", None)
+    if text:
+        acc.add_content(text)
+
+
+CHUNK_DECODERS: Dict[str, ChunkDecoder] = {
+    "openai_chat": decode_openai_chat_chunk,
+    "openai_responses": decode_openai_responses_event,
+    "anthropic": decode_anthropic_event,
+    "google_genai": decode_google_genai_chunk,
+}
@@ -7,14 +7,17 @@ library versions across all instrumentation modules.
 import logging
 from typing import Optional
 
+from agentops.helpers.packages import get_package_index
+
 logger = logging.getLogger(__name__)
 
 
 def get_library_version(package_name: str, default_version: str = "unknown") -> str:
     """Get the version of a library package.
 
-    Attempts to retrieve the installed version of a package using importlib.metadata.
-    Falls back to the default version if the version cannot be determined.
+    Looks the package up in the shared package index, falling back to
+    importlib.metadata for packages installed after the index was built.
+    Returns the default version if the version cannot be determined.
 
     Args:
         package_name: The name of the package to get the version for (as used in pip/importlib.metadata)
@@ -33,6 +36,10 @@ def get_library_version(package_name: str, default_version: str = "unknown") ->
         >>> get_library_version("ibm-watsonx-ai", "1.3.11")
         "1.3.11"  # If not found
     """
+    indexed_version = get_package_index().version(package_name)
+    if indexed_version is not None:
+        return indexed_version
+
     try:
         from importlib.metadata import version
 
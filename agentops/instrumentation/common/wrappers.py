@@ -17,6 +17,7 @@ from opentelemetry import context as context_api
 from opentelemetry.instrumentation.utils import _SUPPRESS_INSTRUMENTATION_KEY
 
 from agentops.instrumentation.common.attributes import AttributeMap
+from agentops.sdk.deferred import defer_attributes, deferred_extraction_enabled, snapshot_kwargs
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +67,25 @@ def _update_span(span: Span, attributes: AttributeMap) -> None:
         span.set_attribute(key, value)
 
 
+def _defer_handler(
+    span: Span, handler: AttributeHandler, args: Optional[Tuple], kwargs: Dict, return_value: Any
+) -> None:
+    """Defer the handler's input and output extraction to export time.
+
+    Args:
+        span: The OpenTelemetry span to extract attributes for
+        handler: The attribute handler of the wrapped method
+        args: Arguments of the call
+        kwargs: Keyword arguments of the call, snapshotted before the call
+        return_value: Return value of the call
+    """
+
+    def extract() -> AttributeMap:
+        return {**handler(args=args, kwargs=kwargs), **handler(return_value=return_value)}
+
+    defer_attributes(span, extract)
+
+
 def _finish_span_success(span: Span) -> None:
     """Mark a span as successful by setting its status to OK.
 
@@ -112,21 +132,28 @@ def _create_wrapper(wrap_config: WrapConfig, tracer: Tracer) -> Callable:
             return wrapped(*args, **kwargs)
 
         return_value = None
+        # Extract attributes on the export thread instead of around the call
+        deferred = deferred_extraction_enabled()
+        request_kwargs = snapshot_kwargs(kwargs) if deferred else kwargs
 
         with tracer.start_as_current_span(
             wrap_config.trace_name,
             kind=wrap_config.span_kind,
         ) as span:
             try:
-                # Add the input attributes to the span before execution
-                attributes = handler(args=args, kwargs=kwargs)
-                _update_span(span, attributes)
-
-                return_value = await wrapped(*args, **kwargs)
-
-                # Add the output attributes to the span after execution
-                attributes = handler(return_value=return_value)
-                _update_span(span, attributes)
+                if deferred:
+                    return_value = await wrapped(*args, **kwargs)
+                    _defer_handler(span, handler, args, request_kwargs, return_value)
+                else:
+                    # Add the input attributes to the span before execution
+                    attributes = handler(args=args, kwargs=kwargs)
+                    _update_span(span, attributes)
+
+                    return_value = await wrapped(*args, **kwargs)
+
+                    # Add the output attributes to the span after execution
+                    attributes = handler(return_value=return_value)
+                    _update_span(span, attributes)
                 _finish_span_success(span)
             except Exception as e:
                 # Add everything we have in the case of an error
@@ -144,21 +171,28 @@ def _create_wrapper(wrap_config: WrapConfig, tracer: Tracer) -> Callable:
             return wrapped(*args, **kwargs)
 
         return_value = None
+        # Extract attributes on the export thread instead of around the call
+        deferred = deferred_extraction_enabled()
+        request_kwargs = snapshot_kwargs(kwargs) if deferred else kwargs
 
         with tracer.start_as_current_span(
             wrap_config.trace_name,
             kind=wrap_config.span_kind,
         ) as span:
             try:
-                # Add the input attributes to the span before execution
-                attributes = handler(args=args, kwargs=kwargs)
-                _update_span(span, attributes)
-
-                return_value = wrapped(*args, **kwargs)
-
-                # Add the output attributes to the span after execution
-                attributes = handler(return_value=return_value)
-                _update_span(span, attributes)
+                if deferred:
+                    return_value = wrapped(*args, **kwargs)
+                    _defer_handler(span, handler, args, request_kwargs, return_value)
+                else:
+                    # Add the input attributes to the span before execution
+                    attributes = handler(args=args, kwargs=kwargs)
+                    _update_span(span, attributes)
+
+                    return_value = wrapped(*args, **kwargs)
+
+                    # Add the output attributes to the span after execution
+                    attributes = handler(return_value=return_value)
+                    _update_span(span, attributes)
                 _finish_span_success(span)
             except Exception as e:
                 # Add everything we have in the case of an error
@@ -13,7 +13,7 @@ from wrapt import wrap_function_wrapper
 from opentelemetry.metrics import Meter
 
 from agentops.logging import logger
-from agentops.instrumentation.common import CommonInstrumentor, StandardMetrics, InstrumentorConfig
+from agentops.instrumentation.common import CommonInstrumentor, StandardMetrics, InstrumentorConfig, MetricsRecorder
 from agentops.instrumentation.common.wrappers import WrapConfig
 from agentops.instrumentation.providers.google_genai.attributes.model import (
     get_generate_content_attributes,
@@ -22,6 +22,7 @@ from agentops.instrumentation.providers.google_genai.attributes.model import (
 from agentops.instrumentation.providers.google_genai.stream_wrapper import (
     generate_content_stream_wrapper,
     generate_content_stream_async_wrapper,
+    set_metrics_recorder,
 )
 
 # Library info for tracer/meter
@@ -127,7 +128,9 @@ class GoogleGenaiInstrumentor(CommonInstrumentor):
         Returns:
             Dictionary containing the created metrics.
         """
-        return StandardMetrics.create_standard_metrics(meter)
+        metrics = StandardMetrics.create_standard_metrics(meter)
+        metrics["inter_token_latency_histogram"] = StandardMetrics.create_inter_token_latency_histogram(meter)
+        return metrics
 
     def _custom_wrap(self, **kwargs):
         """Perform custom wrapping for streaming methods.
@@ -135,6 +138,8 @@ class GoogleGenaiInstrumentor(CommonInstrumentor):
         Args:
             **kwargs: Configuration options for instrumentation.
         """
+        set_metrics_recorder(MetricsRecorder(self._metrics) if self._metrics else None)
+
         # Special handling for streaming responses
         for stream_method in STREAMING_METHODS:
             try:
@@ -157,6 +162,8 @@ class GoogleGenaiInstrumentor(CommonInstrumentor):
         Args:
             **kwargs: Configuration options for uninstrumentation.
         """
+        set_metrics_recorder(None)
+
         # Unwrap streaming methods
         from opentelemetry.instrumentation.utils import unwrap as otel_unwrap
 
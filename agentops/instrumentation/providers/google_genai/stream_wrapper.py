@@ -6,13 +6,15 @@ It instruments streams to collect telemetry data for monitoring and analysis.
 """
 
 import logging
-from typing import TypeVar
+from typing import Any, Dict, Optional, TypeVar
 
 from opentelemetry import context as context_api
 from opentelemetry.trace import SpanKind, Status, StatusCode
 from opentelemetry.instrumentation.utils import _SUPPRESS_INSTRUMENTATION_KEY
 
 from agentops.semconv import SpanAttributes, LLMRequestTypeValues, CoreAttributes, MessageAttributes
+from agentops.instrumentation.common.metrics import MetricsRecorder
+from agentops.instrumentation.common.streaming import StreamAccumulator
 from agentops.instrumentation.common.wrappers import _with_tracer_wrapper
 from agentops.instrumentation.providers.google_genai.attributes.model import (
     get_generate_content_attributes,
@@ -26,6 +28,50 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
+# Metrics recorder of the active instrumentor, None while metrics are off
+_metrics_recorder: Optional[MetricsRecorder] = None
+
+
+def set_metrics_recorder(recorder: Optional[MetricsRecorder]) -> None:
+    """Set the metrics recorder the stream wrappers record inter-token latency with."""
+    global _metrics_recorder
+    _metrics_recorder = recorder
+
+
+def _new_accumulator(request_attributes: Dict[str, Any]) -> StreamAccumulator:
+    """Create a stream accumulator that records its inter-token gaps as a metric when metrics are on."""
+    accumulator = StreamAccumulator.for_provider("google_genai")
+    if _metrics_recorder is not None:
+        attributes = {SpanAttributes.LLM_SYSTEM: "Gemini"}
+        model = request_attributes.get(SpanAttributes.LLM_REQUEST_MODEL)
+        if model:
+            attributes[SpanAttributes.LLM_REQUEST_MODEL] = model
+        _metrics_recorder.observe_inter_token_latency(accumulator, attributes)
+    return accumulator
+
+
+def _set_stream_completion_attributes(span, accumulator: StreamAccumulator) -> None:
+    """Set the completion content, token usage, inter-token latency and capture size of a finished stream."""
+    full_text = accumulator.content
+    if full_text:
+        span.set_attribute(MessageAttributes.COMPLETION_CONTENT.format(i=0), full_text)
+        span.set_attribute(MessageAttributes.COMPLETION_ROLE.format(i=0), "assistant")
+
+    # Token usage comes from the last chunk carrying usage metadata
+    metadata = accumulator.usage
+    if metadata is not None:
+        if hasattr(metadata, "prompt_token_count"):
+            span.set_attribute(SpanAttributes.LLM_USAGE_PROMPT_TOKENS, metadata.prompt_token_count)
+        if hasattr(metadata, "candidates_token_count"):
+            span.set_attribute(SpanAttributes.LLM_USAGE_COMPLETION_TOKENS, metadata.candidates_token_count)
+        if hasattr(metadata, "total_token_count"):
+            span.set_attribute(SpanAttributes.LLM_USAGE_TOTAL_TOKENS, metadata.total_token_count)
+
+    completion_tokens = getattr(metadata, "candidates_token_count", None)
+    for key, value in accumulator.latency_attributes(completion_tokens).items():
+        span.set_attribute(key, value)
+    accumulator.record_capture(span)
+
 
 @_with_tracer_wrapper
 def generate_content_stream_wrapper(tracer, wrapped, instance, args, kwargs):
@@ -81,37 +127,14 @@ def generate_content_stream_wrapper(tracer, wrapped, instance, args, kwargs):
             Yields:
                 Items from the original stream with added instrumentation
             """
-            full_text = ""
-            last_chunk_with_metadata = None
+            accumulator = _new_accumulator(request_attributes)
 
             try:
                 for chunk in stream:
-                    # Keep track of the last chunk that might have metadata
-                    if hasattr(chunk, "usage_metadata") and chunk.usage_metadata:
-                        last_chunk_with_metadata = chunk
-
-                    # Track token count (approximate by word count if metadata not available)
-                    if hasattr(chunk, "text"):
-                        text_value = getattr(chunk, "text", None)
-                        if text_value:
-                            full_text += text_value
-
+                    accumulator.add(chunk)
                     yield chunk
 
-                # Set final content when complete
-                if full_text:
-                    span.set_attribute(MessageAttributes.COMPLETION_CONTENT.format(i=0), full_text)
-                    span.set_attribute(MessageAttributes.COMPLETION_ROLE.format(i=0), "assistant")
-
-                # Get token usage from the last chunk if available
-                if last_chunk_with_metadata and hasattr(last_chunk_with_metadata, "usage_metadata"):
-                    metadata = last_chunk_with_metadata.usage_metadata
-                    if hasattr(metadata, "prompt_token_count"):
-                        span.set_attribute(SpanAttributes.LLM_USAGE_PROMPT_TOKENS, metadata.prompt_token_count)
-                    if hasattr(metadata, "candidates_token_count"):
-                        span.set_attribute(SpanAttributes.LLM_USAGE_COMPLETION_TOKENS, metadata.candidates_token_count)
-                    if hasattr(metadata, "total_token_count"):
-                        span.set_attribute(SpanAttributes.LLM_USAGE_TOTAL_TOKENS, metadata.total_token_count)
+                _set_stream_completion_attributes(span, accumulator)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
@@ -187,36 +210,14 @@ async def generate_content_stream_async_wrapper(tracer, wrapped, instance, args,
             Yields:
                 Items from the original stream with added instrumentation
             """
-            full_text = ""
-            last_chunk_with_metadata = None
+            accumulator = _new_accumulator(request_attributes)
 
             try:
                 async for chunk in stream:
-                    # Keep track of the last chunk that might have metadata
-                    if hasattr(chunk, "usage_metadata") and chunk.usage_metadata:
-                        last_chunk_with_metadata = chunk
-
-                    if hasattr(chunk, "text"):
-                        text_value = getattr(chunk, "text", None)
-                        if text_value:
-                            full_text += text_value
-
+                    accumulator.add(chunk)
                     yield chunk
 
-                # Set final content when complete
-                if full_text:
-                    span.set_attribute(MessageAttributes.COMPLETION_CONTENT.format(i=0), full_text)
-                    span.set_attribute(MessageAttributes.COMPLETION_ROLE.format(i=0), "assistant")
-
-                # Get token usage from the last chunk if available
-                if last_chunk_with_metadata and hasattr(last_chunk_with_metadata, "usage_metadata"):
-                    metadata = last_chunk_with_metadata.usage_metadata
-                    if hasattr(metadata, "prompt_token_count"):
-                        span.set_attribute(SpanAttributes.LLM_USAGE_PROMPT_TOKENS, metadata.prompt_token_count)
-                    if hasattr(metadata, "candidates_token_count"):
-                        span.set_attribute(SpanAttributes.LLM_USAGE_COMPLETION_TOKENS, metadata.candidates_token_count)
-                    if hasattr(metadata, "total_token_count"):
-                        span.set_attribute(SpanAttributes.LLM_USAGE_TOTAL_TOKENS, metadata.total_token_count)
+                _set_stream_completion_attributes(span, accumulator)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
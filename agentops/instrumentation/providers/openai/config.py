@@ -4,7 +4,7 @@ This module provides a global configuration object that can be used to customize
 the behavior of OpenAI instrumentation across all components.
 """
 
-from typing import Callable, Optional, Dict
+from typing import Any, Callable, Optional, Dict
 from typing_extensions import Protocol
 
 
@@ -26,6 +26,7 @@ class Config:
         get_common_metrics_attributes: Function to get common attributes for metrics
         upload_base64_image: Optional async function to upload base64 images
         enable_trace_context_propagation: Whether to propagate trace context in headers
+        metrics_recorder: MetricsRecorder of the active instrumentor, used by the stream wrappers
     """
 
     enrich_token_usage: bool = True
@@ -34,3 +35,4 @@ class Config:
     get_common_metrics_attributes: Callable[[], Dict[str, str]] = lambda: {}
     upload_base64_image: Optional[UploadImageCallable] = None
     enable_trace_context_propagation: bool = True
+    metrics_recorder: Optional[Any] = None
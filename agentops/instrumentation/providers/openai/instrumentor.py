@@ -91,6 +91,8 @@ class OpenaiInstrumentor(CommonInstrumentor):
 
     def _custom_wrap(self, **kwargs):
         """Add custom wrappers for streaming functionality."""
+        Config.metrics_recorder = self.get_metrics_recorder() if self._metrics else None
+
         if is_openai_v1() and self._tracer:
             # from wrapt import wrap_function_wrapper
             # # Add streaming wrappers for v1
@@ -159,6 +161,7 @@ class OpenaiInstrumentor(CommonInstrumentor):
                     unit="s",
                     description="Time to first token in streaming chat completions",
                 ),
+                "inter_token_latency_histogram": StandardMetrics.create_inter_token_latency_histogram(meter),
                 "streaming_time_to_generate": meter.create_histogram(
                     name=Meters.LLM_STREAMING_TIME_TO_GENERATE,
                     unit="s",
@@ -186,6 +189,8 @@ class OpenaiInstrumentor(CommonInstrumentor):
 
     def _custom_unwrap(self, **kwargs):
         """Handle version-specific uninstrumentation."""
+        Config.metrics_recorder = None
+
         if not is_openai_v1():
             OpenAIV0Instrumentor().uninstrument(**kwargs)
 
@@ -6,29 +6,44 @@ It instruments streams to collect telemetry data for monitoring and analysis.
 """
 
 import time
-from typing import Any, AsyncIterator, Iterator
+from typing import Any, AsyncIterator, Iterator, Optional
 
 from opentelemetry import context as context_api
 from opentelemetry.trace import Span, SpanKind, Status, StatusCode, set_span_in_context
 from opentelemetry.context import _SUPPRESS_INSTRUMENTATION_KEY
 
 from agentops.logging import logger
+from agentops.instrumentation.common.streaming import StreamAccumulator
 from agentops.instrumentation.common.wrappers import _with_tracer_wrapper
+from agentops.instrumentation.providers.openai.config import Config
 from agentops.instrumentation.providers.openai.utils import is_metrics_enabled
-from agentops.instrumentation.providers.openai.wrappers.chat import handle_chat_attributes, _create_tool_span
+from agentops.instrumentation.providers.openai.wrappers.chat import (
+    handle_chat_attributes,
+    _create_tool_span,
+    _has_tool_calls,
+)
+from agentops.sdk.deferred import defer_attributes, deferred_extraction_enabled, snapshot_kwargs
 from agentops.semconv import SpanAttributes, LLMRequestTypeValues, MessageAttributes
 
 
-class OpenaiStreamWrapper:
-    """Wrapper for OpenAI Chat Completions streaming responses.
+def _new_accumulator(provider: str) -> StreamAccumulator:
+    """Create a stream accumulator that records its inter-token gaps as a metric when metrics are on."""
+    accumulator = StreamAccumulator.for_provider(provider)
+    recorder = Config.metrics_recorder
+    if recorder is not None and is_metrics_enabled():
+        attributes = {**Config.get_common_metrics_attributes(), SpanAttributes.LLM_SYSTEM: "OpenAI"}
+        recorder.observe_inter_token_latency(accumulator, attributes)
+    return accumulator
 
-    This wrapper intercepts streaming chunks to collect telemetry data including:
-    - Time to first token
-    - Total generation time
-    - Content aggregation
-    - Token usage (if available)
-    - Chunk statistics
-    """
+
+def _record_stream_latency(span: Span, accumulator: StreamAccumulator, completion_tokens: Optional[int]) -> None:
+    """Set the inter-token latency summary on the span."""
+    for key, value in accumulator.latency_attributes(completion_tokens).items():
+        span.set_attribute(key, value)
+
+
+class _ChatStreamTelemetry:
+    """Chunk accounting shared by the sync and async Chat Completions stream wrappers."""
 
     def __init__(self, stream: Any, span: Span, request_kwargs: dict):
         """Initialize the stream wrapper.
@@ -41,146 +56,48 @@ class OpenaiStreamWrapper:
         self._stream = stream
         self._span = span
         self._request_kwargs = request_kwargs
-        self._start_time = time.time()
-        self._first_token_time = None
-        self._chunk_count = 0
-        self._content_chunks = []
-        self._finish_reason = None
-        self._model = None
+        self._accumulator = _new_accumulator("openai_chat")
         self._response_id = None
-        self._usage = None
-        self._tool_calls = {}
-        self._current_tool_call_index = None
+        self._model = None
 
         # Make sure the span is attached to the current context
         current_context = context_api.get_current()
         self._token = context_api.attach(set_span_in_context(span, current_context))
 
-    def __iter__(self) -> Iterator[Any]:
-        """Return iterator for sync streaming."""
-        return self
-
-    def __next__(self) -> Any:
-        """Process the next chunk from the stream."""
-        try:
-            chunk = next(self._stream)
-            self._process_chunk(chunk)
-            return chunk
-        except StopIteration:
-            self._finalize_stream()
-            raise
-
-    def __enter__(self):
-        """Support context manager protocol."""
-        return self
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        """Clean up on context manager exit."""
-        if exc_type is not None:
-            self._span.record_exception(exc_val)
-            self._span.set_status(Status(StatusCode.ERROR, str(exc_val)))
-
-        self._span.end()
-        context_api.detach(self._token)
-        return False
-
     def _process_chunk(self, chunk: Any) -> None:
         """Process a single chunk from the stream.
 
         Args:
             chunk: A chunk from the OpenAI streaming response
         """
-        self._chunk_count += 1
-
-        # Usage (may be in final chunk with a different structure)
-        if hasattr(chunk, "usage"):
-            self._usage = chunk.usage
-            # Check if this is a usage-only chunk (often the final chunk when stream_options.include_usage=true)
-            is_usage_only_chunk = not (hasattr(chunk, "choices") and chunk.choices)
-
-            # If this is a usage-only chunk, we don't need to process it as a content chunk
-            if is_usage_only_chunk:
-                return
-
-        # Skip processing if no choices are present
-        if not hasattr(chunk, "choices") or not chunk.choices:
-            return
-
-        # Track first token timing
-        if self._first_token_time is None:
-            if any(choice.delta.content for choice in chunk.choices if hasattr(choice.delta, "content")):
-                self._first_token_time = time.time()
-                time_to_first_token = self._first_token_time - self._start_time
-                self._span.set_attribute(SpanAttributes.LLM_STREAMING_TIME_TO_FIRST_TOKEN, time_to_first_token)
-                self._span.add_event("first_token_received", {"time_elapsed": time_to_first_token})
-            # Also check for tool_calls as first tokens
-            elif any(
-                choice.delta.tool_calls
-                for choice in chunk.choices
-                if hasattr(choice.delta, "tool_calls") and choice.delta.tool_calls
-            ):
-                self._first_token_time = time.time()
-                time_to_first_token = self._first_token_time - self._start_time
-                self._span.set_attribute(SpanAttributes.LLM_STREAMING_TIME_TO_FIRST_TOKEN, time_to_first_token)
+        acc = self._accumulator
+        if acc.add(chunk):
+            time_to_first_token = acc.time_to_first_token()
+            self._span.set_attribute(SpanAttributes.LLM_STREAMING_TIME_TO_FIRST_TOKEN, time_to_first_token)
+            if acc.first_token_kind == "tool_call":
                 self._span.add_event("first_tool_call_token_received", {"time_elapsed": time_to_first_token})
+            else:
+                self._span.add_event("first_token_received", {"time_elapsed": time_to_first_token})
+
+        if self._response_id is None and acc.response_id is not None:
+            self._response_id = acc.response_id
+            self._span.set_attribute(SpanAttributes.LLM_RESPONSE_ID, self._response_id)
 
-        # Extract chunk data
-        if hasattr(chunk, "id") and chunk.id and not self._response_id:
-            self._response_id = chunk.id
-            if self._response_id is not None:
-                self._span.set_attribute(SpanAttributes.LLM_RESPONSE_ID, self._response_id)
-
-        if hasattr(chunk, "model") and chunk.model and not self._model:
-            self._model = chunk.model
-            if self._model is not None:
-                self._span.set_attribute(SpanAttributes.LLM_RESPONSE_MODEL, self._model)
-
-        # Process choices
-        for choice in chunk.choices:
-            if not hasattr(choice, "delta"):
-                continue
-
-            delta = choice.delta
-
-            # Content
-            if hasattr(delta, "content") and delta.content is not None:
-                self._content_chunks.append(delta.content)
-
-            # Tool calls
-            if hasattr(delta, "tool_calls") and delta.tool_calls:
-                for tool_call in delta.tool_calls:
-                    if hasattr(tool_call, "index"):
-                        idx = tool_call.index
-                        if idx not in self._tool_calls:
-                            self._tool_calls[idx] = {
-                                "id": "",
-                                "type": "function",
-                                "function": {"name": "", "arguments": ""},
-                            }
-
-                        if hasattr(tool_call, "id") and tool_call.id:
-                            self._tool_calls[idx]["id"] = tool_call.id
-
-                        if hasattr(tool_call, "function"):
-                            if hasattr(tool_call.function, "name") and tool_call.function.name:
-                                self._tool_calls[idx]["function"]["name"] = tool_call.function.name
-                            if hasattr(tool_call.function, "arguments") and tool_call.function.arguments:
-                                self._tool_calls[idx]["function"]["arguments"] += tool_call.function.arguments
-
-            # Finish reason
-            if hasattr(choice, "finish_reason") and choice.finish_reason:
-                self._finish_reason = choice.finish_reason
+        if self._model is None and acc.model is not None:
+            self._model = acc.model
+            self._span.set_attribute(SpanAttributes.LLM_RESPONSE_MODEL, self._model)
 
     def _finalize_stream(self) -> None:
         """Finalize the stream and set final attributes on the span."""
-        total_time = time.time() - self._start_time
+        acc = self._accumulator
+        total_time = time.time() - acc.start_time
 
         # Aggregate content
-        full_content = "".join(self._content_chunks)
+        full_content = acc.content
 
         # Set generation time
-        if self._first_token_time:
-            generation_time = total_time - (self._first_token_time - self._start_time)
+        if acc.first_token_time:
+            generation_time = total_time - acc.time_to_first_token()
             self._span.set_attribute(SpanAttributes.LLM_STREAMING_TIME_TO_GENERATE, generation_time)
 
         # Add content attributes
@@ -189,40 +106,43 @@ class OpenaiStreamWrapper:
             self._span.set_attribute(MessageAttributes.COMPLETION_ROLE.format(i=0), "assistant")
 
         # Set finish reason
-        if self._finish_reason:
-            self._span.set_attribute(MessageAttributes.COMPLETION_FINISH_REASON.format(i=0), self._finish_reason)
+        if acc.finish_reason:
+            self._span.set_attribute(MessageAttributes.COMPLETION_FINISH_REASON.format(i=0), acc.finish_reason)
 
-        # Create tool spans for each tool call
-        if len(self._tool_calls) > 0:
-            for idx, tool_call in self._tool_calls.items():
-                # Create a child span for this tool call
-                _create_tool_span(self._span, tool_call)
+        # Create a child span for each tool call
+        tool_calls = acc.tool_calls
+        for tool_call in tool_calls:
+            _create_tool_span(self._span, tool_call.to_dict(), tool_call.arguments_omitted)
 
         # Set usage if available from the API
-        if self._usage is not None:
+        usage = acc.usage
+        if usage is not None:
             # Only set token attributes if they exist and have non-None values
-            if hasattr(self._usage, "prompt_tokens") and self._usage.prompt_tokens is not None:
-                self._span.set_attribute(SpanAttributes.LLM_USAGE_PROMPT_TOKENS, int(self._usage.prompt_tokens))
+            if getattr(usage, "prompt_tokens", None) is not None:
+                self._span.set_attribute(SpanAttributes.LLM_USAGE_PROMPT_TOKENS, int(usage.prompt_tokens))
 
-            if hasattr(self._usage, "completion_tokens") and self._usage.completion_tokens is not None:
-                self._span.set_attribute(SpanAttributes.LLM_USAGE_COMPLETION_TOKENS, int(self._usage.completion_tokens))
+            if getattr(usage, "completion_tokens", None) is not None:
+                self._span.set_attribute(SpanAttributes.LLM_USAGE_COMPLETION_TOKENS, int(usage.completion_tokens))
 
-            if hasattr(self._usage, "total_tokens") and self._usage.total_tokens is not None:
-                self._span.set_attribute(SpanAttributes.LLM_USAGE_TOTAL_TOKENS, int(self._usage.total_tokens))
+            if getattr(usage, "total_tokens", None) is not None:
+                self._span.set_attribute(SpanAttributes.LLM_USAGE_TOTAL_TOKENS, int(usage.total_tokens))
+
+        _record_stream_latency(self._span, acc, getattr(usage, "completion_tokens", None))
+        acc.record_capture(self._span)
 
         # Stream statistics
-        self._span.set_attribute("llm.openai.stream.chunk_count", self._chunk_count)
-        self._span.set_attribute("llm.openai.stream.content_length", len(full_content))
+        self._span.set_attribute("llm.openai.stream.chunk_count", acc.chunk_count)
+        self._span.set_attribute("llm.openai.stream.content_length", acc.content_length)
         self._span.set_attribute("llm.openai.stream.total_duration", total_time)
 
         # Add completion event
         self._span.add_event(
             "stream_completed",
             {
-                "chunks_received": self._chunk_count,
-                "total_content_length": len(full_content),
+                "chunks_received": acc.chunk_count,
+                "total_content_length": acc.content_length,
                 "duration": total_time,
-                "had_tool_calls": len(self._tool_calls) > 0,
+                "had_tool_calls": len(tool_calls) > 0,
             },
         )
 
@@ -232,33 +152,48 @@ class OpenaiStreamWrapper:
         context_api.detach(self._token)
 
 
-class OpenAIAsyncStreamWrapper:
-    """Async wrapper for OpenAI Chat Completions streaming responses."""
+class OpenaiStreamWrapper(_ChatStreamTelemetry):
+    """Wrapper for OpenAI Chat Completions streaming responses.
 
-    def __init__(self, stream: Any, span: Span, request_kwargs: dict):
-        """Initialize the async stream wrapper.
+    This wrapper intercepts streaming chunks to collect telemetry data including:
+    - Time to first token
+    - Total generation time
+    - Content aggregation
+    - Token usage (if available)
+    - Chunk statistics
+    """
 
-        Args:
-            stream: The original OpenAI async stream object
-            span: The OpenTelemetry span for tracking
-            request_kwargs: Original request parameters for context
-        """
-        self._stream = stream
-        self._span = span
-        self._request_kwargs = request_kwargs
-        self._start_time = time.time()
-        self._first_token_time = None
-        self._chunk_count = 0
-        self._content_chunks = []
-        self._finish_reason = None
-        self._model = None
-        self._response_id = None
-        self._usage = None
-        self._tool_calls = {}
+    def __iter__(self) -> Iterator[Any]:
+        """Return iterator for sync streaming."""
+        return self
 
-        # Make sure the span is attached to the current context
-        current_context = context_api.get_current()
-        self._token = context_api.attach(set_span_in_context(span, current_context))
+    def __next__(self) -> Any:
+        """Process the next chunk from the stream."""
+        try:
+            chunk = next(self._stream)
+            self._process_chunk(chunk)
+            return chunk
+        except StopIteration:
+            self._finalize_stream()
+            raise
+
+    def __enter__(self):
+        """Support context manager protocol."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Clean up on context manager exit."""
+        if exc_type is not None:
+            self._span.record_exception(exc_val)
+            self._span.set_status(Status(StatusCode.ERROR, str(exc_val)))
+
+        self._span.end()
+        context_api.detach(self._token)
+        return False
+
+
+class OpenAIAsyncStreamWrapper(_ChatStreamTelemetry):
+    """Async wrapper for OpenAI Chat Completions streaming responses."""
 
     def __aiter__(self) -> AsyncIterator[Any]:
         """Return async iterator for async streaming."""
@@ -267,9 +202,6 @@ class OpenAIAsyncStreamWrapper:
     async def __anext__(self) -> Any:
         """Process the next chunk from the async stream."""
         try:
-            if not hasattr(self, "_aiter_debug_logged"):
-                self._aiter_debug_logged = True
-
             chunk = await self._stream.__anext__()
 
             # Process the chunk
@@ -301,153 +233,6 @@ class OpenAIAsyncStreamWrapper:
         context_api.detach(self._token)
         return False
 
-    def _process_chunk(self, chunk: Any) -> None:
-        """Process a single chunk from the stream.
-
-        Args:
-            chunk: A chunk from the OpenAI streaming response
-        """
-        self._chunk_count += 1
-
-        # Usage (may be in final chunk with a different structure)
-        if hasattr(chunk, "usage"):
-            self._usage = chunk.usage
-            # Check if this is a usage-only chunk (often the final chunk when stream_options.include_usage=true)
-            is_usage_only_chunk = not (hasattr(chunk, "choices") and chunk.choices)
-
-            # If this is a usage-only chunk, we don't need to process it as a content chunk
-            if is_usage_only_chunk:
-                return
-
-        # Skip processing if no choices are present
-        if not hasattr(chunk, "choices") or not chunk.choices:
-            return
-
-        # Track first token timing
-        if self._first_token_time is None:
-            if any(choice.delta.content for choice in chunk.choices if hasattr(choice.delta, "content")):
-                self._first_token_time = time.time()
-                time_to_first_token = self._first_token_time - self._start_time
-                self._span.set_attribute(SpanAttributes.LLM_STREAMING_TIME_TO_FIRST_TOKEN, time_to_first_token)
-                self._span.add_event("first_token_received", {"time_elapsed": time_to_first_token})
-            # Also check for tool_calls as first tokens
-            elif any(
-                choice.delta.tool_calls
-                for choice in chunk.choices
-                if hasattr(choice.delta, "tool_calls") and choice.delta.tool_calls
-            ):
-                self._first_token_time = time.time()
-                time_to_first_token = self._first_token_time - self._start_time
-                self._span.set_attribute(SpanAttributes.LLM_STREAMING_TIME_TO_FIRST_TOKEN, time_to_first_token)
-                self._span.add_event("first_tool_call_token_received", {"time_elapsed": time_to_first_token})
-
-        # Extract chunk data
-        if hasattr(chunk, "id") and chunk.id and not self._response_id:
-            self._response_id = chunk.id
-            if self._response_id is not None:
-                self._span.set_attribute(SpanAttributes.LLM_RESPONSE_ID, self._response_id)
-
-        if hasattr(chunk, "model") and chunk.model and not self._model:
-            self._model = chunk.model
-            if self._model is not None:
-                self._span.set_attribute(SpanAttributes.LLM_RESPONSE_MODEL, self._model)
-
-        # Process choices
-        for choice in chunk.choices:
-            if not hasattr(choice, "delta"):
-                continue
-
-            delta = choice.delta
-
-            # Content
-            if hasattr(delta, "content") and delta.content is not None:
-                self._content_chunks.append(delta.content)
-
-            # Tool calls
-            if hasattr(delta, "tool_calls") and delta.tool_calls:
-                for tool_call in delta.tool_calls:
-                    if hasattr(tool_call, "index"):
-                        idx = tool_call.index
-                        if idx not in self._tool_calls:
-                            self._tool_calls[idx] = {
-                                "id": "",
-                                "type": "function",
-                                "function": {"name": "", "arguments": ""},
-                            }
-
-                        if hasattr(tool_call, "id") and tool_call.id:
-                            self._tool_calls[idx]["id"] = tool_call.id
-
-                        if hasattr(tool_call, "function"):
-                            if hasattr(tool_call.function, "name") and tool_call.function.name:
-                                self._tool_calls[idx]["function"]["name"] = tool_call.function.name
-                            if hasattr(tool_call.function, "arguments") and tool_call.function.arguments:
-                                self._tool_calls[idx]["function"]["arguments"] += tool_call.function.arguments
-
-            # Finish reason
-            if hasattr(choice, "finish_reason") and choice.finish_reason:
-                self._finish_reason = choice.finish_reason
-
-    def _finalize_stream(self) -> None:
-        """Finalize the stream and set final attributes on the span."""
-        total_time = time.time() - self._start_time
-
-        # Aggregate content
-        full_content = "".join(self._content_chunks)
-
-        # Set generation time
-        if self._first_token_time:
-            generation_time = total_time - (self._first_token_time - self._start_time)
-            self._span.set_attribute(SpanAttributes.LLM_STREAMING_TIME_TO_GENERATE, generation_time)
-
-        # Add content attributes
-        if full_content:
-            self._span.set_attribute(MessageAttributes.COMPLETION_CONTENT.format(i=0), full_content)
-            self._span.set_attribute(MessageAttributes.COMPLETION_ROLE.format(i=0), "assistant")
-
-        # Set finish reason
-        if self._finish_reason:
-            self._span.set_attribute(MessageAttributes.COMPLETION_FINISH_REASON.format(i=0), self._finish_reason)
-
-        # Create tool spans for each tool call
-        if len(self._tool_calls) > 0:
-            for idx, tool_call in self._tool_calls.items():
-                # Create a child span for this tool call
-                _create_tool_span(self._span, tool_call)
-
-        # Set usage if available from the API
-        if self._usage is not None:
-            # Only set token attributes if they exist and have non-None values
-            if hasattr(self._usage, "prompt_tokens") and self._usage.prompt_tokens is not None:
-                self._span.set_attribute(SpanAttributes.LLM_USAGE_PROMPT_TOKENS, int(self._usage.prompt_tokens))
-
-            if hasattr(self._usage, "completion_tokens") and self._usage.completion_tokens is not None:
-                self._span.set_attribute(SpanAttributes.LLM_USAGE_COMPLETION_TOKENS, int(self._usage.completion_tokens))
-
-            if hasattr(self._usage, "total_tokens") and self._usage.total_tokens is not None:
-                self._span.set_attribute(SpanAttributes.LLM_USAGE_TOTAL_TOKENS, int(self._usage.total_tokens))
-
-        # Stream statistics
-        self._span.set_attribute("llm.openai.stream.chunk_count", self._chunk_count)
-        self._span.set_attribute("llm.openai.stream.content_length", len(full_content))
-        self._span.set_attribute("llm.openai.stream.total_duration", total_time)
-
-        # Add completion event
-        self._span.add_event(
-            "stream_completed",
-            {
-                "chunks_received": self._chunk_count,
-                "total_content_length": len(full_content),
-                "duration": total_time,
-                "had_tool_calls": len(self._tool_calls) > 0,
-            },
-        )
-
-        # Finalize span and context
-        self._span.set_status(Status(StatusCode.OK))
-        self._span.end()
-        context_api.detach(self._token)
-
 
 @_with_tracer_wrapper
 def chat_completion_stream_wrapper(tracer, wrapped, instance, args, kwargs):
@@ -473,12 +258,20 @@ def chat_completion_stream_wrapper(tracer, wrapped, instance, args, kwargs):
     current_context = context_api.get_current()
     token = context_api.attach(set_span_in_context(span, current_context))
 
+    # Non-streaming responses can be turned into attributes on the export thread instead
+    deferred = not is_streaming and deferred_extraction_enabled()
+
     try:
-        # Extract and set request attributes
-        request_attributes = handle_chat_attributes(kwargs=kwargs)
+        if deferred:
+            request_kwargs = snapshot_kwargs(kwargs)
+            request_attributes = {}
+        else:
+            # Extract and set request attributes
+            request_kwargs = kwargs
+            request_attributes = handle_chat_attributes(kwargs=kwargs)
 
-        for key, value in request_attributes.items():
-            span.set_attribute(key, value)
+            for key, value in request_attributes.items():
+                span.set_attribute(key, value)
 
         # Add include_usage to get token counts for streaming responses
         if is_streaming and is_metrics_enabled():
@@ -501,12 +294,15 @@ def chat_completion_stream_wrapper(tracer, wrapped, instance, args, kwargs):
             context_api.detach(token)
             return OpenaiStreamWrapper(response, span, kwargs)
         else:
-            # Handle non-streaming response
-            response_attributes = handle_chat_attributes(kwargs=kwargs, return_value=response, span=span)
+            # Handle non-streaming response; tool calls become child spans, which need the live span
+            if deferred and not _has_tool_calls(response):
+                defer_attributes(span, lambda: handle_chat_attributes(kwargs=request_kwargs, return_value=response))
+            else:
+                response_attributes = handle_chat_attributes(kwargs=request_kwargs, return_value=response, span=span)
 
-            for key, value in response_attributes.items():
-                if key not in request_attributes:  # Avoid overwriting request attributes
-                    span.set_attribute(key, value)
+                for key, value in response_attributes.items():
+                    if key not in request_attributes:  # Avoid overwriting request attributes
+                        span.set_attribute(key, value)
 
             span.set_status(Status(StatusCode.OK))
             span.end()
@@ -542,12 +338,20 @@ async def async_chat_completion_stream_wrapper(tracer, wrapped, instance, args,
     current_context = context_api.get_current()
     token = context_api.attach(set_span_in_context(span, current_context))
 
+    # Non-streaming responses can be turned into attributes on the export thread instead
+    deferred = not is_streaming and deferred_extraction_enabled()
+
     try:
-        # Extract and set request attributes
-        request_attributes = handle_chat_attributes(kwargs=kwargs)
+        if deferred:
+            request_kwargs = snapshot_kwargs(kwargs)
+            request_attributes = {}
+        else:
+            # Extract and set request attributes
+            request_kwargs = kwargs
+            request_attributes = handle_chat_attributes(kwargs=kwargs)
 
-        for key, value in request_attributes.items():
-            span.set_attribute(key, value)
+            for key, value in request_attributes.items():
+                span.set_attribute(key, value)
 
         # Add include_usage to get token counts for streaming responses
         if is_streaming and is_metrics_enabled():
@@ -566,12 +370,15 @@ async def async_chat_completion_stream_wrapper(tracer, wrapped, instance, args,
             context_api.detach(token)
             return OpenAIAsyncStreamWrapper(response, span, kwargs)
         else:
-            # Handle non-streaming response
-            response_attributes = handle_chat_attributes(kwargs=kwargs, return_value=response, span=span)
+            # Handle non-streaming response; tool calls become child spans, which need the live span
+            if deferred and not _has_tool_calls(response):
+                defer_attributes(span, lambda: handle_chat_attributes(kwargs=request_kwargs, return_value=response))
+            else:
+                response_attributes = handle_chat_attributes(kwargs=request_kwargs, return_value=response, span=span)
 
-            for key, value in response_attributes.items():
-                if key not in request_attributes:  # Avoid overwriting request attributes
-                    span.set_attribute(key, value)
+                for key, value in response_attributes.items():
+                    if key not in request_attributes:  # Avoid overwriting request attributes
+                        span.set_attribute(key, value)
 
             span.set_status(Status(StatusCode.OK))
             span.end()
@@ -587,6 +394,10 @@ async def async_chat_completion_stream_wrapper(tracer, wrapped, instance, args,
         raise
 
 
+# Responses API events recorded as span events; deltas are not
+_SIGNIFICANT_RESPONSES_EVENTS = frozenset(("response.created", "response.completed", "response.output_item.added"))
+
+
 class ResponsesAPIStreamWrapper:
     """Wrapper for OpenAI Responses API streaming.
 
@@ -599,17 +410,9 @@ class ResponsesAPIStreamWrapper:
         self._stream = stream
         self._span = span
         self._request_kwargs = request_kwargs
-        self._start_time = time.time()
-        self._first_token_time = None
-        self._event_count = 0
-        self._content_chunks = []
-        self._function_call_chunks = []
-        self._reasoning_chunks = []
+        self._accumulator = _new_accumulator("openai_responses")
         self._response_id = None
         self._model = None
-        self._usage = None
-        self._output_items = []
-        self._current_function_args = ""
 
         # Make sure the span is attached to the current context
         current_context = context_api.get_current()
@@ -664,93 +467,72 @@ class ResponsesAPIStreamWrapper:
 
     def _process_event(self, event: Any) -> None:
         """Process a single event from the Responses API stream."""
-        self._event_count += 1
-
-        # Track first content event
-        if self._first_token_time is None and hasattr(event, "type"):
-            if event.type in ["response.output_text.delta", "response.function_call_arguments.delta"]:
-                self._first_token_time = time.time()
-                time_to_first_token = self._first_token_time - self._start_time
-                self._span.set_attribute(SpanAttributes.LLM_STREAMING_TIME_TO_FIRST_TOKEN, time_to_first_token)
-
-        # Process different event types
-        if hasattr(event, "type"):
-            if event.type == "response.created":
-                if hasattr(event, "response"):
-                    response = event.response
-                    if hasattr(response, "id"):
-                        self._response_id = response.id
-                        self._span.set_attribute(SpanAttributes.LLM_RESPONSE_ID, self._response_id)
-                    if hasattr(response, "model"):
-                        self._model = response.model
-                        self._span.set_attribute(SpanAttributes.LLM_RESPONSE_MODEL, self._model)
-
-            elif event.type == "response.output_text.delta":
-                if hasattr(event, "delta"):
-                    self._content_chunks.append(event.delta)
-
-            elif event.type == "response.function_call_arguments.delta":
-                # Accumulate function call arguments
-                if hasattr(event, "delta"):
-                    self._current_function_args += event.delta
-
-            elif event.type == "response.completed":
-                # Process the final response which contains all output items
-                if hasattr(event, "response"):
-                    response = event.response
-                    if hasattr(response, "usage"):
-                        self._usage = response.usage
-
-                    # Extract output items from the completed response
-                    if hasattr(response, "output"):
-                        for output_item in response.output:
-                            if hasattr(output_item, "type"):
-                                if output_item.type == "function_call" and hasattr(output_item, "arguments"):
-                                    self._function_call_chunks.append(output_item.arguments)
-                                elif output_item.type == "reasoning":
-                                    # Extract reasoning text - could be in summary or content
-                                    if hasattr(output_item, "summary"):
-                                        self._reasoning_chunks.append(str(output_item.summary))
-                                    elif hasattr(output_item, "content"):
-                                        # content might be a list of text items
-                                        if isinstance(output_item.content, list):
-                                            for content_item in output_item.content:
-                                                if hasattr(content_item, "text"):
-                                                    self._reasoning_chunks.append(str(content_item.text))
-                                        else:
-                                            self._reasoning_chunks.append(str(output_item.content))
-                                elif output_item.type == "message" and hasattr(output_item, "content"):
-                                    # Extract text content from message items
-                                    if isinstance(output_item.content, list):
-                                        for content in output_item.content:
-                                            if (
-                                                hasattr(content, "type")
-                                                and content.type == "text"
-                                                and hasattr(content, "text")
-                                            ):
-                                                self._content_chunks.append(str(content.text))
-                                    else:
-                                        self._content_chunks.append(str(output_item.content))
+        acc = self._accumulator
+        if acc.add(event):
+            self._span.set_attribute(SpanAttributes.LLM_STREAMING_TIME_TO_FIRST_TOKEN, acc.time_to_first_token())
 
+        event_type = getattr(event, "type", None)
         # Only add significant events, not every delta
-        if hasattr(event, "type") and event.type in [
-            "response.created",
-            "response.completed",
-            "response.output_item.added",
-        ]:
+        if event_type in _SIGNIFICANT_RESPONSES_EVENTS:
+            if event_type == "response.created":
+                if self._response_id is None and acc.response_id is not None:
+                    self._response_id = acc.response_id
+                    self._span.set_attribute(SpanAttributes.LLM_RESPONSE_ID, self._response_id)
+                if self._model is None and acc.model is not None:
+                    self._model = acc.model
+                    self._span.set_attribute(SpanAttributes.LLM_RESPONSE_MODEL, self._model)
+
             self._span.add_event(
                 "responses_api_event",
-                {"event_type": event.type, "event_number": self._event_count},
+                {"event_type": event_type, "event_number": acc.chunk_count},
             )
 
+    def _collect_output_items(self, content_chunks: list, function_call_chunks: list, reasoning_chunks: list) -> None:
+        """Collect function calls, reasoning and message text from the output of the completed response."""
+        response = self._accumulator.final_response
+        for output_item in getattr(response, "output", None) or []:
+            item_type = getattr(output_item, "type", None)
+            if item_type == "function_call" and hasattr(output_item, "arguments"):
+                function_call_chunks.append(output_item.arguments)
+            elif item_type == "reasoning":
+                # Extract reasoning text - could be in summary or content
+                if hasattr(output_item, "summary"):
+                    reasoning_chunks.append(str(output_item.summary))
+                elif hasattr(output_item, "content"):
+                    # content might be a list of text items
+                    if isinstance(output_item.content, list):
+                        for content_item in output_item.content:
+                            if hasattr(content_item, "text"):
+                                reasoning_chunks.append(str(content_item.text))
+                    else:
+                        reasoning_chunks.append(str(output_item.content))
+            elif item_type == "message" and hasattr(output_item, "content"):
+                # Extract text content from message items
+                if isinstance(output_item.content, list):
+                    for content in output_item.content:
+                        if getattr(content, "type", None) == "text" and hasattr(content, "text"):
+                            content_chunks.append(str(content.text))
+                else:
+                    content_chunks.append(str(output_item.content))
+
     def _finalize_stream(self) -> None:
         """Finalize the Responses API stream."""
-        total_time = time.time() - self._start_time
+        acc = self._accumulator
+        total_time = time.time() - acc.start_time
 
         # Aggregate different types of content
-        text_content = "".join(self._content_chunks)
-        function_content = self._current_function_args or "".join(self._function_call_chunks)
-        reasoning_content = "".join(self._reasoning_chunks)
+        content_chunks = [acc.content]
+        function_call_chunks = []
+        reasoning_chunks = []
+        self._collect_output_items(content_chunks, function_call_chunks, reasoning_chunks)
+
+        text_content = "".join(content_chunks)
+        streamed_function_args = "".join(tool_call.arguments for tool_call in acc.tool_calls)
+        arguments_omitted = sum(tool_call.arguments_omitted for tool_call in acc.tool_calls)
+        if arguments_omitted:
+            self._span.set_attribute(SpanAttributes.LLM_STREAMING_TOOL_ARGUMENTS_OMITTED, arguments_omitted)
+        function_content = streamed_function_args or "".join(function_call_chunks)
+        reasoning_content = "".join(reasoning_chunks)
 
         # Combine all content types for the completion
         full_content = ""
@@ -776,31 +558,35 @@ class ResponsesAPIStreamWrapper:
             )
 
         # Set timing
-        if self._first_token_time:
-            generation_time = total_time - (self._first_token_time - self._start_time)
+        if acc.first_token_time:
+            generation_time = total_time - acc.time_to_first_token()
             self._span.set_attribute(SpanAttributes.LLM_STREAMING_TIME_TO_GENERATE, generation_time)
 
         # Set usage if available from the API
-        if self._usage is not None:
+        usage = acc.usage
+        if usage is not None:
             # Only set token attributes if they exist and have non-None values
-            if hasattr(self._usage, "input_tokens") and self._usage.input_tokens is not None:
-                self._span.set_attribute(SpanAttributes.LLM_USAGE_PROMPT_TOKENS, int(self._usage.input_tokens))
+            if getattr(usage, "input_tokens", None) is not None:
+                self._span.set_attribute(SpanAttributes.LLM_USAGE_PROMPT_TOKENS, int(usage.input_tokens))
 
-            if hasattr(self._usage, "output_tokens") and self._usage.output_tokens is not None:
-                self._span.set_attribute(SpanAttributes.LLM_USAGE_COMPLETION_TOKENS, int(self._usage.output_tokens))
+            if getattr(usage, "output_tokens", None) is not None:
+                self._span.set_attribute(SpanAttributes.LLM_USAGE_COMPLETION_TOKENS, int(usage.output_tokens))
 
-            if hasattr(self._usage, "total_tokens") and self._usage.total_tokens is not None:
-                self._span.set_attribute(SpanAttributes.LLM_USAGE_TOTAL_TOKENS, int(self._usage.total_tokens))
+            if getattr(usage, "total_tokens", None) is not None:
+                self._span.set_attribute(SpanAttributes.LLM_USAGE_TOTAL_TOKENS, int(usage.total_tokens))
 
         else:
             logger.debug(
                 f"[RESPONSES API] No usage provided by API. "
                 f"content_length={len(full_content)}, "
-                f"event_count={self._event_count}"
+                f"event_count={acc.chunk_count}"
             )
 
+        _record_stream_latency(self._span, acc, getattr(usage, "output_tokens", None))
+        acc.record_capture(self._span)
+
         # Stream statistics
-        self._span.set_attribute("llm.openai.responses.event_count", self._event_count)
+        self._span.set_attribute("llm.openai.responses.event_count", acc.chunk_count)
         self._span.set_attribute("llm.openai.responses.content_length", len(full_content))
         self._span.set_attribute("llm.openai.responses.total_duration", total_time)
 
@@ -808,7 +594,7 @@ class ResponsesAPIStreamWrapper:
         self._span.add_event(
             "stream_completed",
             {
-                "event_count": self._event_count,
+                "event_count": acc.chunk_count,
                 "total_content_length": len(full_content),
                 "duration": total_time,
                 "had_function_calls": bool(function_content),
@@ -822,7 +608,8 @@ class ResponsesAPIStreamWrapper:
         self._span.end()
         context_api.detach(self._token)
         logger.debug(
-            f"[RESPONSES API] Finalized streaming span after {self._event_count} events. Content length: {len(full_content)}"
+            f"[RESPONSES API] Finalized streaming span after {acc.chunk_count} events. "
+            f"Content length: {len(full_content)}"
         )
 
 
@@ -847,13 +634,21 @@ def responses_stream_wrapper(tracer, wrapped, instance, args, kwargs):
     current_context = context_api.get_current()
     token = context_api.attach(set_span_in_context(span, current_context))
 
+    # Non-streaming responses can be turned into attributes on the export thread instead
+    deferred = not is_streaming and deferred_extraction_enabled()
+
     try:
         # Extract and set request attributes
         from agentops.instrumentation.providers.openai.wrappers.responses import handle_responses_attributes
 
-        request_attributes = handle_responses_attributes(kwargs=kwargs)
-        for key, value in request_attributes.items():
-            span.set_attribute(key, value)
+        if deferred:
+            request_kwargs = snapshot_kwargs(kwargs)
+            request_attributes = {}
+        else:
+            request_kwargs = kwargs
+            request_attributes = handle_responses_attributes(kwargs=kwargs)
+            for key, value in request_attributes.items():
+                span.set_attribute(key, value)
 
         # Call the original method
         response = wrapped(*args, **kwargs)
@@ -864,10 +659,15 @@ def responses_stream_wrapper(tracer, wrapped, instance, args, kwargs):
             return ResponsesAPIStreamWrapper(response, span, kwargs)
         else:
             # For non-streaming, handle response attributes and close span
-            response_attributes = handle_responses_attributes(kwargs=kwargs, return_value=response)
-            for key, value in response_attributes.items():
-                if key not in request_attributes:  # Avoid overwriting request attributes
-                    span.set_attribute(key, value)
+            if deferred:
+                defer_attributes(
+                    span, lambda: handle_responses_attributes(kwargs=request_kwargs, return_value=response)
+                )
+            else:
+                response_attributes = handle_responses_attributes(kwargs=request_kwargs, return_value=response)
+                for key, value in response_attributes.items():
+                    if key not in request_attributes:  # Avoid overwriting request attributes
+                        span.set_attribute(key, value)
 
             span.set_status(Status(StatusCode.OK))
             span.end()
@@ -904,13 +704,21 @@ async def async_responses_stream_wrapper(tracer, wrapped, instance, args, kwargs
     current_context = context_api.get_current()
     token = context_api.attach(set_span_in_context(span, current_context))
 
+    # Non-streaming responses can be turned into attributes on the export thread instead
+    deferred = not is_streaming and deferred_extraction_enabled()
+
     try:
         # Extract and set request attributes
         from agentops.instrumentation.providers.openai.wrappers.responses import handle_responses_attributes
 
-        request_attributes = handle_responses_attributes(kwargs=kwargs)
-        for key, value in request_attributes.items():
-            span.set_attribute(key, value)
+        if deferred:
+            request_kwargs = snapshot_kwargs(kwargs)
+            request_attributes = {}
+        else:
+            request_kwargs = kwargs
+            request_attributes = handle_responses_attributes(kwargs=kwargs)
+            for key, value in request_attributes.items():
+                span.set_attribute(key, value)
 
         # Call the original method
         response = await wrapped(*args, **kwargs)
@@ -922,10 +730,15 @@ async def async_responses_stream_wrapper(tracer, wrapped, instance, args, kwargs
             return ResponsesAPIStreamWrapper(response, span, kwargs)
         else:
             # For non-streaming, handle response attributes and close span
-            response_attributes = handle_responses_attributes(kwargs=kwargs, return_value=response)
-            for key, value in response_attributes.items():
-                if key not in request_attributes:  # Avoid overwriting request attributes
-                    span.set_attribute(key, value)
+            if deferred:
+                defer_attributes(
+                    span, lambda: handle_responses_attributes(kwargs=request_kwargs, return_value=response)
+                )
+            else:
+                response_attributes = handle_responses_attributes(kwargs=request_kwargs, return_value=response)
+                for key, value in response_attributes.items():
+                    if key not in request_attributes:  # Avoid overwriting request attributes
+                        span.set_attribute(key, value)
 
             span.set_status(Status(StatusCode.OK))
             span.end()
@@ -28,13 +28,14 @@ logger = logging.getLogger(__name__)
 LLM_REQUEST_TYPE = LLMRequestTypeValues.CHAT
 
 
-def _create_tool_span(parent_span, tool_call_data):
+def _create_tool_span(parent_span, tool_call_data, arguments_omitted: int = 0):
     """
     Create a distinct span for each tool call.
 
     Args:
         parent_span: The parent LLM span
         tool_call_data: The tool call data dictionary
+        arguments_omitted: Characters cut from the end of the arguments of a streamed tool call
     """
     # Get the tracer for this module
     tracer = get_tracer(__name__)
@@ -51,6 +52,8 @@ def _create_tool_span(parent_span, tool_call_data):
         # Set tool-specific attributes
         tool_span.set_attribute(ToolAttributes.TOOL_NAME, tool_call_data["function"]["name"])
         tool_span.set_attribute(ToolAttributes.TOOL_PARAMETERS, tool_call_data["function"]["arguments"])
+        if arguments_omitted:
+            tool_span.set_attribute(SpanAttributes.LLM_STREAMING_TOOL_ARGUMENTS_OMITTED, arguments_omitted)
         tool_span.set_attribute("tool.call.id", tool_call_data["id"])
         tool_span.set_attribute("tool.call.type", tool_call_data["type"])
 
@@ -58,6 +61,17 @@ def _create_tool_span(parent_span, tool_call_data):
         tool_span.set_status(Status(StatusCode.OK))
 
 
+def _has_tool_calls(response: Any) -> bool:
+    """Check whether a chat completion requested tool calls, without converting the response to a dict."""
+    choices = response.get("choices") if isinstance(response, dict) else getattr(response, "choices", None)
+    for choice in choices or ():
+        message = choice.get("message") if isinstance(choice, dict) else getattr(choice, "message", None)
+        tool_calls = message.get("tool_calls") if isinstance(message, dict) else getattr(message, "tool_calls", None)
+        if tool_calls:
+            return True
+    return False
+
+
 def handle_chat_attributes(
     args: Optional[Tuple] = None,
     kwargs: Optional[Dict] = None,
@@ -1,4 +1,20 @@
 from agentops.logging.config import configure_logging, logger
-from agentops.logging.instrument_logging import setup_print_logger, upload_logfile
+from agentops.logging.instrument_logging import (
+    defer_log_uploads,
+    discard_logfile,
+    flush_logs,
+    setup_print_logger,
+    shutdown_print_logger,
+    upload_logfile,
+)
 
-__all__ = ["logger", "configure_logging", "setup_print_logger", "upload_logfile"]
+__all__ = [
+    "logger",
+    "configure_logging",
+    "setup_print_logger",
+    "upload_logfile",
+    "discard_logfile",
+    "defer_log_uploads",
+    "flush_logs",
+    "shutdown_print_logger",
+]
@@ -1,35 +1,361 @@
 import builtins
 import logging
-import atexit
-from typing import Any
-from io import StringIO
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from opentelemetry import trace
 
 _original_print = builtins.print
 
-# Global buffer to store logs
-_log_buffer = StringIO()
+# Captured output that was written outside of any trace, attached to the next trace upload
+_UNTRACED = 0
+
+# Upper bound on traces with captured output awaiting upload
+_MAX_TRACE_BUFFERS = 256
+
+# Chunk uploads waiting for the uploader thread before new chunks are dropped
+_MAX_PENDING_CHUNKS = 16
 
 print_logger = None
 
 
-def setup_print_logger() -> None:
+class LogRingBuffer:
+    """
+    Captured log lines for a single trace, oldest first.
+
+    Sizes are tracked in encoded bytes so the owning handler can hold all
+    buffers to a shared byte budget.
+    """
+
+    def __init__(self) -> None:
+        self._lines: Deque[Tuple[str, int]] = deque()
+        self.size = 0
+        self.dropped = 0
+        self.chunks_sent = 0
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def append(self, line: str) -> int:
+        """Add a line and return its size in bytes."""
+        size = len(line.encode("utf-8", "replace"))
+        self._lines.append((line, size))
+        self.size += size
+        return size
+
+    def pop_oldest(self) -> int:
+        """Drop the oldest line and return its size in bytes."""
+        _, size = self._lines.popleft()
+        self.size -= size
+        self.dropped += 1
+        return size
+
+    def drain(self) -> str:
+        """Remove and return the buffered lines as one string."""
+        content = "".join(line for line, _ in self._lines)
+        self._lines.clear()
+        self.size = 0
+        return content
+
+
+class _LogUploader:
+    """Uploads log chunks from a daemon thread so capturing output never waits on the network."""
+
+    def __init__(self, max_pending: int = _MAX_PENDING_CHUNKS) -> None:
+        self._queue: "queue.Queue[Tuple[str, int, int, bool]]" = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.dropped_chunks = 0
+
+    def submit(self, content: str, trace_id: int, chunk_index: int, compress: bool) -> bool:
+        """
+        Queue a chunk for upload.
+
+        Returns:
+            False if the queue was full and the chunk was dropped
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((content, trace_id, chunk_index, compress))
+            return True
+        except queue.Full:
+            self.dropped_chunks += 1
+            return False
+
+    def flush(self, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for queued chunks to be uploaded."""
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="agentops-log-uploader", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        from agentops.logging.config import logger
+
+        while True:
+            content, trace_id, chunk_index, compress = self._queue.get()
+            try:
+                _send(content, trace_id, chunk_index, compress)
+            except Exception as e:
+                logger.debug(f"Failed to upload log chunk {chunk_index} for trace {trace_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+
+class TraceLogHandler(logging.Handler):
+    """
+    Logging handler that buffers records per trace under a shared byte budget.
+
+    Records are keyed by the trace of the span that is current when they are
+    emitted, so concurrent traces never mix their output. Once a trace has
+    buffered `chunk_bytes` of output it is handed to a background uploader,
+    keeping memory flat for long-running traces. When the budget is exhausted
+    the `drop_oldest` policy evicts the oldest buffered lines, while `sample`
+    never evicts: a line that does not fit is rejected, and from then on only
+    every `sample_every`-th new line is admitted, if it fits, until uploads
+    bring the buffered output back under half the budget.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 4 * 1024 * 1024,
+        policy: str = "drop_oldest",
+        chunk_bytes: int = 1024 * 1024,
+        compress: bool = False,
+        sample_every: int = 10,
+    ) -> None:
+        super().__init__(level=logging.DEBUG)
+        self._buffers: "OrderedDict[int, LogRingBuffer]" = OrderedDict()
+        self._total_bytes = 0
+        self._sample_counter = 0
+        self._sampling = False
+        self._uploader = _LogUploader()
+        self.configure(max_bytes, policy, chunk_bytes, compress, sample_every)
+
+        from agentops.helpers.fork import register_after_fork
+
+        register_after_fork(self._reset_after_fork)
+
+    def _reset_after_fork(self) -> None:
+        # Output buffered in the parent is uploaded by the parent; the uploader thread did not survive the fork
+        self._buffers = OrderedDict()
+        self._total_bytes = 0
+        self._sampling = False
+        self._uploader = _LogUploader()
+
+    def configure(
+        self,
+        max_bytes: int = 4 * 1024 * 1024,
+        policy: str = "drop_oldest",
+        chunk_bytes: int = 1024 * 1024,
+        compress: bool = False,
+        sample_every: int = 10,
+    ) -> None:
+        """Update the buffer limits and upload settings. An unknown policy falls back to `drop_oldest`."""
+        if policy not in ("drop_oldest", "sample"):
+            from agentops.logging.config import logger
+
+            logger.warning(f"Unknown log buffer policy {policy!r}; using 'drop_oldest'")
+            policy = "drop_oldest"
+        self.max_bytes = max(max_bytes, 0)
+        self.policy = policy
+        self.chunk_bytes = max(chunk_bytes, 0)
+        self.compress = compress
+        self.sample_every = max(sample_every, 1)
+
+    @property
+    def total_bytes(self) -> int:
+        """Bytes currently buffered across all traces."""
+        return self._total_bytes
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            line = self.format(record) + "\n"
+        except Exception:
+            self.handleError(record)
+            return
+
+        span_context = trace.get_current_span().get_span_context()
+        trace_id = span_context.trace_id if span_context.is_valid else _UNTRACED
+
+        chunk = None
+        with self.lock:
+            buffer = self._buffer_for(trace_id)
+            if self.policy == "sample":
+                if not self._admit_sampled(len(line.encode("utf-8", "replace"))):
+                    buffer.dropped += 1
+                    return
+                self._total_bytes += buffer.append(line)
+            else:
+                self._total_bytes += buffer.append(line)
+                self._enforce_budget()
+
+            if self.chunk_bytes and trace_id != _UNTRACED and buffer.size >= self.chunk_bytes:
+                chunk = self._take_chunk(buffer)
+
+        if chunk is not None:
+            content, chunk_index = chunk
+            if not self._uploader.submit(content, trace_id, chunk_index, self.compress):
+                with self.lock:
+                    self._buffer_for(trace_id).dropped += content.count("\n")
+
+    def _buffer_for(self, trace_id: int) -> LogRingBuffer:
+        buffer = self._buffers.get(trace_id)
+        if buffer is None:
+            while len(self._buffers) >= _MAX_TRACE_BUFFERS:
+                # Traces that never end (or end without a root span) must not pin memory
+                _, evicted = self._buffers.popitem(last=False)
+                self._total_bytes -= evicted.size
+            buffer = self._buffers[trace_id] = LogRingBuffer()
+        else:
+            self._buffers.move_to_end(trace_id)
+        return buffer
+
+    def _admit_sampled(self, size: int) -> bool:
+        """Whether the `sample` policy admits a line of `size` bytes, keeping everything already buffered."""
+        if self._sampling and self._total_bytes <= self.max_bytes // 2:
+            self._sampling = False
+        if self._sampling:
+            self._sample_counter += 1
+            if self._sample_counter % self.sample_every:
+                return False
+        if self._total_bytes + size > self.max_bytes:
+            self._sampling = True
+            return False
+        return True
+
+    def _enforce_budget(self) -> None:
+        """Evict the oldest lines, least recently written traces first, until within budget."""
+        while self._total_bytes > self.max_bytes:
+            for buffer in self._buffers.values():
+                if len(buffer):
+                    self._total_bytes -= buffer.pop_oldest()
+                    break
+            else:
+                self._total_bytes = 0
+                return
+
+    def _take_chunk(self, buffer: LogRingBuffer) -> Tuple[str, int]:
+        self._total_bytes -= buffer.size
+        content = _with_drop_marker(buffer.drain(), buffer.dropped)
+        buffer.dropped = 0
+        chunk_index = buffer.chunks_sent
+        buffer.chunks_sent += 1
+        return content, chunk_index
+
+    def take(self, trace_id: int) -> Tuple[str, Optional[int]]:
+        """
+        Remove everything buffered for a trace, along with untraced output.
+
+        Returns:
+            The content and its chunk index, which is None if no earlier chunks
+            of this trace were uploaded
+        """
+        with self.lock:
+            buffer = self._buffers.pop(trace_id, None)
+            untraced = self._buffers.pop(_UNTRACED, None)
+
+            parts = []
+            dropped = 0
+            for part in (untraced, buffer):
+                if part is not None:
+                    self._total_bytes -= part.size
+                    dropped += part.dropped
+                    parts.append(part.drain())
+
+            content = _with_drop_marker("".join(parts), dropped)
+            chunk_index = buffer.chunks_sent if buffer is not None and buffer.chunks_sent else None
+            return content, chunk_index
+
+    def discard(self, trace_id: int) -> None:
+        """Discard what is buffered for a trace, keeping untraced output for the next upload."""
+        with self.lock:
+            buffer = self._buffers.pop(trace_id, None)
+            if buffer is not None:
+                self._total_bytes -= buffer.size
+
+    def clear(self) -> None:
+        """Discard all buffered output."""
+        with self.lock:
+            self._buffers.clear()
+            self._total_bytes = 0
+
+    def flush_uploads(self, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for chunks handed to the uploader to be sent."""
+        return self._uploader.flush(timeout)
+
+
+def _with_drop_marker(content: str, dropped: int) -> str:
+    if not dropped:
+        return content
+    return f"[agentops] {dropped} log lines dropped to stay within the log buffer limit\n{content}"
+
+
+def _send(content: str, trace_id: int, chunk_index: Optional[int], compress: bool) -> None:
+    from agentops import get_client
+
+    client = get_client()
+    kwargs: Dict[str, Any] = {}
+    if chunk_index is not None:
+        kwargs["chunk_index"] = chunk_index
+    if compress:
+        kwargs["compress"] = True
+    client.api.v4.upload_logfile(content, trace_id, **kwargs)
+
+
+# Global handler holding captured output until its trace ends
+_log_handler: Optional[TraceLogHandler] = None
+
+# Final uploads of traces ended during shutdown, sent by flush_logs instead of one by one as traces end
+_deferred_uploads: Optional[List[Tuple[str, int, Optional[int], bool]]] = None
+
+
+def setup_print_logger(
+    max_bytes: int = 4 * 1024 * 1024,
+    policy: str = "drop_oldest",
+    chunk_bytes: int = 1024 * 1024,
+    compress: bool = False,
+) -> None:
     """
     Instruments the built-in print function and configures logging to use a memory buffer.
     Preserves existing logging configuration and console output behavior.
+
+    Args:
+        max_bytes: Byte budget shared by all buffered traces
+        policy: What to drop once the budget is reached, 'drop_oldest' or 'sample'
+        chunk_bytes: Upload a trace's output in chunks of this size while it runs (0 to disable)
+        compress: Whether to gzip uploads
     """
+    global _log_handler
+
     buffer_logger = logging.getLogger("agentops_buffer_logger")
     buffer_logger.setLevel(logging.DEBUG)
 
     # Check if the logger already has handlers to prevent duplicates
     if not buffer_logger.handlers:
-        # Create a StreamHandler that writes to our StringIO buffer
-        buffer_handler = logging.StreamHandler(_log_buffer)
-        buffer_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
-        buffer_handler.setLevel(logging.DEBUG)
-        buffer_logger.addHandler(buffer_handler)
+        _log_handler = TraceLogHandler(max_bytes=max_bytes, policy=policy, chunk_bytes=chunk_bytes, compress=compress)
+        _log_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+        buffer_logger.addHandler(_log_handler)
 
         # Ensure the new logger doesn't propagate to root
         buffer_logger.propagate = False
+    elif _log_handler is not None:
+        _log_handler.configure(max_bytes=max_bytes, policy=policy, chunk_bytes=chunk_bytes, compress=compress)
 
     global print_logger
 
@@ -51,45 +377,91 @@ def setup_print_logger() -> None:
     if builtins.print is _original_print:
         builtins.print = print_logger
 
-    def cleanup():
-        """
-        Cleanup function to be called when the process exits.
-        Restores the original print function and clears the buffer.
-        """
-        try:
-            # Remove our buffer handler
-            for handler in buffer_logger.handlers[:]:
-                handler.close()
-                buffer_logger.removeHandler(handler)
 
-            # Clear the buffer
-            _log_buffer.seek(0)
-            _log_buffer.truncate()
+def upload_logfile(trace_id: int) -> None:
+    """
+    Upload the log content captured for a trace to the API.
 
-            # Restore the original print function
-            builtins.print = _original_print
-        except Exception as e:
-            # If something goes wrong during cleanup, just print the error
-            _original_print(f"Error during cleanup: {e}")
+    Output written outside of any trace is included with it. If parts of the
+    trace were already uploaded as chunks, this is sent as the final chunk.
+    """
+    if _log_handler is None:
+        return
 
-    # Register the cleanup function to run when the process exits
-    atexit.register(cleanup)
+    log_content, chunk_index = _log_handler.take(trace_id)
+    if not log_content:
+        return
+
+    if _deferred_uploads is not None:
+        _deferred_uploads.append((log_content, trace_id, chunk_index, _log_handler.compress))
+        return
+    _send(log_content, trace_id, chunk_index, _log_handler.compress)
 
 
-def upload_logfile(trace_id: int) -> None:
+def discard_logfile(trace_id: int) -> None:
+    """Drop the log content captured for a trace without uploading it."""
+    if _log_handler is not None:
+        _log_handler.discard(trace_id)
+
+
+def defer_log_uploads() -> None:
     """
-    Upload the log content from the memory buffer to the API.
+    Hold back the uploads of traces that end from now on until `flush_logs`.
+
+    Called at shutdown, so ending many traces at once does not wait on one
+    upload per trace before anything else is flushed.
     """
-    from agentops import get_client
+    global _deferred_uploads
+    if _deferred_uploads is None:
+        _deferred_uploads = []
 
-    # Get the content from the buffer
-    log_content = _log_buffer.getvalue()
-    if not log_content:
-        return
 
-    client = get_client()
-    client.api.v4.upload_logfile(log_content, trace_id)
+def flush_logs(timeout_millis: int) -> bool:
+    """
+    Upload deferred and queued log output, giving up at the deadline.
+
+    Args:
+        timeout_millis: Deadline for all uploads
+
+    Returns:
+        True if everything was uploaded within the deadline
+    """
+    global _deferred_uploads
+    deadline = time.monotonic() + timeout_millis / 1000
+    pending, _deferred_uploads = _deferred_uploads or [], None
+
+    for content, trace_id, chunk_index, compress in pending:
+        if time.monotonic() >= deadline:
+            return False
+        try:
+            _send(content, trace_id, chunk_index, compress)
+        except Exception as e:
+            from agentops.logging.config import logger
+
+            logger.debug(f"Failed to upload log output for trace {trace_id}: {e}")
+
+    if _log_handler is None:
+        return True
+    return _log_handler.flush_uploads(max(deadline - time.monotonic(), 0))
+
+
+def shutdown_print_logger() -> None:
+    """
+    Stop capturing output: restores the original print function and discards anything still buffered.
+    """
+    global _log_handler, _deferred_uploads
+    try:
+        buffer_logger = logging.getLogger("agentops_buffer_logger")
+        for handler in buffer_logger.handlers[:]:
+            handler.close()
+            buffer_logger.removeHandler(handler)
+
+        if _log_handler is not None:
+            _log_handler.clear()
+            _log_handler = None
+        _deferred_uploads = None
 
-    # Clear the buffer after upload
-    _log_buffer.seek(0)
-    _log_buffer.truncate()
+        builtins.print = _original_print
+    except Exception as e:
+        # If something goes wrong during cleanup, just print the error
+        _original_print(f"Error during cleanup: {e}")
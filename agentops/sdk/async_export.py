@@ -0,0 +1,351 @@
+"""
+asyncio-native span export for AgentOps SDK.
+
+This module contains an OTLP span exporter and a batching span processor that
+export on an event loop through HttpClient's pooled aiohttp session, instead of
+the blocking `requests`-based exporter running on its own thread.
+"""
+
+import asyncio
+import gzip
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional, Sequence, Set
+
+import aiohttp
+from opentelemetry.context import Context
+from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from agentops.client.http.http_client import HttpClient
+from agentops.helpers.fork import register_after_fork
+from agentops.logging import logger
+from agentops.sdk.stats import PipelineStats
+
+
+class AsyncOTLPSpanExporter(SpanExporter):
+    """
+    OTLP/HTTP protobuf span exporter built on HttpClient's aiohttp session.
+
+    `export_async` must be awaited on an event loop; the synchronous `export`
+    runs it on HttpClient's shared background loop so the exporter can also be
+    used with the stock BatchSpanProcessor.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        jwt_provider: Optional[Callable[[], Optional[str]]] = None,
+        timeout: float = 10,
+        compress: bool = True,
+        stats: Optional[PipelineStats] = None,
+    ):
+        """
+        Initialize the async exporter.
+
+        Args:
+            endpoint: The OTLP traces endpoint URL
+            jwt_provider: Function returning the current JWT token (optional)
+            timeout: Request timeout in seconds
+            compress: Whether to gzip request bodies
+            stats: Pipeline stats to record export results, latency and payload sizes in (optional)
+        """
+        self._endpoint = endpoint
+        self._stats = stats
+        self._jwt_provider = jwt_provider
+        self._timeout = timeout
+        self._compress = compress
+        self._last_auth_failure = 0.0
+        self._failed_jwt: Optional[str] = None
+        self._auth_failure_threshold = 60  # Don't retry auth failures more than once per minute
+        self._shutdown = False
+
+    def _get_current_jwt(self) -> Optional[str]:
+        if not self._jwt_provider:
+            return None
+        try:
+            return self._jwt_provider()
+        except Exception as e:
+            logger.warning(f"Failed to get JWT token: {e}")
+            return None
+
+    def _prepare_headers(self, token: Optional[str]) -> dict:
+        headers = {"Content-Type": "application/x-protobuf"}
+        if self._compress:
+            headers["Content-Encoding"] = "gzip"
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        return headers
+
+    def _in_auth_backoff(self, token: Optional[str]) -> bool:
+        """Whether the last auth failure is recent and the token has not been refreshed since."""
+        if not self._last_auth_failure or time.time() - self._last_auth_failure >= self._auth_failure_threshold:
+            return False
+        return self._failed_jwt is None or token == self._failed_jwt
+
+    async def export_async(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        """
+        Export spans on the running event loop.
+
+        Args:
+            spans: The spans to export
+
+        Returns:
+            The export result
+        """
+        if self._stats is None:
+            return await self._export_spans(spans)
+
+        start = time.perf_counter()
+        result = await self._export_spans(spans)
+        self._stats.record_export(len(spans), (time.perf_counter() - start) * 1e3, result == SpanExportResult.SUCCESS)
+        return result
+
+    async def _export_spans(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        if self._shutdown:
+            return SpanExportResult.FAILURE
+
+        token = self._get_current_jwt()
+        if self._in_auth_backoff(token):
+            logger.debug("Skipping export due to recent authentication failure")
+            return SpanExportResult.FAILURE
+
+        try:
+            body = encode_spans(spans).SerializePartialToString()
+            if self._compress:
+                body = gzip.compress(body)
+            if self._stats is not None:
+                self._stats.record_payload(len(body))
+
+            session = await HttpClient.get_async_session()
+            if session is None:
+                return SpanExportResult.FAILURE
+
+            async with session.post(
+                self._endpoint,
+                data=body,
+                headers=self._prepare_headers(token),
+                timeout=aiohttp.ClientTimeout(total=self._timeout),
+            ) as response:
+                if response.status in (401, 403):
+                    self._last_auth_failure = time.time()
+                    self._failed_jwt = token
+                    logger.warning(
+                        f"Authentication failed during span export. Will retry in {self._auth_failure_threshold} seconds."
+                    )
+                    return SpanExportResult.FAILURE
+                if response.status >= 400:
+                    logger.error(f"Failed to export span batch, status: {response.status}")
+                    return SpanExportResult.FAILURE
+
+            self._last_auth_failure = 0.0
+            return SpanExportResult.SUCCESS
+
+        except Exception as e:
+            logger.error(f"Error during async span export: {e}")
+            return SpanExportResult.FAILURE
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        """Export spans synchronously by running `export_async` on the shared background loop."""
+        future = asyncio.run_coroutine_threadsafe(self.export_async(spans), HttpClient.get_background_loop())
+        try:
+            return future.result(timeout=self._timeout * 2)
+        except Exception as e:
+            logger.error(f"Error waiting for async span export: {e}")
+            return SpanExportResult.FAILURE
+
+    def shutdown(self) -> None:
+        """Shutdown the exporter."""
+        self._shutdown = True
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        """Nothing is buffered in this exporter."""
+        return True
+
+
+class AsyncBatchSpanProcessor(SpanProcessor):
+    """
+    Batching span processor that exports on an asyncio event loop.
+
+    Ended spans are queued from any thread. A coroutine on `loop` groups them
+    into batches and keeps up to `max_in_flight` export requests pipelined at
+    once. By default the loop is HttpClient's shared background loop; pass the
+    application's loop to export on it instead.
+    """
+
+    def __init__(
+        self,
+        exporter: AsyncOTLPSpanExporter,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        max_queue_size: int = 2048,
+        max_export_batch_size: int = 512,
+        schedule_delay_millis: float = 1000,
+        max_in_flight: int = 4,
+        stats: Optional[PipelineStats] = None,
+    ):
+        """
+        Initialize the processor.
+
+        Args:
+            exporter: The async exporter to send batches with
+            loop: Event loop to export on. Defaults to HttpClient's background loop.
+            max_queue_size: Maximum number of spans held before new spans are dropped
+            max_export_batch_size: Maximum number of spans per export request
+            schedule_delay_millis: Delay between scheduled exports
+            max_in_flight: Maximum number of concurrent export requests
+            stats: Pipeline stats to record enqueued and dropped spans in (optional)
+        """
+        self._exporter = exporter
+        self._uses_background_loop = loop is None
+        self._loop = loop or HttpClient.get_background_loop()
+        self._max_queue_size = max_queue_size
+        self._max_export_batch_size = max_export_batch_size
+        self._schedule_delay = schedule_delay_millis / 1e3
+        self._max_in_flight = max_in_flight
+
+        self._queue: Deque[ReadableSpan] = deque()
+        self._queue_lock = threading.Lock()
+        self._dropped = 0
+        self._done = False
+        self._stats = stats
+        if stats is not None:
+            stats.track_queue(lambda: len(self._queue))
+
+        # Created on the loop by _run so they bind to it
+        self._wakeup: Optional[asyncio.Event] = None
+        self._in_flight: Set["asyncio.Task[SpanExportResult]"] = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._started = threading.Event()
+        self._runner = asyncio.run_coroutine_threadsafe(self._run(), self._loop)
+
+        register_after_fork(self._at_fork_reinit)
+
+    def _at_fork_reinit(self) -> None:
+        """
+        Restart the export coroutine in a forked child.
+
+        Spans queued in the parent are left to the parent. When exporting on
+        HttpClient's background loop, the child's own loop is used, since the
+        parent's loop thread did not survive the fork.
+        """
+        self._queue.clear()
+        self._queue_lock = threading.Lock()
+        self._in_flight = set()
+        self._wakeup = None
+        self._slots = None
+        self._started = threading.Event()
+        if self._uses_background_loop:
+            self._loop = HttpClient.get_background_loop()
+        if not self._done:
+            self._runner = asyncio.run_coroutine_threadsafe(self._run(), self._loop)
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+        pass
+
+    def on_end(self, span: ReadableSpan) -> None:
+        """Queue an ended span for export."""
+        if self._done or not span.context or not span.context.trace_flags.sampled:
+            return
+
+        with self._queue_lock:
+            if len(self._queue) >= self._max_queue_size:
+                self._dropped += 1
+                if self._dropped == 1:
+                    logger.warning("Async span queue is full, dropping spans")
+                if self._stats is not None:
+                    self._stats.record_dropped()
+                return
+            self._queue.append(span)
+            queue_depth = len(self._queue)
+            batch_ready = queue_depth >= self._max_export_batch_size
+
+        if self._stats is not None:
+            self._stats.record_enqueued(queue_depth)
+
+        if batch_ready:
+            self._notify()
+
+    def _notify(self) -> None:
+        if self._wakeup is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _take_batch(self) -> List[ReadableSpan]:
+        with self._queue_lock:
+            count = min(len(self._queue), self._max_export_batch_size)
+            return [self._queue.popleft() for _ in range(count)]
+
+    async def _export_batch(self, batch: List[ReadableSpan]) -> SpanExportResult:
+        assert self._slots is not None
+        try:
+            return await self._exporter.export_async(batch)
+        finally:
+            self._slots.release()
+
+    async def _dispatch(self) -> None:
+        """Start export tasks for everything queued, pipelining up to max_in_flight requests."""
+        assert self._slots is not None
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            await self._slots.acquire()
+            task = self._loop.create_task(self._export_batch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _run(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(self._max_in_flight)
+        self._started.set()
+        while not self._done:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._schedule_delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._dispatch()
+
+    async def _flush(self) -> None:
+        await self._dispatch()
+        if self._in_flight:
+            await asyncio.gather(*list(self._in_flight), return_exceptions=True)
+
+    def _on_loop_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        """
+        Export everything queued and wait for in-flight requests.
+
+        When called from the processor's own loop the flush is scheduled without
+        waiting, since blocking would deadlock the loop.
+        """
+        if self._loop.is_closed():
+            return False
+        if self._on_loop_thread():
+            # The export coroutine was scheduled first, so it is running by the time the flush is
+            asyncio.run_coroutine_threadsafe(self._flush(), self._loop)
+            return True
+        deadline = time.monotonic() + timeout_millis / 1e3
+        self._started.wait(timeout_millis / 1e3)
+        future = asyncio.run_coroutine_threadsafe(self._flush(), self._loop)
+        try:
+            future.result(timeout=max(deadline - time.monotonic(), 0))
+            return True
+        except Exception as e:
+            logger.warning(f"Async span flush did not complete: {e}")
+            return False
+
+    def shutdown(self) -> None:
+        """Flush remaining spans and stop the export coroutine."""
+        if self._done:
+            return
+        self.force_flush()
+        self._done = True
+        self._notify()
+        self._exporter.shutdown()
@@ -6,14 +6,12 @@ isolating the knowledge of semantic conventions from the core tracing logic.
 """
 
 import platform
-import os
 from typing import Any, Optional, Union
 
-import psutil  #  type: ignore[import-untyped]
-
 from agentops.logging import logger
 from agentops.semconv import ResourceAttributes, SpanAttributes, CoreAttributes
 from agentops.helpers.system import get_imported_libraries
+from agentops.sdk.system_metrics import collect_system_metrics, get_system_metrics_snapshot
 
 
 def get_system_resource_attributes() -> dict[str, Any]:
@@ -33,22 +31,10 @@ def get_system_resource_attributes() -> dict[str, Any]:
         ResourceAttributes.HOST_OS_RELEASE: platform.release(),
     }
 
-    # Add CPU stats
-    try:
-        attributes[ResourceAttributes.CPU_COUNT] = os.cpu_count() or 0
-        attributes[ResourceAttributes.CPU_PERCENT] = psutil.cpu_percent(interval=0.1)
-    except Exception as e:
-        logger.debug(f"Error getting CPU stats: {e}")
-
-    # Add memory stats
-    try:
-        memory = psutil.virtual_memory()
-        attributes[ResourceAttributes.MEMORY_TOTAL] = memory.total
-        attributes[ResourceAttributes.MEMORY_AVAILABLE] = memory.available
-        attributes[ResourceAttributes.MEMORY_USED] = memory.used
-        attributes[ResourceAttributes.MEMORY_PERCENT] = memory.percent
-    except Exception as e:
-        logger.debug(f"Error getting memory stats: {e}")
+    # Resource usage comes from the background sampler when it is running; otherwise read it
+    # inline, which is non-blocking but reports CPU usage since the previous reading
+    snapshot = get_system_metrics_snapshot()
+    attributes.update(snapshot if snapshot is not None else collect_system_metrics())
 
     return attributes
 
@@ -0,0 +1,406 @@
+"""
+Adaptive batching for span export.
+
+The stock BatchSpanProcessor exports fixed-size batches on a fixed schedule.
+AdaptiveBatchSpanProcessor instead tunes both to the traffic it sees: batch
+size grows while batches keep filling up before the delay expires (bursts),
+cutting the number of requests, and shrinks again when they don't. The flush
+delay drops to a minimum when fewer than one span arrives per flush interval,
+since batching then saves no requests and only delays the dashboard, and is
+stretched when exports are slow so each request carries more spans.
+
+The queue is bounded both in spans and in (estimated) bytes, so a burst of
+large spans cannot grow memory without bound.
+
+With a reorder window, spans are grouped by trace before they are queued: a
+trace's spans are held until its root span ends, or for at most the window,
+and then queued together. Requests then carry whole traces instead of slices
+of hundreds of interleaved ones, and a trace's rows arrive at the backend
+together.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.sdk.trace.export import SpanExporter
+from opentelemetry.util.types import Attributes
+
+from agentops.helpers.fork import register_after_fork
+from agentops.logging import logger
+from agentops.sdk.stats import PipelineStats
+
+# Fixed per-span cost of the OTLP encoding: ids, timestamps, kind, status and field tags
+_SPAN_OVERHEAD_BYTES = 128
+_EVENT_OVERHEAD_BYTES = 32
+_LINK_OVERHEAD_BYTES = 48
+_VALUE_OVERHEAD_BYTES = 8
+
+# Weight of the newest observation in the arrival rate and latency averages
+_EWMA_ALPHA = 0.3
+
+# Traces remembered as released, so their late spans are not held for the full window
+_MAX_RELEASED_TRACES = 10000
+
+
+def _attributes_bytes(attributes: Attributes) -> int:
+    if not attributes:
+        return 0
+    size = 0
+    for key, value in attributes.items():
+        size += len(key) + _VALUE_OVERHEAD_BYTES
+        if isinstance(value, str):
+            size += len(value)
+        elif isinstance(value, (list, tuple)):
+            size += sum(len(item) if isinstance(item, str) else _VALUE_OVERHEAD_BYTES for item in value)
+    return size
+
+
+def estimate_span_bytes(span: ReadableSpan) -> int:
+    """
+    Estimate the encoded OTLP size of a span.
+
+    Counts the name, attributes, events and links without encoding the span,
+    which is precise enough for a memory bound and far cheaper.
+    """
+    size = _SPAN_OVERHEAD_BYTES + len(span.name) + _attributes_bytes(span.attributes)
+    for event in span.events:
+        size += _EVENT_OVERHEAD_BYTES + len(event.name) + _attributes_bytes(event.attributes)
+    for link in span.links:
+        size += _LINK_OVERHEAD_BYTES + _attributes_bytes(link.attributes)
+    return size
+
+
+class AdaptiveBatchSpanProcessor(SpanProcessor):
+    """
+    Batching span processor that adapts batch size and flush delay to the load.
+
+    A batch is exported once the queue holds `batch_size` spans or
+    `max_batch_bytes` bytes, or once its oldest span has waited `delay`
+    seconds. After every export, `batch_size` doubles if the batch filled up
+    and halves if it was less than a quarter full, within
+    [max_export_batch_size / 8, max_export_batch_size]. `delay` is the
+    minimum delay under light traffic, and otherwise the scheduled delay,
+    stretched up to the maximum while exports take longer than half of it.
+
+    With `reorder_window_millis`, spans are held per trace until the trace's
+    root span ends or its first span has waited that long, then queued
+    together, children before the root. Held spans count toward the queue
+    limits and are released by flushes.
+    """
+
+    def __init__(
+        self,
+        span_exporter: SpanExporter,
+        max_queue_size: int = 2048,
+        max_queue_bytes: int = 16 * 1024 * 1024,
+        max_export_batch_size: int = 512,
+        schedule_delay_millis: float = 1000,
+        max_schedule_delay_millis: float = 5000,
+        min_schedule_delay_millis: Optional[float] = None,
+        max_batch_bytes: int = 4 * 1024 * 1024,
+        export_timeout_millis: float = 30000,
+        reorder_window_millis: float = 0,
+        stats: Optional[PipelineStats] = None,
+    ):
+        """
+        Initialize the processor.
+
+        Args:
+            span_exporter: Exporter to send batches with
+            max_queue_size: Maximum number of spans queued before new spans are dropped
+            max_queue_bytes: Maximum estimated size of the queued spans before new spans are dropped
+            max_export_batch_size: Upper bound for the adaptive batch size
+            schedule_delay_millis: Flush delay under normal load
+            max_schedule_delay_millis: Upper bound for the flush delay when exports are slow
+            min_schedule_delay_millis: Flush delay under light load. Defaults to a tenth of `schedule_delay_millis`.
+            max_batch_bytes: Maximum estimated size of one export request
+            export_timeout_millis: Time allowed for the final export at shutdown
+            reorder_window_millis: Longest a span is held back to be queued with the rest of its trace (0 disables)
+            stats: Pipeline stats to record enqueued and dropped spans in (optional)
+        """
+        self._exporter = span_exporter
+        self._max_queue_size = max(max_queue_size, 1)
+        self._max_queue_bytes = max_queue_bytes
+        self._max_batch_size = max(min(max_export_batch_size, self._max_queue_size), 1)
+        self._min_batch_size = max(self._max_batch_size // 8, 1)
+        self._max_batch_bytes = max_batch_bytes
+        self._base_delay = schedule_delay_millis / 1e3
+        self._max_delay = max(max_schedule_delay_millis / 1e3, self._base_delay)
+        if min_schedule_delay_millis is None:
+            self._min_delay = self._base_delay / 10
+        else:
+            self._min_delay = min(min_schedule_delay_millis / 1e3, self._base_delay)
+        self._export_timeout = export_timeout_millis / 1e3
+        self._reorder_window = reorder_window_millis / 1e3
+        self._stats = stats
+
+        self.batch_size = self._min_batch_size
+        self.delay = self._base_delay
+        self._rate: Optional[float] = None  # Spans per second
+        self._latency: Optional[float] = None  # Seconds per export
+        self._done = False
+
+        self._start_worker()
+        register_after_fork(self._at_fork_reinit)
+
+        if stats is not None:
+            stats.track_queue(self._queued_spans)
+            stats.add_source("batching", self.batching_stats)
+
+    def _start_worker(self) -> None:
+        self._condition = threading.Condition(threading.Lock())
+        self._queue: Deque[Tuple[ReadableSpan, int]] = deque()
+        self._queue_bytes = 0
+        self._oldest: Optional[float] = None  # When the oldest queued span arrived
+        self._arrivals = 0
+        # Spans held back per trace, by trace ID in order of first arrival: (first arrival, spans)
+        self._held: "OrderedDict[int, Tuple[float, List[Tuple[ReadableSpan, int]]]]" = OrderedDict()
+        self._held_spans = 0
+        self._held_bytes = 0
+        self._released: "OrderedDict[int, None]" = OrderedDict()
+        self._last_adapted = time.monotonic()
+        self._flush_requests: List[threading.Event] = []
+        self._warned_full = False
+        self._worker = threading.Thread(target=self._run, name="agentops-batch-export", daemon=True)
+        if not self._done:
+            self._worker.start()
+
+    def _at_fork_reinit(self) -> None:
+        # Spans queued in the parent are exported by the parent
+        self._start_worker()
+
+    def batching_stats(self) -> Dict[str, Any]:
+        """Get the current batch size, flush delay and the observations they were derived from."""
+        return {
+            "batch_size": self.batch_size,
+            "delay_ms": self.delay * 1e3,
+            "arrival_rate": self._rate,
+            "export_latency_ms": self._latency * 1e3 if self._latency is not None else None,
+            "queue_bytes": self._queue_bytes + self._held_bytes,
+            "held_traces": len(self._held),
+        }
+
+    def _queued_spans(self) -> int:
+        return len(self._queue) + self._held_spans
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+        pass
+
+    def on_end(self, span: ReadableSpan) -> None:
+        """Queue an ended span, or drop it if the queue is at its span or byte limit."""
+        if self._done or not span.context or not span.context.trace_flags.sampled:
+            return
+
+        size = estimate_span_bytes(span)
+        with self._condition:
+            self._arrivals += 1
+            queued_bytes = self._queue_bytes + self._held_bytes
+            full = self._queued_spans() >= self._max_queue_size or queued_bytes + size > self._max_queue_bytes
+            if not full:
+                if self._reorder_window > 0:
+                    self._hold(span, size)
+                else:
+                    self._enqueue(span, size, time.monotonic())
+                queue_depth = self._queued_spans()
+            warn = full and not self._warned_full
+            if warn:
+                self._warned_full = True
+
+        if warn:
+            logger.warning("Span export queue is full, dropping spans")
+        if self._stats is not None:
+            if full:
+                self._stats.record_dropped()
+            else:
+                self._stats.record_enqueued(queue_depth)
+
+    def _enqueue(self, span: ReadableSpan, size: int, arrived: float) -> None:
+        """Queue a span for export. Caller holds the lock."""
+        self._queue.append((span, size))
+        self._queue_bytes += size
+        if self._oldest is None:
+            # The worker sleeps while the queue is empty; wake it to start the delay
+            self._oldest = arrived
+            self._condition.notify()
+        elif self._batch_ready():
+            self._condition.notify()
+
+    def _hold(self, span: ReadableSpan, size: int) -> None:
+        """Hold a span back with the rest of its trace, or queue the trace if this is its root. Caller holds the lock."""
+        trace_id = span.context.trace_id  # type: ignore[union-attr]
+        now = time.monotonic()
+        if trace_id in self._released:
+            # A late span of a trace whose root was already queued
+            self._enqueue(span, size, now)
+            return
+
+        held = self._held.get(trace_id)
+        if span.parent is None or span.parent.is_remote:
+            if held is not None:
+                del self._held[trace_id]
+                self._held_spans -= len(held[1])
+                for child, child_size in held[1]:
+                    self._held_bytes -= child_size
+                    self._enqueue(child, child_size, held[0])
+            self._enqueue(span, size, now if held is None else held[0])
+            self._mark_released(trace_id)
+            return
+
+        if held is None:
+            if not self._held:
+                # Wake the worker so it starts timing the window
+                self._condition.notify()
+            held = self._held[trace_id] = (now, [])
+        held[1].append((span, size))
+        self._held_spans += 1
+        self._held_bytes += size
+
+    def _mark_released(self, trace_id: int) -> None:
+        self._released[trace_id] = None
+        if len(self._released) > _MAX_RELEASED_TRACES:
+            self._released.popitem(last=False)
+
+    def _release_held(self, expired_only: bool = True) -> None:
+        """Queue held traces, only those whose window has passed unless `expired_only` is False. Caller holds the lock."""
+        deadline = time.monotonic() - self._reorder_window
+        while self._held:
+            trace_id, (first_arrival, spans) = next(iter(self._held.items()))
+            if expired_only and first_arrival > deadline:
+                return
+            del self._held[trace_id]
+            self._held_spans -= len(spans)
+            for span, size in spans:
+                self._held_bytes -= size
+                self._enqueue(span, size, first_arrival)
+            self._mark_released(trace_id)
+
+    def _batch_ready(self) -> bool:
+        return len(self._queue) >= self.batch_size or self._queue_bytes >= self._max_batch_bytes
+
+    def _wait_timeout(self) -> Optional[float]:
+        deadlines = []
+        if self._oldest is not None:
+            deadlines.append(self._oldest + self.delay)
+        if self._held:
+            deadlines.append(next(iter(self._held.values()))[0] + self._reorder_window)
+        if not deadlines:
+            return None
+        return max(min(deadlines) - time.monotonic(), 0.0)
+
+    def _should_wake(self) -> bool:
+        if self._done or self._flush_requests or self._batch_ready():
+            return True
+        return self._oldest is not None and time.monotonic() - self._oldest >= self.delay
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while True:
+                    self._release_held()
+                    if self._should_wake():
+                        break
+                    self._condition.wait(self._wait_timeout())
+                flush_requests, self._flush_requests = self._flush_requests, []
+                done = self._done
+                if flush_requests or done:
+                    self._release_held(expired_only=False)
+                size_triggered = self._batch_ready()
+                queued = len(self._queue)
+
+            if flush_requests or done:
+                # Drain what was queued when the flush was requested, in full-size batches
+                while queued > 0:
+                    exported = self._export_batch(min(queued, self._max_batch_size))
+                    if not exported:
+                        break
+                    queued -= exported
+            else:
+                start = time.monotonic()
+                exported = self._export_batch(self.batch_size)
+                self._adapt(exported, size_triggered, time.monotonic() - start)
+
+            for event in flush_requests:
+                event.set()
+            if done:
+                return
+
+    def _take_batch(self, max_spans: int) -> List[ReadableSpan]:
+        with self._condition:
+            batch: List[ReadableSpan] = []
+            batch_bytes = 0
+            while self._queue and len(batch) < max_spans:
+                span, size = self._queue[0]
+                if batch and batch_bytes + size > self._max_batch_bytes:
+                    break
+                self._queue.popleft()
+                self._queue_bytes -= size
+                batch.append(span)
+                batch_bytes += size
+            self._oldest = time.monotonic() if self._queue else None
+            return batch
+
+    def _export_batch(self, max_spans: int) -> int:
+        batch = self._take_batch(max_spans)
+        if not batch:
+            return 0
+        try:
+            self._exporter.export(batch)
+        except Exception as e:
+            logger.error(f"Exception while exporting spans: {e}")
+        return len(batch)
+
+    def _adapt(self, exported: int, size_triggered: bool, latency: float) -> None:
+        """Update the load estimates and derive the next batch size and delay from them."""
+        now = time.monotonic()
+        with self._condition:
+            arrivals, self._arrivals = self._arrivals, 0
+        rate = arrivals / max(now - self._last_adapted, 1e-3)
+        self._last_adapted = now
+
+        self._rate = rate if self._rate is None else _EWMA_ALPHA * rate + (1 - _EWMA_ALPHA) * self._rate
+        if exported:
+            self._latency = (
+                latency if self._latency is None else _EWMA_ALPHA * latency + (1 - _EWMA_ALPHA) * self._latency
+            )
+
+        if size_triggered:
+            self.batch_size = min(self.batch_size * 2, self._max_batch_size)
+        elif exported < self.batch_size // 4:
+            self.batch_size = max(self.batch_size // 2, self._min_batch_size)
+
+        if self._rate * self._base_delay < 1:
+            # Less than a span per interval: waiting would not save any requests
+            self.delay = self._min_delay
+        else:
+            self.delay = min(max(self._base_delay, 2 * (self._latency or 0.0)), self._max_delay)
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        """Export everything queued, then flush the exporter within the remaining time."""
+        if self._done:
+            return True
+
+        start = time.monotonic()
+        flushed = threading.Event()
+        with self._condition:
+            self._flush_requests.append(flushed)
+            self._condition.notify()
+        if not flushed.wait(timeout_millis / 1e3):
+            logger.warning("Timed out flushing queued spans")
+            return False
+
+        remaining_millis = max(int(timeout_millis - (time.monotonic() - start) * 1e3), 0)
+        return self._exporter.force_flush(remaining_millis)
+
+    def shutdown(self) -> None:
+        """Export everything queued and shut down the exporter."""
+        if self._done:
+            return
+        with self._condition:
+            self._done = True
+            self._condition.notify()
+        self._worker.join(self._export_timeout)
+        self._exporter.shutdown()
@@ -1,23 +1,49 @@
 from __future__ import annotations
 
 import atexit
+import multiprocessing.util
 import threading
-from typing import Optional, Any, Dict, Union, Callable
+import time
+from contextlib import nullcontext
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Any, Dict, List, Union, Callable
 
 from opentelemetry import metrics, trace
-from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
 from opentelemetry.sdk.metrics import MeterProvider
 from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider, Span
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace import TracerProvider, Span, SpanProcessor
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExporter
 from opentelemetry import context as context_api
 
 from agentops.exceptions import AgentOpsClientNotInitializedException
-from agentops.logging import logger, setup_print_logger
-from agentops.sdk.processors import InternalSpanProcessor
+from agentops.helpers.fork import register_after_fork
+from agentops.logging import defer_log_uploads, flush_logs, logger, setup_print_logger, shutdown_print_logger
+from agentops.sdk.batching import AdaptiveBatchSpanProcessor
+from agentops.sdk.processors import (
+    ExporterFlushingBatchSpanProcessor,
+    InstrumentedBatchSpanProcessor,
+    InternalSpanProcessor,
+)
 from agentops.sdk.types import TracingConfig
-from agentops.sdk.exporters import AuthenticatedOTLPExporter
+from agentops.sdk.exporters import AuthenticatedOTLPExporter, AuthenticatedOTLPMetricExporter, ConcurrentSpanExporter
+from agentops.sdk.file_export import FSYNC_POLICIES, FileSpanExporter
+from agentops.sdk.deferred import DeferredAttributesSpanExporter, set_deferred_extraction
+from agentops.sdk.prompt_dedup import PromptDedupSpanExporter
+from agentops.sdk.pipelines import (
+    PipelineRegistry,
+    PipelineRoutingExporter,
+    PipelineRoutingProcessor,
+    current_pipeline,
+    use_pipeline,
+)
+from agentops.sdk.relay import RELAY_SUPPORTED, RelaySpanExporter
+from agentops.sdk.shutdown import ShutdownStep, run_until_deadline
+from agentops.sdk.span_store import SpanStore
+from agentops.sdk.spill import SpillStore
+from agentops.sdk.stats import PipelineStats
+from agentops.sdk.sampling import TailSamplingSpanProcessor, create_head_sampler
+from agentops.sdk.system_metrics import SystemMetricsSampler
 from agentops.sdk.attributes import (
     get_global_resource_attributes,
     get_trace_attributes,
@@ -80,10 +106,39 @@ def setup_telemetry(
     project_id: Optional[str] = None,
     exporter_endpoint: str = "https://otlp.agentops.ai/v1/traces",
     metrics_endpoint: str = "https://otlp.agentops.ai/v1/metrics",
-    max_queue_size: int = 512,
+    max_queue_size: int = 2048,
+    max_export_batch_size: int = 512,
+    max_queue_bytes: int = 16 * 1024 * 1024,
     max_wait_time: int = 5000,
     export_flush_interval: int = 1000,
     jwt_provider: Optional[Callable[[], Optional[str]]] = None,
+    spill_directory: Optional[str] = None,
+    spill_max_bytes: int = 64 * 1024 * 1024,
+    export_workers: int = 1,
+    async_export: bool = False,
+    log_buffer_max_bytes: int = 4 * 1024 * 1024,
+    log_buffer_policy: str = "drop_oldest",
+    log_upload_chunk_bytes: int = 1024 * 1024,
+    log_upload_compression: bool = False,
+    sampling_ratio: float = 1.0,
+    sampling_ratios_by_kind: Optional[Dict[str, float]] = None,
+    tail_sampling: bool = False,
+    tail_sampling_ratio: float = 1.0,
+    tail_sampling_latency_ms: Optional[int] = None,
+    tail_sampling_min_cost: Optional[float] = None,
+    tail_sampling_min_tokens: Optional[int] = None,
+    tail_sampling_max_traces: int = 1000,
+    span_relay_socket: Optional[str] = None,
+    adaptive_batching: bool = False,
+    export_reorder_window: int = 0,
+    file_export_directory: Optional[str] = None,
+    file_export_segment_bytes: int = 64 * 1024 * 1024,
+    file_export_compression: bool = False,
+    file_export_fsync: str = "rotate",
+    prompt_dedup: bool = False,
+    deferred_extraction: bool = False,
+    pipelines: Optional[PipelineRegistry] = None,
+    stats: Optional[PipelineStats] = None,
 ) -> tuple[TracerProvider, MeterProvider]:
     """
     Setup the telemetry system.
@@ -93,10 +148,39 @@ def setup_telemetry(
         project_id: Project ID to include in resource attributes
         exporter_endpoint: Endpoint for the span exporter
         metrics_endpoint: Endpoint for the metrics exporter
-        max_queue_size: Maximum number of spans to queue before forcing a flush
-        max_wait_time: Maximum time in milliseconds to wait before flushing
+        max_queue_size: Maximum number of spans to queue before new spans are dropped
+        max_export_batch_size: Maximum number of spans sent in one export request
+        max_queue_bytes: Maximum estimated size in bytes of the queued spans (adaptive batching only)
+        max_wait_time: Maximum time in milliseconds to wait before flushing (adaptive batching only)
         export_flush_interval: Time interval in milliseconds between automatic exports of telemetry data
         jwt_provider: Function that returns the current JWT token
+        spill_directory: Directory for spilling failed span batches to disk (disabled when None)
+        spill_max_bytes: Size cap for the spill directory
+        export_workers: Number of span batches exported concurrently
+        async_export: Export spans on HttpClient's event loop with the aiohttp-based exporter
+        log_buffer_max_bytes: Byte budget for captured print and log output
+        log_buffer_policy: What to drop once the budget is reached: 'drop_oldest' or 'sample'
+        log_upload_chunk_bytes: Size of incremental per-trace log uploads (0 uploads at trace end only)
+        log_upload_compression: Gzip log uploads
+        sampling_ratio: Fraction of new traces to record
+        sampling_ratios_by_kind: Fraction of new traces to record by the root span's AgentOps span kind
+        tail_sampling: Buffer each trace until its root span ends and export it only if a keep rule matches
+        tail_sampling_ratio: Fraction of traces kept by tail sampling when no keep rule matches
+        tail_sampling_latency_ms: Keep traces running at least this long
+        tail_sampling_min_cost: Keep traces costing at least this much
+        tail_sampling_min_tokens: Keep traces using at least this many tokens
+        tail_sampling_max_traces: Maximum number of traces buffered for tail sampling
+        span_relay_socket: Unix socket through which processes on this host share one exporting process
+        adaptive_batching: Adapt batch size and flush delay to span arrival rate and export latency
+        export_reorder_window: Milliseconds a span may be held back to be batched with the rest of its trace
+        file_export_directory: Record spans to segment files in this directory instead of sending them
+        file_export_segment_bytes: Size at which a span file segment is finished
+        file_export_compression: Gzip span batches written to file
+        file_export_fsync: When span files are synced to disk: 'always', 'rotate' or 'never'
+        prompt_dedup: Export each distinct prompt message body once per trace, referenced by hash afterwards
+        deferred_extraction: Extract LLM span attributes from requests and responses on the export thread
+        pipelines: Registry of per-project pipelines to route traces to (default exporter only)
+        stats: Pipeline stats the processor and exporter record into
 
     Returns:
         Tuple of (TracerProvider, MeterProvider)
@@ -108,37 +192,175 @@ def setup_telemetry(
     )
 
     resource = Resource(resource_attrs)
-    provider = TracerProvider(resource=resource)
+    provider = TracerProvider(resource=resource, sampler=create_head_sampler(sampling_ratio, sampling_ratios_by_kind))
 
     # Set as global provider
     trace.set_tracer_provider(provider)
 
-    # Create exporter with dynamic JWT support
-    exporter = AuthenticatedOTLPExporter(endpoint=exporter_endpoint, jwt_provider=jwt_provider)
+    if span_relay_socket and (async_export or not RELAY_SUPPORTED):
+        logger.warning("Span relay requires Unix sockets and the default exporter; exporting from this process")
+        span_relay_socket = None
 
-    # Regular processor for normal spans and immediate export
-    processor = BatchSpanProcessor(
-        exporter,
-        max_export_batch_size=max_queue_size,
-        schedule_delay_millis=export_flush_interval,
-    )
+    if file_export_directory and async_export:
+        logger.warning("File export uses the threaded exporter; ignoring async_export")
+        async_export = False
+
+    if adaptive_batching and async_export:
+        logger.warning("Adaptive batching is not supported with async export; using fixed batches")
+        adaptive_batching = False
+
+    if export_reorder_window > 0 and not adaptive_batching:
+        logger.warning("export_reorder_window requires adaptive_batching; exporting spans in arrival order")
+
+    if prompt_dedup and async_export:
+        logger.warning("Prompt deduplication is not supported with async export; exporting prompts in full")
+
+    if deferred_extraction and async_export:
+        logger.warning("Deferred attribute extraction is not supported with async export; extracting on the call path")
+        deferred_extraction = False
+
+    if deferred_extraction and tail_sampling and (tail_sampling_min_tokens or tail_sampling_min_cost):
+        logger.warning("Tail sampling token and cost rules do not see attributes whose extraction is deferred")
+    set_deferred_extraction(deferred_extraction)
+
+    # BatchSpanProcessor rejects batches larger than its queue
+    max_export_batch_size = min(max_export_batch_size, max_queue_size)
+
+    processor: SpanProcessor
+    if async_export:
+        # Imported lazily: the HttpClient import chain leads back to this module
+        from agentops.sdk.async_export import AsyncBatchSpanProcessor, AsyncOTLPSpanExporter
+
+        # Export on the shared aiohttp pool, pipelining up to export_workers requests
+        processor = AsyncBatchSpanProcessor(
+            AsyncOTLPSpanExporter(endpoint=exporter_endpoint, jwt_provider=jwt_provider, stats=stats),
+            max_queue_size=max_queue_size,
+            max_export_batch_size=max_export_batch_size,
+            schedule_delay_millis=export_flush_interval,
+            max_in_flight=export_workers,
+            stats=stats,
+        )
+    else:
+        span_exporter: SpanExporter
+        if file_export_directory:
+            if file_export_fsync not in FSYNC_POLICIES:
+                logger.warning(f"Unknown file_export_fsync {file_export_fsync!r}, syncing on rotation")
+                file_export_fsync = "rotate"
+            # Record spans locally, e.g. on air-gapped hosts, for upload later with agentops-replay
+            span_exporter = FileSpanExporter(
+                file_export_directory,
+                segment_max_bytes=file_export_segment_bytes,
+                compression=file_export_compression,
+                fsync=file_export_fsync,
+            )
+        else:
+            # Optional write-ahead store so export outages cost disk instead of data
+            spill_store = None
+            if spill_directory:
+                try:
+                    spill_store = SpillStore(spill_directory, max_bytes=spill_max_bytes)
+                except OSError as e:
+                    logger.warning(f"Could not open span spill directory {spill_directory}: {e}")
+
+            # Create exporter with dynamic JWT support
+            exporter = AuthenticatedOTLPExporter(
+                endpoint=exporter_endpoint,
+                jwt_provider=jwt_provider,
+                spill_store=spill_store,
+                pool_maxsize=export_workers if export_workers > 1 else None,
+                stats=stats,
+            )
+            if stats is not None and spill_store is not None:
+                stats.add_source("spill", exporter.spill_stats)
+
+            span_exporter = exporter
+            if span_relay_socket:
+                # Processes on this host hand their batches to one relay process and share its connections
+                span_exporter = RelaySpanExporter(exporter, span_relay_socket)
+
+            if pipelines is not None:
+                # Send traces started for other projects with their own credentials, from the same worker
+                span_exporter = PipelineRoutingExporter(span_exporter, pipelines)
+                provider.add_span_processor(PipelineRoutingProcessor(pipelines))
+
+        if prompt_dedup:
+            # Send each prompt message body once per trace; multi-turn spans carry hash references
+            dedup_exporter = PromptDedupSpanExporter(span_exporter)
+            if stats is not None:
+                stats.add_source("prompt_dedup", lambda: {"chars_saved": dedup_exporter.chars_saved})
+            span_exporter = dedup_exporter
+
+        # Turn captured requests and responses into attributes here, off the LLM call path. Also runs
+        # work that never belongs on it, such as uploading spilled stream content, so it is always installed
+        deferred_exporter = DeferredAttributesSpanExporter(span_exporter)
+        if stats is not None and deferred_extraction:
+            stats.add_source("deferred_extraction", deferred_exporter.stats)
+        span_exporter = deferred_exporter
+
+        if export_workers > 1:
+            # Export several batches at once over a pooled set of connections
+            span_exporter = ConcurrentSpanExporter(span_exporter, max_workers=export_workers)
+
+        if adaptive_batching:
+            # Grow batches under bursts and cut the flush delay when traffic is light
+            processor = AdaptiveBatchSpanProcessor(
+                span_exporter,
+                max_queue_size=max_queue_size,
+                max_queue_bytes=max_queue_bytes,
+                max_export_batch_size=max_export_batch_size,
+                schedule_delay_millis=export_flush_interval,
+                max_schedule_delay_millis=max_wait_time,
+                reorder_window_millis=export_reorder_window,
+                stats=stats,
+            )
+        elif export_workers > 1:
+            processor = ExporterFlushingBatchSpanProcessor(
+                span_exporter,
+                max_queue_size=max_queue_size,
+                max_export_batch_size=max_export_batch_size,
+                schedule_delay_millis=export_flush_interval,
+                stats=stats,
+            )
+        else:
+            # Regular processor for normal spans and immediate export
+            processor = InstrumentedBatchSpanProcessor(
+                span_exporter,
+                max_queue_size=max_queue_size,
+                max_export_batch_size=max_export_batch_size,
+                schedule_delay_millis=export_flush_interval,
+                stats=stats,
+            )
+
+    if tail_sampling:
+        # Hold each trace back from export until its root span ends
+        processor = TailSamplingSpanProcessor(
+            processor,
+            ratio=tail_sampling_ratio,
+            latency_ms=tail_sampling_latency_ms,
+            min_cost=tail_sampling_min_cost,
+            min_tokens=tail_sampling_min_tokens,
+            max_traces=tail_sampling_max_traces,
+        )
+        if stats is not None:
+            stats.add_source("tail_sampling", processor.stats)
     provider.add_span_processor(processor)
     internal_processor = InternalSpanProcessor()  # Catches spans for AgentOps on-terminal printing
     provider.add_span_processor(internal_processor)
 
-    # Setup metrics with JWT provider
-    def get_metrics_headers():
-        token = jwt_provider() if jwt_provider else None
-        return {"Authorization": f"Bearer {token}"} if token else {}
-
-    metric_exporter = OTLPMetricExporter(endpoint=metrics_endpoint, headers=get_metrics_headers())
+    # Setup metrics with JWT provider, read on every export so token rotation reaches metrics too
+    metric_exporter = AuthenticatedOTLPMetricExporter(endpoint=metrics_endpoint, jwt_provider=jwt_provider)
 
     metric_reader = PeriodicExportingMetricReader(metric_exporter)
     meter_provider = MeterProvider(resource=resource, metric_readers=[metric_reader])
     metrics.set_meter_provider(meter_provider)
 
     ### Logging
-    setup_print_logger()
+    setup_print_logger(
+        max_bytes=log_buffer_max_bytes,
+        policy=log_buffer_policy,
+        chunk_bytes=log_upload_chunk_bytes,
+        compress=log_upload_compression,
+    )
 
     # Initialize root context
     # context_api.get_current() # It's better to manage context explicitly with traces
@@ -166,10 +388,41 @@ class TracingCore:
         self._active_traces: dict = {}
         self._traces_lock = threading.Lock()
         self._jwt_provider: Optional[Callable[[], Optional[str]]] = None
-
-        # Register shutdown handler
+        self._flush_executor: Optional[ThreadPoolExecutor] = None
+        self._flush_executor_lock = threading.Lock()
+        self._system_metrics: Optional[SystemMetricsSampler] = None
+        self._tracers: Dict[str, tuple] = {}  # name -> (provider, tracer)
+        self._stats: Optional[PipelineStats] = None
+        self._span_store: Optional[SpanStore] = None
+        self._pipelines: Optional[PipelineRegistry] = None
+        self._inherited_traces: set = set()  # Traces started before this process was forked
+        self._shutdown_hooks: List[Callable[[], None]] = []
+
+        # The one exit handler for all telemetry; other components hook in with add_shutdown_hook
         atexit.register(self.shutdown)
 
+        # Exporter threads are restarted by their owners; this resets the trace registry
+        register_after_fork(self._at_fork_reinit)
+        # multiprocessing children exit with os._exit, skipping atexit, so flush on its exit hook instead
+        multiprocessing.util.register_after_fork(self, TracingCore._shutdown_at_worker_exit)
+
+    def _at_fork_reinit(self) -> None:
+        """
+        Reset per-process state in a forked child.
+
+        Traces that were active in the parent stay the parent's to end. The
+        child remembers them only so it never ends and exports them a second time.
+        A child that forks again keeps those of its own ancestors as well.
+        """
+        self._traces_lock = threading.Lock()
+        self._inherited_traces |= set(self._active_traces)
+        self._active_traces = {}
+        self._flush_executor_lock = threading.Lock()
+        self._flush_executor = None
+
+    def _shutdown_at_worker_exit(self) -> None:
+        multiprocessing.util.Finalize(self, self.shutdown, exitpriority=10)
+
     def initialize(self, jwt_provider: Optional[Callable[[], Optional[str]]] = None, **kwargs: Any) -> None:
         """
         Initialize the tracing core with the given configuration.
@@ -181,10 +434,43 @@ class TracingCore:
                 exporter: Custom span exporter
                 processor: Custom span processor
                 exporter_endpoint: Endpoint for the span exporter
-                max_queue_size: Maximum number of spans to queue before forcing a flush
+                max_queue_size: Maximum number of spans to queue before new spans are dropped
+                max_export_batch_size: Maximum number of spans sent in one export request
+                max_queue_bytes: Maximum estimated size in bytes of spans queued for export, enforced with adaptive batching
                 max_wait_time: Maximum time in milliseconds to wait before flushing
                 api_key: API key for authentication (required for authenticated exporter)
                 project_id: Project ID to include in resource attributes
+                flush_on_trace_end: Whether ending a trace blocks until its spans are exported
+                shutdown_flush_timeout: Deadline in milliseconds for flushing spans, metrics and logs at shutdown
+                spill_directory: Directory for spilling failed span batches to disk
+                spill_max_bytes: Size cap for the spill directory
+                export_workers: Number of span batches exported concurrently
+                async_export: Export spans with the asyncio exporter over the shared aiohttp session
+                system_metrics_interval: Seconds between background host resource samples (0 disables the sampler)
+                system_metrics_gauges: Whether to publish sampled host resource usage as OTel gauges
+                log_buffer_max_bytes: Byte budget for captured print and log output awaiting upload
+                log_buffer_policy: What to drop when the log buffer is full: 'drop_oldest' or 'sample'
+                log_upload_chunk_bytes: Size of incremental uploads of a trace's captured output (0 uploads at trace end only)
+                log_upload_compression: Whether to gzip captured log uploads
+                sampling_ratio: Fraction of new traces to record; child spans follow their parent
+                sampling_ratios_by_kind: Head sampling ratio for new traces by span kind, overriding sampling_ratio
+                tail_sampling: Whether to buffer traces and decide whether to export each one when its root span ends
+                tail_sampling_ratio: Fraction of traces kept by tail sampling when no keep rule matches
+                tail_sampling_latency_ms: Keep traces whose root span took at least this many milliseconds
+                tail_sampling_min_cost: Keep traces whose recorded cost adds up to at least this much
+                tail_sampling_min_tokens: Keep traces that used at least this many tokens
+                tail_sampling_max_traces: Maximum number of traces buffered for tail sampling
+                span_relay_socket: Unix socket path; processes on this host export spans through whichever process binds it first
+                export_stats_metrics: Whether to publish span export pipeline stats as OTel metrics
+                adaptive_batching: Whether to adapt export batch size and flush delay to span arrival rate and export latency
+                export_reorder_window: Longest time in milliseconds a span is held back to be exported with the rest of its trace
+                span_store_max_spans: Number of finished spans kept in an in-process span store (0 disables)
+                file_export_directory: Directory to record spans to instead of sending them
+                file_export_segment_bytes: Size in bytes at which a span file segment is finished
+                file_export_compression: Whether to gzip span batches written to file
+                file_export_fsync: When span files are synced to disk: 'always', 'rotate' or 'never'
+                prompt_dedup: Whether to export each distinct prompt message body once per trace
+                deferred_extraction: Whether to extract LLM span attributes on the export thread
         """
         if self._initialized:
             return
@@ -196,9 +482,36 @@ class TracingCore:
         kwargs.setdefault("service_name", "agentops")
         kwargs.setdefault("exporter_endpoint", "https://otlp.agentops.ai/v1/traces")
         kwargs.setdefault("metrics_endpoint", "https://otlp.agentops.ai/v1/metrics")
-        kwargs.setdefault("max_queue_size", 512)
+        kwargs.setdefault("max_queue_size", 2048)
+        kwargs.setdefault("max_export_batch_size", 512)
+        kwargs.setdefault("max_queue_bytes", 16 * 1024 * 1024)
         kwargs.setdefault("max_wait_time", 5000)
         kwargs.setdefault("export_flush_interval", 1000)
+        kwargs.setdefault("flush_on_trace_end", True)
+        kwargs.setdefault("shutdown_flush_timeout", 5000)
+        kwargs.setdefault("spill_max_bytes", 64 * 1024 * 1024)
+        kwargs.setdefault("export_workers", 1)
+        kwargs.setdefault("async_export", False)
+        kwargs.setdefault("system_metrics_interval", 15)
+        kwargs.setdefault("system_metrics_gauges", False)
+        kwargs.setdefault("log_buffer_max_bytes", 4 * 1024 * 1024)
+        kwargs.setdefault("log_buffer_policy", "drop_oldest")
+        kwargs.setdefault("log_upload_chunk_bytes", 1024 * 1024)
+        kwargs.setdefault("log_upload_compression", False)
+        kwargs.setdefault("sampling_ratio", 1.0)
+        kwargs.setdefault("sampling_ratios_by_kind", {})
+        kwargs.setdefault("tail_sampling", False)
+        kwargs.setdefault("tail_sampling_ratio", 1.0)
+        kwargs.setdefault("tail_sampling_max_traces", 1000)
+        kwargs.setdefault("export_stats_metrics", False)
+        kwargs.setdefault("adaptive_batching", False)
+        kwargs.setdefault("export_reorder_window", 0)
+        kwargs.setdefault("span_store_max_spans", 0)
+        kwargs.setdefault("file_export_segment_bytes", 64 * 1024 * 1024)
+        kwargs.setdefault("file_export_compression", False)
+        kwargs.setdefault("file_export_fsync", "rotate")
+        kwargs.setdefault("prompt_dedup", False)
+        kwargs.setdefault("deferred_extraction", False)
 
         # Create a TracingConfig from kwargs with proper defaults
         config: TracingConfig = {
@@ -206,13 +519,50 @@ class TracingCore:
             "exporter_endpoint": kwargs["exporter_endpoint"],
             "metrics_endpoint": kwargs["metrics_endpoint"],
             "max_queue_size": kwargs["max_queue_size"],
+            "max_export_batch_size": kwargs["max_export_batch_size"],
+            "max_queue_bytes": kwargs["max_queue_bytes"],
             "max_wait_time": kwargs["max_wait_time"],
             "export_flush_interval": kwargs["export_flush_interval"],
+            "flush_on_trace_end": kwargs["flush_on_trace_end"],
+            "shutdown_flush_timeout": kwargs["shutdown_flush_timeout"],
+            "spill_directory": kwargs.get("spill_directory"),
+            "spill_max_bytes": kwargs["spill_max_bytes"],
+            "export_workers": kwargs["export_workers"],
+            "async_export": kwargs["async_export"],
+            "system_metrics_interval": kwargs["system_metrics_interval"],
+            "system_metrics_gauges": kwargs["system_metrics_gauges"],
+            "log_buffer_max_bytes": kwargs["log_buffer_max_bytes"],
+            "log_buffer_policy": kwargs["log_buffer_policy"],
+            "log_upload_chunk_bytes": kwargs["log_upload_chunk_bytes"],
+            "log_upload_compression": kwargs["log_upload_compression"],
+            "sampling_ratio": kwargs["sampling_ratio"],
+            "sampling_ratios_by_kind": kwargs["sampling_ratios_by_kind"],
+            "tail_sampling": kwargs["tail_sampling"],
+            "tail_sampling_ratio": kwargs["tail_sampling_ratio"],
+            "tail_sampling_latency_ms": kwargs.get("tail_sampling_latency_ms"),
+            "tail_sampling_min_cost": kwargs.get("tail_sampling_min_cost"),
+            "tail_sampling_min_tokens": kwargs.get("tail_sampling_min_tokens"),
+            "tail_sampling_max_traces": kwargs["tail_sampling_max_traces"],
+            "span_relay_socket": kwargs.get("span_relay_socket"),
+            "export_stats_metrics": kwargs["export_stats_metrics"],
+            "adaptive_batching": kwargs["adaptive_batching"],
+            "export_reorder_window": kwargs["export_reorder_window"],
+            "span_store_max_spans": kwargs["span_store_max_spans"],
+            "file_export_directory": kwargs.get("file_export_directory"),
+            "file_export_segment_bytes": kwargs["file_export_segment_bytes"],
+            "file_export_compression": kwargs["file_export_compression"],
+            "file_export_fsync": kwargs["file_export_fsync"],
+            "prompt_dedup": kwargs["prompt_dedup"],
+            "deferred_extraction": kwargs["deferred_extraction"],
             "api_key": kwargs.get("api_key"),
             "project_id": kwargs.get("project_id"),
         }
 
         self._config = config
+        self._stats = PipelineStats()
+        # Project pipelines export through AuthenticatedOTLPExporter, so they need the default export path
+        if not config["async_export"] and not config.get("file_export_directory"):
+            self._pipelines = PipelineRegistry()
 
         # Setup telemetry using the extracted configuration
         provider, meter_provider = setup_telemetry(
@@ -221,14 +571,58 @@ class TracingCore:
             exporter_endpoint=config["exporter_endpoint"],
             metrics_endpoint=config["metrics_endpoint"],
             max_queue_size=config["max_queue_size"],
+            max_export_batch_size=config["max_export_batch_size"],
+            max_queue_bytes=config["max_queue_bytes"],
             max_wait_time=config["max_wait_time"],
             export_flush_interval=config["export_flush_interval"],
             jwt_provider=jwt_provider,
+            spill_directory=config.get("spill_directory"),
+            spill_max_bytes=config["spill_max_bytes"],
+            export_workers=config["export_workers"],
+            async_export=config["async_export"],
+            log_buffer_max_bytes=config["log_buffer_max_bytes"],
+            log_buffer_policy=config["log_buffer_policy"],
+            log_upload_chunk_bytes=config["log_upload_chunk_bytes"],
+            log_upload_compression=config["log_upload_compression"],
+            sampling_ratio=config["sampling_ratio"],
+            sampling_ratios_by_kind=config["sampling_ratios_by_kind"],
+            tail_sampling=config["tail_sampling"],
+            tail_sampling_ratio=config["tail_sampling_ratio"],
+            tail_sampling_latency_ms=config.get("tail_sampling_latency_ms"),
+            tail_sampling_min_cost=config.get("tail_sampling_min_cost"),
+            tail_sampling_min_tokens=config.get("tail_sampling_min_tokens"),
+            tail_sampling_max_traces=config["tail_sampling_max_traces"],
+            span_relay_socket=config.get("span_relay_socket"),
+            adaptive_batching=config["adaptive_batching"],
+            export_reorder_window=config["export_reorder_window"],
+            file_export_directory=config.get("file_export_directory"),
+            file_export_segment_bytes=config["file_export_segment_bytes"],
+            file_export_compression=config["file_export_compression"],
+            file_export_fsync=config["file_export_fsync"],
+            prompt_dedup=config["prompt_dedup"],
+            deferred_extraction=config["deferred_extraction"],
+            pipelines=self._pipelines,
+            stats=self._stats,
         )
 
         self.provider = provider
         self._meter_provider = meter_provider
 
+        # Keep finished spans queryable in-process; stored as they end, independent of export
+        if config["span_store_max_spans"] > 0:
+            self._span_store = SpanStore(max_spans=config["span_store_max_spans"])
+            provider.add_span_processor(SimpleSpanProcessor(self._span_store))
+
+        # Sample host resource usage in the background so session starts never block on psutil
+        if config["system_metrics_interval"] > 0:
+            self._system_metrics = SystemMetricsSampler(interval=config["system_metrics_interval"])
+            self._system_metrics.start()
+            if config["system_metrics_gauges"]:
+                self._system_metrics.register_gauges(meter_provider.get_meter("agentops.system"))
+
+        if config["export_stats_metrics"]:
+            self._stats.register_instruments(meter_provider.get_meter("agentops.export"))
+
         self._initialized = True
         logger.debug("Tracing core initialized")
 
@@ -268,12 +662,42 @@ class TracingCore:
             raise AgentOpsClientNotInitializedException("Tracer config accessed before initialization.")
         return self._config
 
-    def shutdown(self) -> None:
-        """Shutdown the tracing core and clean up resources."""
+    def add_shutdown_hook(self, hook: Callable[[], None]) -> None:
+        """
+        Run a callable at the start of shutdown, before active traces are ended.
+
+        Hooks run once per shutdown, in registration order, and should return quickly.
+        """
+        if hook not in self._shutdown_hooks:
+            self._shutdown_hooks.append(hook)
+
+    def shutdown(self) -> Dict[str, Any]:
+        """
+        Shutdown the tracing core and clean up resources.
+
+        All active traces are ended in one pass without waiting on exports.
+        Spans, metrics and captured logs are then flushed and their pipelines
+        shut down concurrently, together bounded by `shutdown_flush_timeout`.
+        Whatever is not flushed by the deadline is reported and abandoned.
+
+        Returns:
+            Pipelines that `completed`, `failed` or `timed_out`, `elapsed_ms`, and
+            `spans_queued` still waiting for export. Empty if the tracer was not initialized.
+        """
         if not self._initialized:
-            return
+            return {}
 
+        report: Dict[str, Any] = {}
         try:
+            # Log uploads of the traces ended below are sent alongside the other flushes
+            defer_log_uploads()
+
+            for hook in self._shutdown_hooks:
+                try:
+                    hook()
+                except Exception as e:
+                    logger.error(f"Error in shutdown hook: {e}")
+
             # End all active traces
             with self._traces_lock:
                 active_traces = list(self._active_traces.values())
@@ -281,39 +705,189 @@ class TracingCore:
 
             for trace_context in active_traces:
                 try:
-                    self._end_single_trace(trace_context, "Shutdown")
+                    self._end_single_trace(trace_context, "Shutdown", flush=False)
                 except Exception as e:
                     logger.error(f"Error ending trace during shutdown: {e}")
 
-            # Force flush all processors
-            self._flush_span_processors()
-
-            # Shutdown providers
-            if self.provider:
-                self.provider.shutdown()
-
-            if self._meter_provider:
-                self._meter_provider.shutdown()
-
-            logger.debug("Tracing core shutdown complete")
+            steps: Dict[str, ShutdownStep] = {"spans": self._shutdown_spans, "logs": self._shutdown_logs}
+            if self._meter_provider or self._system_metrics:
+                steps["metrics"] = self._shutdown_metrics
+            report = run_until_deadline(steps, self._shutdown_flush_timeout)
+            if self._stats is not None:
+                report["spans_queued"] = self._stats.queue_depth
+
+            if self._flush_executor:
+                self._flush_executor.shutdown(wait=False)
+                self._flush_executor = None
+
+            self._pipelines = None
+
+            unflushed = report["timed_out"] + report["failed"]
+            if unflushed:
+                queued = report.get("spans_queued")
+                logger.warning(
+                    f"Telemetry not fully flushed at shutdown after {report['elapsed_ms']} ms: "
+                    f"{', '.join(unflushed)}" + (f" ({queued} spans still queued)" if queued else "")
+                )
+            else:
+                logger.debug(f"Tracing core shutdown complete in {report['elapsed_ms']} ms")
 
         except Exception as e:
             logger.error(f"Error during tracing core shutdown: {e}")
 
         finally:
             self._initialized = False
+        return report
+
+    def _shutdown_spans(self, timeout_millis: int) -> bool:
+        started = time.monotonic()
+        flushed = self._flush_span_processors(timeout_millis=timeout_millis)
+        if self.provider:
+            remaining = timeout_millis - (time.monotonic() - started) * 1000
+            if flushed and remaining > 0:
+                # Queues are empty, so the processors only stop their workers
+                self.provider.shutdown()
+            else:
+                # Shutting down would export what is still queued with no deadline; leave it to the
+                # daemon workers rather than hold up exit
+                logger.debug("Span queues not drained before the shutdown deadline, skipping processor shutdown")
+        return flushed
+
+    def _shutdown_metrics(self, timeout_millis: int) -> bool:
+        if self._system_metrics:
+            self._system_metrics.stop(timeout=min(timeout_millis / 1000, 1.0))
+            self._system_metrics = None
+        if not self._meter_provider:
+            return True
+        started = time.monotonic()
+        flushed = self._meter_provider.force_flush(timeout_millis)
+        remaining = max(timeout_millis - (time.monotonic() - started) * 1000, 1)
+        self._meter_provider.shutdown(timeout_millis=remaining)
+        return flushed is not False
+
+    def _shutdown_logs(self, timeout_millis: int) -> bool:
+        try:
+            return flush_logs(timeout_millis)
+        finally:
+            shutdown_print_logger()
 
-    def _flush_span_processors(self) -> None:
-        """Helper to force flush all span processors."""
+    @property
+    def _flush_on_trace_end(self) -> bool:
+        """Whether ending a trace should block until its spans are exported."""
+        if self._config is None:
+            return True
+        return self._config.get("flush_on_trace_end", True)
+
+    @property
+    def _shutdown_flush_timeout(self) -> int:
+        """Deadline in milliseconds for flushing spans, metrics and logs at shutdown."""
+        if self._config is None:
+            return 5000
+        return self._config.get("shutdown_flush_timeout", 5000)
+
+    def _flush_span_processors(self, timeout_millis: Optional[int] = None) -> bool:
+        """
+        Helper to force flush all span processors.
+
+        Args:
+            timeout_millis: Optional deadline for the flush. Defaults to the provider's own timeout.
+
+        Returns:
+            True if the flush completed within the deadline, False otherwise.
+        """
         if not self.provider or not hasattr(self.provider, "force_flush"):
             logger.debug("No provider or provider cannot force_flush.")
-            return
+            return False
 
         try:
-            self.provider.force_flush()  # type: ignore
+            if timeout_millis is None:
+                result = self.provider.force_flush()  # type: ignore
+            else:
+                result = self.provider.force_flush(timeout_millis)  # type: ignore
             logger.debug("Provider force_flush completed.")
+            return result is not False
         except Exception as e:
             logger.warning(f"Failed to force flush provider's span processors: {e}", exc_info=True)
+            return False
+
+    def flush_async(self, timeout_millis: Optional[int] = None) -> Future:
+        """
+        Flush all span processors on a background thread.
+
+        Use this when traces are ended with `flush_on_trace_end` disabled and the caller
+        still needs confirmation that spans were delivered. The returned future resolves
+        to True once the flush completes; wrap it with `asyncio.wrap_future` to await it
+        from async code.
+
+        Args:
+            timeout_millis: Optional deadline for the flush.
+
+        Returns:
+            A future resolving to whether the flush completed within the deadline.
+        """
+        with self._flush_executor_lock:
+            if self._flush_executor is None:
+                self._flush_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agentops-flush")
+            return self._flush_executor.submit(self._flush_span_processors, timeout_millis)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get counters for the span export pipeline.
+
+        Returns:
+            Spans enqueued, dropped, exported and failed, export latency, batch and payload
+            size histograms, and queue depth. Empty if the tracer is not initialized.
+        """
+        if self._stats is None:
+            return {}
+        return self._stats.snapshot()
+
+    def add_pipeline(
+        self,
+        name: str,
+        jwt_provider: Callable[[], Optional[str]],
+        project_id: Optional[str] = None,
+        exporter_endpoint: Optional[str] = None,
+    ) -> bool:
+        """
+        Register a named pipeline that traces can be routed to with `start_trace(..., project=name)`.
+
+        Pipelines share this tracer's span processor, worker thread and connection pool,
+        and differ only in the JWT they export with and the project ID they report.
+
+        Args:
+            name: Name to select the pipeline by
+            jwt_provider: Function returning the pipeline's current JWT
+            project_id: Project ID to report, if already known (see `set_pipeline_project_id`)
+            exporter_endpoint: OTLP endpoint to export to. Defaults to this tracer's.
+
+        Returns:
+            True if the pipeline was registered, False if the tracer is not initialized
+            or exports spans asynchronously or to files.
+        """
+        if not self._initialized:
+            logger.warning("Cannot add a project pipeline: tracer not initialized")
+            return False
+        if self._pipelines is None:
+            logger.warning("Project pipelines are not supported with async_export or file_export_directory")
+            return False
+        self._pipelines.add(
+            name,
+            endpoint=exporter_endpoint or self.config["exporter_endpoint"] or "https://otlp.agentops.ai/v1/traces",
+            jwt_provider=jwt_provider,
+            project_id=project_id,
+        )
+        return True
+
+    def set_pipeline_project_id(self, name: str, project_id: str) -> None:
+        """Set the project ID a pipeline reports, e.g. once its authentication completes."""
+        if self._pipelines is not None:
+            self._pipelines.set_project_id(name, project_id)
+
+    @property
+    def span_store(self) -> Optional[SpanStore]:
+        """The in-process span store, if enabled with `span_store_max_spans`."""
+        return self._span_store
 
     def get_tracer(self, name: str = "agentops") -> trace.Tracer:
         """
@@ -328,7 +902,12 @@ class TracingCore:
         if not self._initialized:
             raise AgentOpsClientNotInitializedException
 
-        return trace.get_tracer(name)
+        # Tracers are cached per provider; creating one on every span is measurable overhead
+        provider = trace.get_tracer_provider()
+        cached = self._tracers.get(name)
+        if cached is None or cached[0] is not provider:
+            cached = self._tracers[name] = (provider, trace.get_tracer(name, tracer_provider=provider))
+        return cached[1]
 
     @classmethod
     def initialize_from_config(
@@ -360,9 +939,42 @@ class TracingCore:
                     "exporter": getattr(config_obj, "exporter", None),
                     "processor": getattr(config_obj, "processor", None),
                     "exporter_endpoint": getattr(config_obj, "exporter_endpoint", None),
-                    "max_queue_size": getattr(config_obj, "max_queue_size", 512),
+                    "max_queue_size": getattr(config_obj, "max_queue_size", 2048),
+                    "max_export_batch_size": getattr(config_obj, "max_export_batch_size", 512),
+                    "max_queue_bytes": getattr(config_obj, "max_queue_bytes", 16 * 1024 * 1024),
                     "max_wait_time": getattr(config_obj, "max_wait_time", 5000),
                     "export_flush_interval": getattr(config_obj, "export_flush_interval", 1000),
+                    "flush_on_trace_end": getattr(config_obj, "flush_on_trace_end", True),
+                    "shutdown_flush_timeout": getattr(config_obj, "shutdown_flush_timeout", 5000),
+                    "spill_directory": getattr(config_obj, "spill_directory", None),
+                    "spill_max_bytes": getattr(config_obj, "spill_max_bytes", 64 * 1024 * 1024),
+                    "export_workers": getattr(config_obj, "export_workers", 1),
+                    "async_export": getattr(config_obj, "async_export", False),
+                    "system_metrics_interval": getattr(config_obj, "system_metrics_interval", 15),
+                    "system_metrics_gauges": getattr(config_obj, "system_metrics_gauges", False),
+                    "log_buffer_max_bytes": getattr(config_obj, "log_buffer_max_bytes", 4 * 1024 * 1024),
+                    "log_buffer_policy": getattr(config_obj, "log_buffer_policy", "drop_oldest"),
+                    "log_upload_chunk_bytes": getattr(config_obj, "log_upload_chunk_bytes", 1024 * 1024),
+                    "log_upload_compression": getattr(config_obj, "log_upload_compression", False),
+                    "sampling_ratio": getattr(config_obj, "sampling_ratio", 1.0),
+                    "sampling_ratios_by_kind": getattr(config_obj, "sampling_ratios_by_kind", {}),
+                    "tail_sampling": getattr(config_obj, "tail_sampling", False),
+                    "tail_sampling_ratio": getattr(config_obj, "tail_sampling_ratio", 1.0),
+                    "tail_sampling_latency_ms": getattr(config_obj, "tail_sampling_latency_ms", None),
+                    "tail_sampling_min_cost": getattr(config_obj, "tail_sampling_min_cost", None),
+                    "tail_sampling_min_tokens": getattr(config_obj, "tail_sampling_min_tokens", None),
+                    "tail_sampling_max_traces": getattr(config_obj, "tail_sampling_max_traces", 1000),
+                    "span_relay_socket": getattr(config_obj, "span_relay_socket", None),
+                    "export_stats_metrics": getattr(config_obj, "export_stats_metrics", False),
+                    "adaptive_batching": getattr(config_obj, "adaptive_batching", False),
+                    "export_reorder_window": getattr(config_obj, "export_reorder_window", 0),
+                    "span_store_max_spans": getattr(config_obj, "span_store_max_spans", 0),
+                    "file_export_directory": getattr(config_obj, "file_export_directory", None),
+                    "file_export_segment_bytes": getattr(config_obj, "file_export_segment_bytes", 64 * 1024 * 1024),
+                    "file_export_compression": getattr(config_obj, "file_export_compression", False),
+                    "file_export_fsync": getattr(config_obj, "file_export_fsync", "rotate"),
+                    "prompt_dedup": getattr(config_obj, "prompt_dedup", False),
+                    "deferred_extraction": getattr(config_obj, "deferred_extraction", False),
                     "api_key": getattr(config_obj, "api_key", None),
                     "project_id": getattr(config_obj, "project_id", None),
                     "endpoint": getattr(config_obj, "endpoint", None),
@@ -379,7 +991,11 @@ class TracingCore:
         # No need to register them here anymore
 
     def start_trace(
-        self, trace_name: str = "session", tags: Optional[dict | list] = None, is_init_trace: bool = False
+        self,
+        trace_name: str = "session",
+        tags: Optional[dict | list] = None,
+        is_init_trace: bool = False,
+        project: Optional[str] = None,
     ) -> Optional[TraceContext]:
         """
         Starts a new trace (root span) and returns its context.
@@ -388,9 +1004,12 @@ class TracingCore:
             trace_name: Name for the trace (e.g., "session", "my_custom_trace").
             tags: Optional tags to attach to the trace span.
             is_init_trace: Internal flag to mark if this is the automatically started init trace.
+            project: Pipeline registered with `add_pipeline` to send the trace to. Defaults to
+                the one selected with `use_pipeline` in the current context, if any.
 
         Returns:
-            A TraceContext object containing the span and context token, or None if not initialized.
+            A TraceContext object containing the span and context token, or None if not initialized
+            or the project has no registered pipeline.
         """
         if not self.initialized:
             logger.warning("Global tracer not initialized. Cannot start trace.")
@@ -402,9 +1021,16 @@ class TracingCore:
         if trace_name == "session":
             attributes.update(get_system_resource_attributes())
 
+        # Never fall back to the default project: its credentials would receive another project's trace
+        selected = project if project is not None else current_pipeline()
+        if selected is not None and (self._pipelines is None or selected not in self._pipelines):
+            logger.error(f"No pipeline registered for project '{selected}'. Cannot start trace.")
+            return None
+
         # make_span creates and starts the span, and activates it in the current context
         # It returns: span, context_object, context_token
-        span, _, context_token = self.make_span(trace_name, span_kind=SpanKind.SESSION, attributes=attributes)
+        with use_pipeline(project) if project is not None else nullcontext():
+            span, _, context_token = self.make_span(trace_name, span_kind=SpanKind.SESSION, attributes=attributes)
         logger.debug(f"Trace '{trace_name}' started with span ID: {span.get_span_context().span_id}")
 
         # Log the session replay URL for this new trace
@@ -461,13 +1087,16 @@ class TracingCore:
         # End specific trace
         self._end_single_trace(trace_context, end_state)
 
-    def _end_single_trace(self, trace_context: TraceContext, end_state: Union[Any, StatusCode, str]) -> None:
+    def _end_single_trace(
+        self, trace_context: TraceContext, end_state: Union[Any, StatusCode, str], flush: Optional[bool] = None
+    ) -> None:
         """
         Internal method to end a single trace.
 
         Args:
             trace_context: The TraceContext object to end.
             end_state: The final state of the trace.
+            flush: Whether to block until the trace is exported. Defaults to the `flush_on_trace_end` setting.
         """
         if not trace_context or not trace_context.span:
             logger.warning("Invalid TraceContext or span provided to end trace.")
@@ -481,6 +1110,10 @@ class TracingCore:
             # Handle case where span is mocked or trace_id is not a valid integer
             trace_id = str(span.get_span_context().trace_id)
 
+        if trace_id in self._inherited_traces:
+            logger.debug(f"Not ending trace {trace_id}: it was started before fork and belongs to the parent process")
+            return
+
         # Convert TraceState enum to StatusCode if needed
         from agentops.enums import TraceState
 
@@ -501,7 +1134,7 @@ class TracingCore:
             end_attributes = get_session_end_attributes(end_state)
             for key, value in end_attributes.items():
                 span.set_attribute(key, value)
-            self.finalize_span(span, token=token)
+            self.finalize_span(span, token=token, flush=flush)
 
             # Remove from active traces
             with self._traces_lock:
@@ -509,9 +1142,6 @@ class TracingCore:
                     del self._active_traces[trace_id]
                     logger.debug(f"Removed trace {trace_id} from active traces. Remaining: {len(self._active_traces)}")
 
-            # For root spans (traces), we might want an immediate flush after they end.
-            self._flush_span_processors()
-
             # Log the session replay URL again after the trace has ended
             # The span object should still contain the necessary context (trace_id)
             try:
@@ -578,7 +1208,7 @@ class TracingCore:
 
         return span, ctx, token
 
-    def finalize_span(self, span: trace.Span, token: Any) -> None:
+    def finalize_span(self, span: trace.Span, token: Any, flush: Optional[bool] = None) -> None:
         """
         Finalizes a span and cleans up its context.
 
@@ -595,9 +1225,14 @@ class TracingCore:
         Without proper finalization, spans may not trigger on_end events in processors,
         potentially resulting in missing or incomplete telemetry data.
 
+        When `flush_on_trace_end` is disabled, step 3 is skipped and the span is left to
+        the batch processor, so the caller does not wait on the export round trip.
+        Use `flush_async` if delivery confirmation is needed.
+
         Args:
             span: The span to finalize
             token: The context token to detach
+            flush: Whether to force an export. Defaults to the `flush_on_trace_end` setting.
         """
         # End the span
         if span:
@@ -613,6 +1248,11 @@ class TracingCore:
             except Exception:
                 pass
 
+        if flush is None:
+            flush = self._flush_on_trace_end
+        if not flush:
+            return
+
         # Try to flush span processors
         # Note: force_flush() might not be available in certain scenarios:
         # - During application shutdown when the provider may be partially destroyed
@@ -13,6 +13,8 @@ from agentops.semconv import SpanAttributes, CoreAttributes
 
 from agentops.sdk.decorators.utility import (
     _create_as_current_span,
+    _entity_span_attributes,
+    _start_as_current_entity_span,
     _process_async_generator,
     _process_sync_generator,
     _record_entity_input,
@@ -52,12 +54,17 @@ def create_entity_decorator(entity_kind: str) -> Callable[..., Any]:
             )
 
         if inspect.isclass(wrapped):
+            op_name = name or wrapped.__name__
+            class_span_name = f"{op_name}.{entity_kind}"
+            class_span_attributes = _entity_span_attributes(op_name, entity_kind, version)
+
             # Class decoration wraps __init__ and aenter/aexit for context management.
             # For SpanKind.SESSION, this creates a span for __init__ or async context, not instance lifetime.
             class WrappedClass(wrapped):
                 def __init__(self, *args: Any, **kwargs: Any):
-                    op_name = name or wrapped.__name__
-                    self._agentops_span_context_manager = _create_as_current_span(op_name, entity_kind, version)
+                    self._agentops_span_context_manager = _start_as_current_entity_span(
+                        class_span_name, class_span_attributes
+                    )
                     self._agentops_active_span = self._agentops_span_context_manager.__enter__()
                     try:
                         _record_entity_input(self._agentops_active_span, args, kwargs)
@@ -76,8 +83,9 @@ def create_entity_decorator(entity_kind: str) -> Callable[..., Any]:
                 async def __aenter__(self) -> "WrappedClass":
                     if hasattr(self, "_agentops_active_span") and self._agentops_active_span is not None:
                         return self
-                    op_name = name or wrapped.__name__
-                    self._agentops_span_context_manager = _create_as_current_span(op_name, entity_kind, version)
+                    self._agentops_span_context_manager = _start_as_current_entity_span(
+                        class_span_name, class_span_attributes
+                    )
                     self._agentops_active_span = self._agentops_span_context_manager.__enter__()
                     return self
 
@@ -97,6 +105,21 @@ def create_entity_decorator(entity_kind: str) -> Callable[..., Any]:
             WrappedClass.__doc__ = wrapped.__doc__
             return WrappedClass
 
+        # Everything that does not depend on the call is resolved once, here
+        operation_name = name or wrapped.__name__
+        target = getattr(wrapped, "__func__", wrapped)  # classmethod/staticmethod objects
+        is_async = asyncio.iscoroutinefunction(target)
+        is_generator = inspect.isgeneratorfunction(target)
+        is_async_generator = inspect.isasyncgenfunction(target)
+
+        static_attributes: Dict[str, Any] = {CoreAttributes.TAGS: tags} if tags else {}
+        if entity_kind == "tool" and cost is not None:
+            static_attributes[SpanAttributes.LLM_USAGE_TOOL_COST] = cost
+        if entity_kind == "guardrail" and (spec == "input" or spec == "output"):
+            static_attributes[SpanAttributes.AGENTOPS_DECORATOR_SPEC.format(entity_kind=entity_kind)] = spec
+        span_name = f"{operation_name}.{entity_kind}"
+        span_attributes = _entity_span_attributes(operation_name, entity_kind, version, static_attributes)
+
         @wrapt.decorator
         def wrapper(
             wrapped_func: Callable[..., Any], instance: Optional[Any], args: tuple, kwargs: Dict[str, Any]
@@ -104,11 +127,6 @@ def create_entity_decorator(entity_kind: str) -> Callable[..., Any]:
             if not tracer.initialized:
                 return wrapped_func(*args, **kwargs)
 
-            operation_name = name or wrapped_func.__name__
-            is_async = asyncio.iscoroutinefunction(wrapped_func)
-            is_generator = inspect.isgeneratorfunction(wrapped_func)
-            is_async_generator = inspect.isasyncgenfunction(wrapped_func)
-
             # Special handling for HTTP entity kind
             if entity_kind == SpanKind.HTTP:
                 if is_generator or is_async_generator:
@@ -288,10 +306,7 @@ def create_entity_decorator(entity_kind: str) -> Callable[..., Any]:
                     # !! was previously not implemented, checking with @dwij if this was intentional or if my implementation should go in
                     if is_generator:
                         span, _, token = tracer.make_span(
-                            operation_name,
-                            entity_kind,
-                            version=version,
-                            attributes={CoreAttributes.TAGS: tags} if tags else None,
+                            operation_name, entity_kind, version=version, attributes=static_attributes
                         )
                         try:
                             _record_entity_input(span, args, kwargs, entity_kind=entity_kind)
@@ -301,10 +316,7 @@ def create_entity_decorator(entity_kind: str) -> Callable[..., Any]:
                         return _process_sync_generator(span, result)
                     elif is_async_generator:
                         span, _, token = tracer.make_span(
-                            operation_name,
-                            entity_kind,
-                            version=version,
-                            attributes={CoreAttributes.TAGS: tags} if tags else None,
+                            operation_name, entity_kind, version=version, attributes=static_attributes
                         )
                         try:
                             _record_entity_input(span, args, kwargs, entity_kind=entity_kind)
@@ -380,38 +392,20 @@ def create_entity_decorator(entity_kind: str) -> Callable[..., Any]:
             # Logic for non-SESSION kinds or generators under @trace (as per fallthrough)
             elif is_generator:
                 span, _, token = tracer.make_span(
-                    operation_name,
-                    entity_kind,
-                    version=version,
-                    attributes={CoreAttributes.TAGS: tags} if tags else None,
+                    operation_name, entity_kind, version=version, attributes=static_attributes
                 )
                 try:
                     _record_entity_input(span, args, kwargs, entity_kind=entity_kind)
-                    # Set cost attribute if tool
-                    if entity_kind == "tool" and cost is not None:
-                        span.set_attribute(SpanAttributes.LLM_USAGE_TOOL_COST, cost)
-                    # Set spec attribute if guardrail
-                    if entity_kind == "guardrail" and (spec == "input" or spec == "output"):
-                        span.set_attribute(SpanAttributes.AGENTOPS_DECORATOR_SPEC.format(entity_kind=entity_kind), spec)
                 except Exception as e:
                     logger.warning(f"Input recording failed for '{operation_name}': {e}")
                 result = wrapped_func(*args, **kwargs)
                 return _process_sync_generator(span, result)
             elif is_async_generator:
                 span, _, token = tracer.make_span(
-                    operation_name,
-                    entity_kind,
-                    version=version,
-                    attributes={CoreAttributes.TAGS: tags} if tags else None,
+                    operation_name, entity_kind, version=version, attributes=static_attributes
                 )
                 try:
                     _record_entity_input(span, args, kwargs, entity_kind=entity_kind)
-                    # Set cost attribute if tool
-                    if entity_kind == "tool" and cost is not None:
-                        span.set_attribute(SpanAttributes.LLM_USAGE_TOOL_COST, cost)
-                    # Set spec attribute if guardrail
-                    if entity_kind == "guardrail" and (spec == "input" or spec == "output"):
-                        span.set_attribute(SpanAttributes.AGENTOPS_DECORATOR_SPEC.format(entity_kind=entity_kind), spec)
                 except Exception as e:
                     logger.warning(f"Input recording failed for '{operation_name}': {e}")
                 result = wrapped_func(*args, **kwargs)
@@ -419,22 +413,9 @@ def create_entity_decorator(entity_kind: str) -> Callable[..., Any]:
             elif is_async:
 
                 async def _wrapped_async() -> Any:
-                    with _create_as_current_span(
-                        operation_name,
-                        entity_kind,
-                        version=version,
-                        attributes={CoreAttributes.TAGS: tags} if tags else None,
-                    ) as span:
+                    with _start_as_current_entity_span(span_name, span_attributes) as span:
                         try:
                             _record_entity_input(span, args, kwargs, entity_kind=entity_kind)
-                            # Set cost attribute if tool
-                            if entity_kind == "tool" and cost is not None:
-                                span.set_attribute(SpanAttributes.LLM_USAGE_TOOL_COST, cost)
-                            # Set spec attribute if guardrail
-                            if entity_kind == "guardrail" and (spec == "input" or spec == "output"):
-                                span.set_attribute(
-                                    SpanAttributes.AGENTOPS_DECORATOR_SPEC.format(entity_kind=entity_kind), spec
-                                )
                         except Exception as e:
                             logger.warning(f"Input recording failed for '{operation_name}': {e}")
                         try:
@@ -451,22 +432,9 @@ def create_entity_decorator(entity_kind: str) -> Callable[..., Any]:
 
                 return _wrapped_async()
             else:  # Sync function for non-SESSION kinds
-                with _create_as_current_span(
-                    operation_name,
-                    entity_kind,
-                    version=version,
-                    attributes={CoreAttributes.TAGS: tags} if tags else None,
-                ) as span:
+                with _start_as_current_entity_span(span_name, span_attributes) as span:
                     try:
                         _record_entity_input(span, args, kwargs, entity_kind=entity_kind)
-                        # Set cost attribute if tool
-                        if entity_kind == "tool" and cost is not None:
-                            span.set_attribute(SpanAttributes.LLM_USAGE_TOOL_COST, cost)
-                        # Set spec attribute if guardrail
-                        if entity_kind == "guardrail" and (spec == "input" or spec == "output"):
-                            span.set_attribute(
-                                SpanAttributes.AGENTOPS_DECORATOR_SPEC.format(entity_kind=entity_kind), spec
-                            )
                     except Exception as e:
                         logger.warning(f"Input recording failed for '{operation_name}': {e}")
                     try:
@@ -1,13 +1,14 @@
+import logging
 import types
 from contextlib import contextmanager
-from typing import Any, Dict, Generator, Optional
+from typing import Any, ContextManager, Dict, Generator, Optional
 
 from opentelemetry import context as context_api
 from opentelemetry import trace
 from opentelemetry.context import attach, set_value
 from opentelemetry.trace import Span
 
-from agentops.helpers.serialization import safe_serialize
+from agentops.helpers.serialization import serialize_bounded, value_size
 from agentops.logging import logger
 from agentops.sdk.core import tracer
 from agentops.semconv.span_attributes import SpanAttributes
@@ -30,9 +31,20 @@ def set_entity_path(entity_path: str) -> None:
 # Helper functions for content management
 
 
-def _check_content_size(content_json: str) -> bool:
-    """Verify that a JSON string is within acceptable size limits (1MB)"""
-    return len(content_json) < 1_000_000
+# Size limit for recorded input/output; larger values are recorded as a truncated preview
+MAX_CONTENT_BYTES = 1_000_000
+
+
+def _set_content_attribute(span: trace.Span, attribute: str, content: Any) -> None:
+    """Serialize content into a span attribute, truncating it to the size limit"""
+    json_data, truncated = serialize_bounded(content, MAX_CONTENT_BYTES)
+    span.set_attribute(attribute, json_data)
+    if truncated:
+        span.set_attribute(f"{attribute}.truncated", True)
+        original_size = value_size(content)
+        if original_size is not None:
+            span.set_attribute(f"{attribute}.original_size", original_size)
+        logger.debug(f"{attribute} exceeds size limit, recorded a truncated preview")
 
 
 def _process_sync_generator(span: trace.Span, generator: types.GeneratorType):
@@ -74,6 +86,55 @@ def _get_current_span_info():
     return {"name": "No current span"}
 
 
+def _entity_span_attributes(
+    operation_name: str, span_kind: str, version: Optional[int] = None, attributes: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Build the attributes an entity span starts with; the result can be reused across spans"""
+    span_attributes = dict(attributes) if attributes else {}
+    span_attributes[SpanAttributes.AGENTOPS_SPAN_KIND] = span_kind
+    span_attributes[SpanAttributes.OPERATION_NAME] = operation_name
+    if version is not None:
+        span_attributes[SpanAttributes.OPERATION_VERSION] = version
+    return span_attributes
+
+
+@contextmanager
+def _logged_span(span_name: str, span_context_manager: ContextManager[Span]) -> Generator[Span, None, None]:
+    """Wrap a span context manager with debug logging of the surrounding context"""
+    before_span = _get_current_span_info()
+    logger.debug(f"[DEBUG] BEFORE {span_name} - Current context: {before_span}")
+
+    with span_context_manager as span:
+        span_ctx = span.get_span_context()
+        logger.debug(
+            f"[DEBUG] CREATED {span_name} - span_id: {span_ctx.span_id:x}, parent: {before_span.get('span_id', 'None')}"
+        )
+        yield span
+
+    after_span = _get_current_span_info()
+    logger.debug(f"[DEBUG] AFTER {span_name} - Returned to context: {after_span}")
+
+
+def _start_as_current_entity_span(span_name: str, attributes: Dict[str, Any]) -> ContextManager[Span]:
+    """
+    Start a span with precomputed name and attributes as the current span.
+
+    Context logging only happens when debug logging is enabled, so the common
+    path is a single call into the OpenTelemetry tracer.
+
+    Args:
+        span_name: Full span name, `<operation>.<span_kind>`
+        attributes: Attributes from `_entity_span_attributes`; not modified
+
+    Returns:
+        A context manager yielding the span and ending it on exit
+    """
+    span_context_manager = tracer.get_tracer().start_as_current_span(span_name, attributes=attributes)
+    if logger.isEnabledFor(logging.DEBUG):
+        return _logged_span(span_name, span_context_manager)
+    return span_context_manager
+
+
 @contextmanager
 def _create_as_current_span(
     operation_name: str, span_kind: str, version: Optional[int] = None, attributes: Optional[Dict[str, Any]] = None
@@ -94,57 +155,18 @@ def _create_as_current_span(
     Yields:
         A span with proper context that will be automatically closed when exiting the context
     """
-    # Log before we do anything
-    before_span = _get_current_span_info()
-    logger.debug(f"[DEBUG] BEFORE {operation_name}.{span_kind} - Current context: {before_span}")
-
-    # Create span with proper naming convention
-    span_name = f"{operation_name}.{span_kind}"
-
-    # Get tracer
-    otel_tracer = tracer.get_tracer()
-
-    # Prepare attributes
-    if attributes is None:
-        attributes = {}
-
-    # Add span kind to attributes
-    attributes[SpanAttributes.AGENTOPS_SPAN_KIND] = span_kind
-
-    # Add standard attributes
-    attributes[SpanAttributes.OPERATION_NAME] = operation_name
-    if version is not None:
-        attributes[SpanAttributes.OPERATION_VERSION] = version
-
-    # Get current context explicitly to debug it
-    current_context = context_api.get_current()
-
-    # Use OpenTelemetry's context manager to properly handle span lifecycle
-    with otel_tracer.start_as_current_span(span_name, attributes=attributes, context=current_context) as span:
-        # Log after span creation
-        if hasattr(span, "get_span_context"):
-            span_ctx = span.get_span_context()
-            logger.debug(
-                f"[DEBUG] CREATED {span_name} - span_id: {span_ctx.span_id:x}, parent: {before_span.get('span_id', 'None')}"
-            )
-
+    span_attributes = _entity_span_attributes(operation_name, span_kind, version, attributes)
+    with _start_as_current_entity_span(f"{operation_name}.{span_kind}", span_attributes) as span:
         yield span
 
-    # Log after we're done
-    after_span = _get_current_span_info()
-    logger.debug(f"[DEBUG] AFTER {operation_name}.{span_kind} - Returned to context: {after_span}")
-
 
 def _record_entity_input(span: trace.Span, args: tuple, kwargs: Dict[str, Any], entity_kind: str = "entity") -> None:
     """Record operation input parameters to span if content tracing is enabled"""
     try:
         input_data = {"args": args, "kwargs": kwargs}
-        json_data = safe_serialize(input_data)
-
-        if _check_content_size(json_data):
-            span.set_attribute(SpanAttributes.AGENTOPS_DECORATOR_INPUT.format(entity_kind=entity_kind), json_data)
-        else:
-            logger.debug("Operation input exceeds size limit, not recording")
+        _set_content_attribute(
+            span, SpanAttributes.AGENTOPS_DECORATOR_INPUT.format(entity_kind=entity_kind), input_data
+        )
     except Exception as err:
         logger.warning(f"Failed to serialize operation input: {err}")
 
@@ -152,12 +174,7 @@ def _record_entity_input(span: trace.Span, args: tuple, kwargs: Dict[str, Any],
 def _record_entity_output(span: trace.Span, result: Any, entity_kind: str = "entity") -> None:
     """Record operation output value to span if content tracing is enabled"""
     try:
-        json_data = safe_serialize(result)
-
-        if _check_content_size(json_data):
-            span.set_attribute(SpanAttributes.AGENTOPS_DECORATOR_OUTPUT.format(entity_kind=entity_kind), json_data)
-        else:
-            logger.debug("Operation output exceeds size limit, not recording")
+        _set_content_attribute(span, SpanAttributes.AGENTOPS_DECORATOR_OUTPUT.format(entity_kind=entity_kind), result)
     except Exception as err:
         logger.warning(f"Failed to serialize operation output: {err}")
 
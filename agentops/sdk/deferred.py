@@ -0,0 +1,194 @@
+"""
+Deferred attribute extraction for LLM spans.
+
+Turning a request and its response into span attributes (`model_as_dict`,
+walking every message and choice) costs time on the caller's thread, between
+the provider returning and the user's code getting the result. With deferred
+extraction enabled, instrumentation registers a closure over the request
+kwargs and the response object instead, and DeferredAttributesSpanExporter
+runs it on the export worker thread just before the span is exported.
+
+Attributes set directly on the span win over extracted ones with the same
+key. Processors that read attributes before export, such as tail sampling
+rules and the in-process span store, only see what was set directly.
+
+Work that must stay off the caller's thread whatever the setting, such as
+uploading spilled stream content, is registered with `defer_to_export`; it
+runs whenever a DeferredAttributesSpanExporter is in the export pipeline.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from opentelemetry.attributes import BoundedAttributes
+from opentelemetry.sdk.trace import ReadableSpan, SpanLimits
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry.trace import Span
+
+from agentops.helpers.fork import register_after_fork
+from agentops.logging import logger
+
+AttributeExtractor = Callable[[], Dict[str, Any]]
+
+# Spans dropped before export (queue overflow, sampling) never claim their extractor
+_MAX_PENDING = 10000
+
+
+class DeferredAttributeRegistry:
+    """Extractors of ended spans awaiting export, keyed by trace and span ID."""
+
+    def __init__(self, max_pending: int = _MAX_PENDING):
+        self.enabled = False
+        # Whether a DeferredAttributesSpanExporter runs the extractors
+        self.attached = False
+        self.dropped = 0
+        self._max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending: "OrderedDict[Tuple[int, int], AttributeExtractor]" = OrderedDict()
+        register_after_fork(self._at_fork_reinit)
+
+    def _at_fork_reinit(self) -> None:
+        # Spans of the parent are exported by the parent
+        self._lock = threading.Lock()
+        self._pending = OrderedDict()
+
+    def add(self, trace_id: int, span_id: int, extract: AttributeExtractor) -> None:
+        with self._lock:
+            key = (trace_id, span_id)
+            previous = self._pending.pop(key, None)
+            if previous is not None:
+                extract = _chain(previous, extract)
+            self._pending[key] = extract
+            if len(self._pending) > self._max_pending:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+
+    def pop(self, trace_id: int, span_id: int) -> Optional[AttributeExtractor]:
+        with self._lock:
+            return self._pending.pop((trace_id, span_id), None)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+def _chain(first: AttributeExtractor, second: AttributeExtractor) -> AttributeExtractor:
+    return lambda: {**first(), **second()}
+
+
+_registry = DeferredAttributeRegistry()
+
+
+def set_deferred_extraction(enabled: bool) -> None:
+    """Enable or disable deferred extraction for spans started from now on."""
+    _registry.enabled = enabled
+
+
+def deferred_extraction_enabled() -> bool:
+    return _registry.enabled
+
+
+def snapshot_kwargs(kwargs: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Copy request kwargs so later mutation by the caller does not leak into extraction.
+
+    Lists (such as `messages`, which agent loops append to between turns) are
+    copied one level deep; the objects in them are shared.
+    """
+    if not kwargs:
+        return {}
+    return {key: list(value) if isinstance(value, list) else value for key, value in kwargs.items()}
+
+
+def defer_attributes(span: Span, extract: AttributeExtractor) -> bool:
+    """
+    Register an extractor whose attributes are added to the span at export.
+
+    Call before ending the span. Extractors registered for the same span are
+    merged, later ones winning.
+
+    Args:
+        span: Span the attributes belong to
+        extract: Callable returning the attributes; runs on the export worker thread
+
+    Returns:
+        False if deferred extraction is disabled or the span is not recorded,
+        in which case the caller should set the attributes itself
+    """
+    if not _registry.enabled or not span.is_recording():
+        return False
+    span_context = span.get_span_context()
+    _registry.add(span_context.trace_id, span_context.span_id, extract)
+    return True
+
+
+def defer_to_export(span: Span, extract: AttributeExtractor) -> bool:
+    """
+    Register an extractor to run at export, whether or not deferred extraction is enabled.
+
+    Args:
+        span: Span the attributes belong to
+        extract: Callable returning the attributes; runs on the export worker thread
+
+    Returns:
+        False if no exporter runs extractors or the span is not recorded
+    """
+    if not _registry.attached or not span.is_recording():
+        return False
+    span_context = span.get_span_context()
+    _registry.add(span_context.trace_id, span_context.span_id, extract)
+    return True
+
+
+def _resolve(span: ReadableSpan, extract: AttributeExtractor) -> ReadableSpan:
+    try:
+        extracted = extract()
+    except Exception as e:
+        logger.debug(f"Deferred attribute extraction failed for span {span.name}: {e}")
+        return span
+
+    merged = {key: value for key, value in extracted.items() if value is not None}
+    merged.update(span.attributes or {})
+    return ReadableSpan(
+        name=span.name,
+        context=span.context,
+        parent=span.parent,
+        resource=span.resource,
+        attributes=BoundedAttributes(maxlen=SpanLimits().max_span_attributes, attributes=merged, immutable=True),
+        events=span.events,
+        links=span.links,
+        kind=span.kind,
+        status=span.status,
+        start_time=span.start_time,
+        end_time=span.end_time,
+        instrumentation_scope=span.instrumentation_scope,
+    )
+
+
+class DeferredAttributesSpanExporter(SpanExporter):
+    """Runs the deferred extractors of each span in a batch, then exports it through the wrapped exporter."""
+
+    def __init__(self, exporter: SpanExporter, registry: Optional[DeferredAttributeRegistry] = None):
+        self._exporter = exporter
+        self._registry = registry or _registry
+        self._registry.attached = True
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        if not len(self._registry):
+            # Extractors are registered before their span ends, so none belongs to this batch
+            return self._exporter.export(spans)
+        out: List[ReadableSpan] = []
+        for span in spans:
+            extract = self._registry.pop(span.context.trace_id, span.context.span_id) if span.context else None
+            out.append(span if extract is None else _resolve(span, extract))
+        return self._exporter.export(out)
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self._exporter.force_flush(timeout_millis)
+
+    def shutdown(self) -> None:
+        self._registry.attached = False
+        self._exporter.shutdown()
+
+    def stats(self) -> Dict[str, int]:
+        return {"pending": len(self._registry), "dropped": self._registry.dropped}
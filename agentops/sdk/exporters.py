@@ -1,16 +1,37 @@
 # Define a separate class for the authenticated OTLP exporter
 # This is imported conditionally to avoid dependency issues
+import gzip
 import threading
-from typing import Callable, Dict, Optional, Sequence
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional, Sequence, Set
 import time
 
 import requests
+from requests.adapters import HTTPAdapter
+from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
 from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter, Compression
 from opentelemetry.sdk.trace import ReadableSpan
-from opentelemetry.sdk.trace.export import SpanExportResult
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
 
 from agentops.exceptions import AgentOpsApiJwtExpiredException, ApiServerException
+from agentops.helpers.fork import register_after_fork
 from agentops.logging import logger
+from agentops.sdk.spill import SendResult, SpillReplayer, SpillStore, is_retryable_status
+from agentops.sdk.stats import PipelineStats
+
+
+def _fresh_session(session: requests.Session, pool_maxsize: Optional[int] = None) -> requests.Session:
+    """Create a session with the same default headers as `session` but none of its pooled connections."""
+    fresh = requests.Session()
+    fresh.headers.clear()
+    fresh.headers.update(session.headers)
+    if pool_maxsize:
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        fresh.mount("https://", adapter)
+        fresh.mount("http://", adapter)
+    return fresh
 
 
 class AuthenticatedOTLPExporter(OTLPSpanExporter):
@@ -20,6 +41,15 @@ class AuthenticatedOTLPExporter(OTLPSpanExporter):
     This exporter allows for updating JWT tokens dynamically without recreating
     the exporter. It maintains a reference to a JWT token that can be updated
     by external code, and automatically includes the latest token in requests.
+
+    Authentication is attached per request rather than by mutating the shared
+    session headers, so concurrent exports (e.g. a force_flush racing the batch
+    worker, or a ConcurrentSpanExporter pool) are safe.
+
+    If a `spill_store` is given, batches that cannot be exported (network errors,
+    server errors, rate limiting, or the auth-failure backoff window) are written
+    to disk and replayed in the background once exports succeed again. Batches
+    rejected with any other 4xx status would be rejected again and are dropped.
     """
 
     def __init__(
@@ -30,6 +60,10 @@ class AuthenticatedOTLPExporter(OTLPSpanExporter):
         headers: Optional[Dict[str, str]] = None,
         timeout: Optional[int] = None,
         compression: Optional[Compression] = None,
+        spill_store: Optional[SpillStore] = None,
+        pool_maxsize: Optional[int] = None,
+        stats: Optional[PipelineStats] = None,
+        session: Optional[requests.Session] = None,
         **kwargs,
     ):
         """
@@ -42,14 +76,22 @@ class AuthenticatedOTLPExporter(OTLPSpanExporter):
             headers: Additional headers to include
             timeout: Request timeout
             compression: Compression type
+            spill_store: Disk store for batches that could not be exported (optional)
+            pool_maxsize: Number of pooled connections to keep for concurrent exports (optional)
+            stats: Pipeline stats to record export results, latency and payload sizes in (optional)
+            session: Session to send requests with, e.g. one shared between exporters (optional)
             **kwargs: Additional arguments (stored but not passed to parent)
         """
         # Store JWT-related parameters separately
         self._jwt = jwt
         self._jwt_provider = jwt_provider
+        self._stats = stats
         self._lock = threading.Lock()
         self._last_auth_failure = 0
+        self._failed_jwt: Optional[str] = None
         self._auth_failure_threshold = 60  # Don't retry auth failures more than once per minute
+        # Status of the last response on each exporting thread, read after the parent's export fails
+        self._last_response = threading.local()
 
         # Store any additional kwargs for potential future use
         self._custom_kwargs = kwargs
@@ -65,9 +107,39 @@ class AuthenticatedOTLPExporter(OTLPSpanExporter):
             parent_kwargs["timeout"] = timeout
         if compression is not None:
             parent_kwargs["compression"] = compression
+        if session is not None:
+            parent_kwargs["session"] = session
 
         super().__init__(endpoint=endpoint, **parent_kwargs)
 
+        self._pool_maxsize = pool_maxsize
+        if pool_maxsize:
+            # Size the connection pool so concurrent exports don't queue for a connection
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+
+        self._spill_store = spill_store
+        self._spill_replayer: Optional[SpillReplayer] = None
+        if spill_store is not None:
+            self._spill_replayer = SpillReplayer(spill_store, self.send_serialized)
+
+        register_after_fork(self._at_fork_reinit)
+
+    def _at_fork_reinit(self) -> None:
+        """
+        Give a forked child its own connections.
+
+        The spill directory stays with the parent process: two processes
+        appending to and draining the same segments would corrupt them, so
+        batches that fail in the child are dropped instead of spilled.
+        """
+        self._lock = threading.Lock()
+        self._last_response = threading.local()
+        self._session = _fresh_session(self._session, self._pool_maxsize)
+        self._spill_store = None
+        self._spill_replayer = None
+
     def _get_current_jwt(self) -> Optional[str]:
         """Get the current JWT token from the provider or stored JWT."""
         if self._jwt_provider:
@@ -118,49 +190,154 @@ class AuthenticatedOTLPExporter(OTLPSpanExporter):
 
         return prepared_headers
 
-    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+    def _in_auth_backoff(self) -> bool:
         """
-        Export spans with dynamic JWT authentication.
+        Whether exports are paused after a recent authentication failure.
 
-        This method overrides the parent's export to ensure we always use
-        the latest JWT token and handle authentication failures gracefully.
+        The pause ends early once the token has been refreshed, so a rotated
+        token is used immediately instead of after the full backoff window.
         """
-        # Check if we should skip due to recent auth failure
         with self._lock:
-            current_time = time.time()
-            if self._last_auth_failure > 0 and current_time - self._last_auth_failure < self._auth_failure_threshold:
-                logger.debug("Skipping export due to recent authentication failure")
-                return SpanExportResult.FAILURE
+            if self._last_auth_failure <= 0 or time.time() - self._last_auth_failure >= self._auth_failure_threshold:
+                return False
+            failed_jwt = self._failed_jwt
+        return failed_jwt is None or self._get_current_jwt() == failed_jwt
+
+    def _record_auth_failure(self) -> None:
+        failed_jwt = self._get_current_jwt()
+        with self._lock:
+            self._last_auth_failure = time.time()
+            self._failed_jwt = failed_jwt
+
+    def _spill(self, spans: Sequence[ReadableSpan]) -> None:
+        """Write a failed batch to the spill store, if one is configured."""
+        if self._spill_store is None or not spans:
+            return
 
         try:
-            # Get current JWT and prepare headers
-            current_headers = self._prepare_headers()
+            self._spill_store.append(encode_spans(spans).SerializePartialToString())
+            logger.debug(f"Spilled {len(spans)} spans to disk for later replay")
+        except Exception as e:
+            logger.warning(f"Failed to spill spans to disk: {e}")
 
-            # Temporarily update the session headers for this request
-            original_headers = dict(self._session.headers)
-            self._session.headers.update(current_headers)
+    def _export(self, serialized_data: bytes, timeout_sec: Optional[float] = None) -> requests.Response:
+        """
+        POST a serialized batch with the current auth headers.
 
+        Overrides the parent to pass headers per request instead of relying on
+        `self._session.headers`, which is shared between threads.
+        """
+        data = serialized_data
+        if self._compression == Compression.Gzip:
+            data = gzip.compress(serialized_data)
+        elif self._compression == Compression.Deflate:
+            data = zlib.compress(serialized_data)
+
+        if self._stats is not None:
+            self._stats.record_payload(len(data))
+
+        response = self._session.post(
+            url=self._endpoint,
+            data=data,
+            headers=self._prepare_headers(),
+            verify=self._certificate_file,
+            timeout=timeout_sec if timeout_sec is not None else self._timeout,
+            cert=self._client_cert,
+        )
+        self._last_response.status_code = response.status_code
+        return response
+
+    def send_serialized(self, serialized_data: bytes) -> SendResult:
+        """
+        Send one already encoded batch, e.g. a spilled or recorded one.
+
+        Returns:
+            SENT if the endpoint accepted the batch, REJECTED if it refused it with a
+            status that retrying won't change, RETRY otherwise.
+        """
+        if self._shutdown or self._in_auth_backoff():
+            return SendResult.RETRY
+
+        try:
+            response = self._export(serialized_data)
+        except requests.RequestException as e:
+            logger.debug(f"Network error while sending spans: {e}")
+            return SendResult.RETRY
+
+        if response.ok:
+            return SendResult.SENT
+        if response.status_code in (401, 403):
+            self._record_auth_failure()
+        if is_retryable_status(response.status_code):
+            return SendResult.RETRY
+        logger.warning(f"Span batch rejected by the endpoint with status {response.status_code}")
+        return SendResult.REJECTED
+
+    def export_serialized(self, serialized_data: bytes) -> bool:
+        """
+        Export a batch that was already encoded, e.g. one relayed from another process.
+
+        Batches that fail with a retryable error are spilled like regular ones.
+
+        Returns:
+            True if the batch was accepted by the endpoint.
+        """
+        result = self.send_serialized(serialized_data)
+        if result is SendResult.RETRY and self._spill_store is not None:
             try:
-                # Call parent export method
-                result = super().export(spans)
+                self._spill_store.append(serialized_data)
+            except Exception as e:
+                logger.warning(f"Failed to spill spans to disk: {e}")
+        return result is SendResult.SENT
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        """
+        Export spans with dynamic JWT authentication.
+
+        This method overrides the parent's export to ensure we always use
+        the latest JWT token and handle authentication failures gracefully.
+        Failed batches are spilled to disk when a spill store is configured.
+        """
+        if self._stats is None:
+            return self._export_spans(spans)
+
+        start = time.perf_counter()
+        result = self._export_spans(spans)
+        self._stats.record_export(len(spans), (time.perf_counter() - start) * 1e3, result == SpanExportResult.SUCCESS)
+        return result
+
+    def _export_spans(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        # Check if we should skip due to recent auth failure
+        if self._in_auth_backoff():
+            logger.debug("Skipping export due to recent authentication failure")
+            self._spill(spans)
+            return SpanExportResult.FAILURE
 
-                # Reset auth failure timestamp on success
-                if result == SpanExportResult.SUCCESS:
-                    with self._lock:
-                        self._last_auth_failure = 0
+        try:
+            # Call parent export method; auth headers are attached per request in _export
+            self._last_response.status_code = None
+            result = super().export(spans)
 
-                return result
+            # Reset auth failure timestamp on success
+            if result == SpanExportResult.SUCCESS:
+                with self._lock:
+                    self._last_auth_failure = 0
+                # The backend is reachable again; let the replayer catch up
+                if self._spill_replayer is not None:
+                    self._spill_replayer.notify()
+            elif is_retryable_status(getattr(self._last_response, "status_code", None)):
+                self._spill(spans)
+            else:
+                logger.warning(f"Dropped {len(spans)} spans rejected with status {self._last_response.status_code}")
 
-            finally:
-                # Restore original headers
-                self._session.headers.clear()
-                self._session.headers.update(original_headers)
+            return result
 
         except requests.exceptions.HTTPError as e:
-            if e.response and e.response.status_code in (401, 403):
+            if is_retryable_status(e.response.status_code if e.response is not None else None):
+                self._spill(spans)
+            if e.response is not None and e.response.status_code in (401, 403):
                 # Authentication error - record timestamp and warn
-                with self._lock:
-                    self._last_auth_failure = time.time()
+                self._record_auth_failure()
 
                 logger.warning(
                     f"Authentication failed during span export: {e}. "
@@ -173,8 +350,8 @@ class AuthenticatedOTLPExporter(OTLPSpanExporter):
 
         except AgentOpsApiJwtExpiredException as e:
             # JWT expired - record timestamp and warn
-            with self._lock:
-                self._last_auth_failure = time.time()
+            self._record_auth_failure()
+            self._spill(spans)
 
             logger.warning(
                 f"JWT token expired during span export: {e}. Will retry in {self._auth_failure_threshold} seconds."
@@ -184,11 +361,13 @@ class AuthenticatedOTLPExporter(OTLPSpanExporter):
         except ApiServerException as e:
             # Server-side error
             logger.error(f"API server error during span export: {e}")
+            self._spill(spans)
             return SpanExportResult.FAILURE
 
         except requests.RequestException as e:
             # Network or HTTP error
             logger.error(f"Network error during span export: {e}")
+            self._spill(spans)
             return SpanExportResult.FAILURE
 
         except Exception as e:
@@ -196,6 +375,24 @@ class AuthenticatedOTLPExporter(OTLPSpanExporter):
             logger.error(f"Unexpected error during span export: {e}")
             return SpanExportResult.FAILURE
 
+    def spill_stats(self) -> Optional[Dict[str, int]]:
+        """
+        Get spill queue counters.
+
+        Returns:
+            Spilled/replayed/evicted/rejected counts, or None if spilling is disabled.
+        """
+        if self._spill_store is None:
+            return None
+        return self._spill_store.stats()
+
+    def shutdown(self) -> None:
+        """Stop the spill replayer and shut down the exporter."""
+        if self._spill_replayer is not None:
+            self._spill_replayer.stop(timeout=1.0)
+            self._spill_replayer = None
+        super().shutdown()
+
     def clear(self):
         """
         Clear any stored spans.
@@ -204,3 +401,146 @@ class AuthenticatedOTLPExporter(OTLPSpanExporter):
         The OTLP exporter doesn't store spans, so this is a no-op.
         """
         pass
+
+
+class AuthenticatedOTLPMetricExporter(OTLPMetricExporter):
+    """
+    OTLP metric exporter that reads the JWT on every export.
+
+    The stock exporter fixes its headers at construction time, so a token that
+    was missing at startup or rotated later would never reach the metrics
+    endpoint. Like AuthenticatedOTLPExporter, auth is attached per request.
+    """
+
+    def __init__(self, endpoint: str, jwt_provider: Optional[Callable[[], Optional[str]]] = None, **kwargs):
+        """
+        Initialize the metric exporter.
+
+        Args:
+            endpoint: The OTLP metrics endpoint URL
+            jwt_provider: Function to get JWT token dynamically (optional)
+            **kwargs: Passed through to OTLPMetricExporter
+        """
+        self._jwt_provider = jwt_provider
+        super().__init__(endpoint=endpoint, **kwargs)
+        register_after_fork(self._at_fork_reinit)
+
+    def _at_fork_reinit(self) -> None:
+        """Give a forked child its own connections."""
+        self._session = _fresh_session(self._session)
+
+    def _prepare_headers(self) -> Dict[str, str]:
+        headers = dict(self._headers)
+        if self._jwt_provider:
+            try:
+                token = self._jwt_provider()
+            except Exception as e:
+                logger.warning(f"Failed to get JWT token: {e}")
+                token = None
+            if token:
+                headers["Authorization"] = f"Bearer {token}"
+        return headers
+
+    def _export(self, serialized_data: bytes, timeout_sec: Optional[float] = None) -> requests.Response:
+        """POST a serialized metrics batch with the current auth headers."""
+        data = serialized_data
+        if self._compression == Compression.Gzip:
+            data = gzip.compress(serialized_data)
+        elif self._compression == Compression.Deflate:
+            data = zlib.compress(serialized_data)
+
+        return self._session.post(
+            url=self._endpoint,
+            data=data,
+            headers=self._prepare_headers(),
+            verify=self._certificate_file,
+            timeout=timeout_sec if timeout_sec is not None else self._timeout,
+            cert=self._client_cert,
+        )
+
+
+class ConcurrentSpanExporter(SpanExporter):
+    """
+    Span exporter that runs a wrapped exporter on a pool of worker threads.
+
+    `BatchSpanProcessor` calls `export` from a single worker thread and waits for
+    each batch to finish. Wrapping the exporter lets up to `max_workers` batches
+    be in flight at once, so one slow POST does not stall the queue. When all
+    workers are busy and `max_pending` batches are waiting, `export` blocks,
+    applying backpressure to the processor queue instead of growing memory.
+    """
+
+    def __init__(self, exporter: SpanExporter, max_workers: int = 4, max_pending: Optional[int] = None):
+        """
+        Initialize the concurrent exporter.
+
+        Args:
+            exporter: Thread-safe exporter to delegate to
+            max_workers: Number of export worker threads
+            max_pending: Maximum number of batches accepted but not yet exported. Defaults to 2 * max_workers.
+        """
+        self._exporter = exporter
+        self._max_workers = max_workers
+        self._max_pending = max_pending or max_workers * 2
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agentops-export")
+        self._slots = threading.BoundedSemaphore(self._max_pending)
+        self._pending: Set[Future] = set()
+        self._pending_lock = threading.Lock()
+        self._shutdown = False
+
+        register_after_fork(self._at_fork_reinit)
+
+    def _at_fork_reinit(self) -> None:
+        """Replace the worker pool in a forked child, where its threads no longer exist."""
+        self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="agentops-export")
+        self._slots = threading.BoundedSemaphore(self._max_pending)
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+
+    def _export_batch(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        try:
+            return self._exporter.export(spans)
+        except Exception as e:
+            logger.error(f"Unexpected error during concurrent span export: {e}")
+            return SpanExportResult.FAILURE
+        finally:
+            self._slots.release()
+
+    def _discard(self, future: Future) -> None:
+        with self._pending_lock:
+            self._pending.discard(future)
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        """
+        Hand a batch to the worker pool.
+
+        Returns:
+            SUCCESS once the batch is accepted; delivery is reported by the wrapped exporter.
+        """
+        if self._shutdown:
+            return SpanExportResult.FAILURE
+
+        self._slots.acquire()
+        # The processor reuses its batch list, so the workers need their own copy
+        future = self._executor.submit(self._export_batch, list(spans))
+        with self._pending_lock:
+            self._pending.add(future)
+        future.add_done_callback(self._discard)
+        return SpanExportResult.SUCCESS
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        """Wait for all in-flight batches to finish."""
+        with self._pending_lock:
+            pending = set(self._pending)
+        if not pending:
+            return True
+        _, not_done = wait(pending, timeout=timeout_millis / 1e3)
+        return not not_done
+
+    def shutdown(self) -> None:
+        """Wait for in-flight batches, then shut down the wrapped exporter."""
+        if self._shutdown:
+            return
+        self._shutdown = True
+        self._executor.shutdown(wait=True)
+        self._exporter.shutdown()
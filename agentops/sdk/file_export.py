@@ -0,0 +1,211 @@
+"""
+Span export to local files, for hosts that cannot reach the AgentOps backend.
+
+FileSpanExporter writes every batch as an encoded OTLP export request to
+segment files in a directory. `agentops-replay` (agentops.sdk.replay) uploads
+them later from a host that has network access.
+
+Segment format: the spill store's, a sequence of records, each a 4-byte
+big-endian length followed by the serialized `ExportTraceServiceRequest`.
+In compressed segments (`.otlp.gz`) each record's payload is gzipped on its
+own, so records stay individually addressable by file offset.
+
+A segment is written under a `.open` suffix and renamed once it is rotated
+or the exporter shuts down, so finished segments can be uploaded while the
+process keeps writing.
+"""
+
+import gzip
+import os
+import struct
+import threading
+import time
+from typing import IO, Iterator, List, Optional, Sequence, Tuple
+
+from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from agentops.helpers.fork import register_after_fork
+from agentops.logging import logger
+
+_RECORD_HEADER = struct.Struct(">I")
+_SEGMENT_PREFIX = "spans-"
+_SEGMENT_SUFFIX = ".otlp"
+_COMPRESSED_SUFFIX = ".otlp.gz"
+_OPEN_SUFFIX = ".open"
+
+FSYNC_POLICIES = ("always", "rotate", "never")
+
+
+def list_segments(directory: str, include_open: bool = False) -> List[str]:
+    """
+    List the span segments in a directory, oldest first.
+
+    Args:
+        directory: Directory written by a FileSpanExporter
+        include_open: Also list segments that are still being written (or were left behind by a crash)
+
+    Returns:
+        Paths of the segment files
+    """
+    names = []
+    for name in os.listdir(directory):
+        if not name.startswith(_SEGMENT_PREFIX):
+            continue
+        base = name[: -len(_OPEN_SUFFIX)] if name.endswith(_OPEN_SUFFIX) else name
+        if base.endswith((_SEGMENT_SUFFIX, _COMPRESSED_SUFFIX)) and (include_open or base == name):
+            names.append(name)
+    # Names start with a zero-padded millisecond timestamp
+    return [os.path.join(directory, name) for name in sorted(names)]
+
+
+def read_segment(path: str, offset: int = 0) -> Iterator[Tuple[bytes, int]]:
+    """
+    Read the records of a segment, stopping at a torn trailing record.
+
+    Args:
+        path: Segment file
+        offset: File offset of the first record to read, e.g. from a replay checkpoint
+
+    Yields:
+        Each serialized export request, decompressed, with the file offset just past its record
+    """
+    compressed = path.endswith(_COMPRESSED_SUFFIX) or path.endswith(_COMPRESSED_SUFFIX + _OPEN_SUFFIX)
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while True:
+            header = f.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                return
+            (length,) = _RECORD_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            offset += _RECORD_HEADER.size + length
+            yield (gzip.decompress(payload) if compressed else payload), offset
+
+
+class FileSpanExporter(SpanExporter):
+    """
+    Span exporter writing OTLP-encoded batches to rotating segment files.
+
+    A new segment is started once the current one reaches `segment_max_bytes`
+    or has been open for `segment_max_seconds`. `fsync` controls durability:
+    'always' syncs after every batch, 'rotate' when a segment is finished,
+    'never' leaves it to the OS.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        segment_max_seconds: float = 600.0,
+        compression: bool = False,
+        fsync: str = "rotate",
+    ):
+        """
+        Initialize the file exporter.
+
+        Args:
+            directory: Directory for the segment files. Created if missing.
+            segment_max_bytes: Size at which a segment is finished
+            segment_max_seconds: Age at which a segment is finished (0 disables)
+            compression: Gzip each record
+            fsync: One of 'always', 'rotate' or 'never'
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {', '.join(FSYNC_POLICIES)}, got {fsync!r}")
+        self.directory = directory
+        self._segment_max_bytes = segment_max_bytes
+        self._segment_max_seconds = segment_max_seconds
+        self._compression = compression
+        self._fsync = fsync
+        self._lock = threading.Lock()
+        self._file: Optional[IO[bytes]] = None
+        self._path: Optional[str] = None
+        self._opened_at = 0.0
+        self._written = 0
+        self._seq = 0
+        self._shutdown = False
+
+        os.makedirs(directory, exist_ok=True)
+        register_after_fork(self._at_fork_reinit)
+
+    def _at_fork_reinit(self) -> None:
+        # The parent keeps its segment; the child starts its own, named with its pid.
+        # Files are unbuffered, so dropping the inherited one cannot flush stale data.
+        self._lock = threading.Lock()
+        self._file = None
+        self._path = None
+
+    def _open_segment(self) -> None:
+        suffix = _COMPRESSED_SUFFIX if self._compression else _SEGMENT_SUFFIX
+        name = f"{_SEGMENT_PREFIX}{int(time.time() * 1000):013d}-{os.getpid()}-{self._seq:06d}{suffix}"
+        self._seq += 1
+        self._path = os.path.join(self.directory, name)
+        self._file = open(self._path + _OPEN_SUFFIX, "ab", buffering=0)
+        self._opened_at = time.monotonic()
+        self._written = 0
+
+    def _close_segment(self) -> None:
+        """Sync and publish the current segment. Caller holds the lock."""
+        if self._file is None or self._path is None:
+            return
+        try:
+            if self._fsync != "never":
+                os.fsync(self._file.fileno())
+            self._file.close()
+            os.replace(self._path + _OPEN_SUFFIX, self._path)
+        except OSError as e:
+            logger.warning(f"Failed to finish span segment {self._path}: {e}")
+        self._file = None
+        self._path = None
+
+    def _should_rotate(self, record_size: int) -> bool:
+        if self._written and self._written + record_size > self._segment_max_bytes:
+            return True
+        return 0 < self._segment_max_seconds <= time.monotonic() - self._opened_at
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        if self._shutdown:
+            return SpanExportResult.FAILURE
+        if not spans:
+            return SpanExportResult.SUCCESS
+
+        payload = encode_spans(spans).SerializePartialToString()
+        if self._compression:
+            payload = gzip.compress(payload)
+        record = _RECORD_HEADER.pack(len(payload)) + payload
+
+        with self._lock:
+            try:
+                if self._file is not None and self._should_rotate(len(record)):
+                    self._close_segment()
+                if self._file is None:
+                    self._open_segment()
+                self._file.write(record)  # type: ignore[union-attr]
+                self._written += len(record)
+                if self._fsync == "always":
+                    os.fsync(self._file.fileno())  # type: ignore[union-attr]
+            except OSError as e:
+                logger.warning(f"Failed to write spans to {self.directory}: {e}")
+                return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        """Sync the current segment to disk unless the fsync policy is 'never'."""
+        with self._lock:
+            if self._file is not None and self._fsync != "never":
+                try:
+                    os.fsync(self._file.fileno())
+                except OSError as e:
+                    logger.warning(f"Failed to sync span segment {self._path}: {e}")
+                    return False
+        return True
+
+    def shutdown(self) -> None:
+        """Finish the current segment."""
+        with self._lock:
+            self._shutdown = True
+            self._close_segment()
@@ -0,0 +1,267 @@
+"""
+Per-project tracing pipelines in one process.
+
+A multi-tenant process can register a named pipeline per AgentOps project,
+each with its own JWT and resource attributes, and pick one per trace with
+`start_trace(..., project=...)` or the `use_project` context manager. Spans
+of all projects go through the same tracer provider, batch processor and
+worker thread; at export time PipelineRoutingExporter splits each batch by
+trace and sends every project's spans with that project's credentials over
+one shared connection pool.
+
+A trace's pipeline is fixed when its root span starts and stays pinned
+until the root span ends. Every span started in the trace meanwhile,
+including those of third-party instrumentation, is stamped with the
+pipeline's name, so it is exported with its trace's credentials however
+late it is exported. Spans stamped with a pipeline that is no longer
+registered are dropped, never sent to the default project.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import requests
+from opentelemetry.context import Context
+from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from agentops.helpers.fork import register_after_fork
+from agentops.logging import logger
+from agentops.sdk.exporters import AuthenticatedOTLPExporter
+from agentops.semconv import ResourceAttributes, SpanAttributes
+
+_current_pipeline: ContextVar[Optional[str]] = ContextVar("agentops_pipeline", default=None)
+
+
+def current_pipeline() -> Optional[str]:
+    """Name of the pipeline new traces are routed to in the current context, if any."""
+    return _current_pipeline.get()
+
+
+@contextmanager
+def use_pipeline(name: Optional[str]) -> Iterator[None]:
+    """Route traces started in this context to the named pipeline (None for the default one)."""
+    token = _current_pipeline.set(name)
+    try:
+        yield
+    finally:
+        _current_pipeline.reset(token)
+
+
+class Pipeline:
+    """A named export destination: its exporter and the resource attributes it overrides."""
+
+    __slots__ = ("name", "exporter", "resource_attributes")
+
+    def __init__(self, name: str, exporter: AuthenticatedOTLPExporter, resource_attributes: Dict[str, str]):
+        self.name = name
+        self.exporter = exporter
+        self.resource_attributes = resource_attributes
+
+
+class PipelineRegistry:
+    """
+    Registered pipelines and the pipeline each open trace belongs to.
+
+    A trace is pinned to its pipeline from the start of its root span until
+    the root span ends; spans carry the pipeline name from then on.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pipelines: Dict[str, Pipeline] = {}
+        self._traces: Dict[int, str] = {}
+        self._routed = False
+        self._session = requests.Session()
+        register_after_fork(self._at_fork_reinit)
+
+    def _at_fork_reinit(self) -> None:
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        name: str,
+        endpoint: str,
+        jwt_provider: Callable[[], Optional[str]],
+        project_id: Optional[str] = None,
+        service_name: Optional[str] = None,
+    ) -> Pipeline:
+        """
+        Register a pipeline, replacing any with the same name.
+
+        Args:
+            name: Name traces select the pipeline by
+            endpoint: OTLP endpoint the pipeline exports to
+            jwt_provider: Function returning the pipeline's current JWT
+            project_id: Project ID reported in the resource attributes (can be set later)
+            service_name: Service name reported in the resource attributes (optional)
+        """
+        exporter = AuthenticatedOTLPExporter(endpoint=endpoint, jwt_provider=jwt_provider, session=self._session)
+        attributes: Dict[str, str] = {}
+        if project_id:
+            attributes[ResourceAttributes.PROJECT_ID] = project_id
+        if service_name:
+            attributes[ResourceAttributes.SERVICE_NAME] = service_name
+        pipeline = Pipeline(name, exporter, attributes)
+        with self._lock:
+            self._pipelines[name] = pipeline
+        return pipeline
+
+    def remove(self, name: str) -> None:
+        """Unregister a pipeline; spans of its traces exported from now on are dropped."""
+        with self._lock:
+            self._pipelines.pop(name, None)
+
+    def set_project_id(self, name: str, project_id: str) -> None:
+        """Set the project ID a pipeline reports, e.g. once its authentication completes."""
+        with self._lock:
+            pipeline = self._pipelines.get(name)
+            if pipeline is not None:
+                pipeline.resource_attributes = {
+                    **pipeline.resource_attributes,
+                    ResourceAttributes.PROJECT_ID: project_id,
+                }
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._pipelines
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return list(self._pipelines)
+
+    def get(self, name: str) -> Optional[Pipeline]:
+        """Get a registered pipeline by name."""
+        return self._pipelines.get(name)
+
+    def route_trace(self, trace_id: int, name: str) -> None:
+        """Pin a trace to the named pipeline until `release_trace` is called for it."""
+        with self._lock:
+            self._traces[trace_id] = name
+            self._routed = True
+
+    def release_trace(self, trace_id: int) -> None:
+        """Unpin a trace once its root span has ended."""
+        with self._lock:
+            self._traces.pop(trace_id, None)
+
+    def trace_pipeline(self, trace_id: int) -> Optional[str]:
+        """Name of the pipeline an open trace is pinned to, or None for the default pipeline."""
+        return self._traces.get(trace_id)
+
+    @property
+    def active(self) -> bool:
+        """Whether any trace has been routed to a pipeline, so spans may carry a pipeline name."""
+        return self._routed
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pipelines = list(self._pipelines.values())
+            self._pipelines.clear()
+            self._traces.clear()
+        for pipeline in pipelines:
+            pipeline.exporter.shutdown()
+
+
+class PipelineRoutingProcessor(SpanProcessor):
+    """
+    Pins each new trace to the pipeline selected in the context its root span starts in.
+
+    Spans of pinned traces are stamped with the pipeline's name when they
+    start; the trace is released when its root span ends.
+    """
+
+    def __init__(self, registry: PipelineRegistry):
+        self._registry = registry
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+        if span.context is None:
+            return
+        trace_id = span.context.trace_id
+        if span.parent is None or span.parent.is_remote:
+            name = _current_pipeline.get()
+            if name is None:
+                return
+            self._registry.route_trace(trace_id, name)
+        else:
+            # Children started after their root span ended still follow the context they run in
+            name = self._registry.trace_pipeline(trace_id) or _current_pipeline.get()
+            if name is None:
+                return
+        span.set_attribute(SpanAttributes.AGENTOPS_PIPELINE, name)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if span.context is None or not (span.parent is None or span.parent.is_remote):
+            return
+        self._registry.release_trace(span.context.trace_id)
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+def _override_resource(request, attributes: Dict[str, str]) -> None:
+    """Replace or add string attributes on every resource of an encoded export request."""
+    for resource_spans in request.resource_spans:
+        remaining = dict(attributes)
+        for key_value in resource_spans.resource.attributes:
+            if key_value.key in remaining:
+                key_value.value.string_value = remaining.pop(key_value.key)
+        for key, value in remaining.items():
+            key_value = resource_spans.resource.attributes.add()
+            key_value.key = key
+            key_value.value.string_value = value
+
+
+class PipelineRoutingExporter(SpanExporter):
+    """
+    Splits batches by pipeline, exporting the default share through the wrapped exporter.
+
+    Spans stamped with a pipeline name are re-encoded with that pipeline's
+    resource attributes and sent with its JWT. Spans stamped with a pipeline
+    that is not registered (any more) are dropped rather than exported to the
+    default project. A batch counts as exported only if every share of it was.
+    """
+
+    def __init__(self, exporter: SpanExporter, registry: PipelineRegistry):
+        self._exporter = exporter
+        self._registry = registry
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        if not self._registry.active:
+            return self._exporter.export(spans)
+
+        default: List[ReadableSpan] = []
+        routed: Dict[str, List[ReadableSpan]] = {}
+        for span in spans:
+            name = span.attributes.get(SpanAttributes.AGENTOPS_PIPELINE) if span.attributes else None
+            if name is None:
+                default.append(span)
+            else:
+                routed.setdefault(name, []).append(span)
+
+        success = True
+        if default:
+            success = self._exporter.export(default) == SpanExportResult.SUCCESS
+        for name, pipeline_spans in routed.items():
+            pipeline = self._registry.get(name)
+            if pipeline is None:
+                logger.warning(f"Dropped {len(pipeline_spans)} spans of unregistered project pipeline {name}")
+                continue
+            request = encode_spans(pipeline_spans)
+            _override_resource(request, pipeline.resource_attributes)
+            if not pipeline.exporter.export_serialized(request.SerializePartialToString()):
+                logger.debug(f"Failed to export {len(pipeline_spans)} spans for project pipeline {name}")
+                success = False
+        return SpanExportResult.SUCCESS if success else SpanExportResult.FAILURE
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self._exporter.force_flush(timeout_millis)
+
+    def shutdown(self) -> None:
+        self._exporter.shutdown()
+        self._registry.shutdown()
@@ -4,12 +4,26 @@ Span processors for AgentOps SDK.
 This module contains processors for OpenTelemetry spans.
 """
 
-from typing import Optional
+import time
+from collections import OrderedDict
+from typing import Deque, Optional
 
 from opentelemetry.context import Context
 from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter
 
-from agentops.logging import logger, upload_logfile
+from agentops.logging import discard_logfile, logger, upload_logfile
+from agentops.sdk.stats import PipelineStats
+from agentops.semconv import SpanAttributes
+
+# Upper bound on open traces tracked for their root span; traces whose root never ends must not pin memory
+_MAX_OPEN_TRACES = 10000
+
+
+def _routed_pipeline(span: ReadableSpan) -> Optional[str]:
+    """Name of the project pipeline a span was routed to, or None for the default project."""
+    pipeline = (span.attributes or {}).get(SpanAttributes.AGENTOPS_PIPELINE)
+    return pipeline if isinstance(pipeline, str) and pipeline else None
 
 
 class InternalSpanProcessor(SpanProcessor):
@@ -24,9 +38,17 @@ class InternalSpanProcessor(SpanProcessor):
     - OpenTelemetry spans have a native 'kind' property (INTERNAL, CLIENT, CONSUMER, etc.)
     - AgentOps also uses a semantic convention attribute AGENTOPS_SPAN_KIND for domain-specific kinds
     - This processor tries to use the native kind first, then falls back to the attribute
+
+    Captured log output is uploaded when the root span of its trace ends. The
+    first span seen in a trace is taken as its root, so each concurrent or
+    later trace uploads its own output. At most `_MAX_OPEN_TRACES` traces are
+    tracked; beyond that the longest-open ones are forgotten, and their output
+    is left to the log buffer's own eviction.
     """
 
-    _root_span_id: Optional[int] = None
+    def __init__(self) -> None:
+        # Root span ID of every open trace, by trace ID, oldest first
+        self._root_spans: "OrderedDict[int, int]" = OrderedDict()
 
     def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
         """
@@ -40,8 +62,10 @@ class InternalSpanProcessor(SpanProcessor):
         if not span.context or not span.context.trace_flags.sampled:
             return
 
-        if not self._root_span_id:
-            self._root_span_id = span.context.span_id
+        if span.context.trace_id not in self._root_spans:
+            self._root_spans[span.context.trace_id] = span.context.span_id
+            while len(self._root_spans) > _MAX_OPEN_TRACES:
+                self._root_spans.popitem(last=False)
             logger.debug(f"[agentops.InternalSpanProcessor] Found root span: {span.name}")
 
     def on_end(self, span: ReadableSpan) -> None:
@@ -55,17 +79,98 @@ class InternalSpanProcessor(SpanProcessor):
         if not span.context or not span.context.trace_flags.sampled:
             return
 
-        if self._root_span_id and (span.context.span_id is self._root_span_id):
-            logger.debug(f"[agentops.InternalSpanProcessor] Ending root span: {span.name}")
-            try:
-                upload_logfile(span.context.trace_id)
-            except Exception as e:
-                logger.error(f"[agentops.InternalSpanProcessor] Error uploading logfile: {e}")
+        trace_id = span.context.trace_id
+        if self._root_spans.get(trace_id) != span.context.span_id:
+            return
+        self._root_spans.pop(trace_id, None)
+
+        logger.debug(f"[agentops.InternalSpanProcessor] Ending root span: {span.name}")
+        try:
+            if _routed_pipeline(span):
+                # The log upload authenticates as the default project, which must not see another project's logs
+                discard_logfile(trace_id)
+            else:
+                upload_logfile(trace_id)
+        except Exception as e:
+            logger.error(f"[agentops.InternalSpanProcessor] Error uploading logfile: {e}")
 
     def shutdown(self) -> None:
         """Shutdown the processor."""
-        self._root_span_id = None
+        self._root_spans.clear()
 
     def force_flush(self, timeout_millis: int = 30000) -> bool:
         """Force flush the processor."""
         return True
+
+
+class InstrumentedBatchSpanProcessor(BatchSpanProcessor):
+    """
+    BatchSpanProcessor that reports enqueued and dropped spans to PipelineStats.
+
+    The stock processor drops the oldest queued span without a trace when its
+    queue is full; here every drop is counted and the queue depth is tracked.
+
+    OTel keeps the queue and shutdown flag on the processor itself up to SDK
+    1.32 (`queue`, `done`); from 1.33 they live on its `_batch_processor`
+    (`_queue`, `_shutdown`). Both layouts are read.
+    """
+
+    def __init__(self, span_exporter: SpanExporter, stats: Optional[PipelineStats] = None, **kwargs) -> None:
+        super().__init__(span_exporter, **kwargs)
+        self._stats = stats
+        if stats is not None and self._span_queue() is not None:
+            stats.track_queue(lambda: len(self._span_queue() or ()))
+
+    def _span_queue(self) -> Optional[Deque[ReadableSpan]]:
+        """The deque spans wait in for export, or None if this SDK version's layout is unknown."""
+        batch_processor = getattr(self, "_batch_processor", None)
+        if batch_processor is not None:
+            return getattr(batch_processor, "_queue", None)
+        return getattr(self, "queue", None)
+
+    def _is_shut_down(self) -> bool:
+        batch_processor = getattr(self, "_batch_processor", None)
+        if batch_processor is not None:
+            return bool(getattr(batch_processor, "_shutdown", False))
+        return bool(getattr(self, "done", False))
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if self._stats is None or not span.context or not span.context.trace_flags.sampled:
+            super().on_end(span)
+            return
+
+        if self._is_shut_down():
+            super().on_end(span)
+            self._stats.record_dropped()
+            return
+
+        queue = self._span_queue()
+        full = queue is not None and queue.maxlen is not None and len(queue) >= queue.maxlen
+        super().on_end(span)
+        self._stats.record_enqueued(len(queue) if queue is not None else None, dropped=1 if full else 0)
+
+
+class ExporterFlushingBatchSpanProcessor(InstrumentedBatchSpanProcessor):
+    """
+    BatchSpanProcessor whose force_flush also waits for the exporter.
+
+    The stock processor only drains its queue into `exporter.export`. Exporters
+    that export asynchronously (such as ConcurrentSpanExporter) need their own
+    force_flush called for a flush to mean the spans were actually sent.
+    """
+
+    def __init__(self, span_exporter: SpanExporter, stats: Optional[PipelineStats] = None, **kwargs) -> None:
+        super().__init__(span_exporter, stats=stats, **kwargs)
+        self._flush_exporter = span_exporter
+
+    def force_flush(self, timeout_millis: Optional[int] = None) -> bool:
+        """Drain the queue, then flush the exporter within the remaining time."""
+        if timeout_millis is None:
+            timeout_millis = int(getattr(self, "export_timeout_millis", 30000))
+
+        start = time.monotonic()
+        if not super().force_flush(timeout_millis):
+            return False
+
+        remaining_millis = max(int(timeout_millis - (time.monotonic() - start) * 1000), 0)
+        return self._flush_exporter.force_flush(remaining_millis)
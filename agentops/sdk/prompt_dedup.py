@@ -0,0 +1,149 @@
+"""
+Content-addressed deduplication of prompt messages across the spans of a trace.
+
+Chat instrumentation records the whole message history as
+`gen_ai.prompt.{i}.content` on every LLM span, so an agent loop re-exports
+its entire conversation each turn. PromptDedupSpanExporter hashes each
+message body and exports it once per trace: the first span carrying a body
+keeps it and adds `gen_ai.prompt.{i}.content_hash`; later spans replace the
+body with `gen_ai.prompt.{i}.content_ref`, the same hash. Readers re-expand a
+reference from the span that carries its hash.
+
+A body counts as delivered only once the batch carrying it was exported
+successfully. Until then other batches keep sending it in full, so a failed
+or in-flight export can never leave a reference without its body.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from agentops.helpers.fork import register_after_fork
+from agentops.semconv import SpanAttributes
+
+_PROMPT_CONTENT = re.compile(rf"^{re.escape(SpanAttributes.LLM_PROMPTS)}\.(\d+)\.content$")
+
+# Shorter bodies cost less to send than a reference plus its bookkeeping
+MIN_DEDUP_CHARS = 128
+
+
+def content_hash(content: str) -> str:
+    """Hash identifying a message body in `content_hash` and `content_ref` attributes."""
+    return hashlib.blake2b(content.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+def _with_attributes(span: ReadableSpan, attributes: Dict) -> ReadableSpan:
+    return ReadableSpan(
+        name=span.name,
+        context=span.context,
+        parent=span.parent,
+        resource=span.resource,
+        attributes=attributes,
+        events=span.events,
+        links=span.links,
+        kind=span.kind,
+        status=span.status,
+        start_time=span.start_time,
+        end_time=span.end_time,
+        instrumentation_scope=span.instrumentation_scope,
+    )
+
+
+class PromptDedupSpanExporter(SpanExporter):
+    """
+    Replaces prompt message bodies already exported for a trace with hash references.
+
+    Delivered hashes are remembered for the `max_traces` most recently seen
+    traces; spans of older traces send their bodies in full again.
+    """
+
+    def __init__(self, exporter: SpanExporter, min_chars: int = MIN_DEDUP_CHARS, max_traces: int = 10000):
+        self._exporter = exporter
+        self._min_chars = min_chars
+        self._max_traces = max_traces
+        self._lock = threading.Lock()
+        self._delivered: "OrderedDict[int, Set[str]]" = OrderedDict()
+        self.chars_saved = 0
+        register_after_fork(self._at_fork_reinit)
+
+    def _at_fork_reinit(self) -> None:
+        self._lock = threading.Lock()
+
+    def _delivered_for(self, trace_id: int) -> Set[str]:
+        delivered = self._delivered.get(trace_id)
+        if delivered is None:
+            delivered = self._delivered[trace_id] = set()
+            if len(self._delivered) > self._max_traces:
+                self._delivered.popitem(last=False)
+        else:
+            self._delivered.move_to_end(trace_id)
+        return delivered
+
+    def _dedupe(self, span: ReadableSpan, delivered: Set[str], sending: Set[str]) -> Tuple[Optional[ReadableSpan], int]:
+        """Rewrite one span, or return None if it has nothing to deduplicate, and the characters it saves."""
+        attributes = span.attributes
+        if not attributes:
+            return None, 0
+
+        rewritten: Optional[Dict] = None
+        saved = 0
+        for key, value in attributes.items():
+            if not isinstance(value, str) or len(value) < self._min_chars:
+                continue
+            match = _PROMPT_CONTENT.match(key)
+            if match is None:
+                continue
+
+            if rewritten is None:
+                rewritten = dict(attributes)
+            digest = content_hash(value)
+            prefix = f"{SpanAttributes.LLM_PROMPTS}.{match.group(1)}"
+            if digest in delivered or digest in sending:
+                del rewritten[key]
+                rewritten[f"{prefix}.content_ref"] = digest
+                saved += len(value)
+            else:
+                rewritten[f"{prefix}.content_hash"] = digest
+                sending.add(digest)
+
+        if rewritten is None:
+            return None, 0
+        return _with_attributes(span, rewritten), saved
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        out: List[ReadableSpan] = []
+        # Bodies this batch carries, by trace; referenced freely within the batch, delivered once it succeeds
+        sending: Dict[int, Set[str]] = {}
+        saved = 0
+
+        with self._lock:
+            for span in spans:
+                if span.context is None:
+                    out.append(span)
+                    continue
+                trace_id = span.context.trace_id
+                trace_sending = sending.setdefault(trace_id, set())
+                rewritten, span_saved = self._dedupe(span, self._delivered_for(trace_id), trace_sending)
+                saved += span_saved
+                out.append(span if rewritten is None else rewritten)
+
+        result = self._exporter.export(out)
+        if result == SpanExportResult.SUCCESS:
+            with self._lock:
+                # Counted only once the references actually went out in place of their bodies
+                self.chars_saved += saved
+                for trace_id, digests in sending.items():
+                    if digests:
+                        self._delivered_for(trace_id).update(digests)
+        return result
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self._exporter.force_flush(timeout_millis)
+
+    def shutdown(self) -> None:
+        self._exporter.shutdown()
@@ -0,0 +1,314 @@
+"""
+Local span relay for multi-process deployments.
+
+Pre-fork servers and worker pools run many processes that would each keep
+their own export connections. When a relay socket is configured, the first
+process to bind it becomes the relay: it exports its own spans as usual and
+forwards the batches the other processes send it over the Unix socket. Every
+other process ships its encoded batches to the relay, and exports directly
+while no relay is reachable.
+
+Frames are a 4-byte big-endian length followed by a serialized
+`ExportTraceServiceRequest`, the same records the spill store writes.
+"""
+
+import contextlib
+import errno
+import os
+import socket
+import struct
+import threading
+from typing import Callable, Iterator, Optional, Sequence, Set
+
+from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from agentops.helpers.fork import register_after_fork
+from agentops.logging import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+# Unix domain sockets are required; other platforms export from every process
+RELAY_SUPPORTED = hasattr(socket, "AF_UNIX")
+
+_FRAME_HEADER = struct.Struct(">I")
+
+# Larger frames are treated as a corrupt stream rather than allocated
+_MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+
+@contextlib.contextmanager
+def _path_lock(path: str) -> Iterator[None]:
+    """Serialize relay takeover between processes, so a stale socket is only replaced once."""
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _connect(path: str, timeout: Optional[float]) -> Optional[socket.socket]:
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conn.settimeout(timeout)
+    try:
+        conn.connect(path)
+        return conn
+    except OSError:
+        conn.close()
+        return None
+
+
+def _recv_exact(conn: socket.socket, size: int) -> Optional[bytes]:
+    data = bytearray()
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            return None
+        data.extend(chunk)
+    return bytes(data)
+
+
+class SpanRelayServer:
+    """
+    Accepts encoded span batches on a Unix socket and forwards them.
+
+    Each connected process is served by its own daemon thread, which hands
+    every received batch to `forward`.
+    """
+
+    def __init__(self, path: str, forward: Callable[[bytes], bool]):
+        """
+        Initialize the server.
+
+        Args:
+            path: Filesystem path of the Unix socket
+            forward: Called with each received batch; returns whether it was exported
+        """
+        self.path = path
+        self._forward = forward
+        self._sock: Optional[socket.socket] = None
+        self._connections: Set[socket.socket] = set()
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self.forwarded_batches = 0
+        self.failed_batches = 0
+
+    def start(self) -> bool:
+        """
+        Bind the socket and start accepting connections.
+
+        A socket file left behind by a relay that is no longer running is replaced.
+
+        Returns:
+            False if another process is already serving on the path
+        """
+        with _path_lock(self.path):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.bind(self.path)
+            except OSError as e:
+                if e.errno != errno.EADDRINUSE:
+                    sock.close()
+                    raise
+                live = _connect(self.path, timeout=1.0)
+                if live is not None:
+                    live.close()
+                    sock.close()
+                    return False
+                os.unlink(self.path)
+                sock.bind(self.path)
+            sock.listen()
+
+        self._sock = sock
+        self._pid = os.getpid()
+        threading.Thread(target=self._accept, args=(sock,), name="agentops-span-relay", daemon=True).start()
+        return True
+
+    def _accept(self, sock: socket.socket) -> None:
+        while True:
+            try:
+                conn, _ = sock.accept()
+            except OSError:
+                return
+            with self._lock:
+                self._connections.add(conn)
+            threading.Thread(target=self._serve, args=(conn,), name="agentops-span-relay-conn", daemon=True).start()
+
+    def _serve(self, conn: socket.socket) -> None:
+        try:
+            while True:
+                header = _recv_exact(conn, _FRAME_HEADER.size)
+                if header is None:
+                    return
+                (size,) = _FRAME_HEADER.unpack(header)
+                if size > _MAX_FRAME_BYTES:
+                    logger.warning(f"Span relay received an oversized frame ({size} bytes), closing connection")
+                    return
+                payload = _recv_exact(conn, size)
+                if payload is None:
+                    return
+                try:
+                    exported = self._forward(payload)
+                except Exception as e:
+                    logger.debug(f"Error forwarding relayed spans: {e}")
+                    exported = False
+                if exported:
+                    self.forwarded_batches += 1
+                else:
+                    self.failed_batches += 1
+        except OSError:
+            return
+        finally:
+            with self._lock:
+                self._connections.discard(conn)
+            conn.close()
+
+    def stop(self) -> None:
+        """Stop accepting batches and remove the socket file."""
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            with contextlib.suppress(OSError):
+                sock.shutdown(socket.SHUT_RDWR)  # Wakes the accept thread
+            sock.close()
+            if os.getpid() == self._pid:
+                with contextlib.suppress(OSError):
+                    os.unlink(self.path)
+
+        with self._lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for conn in connections:
+            with contextlib.suppress(OSError):
+                conn.shutdown(socket.SHUT_RDWR)
+            conn.close()
+
+    def close_inherited(self) -> None:
+        """
+        Release the sockets a forked child inherited without disturbing the parent.
+
+        Closing only drops the child's descriptors; the parent keeps serving.
+        """
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        for conn in self._connections:
+            conn.close()
+        self._connections = set()
+        self._lock = threading.Lock()
+
+
+class RelaySpanExporter(SpanExporter):
+    """
+    Span exporter that shares one process's export connections with its siblings.
+
+    The wrapped exporter must provide `export_serialized`, which the relay uses
+    to send batches received from other processes. A forked child never
+    inherits the relay role; it connects to the relay like any other process.
+    """
+
+    def __init__(self, exporter: SpanExporter, path: str, timeout: float = 5.0):
+        """
+        Initialize the exporter and become the relay if no other process is.
+
+        Args:
+            exporter: Exporter used by the relay, and by any process while the relay is unreachable
+            path: Filesystem path of the relay's Unix socket
+            timeout: Seconds to wait on the relay socket before exporting directly
+        """
+        self._exporter = exporter
+        self.path = path
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._conn: Optional[socket.socket] = None
+        self._server: Optional[SpanRelayServer] = None
+        self._shutdown = False
+
+        self._become_relay()
+        register_after_fork(self._at_fork_reinit)
+
+    @property
+    def is_relay(self) -> bool:
+        """Whether this process exports on behalf of the others."""
+        return self._server is not None
+
+    def _become_relay(self) -> bool:
+        server = SpanRelayServer(self.path, self._exporter.export_serialized)  # type: ignore[attr-defined]
+        try:
+            if not server.start():
+                return False
+        except OSError as e:
+            logger.warning(f"Could not start span relay on {self.path}: {e}")
+            return False
+        self._server = server
+        logger.debug(f"Relaying spans from other processes through {self.path}")
+        return True
+
+    def _at_fork_reinit(self) -> None:
+        self._lock = threading.Lock()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self._server is not None:
+            self._server.close_inherited()
+            self._server = None
+
+    def _send(self, payload: bytes) -> bool:
+        frame = _FRAME_HEADER.pack(len(payload)) + payload
+        with self._lock:
+            # A connection the relay closed is only noticed on send, so reconnect once
+            for _ in range(2):
+                if self._conn is None:
+                    self._conn = _connect(self.path, self._timeout)
+                    if self._conn is None:
+                        return False
+                try:
+                    self._conn.sendall(frame)
+                    return True
+                except OSError:
+                    # The relay discards a partial frame, so the batch can be resent whole
+                    self._conn.close()
+                    self._conn = None
+            return False
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        """
+        Send spans to the relay, or export them directly if this process is the relay.
+
+        If the relay cannot be reached, this process takes over as the relay
+        when the previous one has exited, and exports the batch itself.
+        """
+        if self._shutdown:
+            return SpanExportResult.FAILURE
+
+        if self._server is None:
+            if self._send(encode_spans(spans).SerializePartialToString()):
+                return SpanExportResult.SUCCESS
+            if not self._become_relay():
+                logger.debug(f"Span relay at {self.path} unreachable, exporting {len(spans)} spans directly")
+
+        return self._exporter.export(spans)
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self._exporter.force_flush(timeout_millis)
+
+    def shutdown(self) -> None:
+        """Close the relay connection, stop relaying, and shut down the wrapped exporter."""
+        if self._shutdown:
+            return
+        self._shutdown = True
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        if self._server is not None:
+            self._server.stop()
+            self._server = None
+        self._exporter.shutdown()
@@ -0,0 +1,273 @@
+"""
+Upload span segments recorded by FileSpanExporter.
+
+Run `agentops-replay <directory>` (or `python -m agentops.sdk.replay`) on a
+host with network access. Segments are uploaded oldest-first through
+AuthenticatedOTLPExporter, with up to `--workers` requests in flight. The
+offset of the last record known to be uploaded is checkpointed to a file in
+the directory, so an interrupted replay resumes where it stopped. Delivery
+is at least once: records that were in flight when a replay stopped are
+uploaded again. Records the endpoint rejects with a non-retryable status are
+skipped and counted, so one bad record does not stall the rest.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, List, Optional, Tuple, Union
+
+from opentelemetry.exporter.otlp.proto.http.trace_exporter import Compression
+
+from agentops.logging import logger
+from agentops.sdk.file_export import list_segments, read_segment
+from agentops.sdk.spill import SendResult
+
+Send = Callable[[bytes], Union[SendResult, bool]]
+
+CHECKPOINT_FILE = ".replay-checkpoint.json"
+
+# Seconds between checkpoint writes while a segment is uploading
+_CHECKPOINT_INTERVAL = 1.0
+
+
+class ReplayCheckpoint:
+    """
+    Upload progress per segment, persisted as JSON next to the segments.
+
+    Maps segment file names to the offset up to which all records were
+    uploaded. Finished segments are recorded with an offset of -1.
+    """
+
+    def __init__(self, directory: str):
+        self._path = os.path.join(directory, CHECKPOINT_FILE)
+        self._offsets: Dict[str, int] = {}
+        self._saved_at = 0.0
+        try:
+            with open(self._path) as f:
+                self._offsets = {name: int(offset) for name, offset in json.load(f).items()}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable replay checkpoint {self._path}: {e}")
+
+    def offset(self, segment: str) -> int:
+        return self._offsets.get(os.path.basename(segment), 0)
+
+    def update(self, segment: str, offset: int, force: bool = False) -> None:
+        self._offsets[os.path.basename(segment)] = offset
+        if force or time.monotonic() - self._saved_at >= _CHECKPOINT_INTERVAL:
+            self.save()
+
+    def forget(self, segment: str) -> None:
+        self._offsets.pop(os.path.basename(segment), None)
+        self.save()
+
+    def save(self) -> None:
+        tmp_path = f"{self._path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._offsets, f)
+        os.replace(tmp_path, self._path)
+        self._saved_at = time.monotonic()
+
+
+def _send_result(result: Union[SendResult, bool]) -> SendResult:
+    if isinstance(result, SendResult):
+        return result
+    return SendResult.SENT if result else SendResult.RETRY
+
+
+def _with_retries(send: Send, retries: int, backoff: float) -> Callable[[bytes], SendResult]:
+    def send_with_retries(payload: bytes) -> SendResult:
+        for attempt in range(retries + 1):
+            result = _send_result(send(payload))
+            if result is not SendResult.RETRY:
+                return result
+            if attempt < retries:
+                time.sleep(backoff * 2**attempt)
+        return SendResult.RETRY
+
+    return send_with_retries
+
+
+def _replay_segment(
+    segment: str,
+    send: Callable[[bytes], SendResult],
+    executor: ThreadPoolExecutor,
+    window: int,
+    checkpoint: ReplayCheckpoint,
+) -> Tuple[int, int, bool]:
+    """
+    Upload one segment from its checkpointed offset with up to `window` records in flight.
+
+    Returns:
+        Number of records uploaded, number rejected, and whether the whole segment was processed
+    """
+    pending: Deque[Tuple["Future[SendResult]", int]] = deque()
+    uploaded = 0
+    rejected = 0
+    failed = False
+
+    def settle(block: bool) -> None:
+        # Advance the checkpoint over the settled prefix; stop at the first retryable failure
+        nonlocal uploaded, rejected, failed
+        while pending and (block or pending[0][0].done()):
+            future, end = pending.popleft()
+            if failed:
+                future.result()
+                continue
+            result = future.result()
+            if result is SendResult.RETRY:
+                failed = True
+                continue
+            if result is SendResult.REJECTED:
+                rejected += 1
+                logger.warning(f"Skipped a record of {os.path.basename(segment)} rejected by the endpoint")
+            else:
+                uploaded += 1
+            checkpoint.update(segment, end)
+
+    for payload, end in read_segment(segment, checkpoint.offset(segment)):
+        settle(block=False)
+        while len(pending) >= window and not failed:
+            pending[0][0].result()
+            settle(block=False)
+        if failed:
+            break
+        pending.append((executor.submit(send, payload), end))
+    settle(block=True)
+    return uploaded, rejected, not failed
+
+
+def replay_directory(
+    directory: str,
+    send: Send,
+    workers: int = 8,
+    retries: int = 3,
+    retry_backoff: float = 1.0,
+    delete: bool = False,
+    include_open: bool = False,
+) -> Dict[str, int]:
+    """
+    Upload all segments in a directory, resuming from its checkpoint.
+
+    Stops at the first record that still fails after `retries` retries, so
+    the next run resumes from there. Records the endpoint rejects are not
+    retried; they are skipped and counted.
+
+    Args:
+        directory: Directory written by a FileSpanExporter
+        send: Callable that uploads one serialized export request and returns a SendResult
+            (True and False are read as SENT and RETRY)
+        workers: Number of uploads in flight
+        retries: Retries per record before giving up
+        retry_backoff: Delay before the first retry, doubled for each further one
+        delete: Delete segments once they are uploaded, including those an earlier run uploaded
+        include_open: Also upload segments that were never finished
+
+    Returns:
+        Counts of `segments` completed, `records` uploaded, `rejected` records and `failed` segments (0 or 1)
+    """
+    checkpoint = ReplayCheckpoint(directory)
+    send_with_retries = _with_retries(send, retries, retry_backoff)
+    result = {"segments": 0, "records": 0, "rejected": 0, "failed": 0}
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="agentops-replay") as executor:
+        for segment in list_segments(directory, include_open=include_open):
+            if checkpoint.offset(segment) < 0:
+                # Uploaded by an earlier run that kept its segments
+                if delete:
+                    os.remove(segment)
+                    checkpoint.forget(segment)
+                continue
+            uploaded, rejected, complete = _replay_segment(
+                segment, send_with_retries, executor, 2 * max(workers, 1), checkpoint
+            )
+            result["records"] += uploaded
+            result["rejected"] += rejected
+            if not complete:
+                checkpoint.save()
+                result["failed"] = 1
+                logger.warning(f"Stopped replaying at {os.path.basename(segment)}; rerun to resume")
+                break
+
+            result["segments"] += 1
+            if delete:
+                os.remove(segment)
+                checkpoint.forget(segment)
+            else:
+                checkpoint.update(segment, -1, force=True)
+    return result
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="agentops-replay", description="Upload span segments recorded with file_export_directory to AgentOps."
+    )
+    parser.add_argument("directory", help="Directory holding the span segments")
+    parser.add_argument("--api-key", default=os.getenv("AGENTOPS_API_KEY"), help="Defaults to $AGENTOPS_API_KEY")
+    parser.add_argument(
+        "--endpoint",
+        default=os.getenv("AGENTOPS_API_ENDPOINT", "https://api.agentops.ai"),
+        help="AgentOps API endpoint used to authenticate",
+    )
+    parser.add_argument(
+        "--exporter-endpoint",
+        default=os.getenv("AGENTOPS_EXPORTER_ENDPOINT", "https://otlp.agentops.ai/v1/traces"),
+        help="OTLP endpoint the spans are uploaded to",
+    )
+    parser.add_argument("--workers", type=int, default=8, help="Number of uploads in flight")
+    parser.add_argument("--retries", type=int, default=3, help="Retries per batch before stopping")
+    parser.add_argument("--delete", action="store_true", help="Delete segments once uploaded")
+    parser.add_argument("--include-open", action="store_true", help="Also upload unfinished segments")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point of `agentops-replay`."""
+    args = _parse_args(argv)
+    if not args.api_key:
+        print("agentops-replay: an API key is required (--api-key or AGENTOPS_API_KEY)", file=sys.stderr)
+        return 2
+
+    # Imported here: the client import chain is only needed once there is something to upload
+    from agentops.client.api.versions.v3 import V3Client
+    from agentops.client.auth import TokenManager
+    from agentops.sdk.exporters import AuthenticatedOTLPExporter
+
+    api = V3Client(args.endpoint)
+    token_manager = TokenManager(lambda: api.fetch_auth_token(args.api_key))
+    if not token_manager.refresh().result(timeout=60):
+        print("agentops-replay: authentication failed", file=sys.stderr)
+        return 2
+
+    exporter = AuthenticatedOTLPExporter(
+        endpoint=args.exporter_endpoint,
+        jwt_provider=token_manager.get_token,
+        compression=Compression.Gzip,
+        pool_maxsize=args.workers,
+    )
+    try:
+        result = replay_directory(
+            args.directory,
+            exporter.send_serialized,
+            workers=args.workers,
+            retries=args.retries,
+            delete=args.delete,
+            include_open=args.include_open,
+        )
+    finally:
+        exporter.shutdown()
+        token_manager.close()
+
+    print(f"Uploaded {result['records']} batches from {result['segments']} segments")
+    if result["rejected"]:
+        print(f"Skipped {result['rejected']} batches rejected by the endpoint", file=sys.stderr)
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
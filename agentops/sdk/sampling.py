@@ -0,0 +1,286 @@
+"""
+Head and tail sampling for AgentOps SDK.
+
+Head sampling decides when a trace starts, from the trace ID and the AgentOps
+span kind of its root span, and is cheap because unsampled spans are never
+recorded. Tail sampling holds on to every span of a trace until its root span
+ends, so it can keep traces by what actually happened: errors, latency, cost
+and token usage.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.sdk.trace.sampling import ParentBased, Sampler, SamplingResult, TraceIdRatioBased
+from opentelemetry.trace import Link, SpanKind, StatusCode
+from opentelemetry.trace.span import TraceState
+from opentelemetry.util.types import Attributes
+
+from agentops.helpers.fork import register_after_fork
+from agentops.logging import logger
+from agentops.semconv import SpanAttributes
+
+# Decisions remembered per buffered trace slot, so spans ending after their trace was decided follow it
+_DECISIONS_PER_TRACE = 4
+
+
+class SpanKindRatioSampler(Sampler):
+    """
+    Samples new traces by ratio, with per-kind overrides.
+
+    The kind is read from the `agentops.span.kind` attribute the root span is
+    started with. Decisions are derived from the trace ID, so every process
+    handling a trace comes to the same decision.
+    """
+
+    def __init__(self, ratio: float = 1.0, ratios_by_kind: Optional[Dict[str, float]] = None):
+        """
+        Initialize the sampler.
+
+        Args:
+            ratio: Fraction of traces to sample when the root span's kind has no override
+            ratios_by_kind: Fraction of traces to sample by AgentOps span kind
+        """
+        self._default = TraceIdRatioBased(ratio)
+        self._by_kind = {kind: TraceIdRatioBased(kind_ratio) for kind, kind_ratio in (ratios_by_kind or {}).items()}
+
+    def should_sample(
+        self,
+        parent_context: Optional[Context],
+        trace_id: int,
+        name: str,
+        kind: Optional[SpanKind] = None,
+        attributes: Attributes = None,
+        links: Optional[Sequence[Link]] = None,
+        trace_state: Optional[TraceState] = None,
+    ) -> SamplingResult:
+        sampler = self._default
+        if self._by_kind and attributes:
+            sampler = self._by_kind.get(attributes.get(SpanAttributes.AGENTOPS_SPAN_KIND), self._default)  # type: ignore[arg-type]
+        return sampler.should_sample(parent_context, trace_id, name, kind, attributes, links, trace_state)
+
+    def get_description(self) -> str:
+        kinds = ",".join(f"{kind}={sampler.rate}" for kind, sampler in self._by_kind.items())
+        return f"SpanKindRatioSampler{{{self._default.rate}{',' if kinds else ''}{kinds}}}"
+
+
+def create_head_sampler(ratio: float = 1.0, ratios_by_kind: Optional[Dict[str, float]] = None) -> Optional[Sampler]:
+    """
+    Build the head sampler for the tracer provider.
+
+    Child spans follow their parent's decision so traces are never partially
+    sampled; only root spans are sampled by ratio.
+
+    Args:
+        ratio: Fraction of new traces to sample
+        ratios_by_kind: Fraction of new traces to sample by the root span's AgentOps span kind
+
+    Returns:
+        The sampler, or None if everything is sampled and the provider default applies
+    """
+    if ratio >= 1.0 and all(kind_ratio >= 1.0 for kind_ratio in (ratios_by_kind or {}).values()):
+        return None
+    return ParentBased(root=SpanKindRatioSampler(ratio, ratios_by_kind))
+
+
+class _PendingTrace:
+    """Spans of a trace awaiting a tail sampling decision, with running totals for the keep rules."""
+
+    __slots__ = ("spans", "error", "cost", "tokens", "start", "end")
+
+    def __init__(self) -> None:
+        self.spans: List[ReadableSpan] = []
+        self.error = False
+        self.cost = 0.0
+        self.tokens = 0
+        self.start: Optional[int] = None
+        self.end: Optional[int] = None
+
+    def add(self, span: ReadableSpan) -> None:
+        self.spans.append(span)
+
+        if span.status.status_code is StatusCode.ERROR:
+            self.error = True
+        if span.start_time is not None and (self.start is None or span.start_time < self.start):
+            self.start = span.start_time
+        if span.end_time is not None and (self.end is None or span.end_time > self.end):
+            self.end = span.end_time
+
+        attributes = span.attributes or {}
+        cost = attributes.get(SpanAttributes.LLM_USAGE_TOOL_COST)
+        if isinstance(cost, (int, float)):
+            self.cost += cost
+        tokens = attributes.get(SpanAttributes.LLM_USAGE_TOTAL_TOKENS)
+        if not isinstance(tokens, int):
+            prompt = attributes.get(SpanAttributes.LLM_USAGE_PROMPT_TOKENS)
+            completion = attributes.get(SpanAttributes.LLM_USAGE_COMPLETION_TOKENS)
+            tokens = (prompt if isinstance(prompt, int) else 0) + (completion if isinstance(completion, int) else 0)
+        self.tokens += tokens
+
+    @property
+    def duration_ms(self) -> float:
+        if self.start is None or self.end is None:
+            return 0.0
+        return (self.end - self.start) / 1e6
+
+
+class TailSamplingSpanProcessor(SpanProcessor):
+    """
+    Buffers each trace until its root span ends, then forwards it or drops it.
+
+    A trace is kept if any span errored, if it ran for at least `latency_ms`,
+    or if the cost or token usage recorded on its spans reaches `min_cost` or
+    `min_tokens`. Other traces are kept at `ratio`, decided from the trace ID.
+
+    Memory is bounded: when more than `max_traces` traces are buffered, the
+    oldest is decided early on the spans seen so far, and a trace reaching
+    `max_spans_per_trace` spans is decided early too. Spans ending after their
+    trace was decided follow that decision.
+    """
+
+    def __init__(
+        self,
+        span_processor: SpanProcessor,
+        ratio: float = 1.0,
+        latency_ms: Optional[float] = None,
+        min_cost: Optional[float] = None,
+        min_tokens: Optional[int] = None,
+        max_traces: int = 1000,
+        max_spans_per_trace: int = 1000,
+    ):
+        """
+        Initialize the processor.
+
+        Args:
+            span_processor: Processor receiving the spans of kept traces
+            ratio: Fraction of traces kept when no keep rule matches
+            latency_ms: Keep traces running at least this long
+            min_cost: Keep traces whose spans' recorded cost adds up to at least this much
+            min_tokens: Keep traces whose spans used at least this many tokens
+            max_traces: Maximum number of traces buffered at once
+            max_spans_per_trace: Maximum number of spans buffered for one trace
+        """
+        self._processor = span_processor
+        self._ratio_bound = TraceIdRatioBased.get_bound_for_rate(ratio)
+        self._latency_ms = latency_ms
+        self._min_cost = min_cost
+        self._min_tokens = min_tokens
+        self._max_traces = max(max_traces, 1)
+        self._max_spans_per_trace = max(max_spans_per_trace, 1)
+
+        self._lock = threading.Lock()
+        self._pending: "OrderedDict[int, _PendingTrace]" = OrderedDict()
+        self._decided: "OrderedDict[int, bool]" = OrderedDict()
+
+        self.kept_traces = 0
+        self.dropped_traces = 0
+
+        register_after_fork(self._at_fork_reinit)
+
+    def _at_fork_reinit(self) -> None:
+        """Forget traces buffered in the parent process; the parent decides them."""
+        self._lock = threading.Lock()
+        self._pending = OrderedDict()
+        self._decided = OrderedDict()
+
+    @property
+    def buffered_traces(self) -> int:
+        """Number of traces awaiting a decision."""
+        return len(self._pending)
+
+    def stats(self) -> Dict[str, int]:
+        """Get kept, dropped and buffered trace counts."""
+        return {
+            "kept_traces": self.kept_traces,
+            "dropped_traces": self.dropped_traces,
+            "buffered_traces": self.buffered_traces,
+        }
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+        self._processor.on_start(span, parent_context=parent_context)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if span.context is None:
+            return
+        trace_id = span.context.trace_id
+
+        with self._lock:
+            decision = self._decided.get(trace_id)
+            if decision is None:
+                released = self._buffer(trace_id, span)
+            else:
+                released = [span] if decision else []
+
+        for released_span in released:
+            self._processor.on_end(released_span)
+
+    def _buffer(self, trace_id: int, span: ReadableSpan) -> List[ReadableSpan]:
+        released: List[ReadableSpan] = []
+
+        pending = self._pending.get(trace_id)
+        if pending is None:
+            while len(self._pending) >= self._max_traces:
+                oldest_id, oldest = self._pending.popitem(last=False)
+                logger.debug(f"Tail sampling buffer full, deciding trace {oldest_id:032x} early")
+                released.extend(self._decide(oldest_id, oldest))
+            pending = self._pending[trace_id] = _PendingTrace()
+        pending.add(span)
+
+        # A span without a local parent is the trace's root in this process
+        if span.parent is None or span.parent.is_remote or len(pending.spans) >= self._max_spans_per_trace:
+            del self._pending[trace_id]
+            released.extend(self._decide(trace_id, pending))
+        return released
+
+    def _decide(self, trace_id: int, pending: _PendingTrace) -> List[ReadableSpan]:
+        keep, reason = self._should_keep(trace_id, pending)
+
+        self._decided[trace_id] = keep
+        while len(self._decided) > self._max_traces * _DECISIONS_PER_TRACE:
+            self._decided.popitem(last=False)
+
+        if keep:
+            self.kept_traces += 1
+            return pending.spans
+        self.dropped_traces += 1
+        logger.debug(f"Tail sampling dropped trace {trace_id:032x} ({len(pending.spans)} spans, {reason})")
+        return []
+
+    def _should_keep(self, trace_id: int, pending: _PendingTrace) -> Tuple[bool, str]:
+        if pending.error:
+            return True, "error"
+        if self._latency_ms is not None and pending.duration_ms >= self._latency_ms:
+            return True, "latency"
+        if self._min_cost is not None and pending.cost >= self._min_cost:
+            return True, "cost"
+        if self._min_tokens is not None and pending.tokens >= self._min_tokens:
+            return True, "tokens"
+        if trace_id & TraceIdRatioBased.TRACE_ID_LIMIT < self._ratio_bound:
+            return True, "ratio"
+        return False, "no keep rule matched"
+
+    def _decide_all(self) -> None:
+        with self._lock:
+            released: List[ReadableSpan] = []
+            while self._pending:
+                trace_id, pending = self._pending.popitem(last=False)
+                released.extend(self._decide(trace_id, pending))
+        for span in released:
+            self._processor.on_end(span)
+
+    def shutdown(self) -> None:
+        """Decide all buffered traces, then shut down the downstream processor."""
+        self._decide_all()
+        self._processor.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        """
+        Flush the downstream processor.
+
+        Buffered traces stay buffered: their root span has not ended yet, so
+        deciding them now could drop a trace that is about to fail.
+        """
+        return self._processor.force_flush(timeout_millis)
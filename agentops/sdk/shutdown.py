@@ -0,0 +1,87 @@
+"""
+Concurrent shutdown of the telemetry pipelines under one deadline.
+
+At exit every pipeline (spans, metrics, captured logs) has its own flush and
+shutdown, each of which can wait on the network. Run one after another, slow
+pipelines add up past a container's termination grace period.
+`run_until_deadline` starts each pipeline's shutdown on its own daemon
+thread, hands it the time left before a shared deadline and returns once all
+of them finished or the deadline passed. Shutdowns still running then are
+reported as timed out and abandoned; as daemon threads they do not hold up
+interpreter exit.
+
+Where no thread can be started (Python 3.12+ refuses new threads in atexit
+handlers) the steps run inline, one after another, each handed only the time
+left after the ones before it. Steps reached after the deadline are skipped
+and reported as timed out, so the steps themselves must honour the budget
+they are given rather than block on a default timeout.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from agentops.logging import logger
+
+# Shuts down one pipeline given the milliseconds left, returning whether everything was flushed
+ShutdownStep = Callable[[int], bool]
+
+
+def _remaining_millis(deadline: float) -> int:
+    return max(int((deadline - time.monotonic()) * 1000), 0)
+
+
+def run_until_deadline(steps: Dict[str, ShutdownStep], timeout_millis: int) -> Dict[str, Any]:
+    """
+    Run shutdown steps concurrently, waiting at most `timeout_millis` for all of them.
+
+    Args:
+        steps: Shutdown step of each pipeline by name. Each is called with the
+            milliseconds left before the deadline.
+        timeout_millis: Deadline for all steps together
+
+    Returns:
+        Names of the steps that `completed`, that `failed` (returned False or
+        raised) and that were still running at the deadline (`timed_out`), and
+        the `elapsed_ms`
+    """
+    started = time.monotonic()
+    deadline = started + timeout_millis / 1000
+    results: Dict[str, bool] = {}
+
+    def run(name: str, step: ShutdownStep) -> None:
+        try:
+            results[name] = step(_remaining_millis(deadline)) is not False
+        except Exception as e:
+            logger.warning(f"Error shutting down {name}: {e}")
+            results[name] = False
+
+    threads: List[Tuple[str, threading.Thread]] = []
+    inline = False
+    for name, step in steps.items():
+        if not inline:
+            thread = threading.Thread(target=run, args=(name, step), name=f"agentops-shutdown-{name}", daemon=True)
+            try:
+                thread.start()
+                threads.append((name, thread))
+                continue
+            except RuntimeError:
+                # No new threads late in interpreter finalization; run the rest inline
+                inline = True
+        if _remaining_millis(deadline) <= 0:
+            continue  # Reported as timed out below
+        run(name, step)
+
+    for _, thread in threads:
+        thread.join(_remaining_millis(deadline) / 1000)
+
+    report: Dict[str, Any] = {"completed": [], "failed": [], "timed_out": []}
+    for name in steps:
+        if name not in results:
+            report["timed_out"].append(name)
+        elif results[name]:
+            report["completed"].append(name)
+        else:
+            report["failed"].append(name)
+    report["elapsed_ms"] = int((time.monotonic() - started) * 1000)
+    return report
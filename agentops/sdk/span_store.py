@@ -0,0 +1,305 @@
+"""
+In-process span store for tests and offline analysis.
+
+SpanStore is a span exporter that keeps finished spans in memory instead of
+sending them anywhere. Spans are held column by column, with the fields that
+queries filter and aggregate on (ids, timestamps, token usage, cost) in typed
+arrays, and indexed by trace, parent span, AgentOps span kind and model. Its
+query API answers the same questions as the trace and metrics endpoints of
+the AgentOps API, so instrumentation can be checked locally without network.
+
+Retention is bounded by whole traces: once the store holds more than
+`max_spans` spans, the traces seen first are dropped.
+"""
+
+import sys
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from agentops.semconv import SpanAttributes
+
+TraceId = Union[int, str]
+
+
+def _trace_key(trace_id: TraceId) -> int:
+    return trace_id if isinstance(trace_id, int) else int(trace_id, 16)
+
+
+def _int_attribute(attributes: Any, key: str) -> int:
+    value = attributes.get(key)
+    return value if isinstance(value, int) and not isinstance(value, bool) else 0
+
+
+def _interned(value: Any) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else None
+
+
+class SpanStore(SpanExporter):
+    """
+    Span exporter keeping finished spans in indexed, columnar form.
+
+    Query by trace with `spans`, `span_tree` and `trace_metrics`, or across
+    traces by parent span, span kind and model. Trace ids are accepted as
+    integers or 32-character hex strings, and returned as hex strings.
+    """
+
+    def __init__(self, max_spans: int = 10000):
+        """
+        Initialize the store.
+
+        Args:
+            max_spans: Number of spans retained before the oldest traces are dropped
+        """
+        self._max_spans = max(max_spans, 1)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        # Fixed-width columns
+        self._span_ids = array("Q")
+        self._parent_ids = array("Q")  # 0 for root spans
+        self._start_times = array("q")
+        self._end_times = array("q")
+        self._prompt_tokens = array("q")
+        self._completion_tokens = array("q")
+        self._total_tokens = array("q")
+        self._costs = array("d")
+        # Object columns; a None trace id marks an evicted row
+        self._trace_ids: List[Optional[int]] = []
+        self._names: List[str] = []
+        self._kinds: List[Optional[str]] = []
+        self._models: List[Optional[str]] = []
+        self._status_codes: List[str] = []
+        self._attributes: List[Any] = []
+        # Indexes from value to row numbers; _by_trace is ordered by first appearance
+        self._by_trace: Dict[int, List[int]] = {}
+        self._by_parent: Dict[int, List[int]] = {}
+        self._by_kind: Dict[str, List[int]] = {}
+        self._by_model: Dict[str, List[int]] = {}
+        self._live = 0
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        with self._lock:
+            for span in spans:
+                self._append(span)
+            while self._live > self._max_spans:
+                self._evict_oldest_trace()
+            if len(self._trace_ids) > 2 * self._live + 1024:
+                self._compact()
+        return SpanExportResult.SUCCESS
+
+    def _append(self, span: ReadableSpan) -> None:
+        context = span.context
+        if context is None:
+            return
+        attributes = span.attributes or {}
+        row = len(self._trace_ids)
+        parent_id = span.parent.span_id if span.parent is not None else 0
+        kind = _interned(attributes.get(SpanAttributes.AGENTOPS_SPAN_KIND))
+        model = _interned(
+            attributes.get(SpanAttributes.LLM_RESPONSE_MODEL) or attributes.get(SpanAttributes.LLM_REQUEST_MODEL)
+        )
+        prompt_tokens = _int_attribute(attributes, SpanAttributes.LLM_USAGE_PROMPT_TOKENS)
+        completion_tokens = _int_attribute(attributes, SpanAttributes.LLM_USAGE_COMPLETION_TOKENS)
+        total_tokens = _int_attribute(attributes, SpanAttributes.LLM_USAGE_TOTAL_TOKENS)
+        cost = attributes.get(SpanAttributes.LLM_USAGE_TOOL_COST)
+
+        self._span_ids.append(context.span_id)
+        self._parent_ids.append(parent_id)
+        self._start_times.append(span.start_time or 0)
+        self._end_times.append(span.end_time or 0)
+        self._prompt_tokens.append(prompt_tokens)
+        self._completion_tokens.append(completion_tokens)
+        self._total_tokens.append(total_tokens or prompt_tokens + completion_tokens)
+        self._costs.append(float(cost) if isinstance(cost, (int, float)) else 0.0)
+        self._trace_ids.append(context.trace_id)
+        self._names.append(sys.intern(span.name))
+        self._kinds.append(kind)
+        self._models.append(model)
+        self._status_codes.append(span.status.status_code.name)
+        # Span attributes are immutable once the span has ended, so they are kept without copying
+        self._attributes.append(attributes)
+
+        self._by_trace.setdefault(context.trace_id, []).append(row)
+        if parent_id:
+            self._by_parent.setdefault(parent_id, []).append(row)
+        if kind is not None:
+            self._by_kind.setdefault(kind, []).append(row)
+        if model is not None:
+            self._by_model.setdefault(model, []).append(row)
+        self._live += 1
+
+    def _evict_oldest_trace(self) -> None:
+        trace_id = next(iter(self._by_trace))
+        rows = self._by_trace.pop(trace_id)
+        for row in rows:
+            self._trace_ids[row] = None
+            self._attributes[row] = None
+        self._live -= len(rows)
+
+    def _compact(self) -> None:
+        """Drop evicted rows and rebuild the indexes."""
+        rows = [row for row, trace_id in enumerate(self._trace_ids) if trace_id is not None]
+        columns = (
+            "_span_ids",
+            "_parent_ids",
+            "_start_times",
+            "_end_times",
+            "_prompt_tokens",
+            "_completion_tokens",
+            "_total_tokens",
+            "_costs",
+            "_trace_ids",
+            "_names",
+            "_kinds",
+            "_models",
+            "_status_codes",
+            "_attributes",
+        )
+        old = {name: getattr(self, name) for name in columns}
+        self._reset()
+        for name in columns:
+            column = old[name]
+            values = [column[row] for row in rows]
+            setattr(self, name, array(column.typecode, values) if isinstance(column, array) else values)
+        for row in range(len(rows)):
+            self._by_trace.setdefault(self._trace_ids[row], []).append(row)  # type: ignore[arg-type]
+            if self._parent_ids[row]:
+                self._by_parent.setdefault(self._parent_ids[row], []).append(row)
+            if self._kinds[row] is not None:
+                self._by_kind.setdefault(self._kinds[row], []).append(row)  # type: ignore[arg-type]
+            if self._models[row] is not None:
+                self._by_model.setdefault(self._models[row], []).append(row)  # type: ignore[arg-type]
+        self._live = len(rows)
+
+    def shutdown(self) -> None:
+        # Spans stay queryable after the tracer shuts down
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+    def clear(self) -> None:
+        """Drop all stored spans."""
+        with self._lock:
+            self._reset()
+
+    def __len__(self) -> int:
+        return self._live
+
+    def _row_dict(self, row: int) -> Dict[str, Any]:
+        parent_id = self._parent_ids[row]
+        start, end = self._start_times[row], self._end_times[row]
+        return {
+            "trace_id": format(self._trace_ids[row], "032x"),  # type: ignore[arg-type]
+            "span_id": format(self._span_ids[row], "016x"),
+            "parent_span_id": format(parent_id, "016x") if parent_id else None,
+            "span_name": self._names[row],
+            "span_kind": self._kinds[row],
+            "model": self._models[row],
+            "status_code": self._status_codes[row],
+            "start_time": start,
+            "end_time": end,
+            "duration_ms": (end - start) / 1e6,
+            "span_attributes": dict(self._attributes[row]),
+        }
+
+    def _match(
+        self,
+        trace_id: Optional[TraceId],
+        parent_span_id: Optional[Union[int, str]],
+        kind: Optional[str],
+        model: Optional[str],
+    ) -> List[int]:
+        candidates: List[Iterable[int]] = []
+        if trace_id is not None:
+            candidates.append(self._by_trace.get(_trace_key(trace_id), []))
+        if parent_span_id is not None:
+            key = parent_span_id if isinstance(parent_span_id, int) else int(parent_span_id, 16)
+            candidates.append(self._by_parent.get(key, []))
+        if kind is not None:
+            candidates.append(self._by_kind.get(kind, []))
+        if model is not None:
+            candidates.append(self._by_model.get(model, []))
+        if not candidates:
+            return sorted(row for rows in self._by_trace.values() for row in rows)
+
+        # Walk the smallest index and check the others against it
+        candidates.sort(key=len)  # type: ignore[arg-type]
+        rows = [row for row in candidates[0] if self._trace_ids[row] is not None]
+        for other in candidates[1:]:
+            allowed = set(other)
+            rows = [row for row in rows if row in allowed]
+        return rows
+
+    def trace_ids(self) -> List[str]:
+        """Get the ids of the stored traces, oldest first."""
+        with self._lock:
+            return [format(trace_id, "032x") for trace_id in self._by_trace]
+
+    def spans(
+        self,
+        trace_id: Optional[TraceId] = None,
+        parent_span_id: Optional[Union[int, str]] = None,
+        kind: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the stored spans matching all of the given filters, in the order they ended.
+
+        Args:
+            trace_id: Only spans of this trace
+            parent_span_id: Only direct children of this span
+            kind: Only spans with this AgentOps span kind (e.g. 'llm', 'tool')
+            model: Only spans for this model
+
+        Returns:
+            Span dictionaries with the fields of the AgentOps API trace endpoint
+            (`span_name`, `span_attributes`, ...) plus `span_kind` and `model`.
+        """
+        with self._lock:
+            return [self._row_dict(row) for row in self._match(trace_id, parent_span_id, kind, model)]
+
+    def span_tree(self, trace_id: TraceId) -> List[Dict[str, Any]]:
+        """
+        Get the spans of a trace nested under their parents.
+
+        Returns:
+            The trace's root spans, each with its child spans under `children`,
+            ordered by start time. Spans whose parent is not stored are roots.
+        """
+        with self._lock:
+            rows = sorted(self._by_trace.get(_trace_key(trace_id), []), key=lambda row: self._start_times[row])
+            nodes = {self._span_ids[row]: dict(self._row_dict(row), children=[]) for row in rows}
+            roots = []
+            for row in rows:
+                parent = nodes.get(self._parent_ids[row])
+                node = nodes[self._span_ids[row]]
+                (parent["children"] if parent is not None else roots).append(node)
+            return roots
+
+    def trace_metrics(self, trace_id: TraceId) -> Dict[str, Any]:
+        """
+        Roll up token usage and cost for a trace.
+
+        Returns:
+            Totals with the fields of the AgentOps API metrics endpoint
+            (`prompt_tokens`, `completion_tokens`, `total_tokens`, `total_cost`),
+            plus `span_count`, `llm_span_count` and the models used.
+        """
+        with self._lock:
+            rows = self._by_trace.get(_trace_key(trace_id), [])
+            models = {self._models[row] for row in rows if self._models[row] is not None}
+            return {
+                "span_count": len(rows),
+                "llm_span_count": sum(1 for row in rows if self._kinds[row] == "llm"),
+                "prompt_tokens": sum(self._prompt_tokens[row] for row in rows),
+                "completion_tokens": sum(self._completion_tokens[row] for row in rows),
+                "total_tokens": sum(self._total_tokens[row] for row in rows),
+                "total_cost": sum(self._costs[row] for row in rows),
+                "models": sorted(models),  # type: ignore[type-var]
+            }
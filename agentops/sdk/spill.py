@@ -0,0 +1,279 @@
+"""
+Durable disk spill queue for span export.
+
+When the AgentOps backend is unreachable, or the exporter is backing off after an
+authentication failure, encoded OTLP batches are appended to segment files on disk
+instead of being dropped. A background replayer drains the segments oldest-first
+once exports succeed again. Batches the backend rejects outright (a 4xx other
+than 408/429 or an auth failure) are never spilled, and are dropped when found
+during replay so they cannot block the batches behind them.
+
+Segment format: a sequence of records, each a 4-byte big-endian length followed by
+the serialized `ExportTraceServiceRequest` payload.
+"""
+
+import os
+import struct
+import threading
+from enum import Enum
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+from agentops.logging import logger
+
+_RECORD_HEADER = struct.Struct(">I")
+_SEGMENT_PREFIX = "segment-"
+_SEGMENT_SUFFIX = ".otlp"
+
+
+class SendResult(Enum):
+    """Outcome of sending one stored batch."""
+
+    SENT = "sent"
+    RETRY = "retry"  # Transient failure: keep the batch and try again later
+    REJECTED = "rejected"  # The endpoint will never accept the batch: drop it
+
+
+def is_retryable_status(status_code: Optional[int]) -> bool:
+    """
+    Whether a failed export is worth retrying.
+
+    Args:
+        status_code: HTTP status of the response, or None if no response was received.
+    """
+    return status_code is None or status_code in (401, 403, 408, 429) or status_code >= 500
+
+
+class SpillStore:
+    """
+    Append-only, size-capped store of encoded OTLP batches.
+
+    Batches are written to the newest segment file; once it reaches
+    `segment_max_bytes` a new segment is started. When the total size exceeds
+    `max_bytes`, whole segments are evicted oldest-first.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024, segment_max_bytes: Optional[int] = None):
+        """
+        Initialize the spill store.
+
+        Args:
+            directory: Directory holding the segment files. Created if missing.
+            max_bytes: Upper bound on the total size of all segments.
+            segment_max_bytes: Size at which a segment is sealed. Defaults to an eighth of `max_bytes`.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_max_bytes = segment_max_bytes or max(max_bytes // 8, 1)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {"spilled": 0, "replayed": 0, "evicted": 0, "rejected": 0}
+
+        os.makedirs(directory, exist_ok=True)
+        self._segments: List[str] = self._discover_segments()
+        self._next_seq = self._segment_seq(self._segments[-1]) + 1 if self._segments else 0
+
+    def _discover_segments(self) -> List[str]:
+        """Find segments left over from a previous run, oldest first."""
+        names = [n for n in os.listdir(self.directory) if n.startswith(_SEGMENT_PREFIX) and n.endswith(_SEGMENT_SUFFIX)]
+        return [os.path.join(self.directory, n) for n in sorted(names, key=self._segment_seq)]
+
+    @staticmethod
+    def _segment_seq(path: str) -> int:
+        name = os.path.basename(path)
+        try:
+            return int(name[len(_SEGMENT_PREFIX) : -len(_SEGMENT_SUFFIX)])
+        except ValueError:
+            return -1
+
+    def _new_segment_path(self) -> str:
+        path = os.path.join(self.directory, f"{_SEGMENT_PREFIX}{self._next_seq:012d}{_SEGMENT_SUFFIX}")
+        self._next_seq += 1
+        return path
+
+    @staticmethod
+    def _size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def _total_bytes(self) -> int:
+        return sum(self._size(p) for p in self._segments)
+
+    def append(self, payload: bytes) -> None:
+        """
+        Append an encoded batch to the newest segment.
+
+        Args:
+            payload: Serialized OTLP export request.
+        """
+        record = _RECORD_HEADER.pack(len(payload)) + payload
+        with self._lock:
+            if not self._segments or self._size(self._segments[-1]) + len(record) > self.segment_max_bytes:
+                self._segments.append(self._new_segment_path())
+
+            with open(self._segments[-1], "ab") as f:
+                f.write(record)
+            self._counters["spilled"] += 1
+
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop the oldest segments until the store fits within `max_bytes`. Caller holds the lock."""
+        while len(self._segments) > 1 and self._total_bytes() > self.max_bytes:
+            oldest = self._segments.pop(0)
+            evicted = sum(1 for _ in self._read_records(oldest))
+            try:
+                os.remove(oldest)
+            except OSError as e:
+                logger.debug(f"Failed to remove spill segment {oldest}: {e}")
+            self._counters["evicted"] += evicted
+            logger.warning(f"Spill store over {self.max_bytes} bytes, evicted {evicted} oldest batches")
+
+    @staticmethod
+    def _read_records(path: str) -> Iterator[bytes]:
+        """Yield the payloads stored in a segment, stopping at a torn trailing record."""
+        try:
+            with open(path, "rb") as f:
+                while True:
+                    header = f.read(_RECORD_HEADER.size)
+                    if len(header) < _RECORD_HEADER.size:
+                        return
+                    (length,) = _RECORD_HEADER.unpack(header)
+                    payload = f.read(length)
+                    if len(payload) < length:
+                        return
+                    yield payload
+        except OSError:
+            return
+
+    def drain(self, send: Callable[[bytes], Union[SendResult, bool]]) -> bool:
+        """
+        Replay stored batches oldest-first until the store is empty or a send fails.
+
+        Batches the endpoint rejects are dropped and counted, and the drain
+        moves on to the next one.
+
+        Args:
+            send: Callable that exports one payload and returns a SendResult (True and False
+                are read as SENT and RETRY).
+
+        Returns:
+            True if the store is empty afterwards, False if a send failed.
+        """
+        while True:
+            with self._lock:
+                if not self._segments:
+                    return True
+                segment = self._segments[0]
+                # Seal the segment so new batches go to a fresh file while we replay this one
+                if len(self._segments) == 1:
+                    self._segments.append(self._new_segment_path())
+
+            records = list(self._read_records(segment))
+            for index, payload in enumerate(records):
+                result = send(payload)
+                if result is SendResult.REJECTED:
+                    logger.warning("Dropped a spilled span batch the endpoint rejected")
+                    with self._lock:
+                        self._counters["rejected"] += 1
+                    continue
+                if result is not SendResult.SENT and result is not True:
+                    self._rewrite(segment, records[index:])
+                    return False
+                with self._lock:
+                    self._counters["replayed"] += 1
+
+            with self._lock:
+                if segment in self._segments:
+                    self._segments.remove(segment)
+                if self._segments and self._size(self._segments[-1]) == 0:
+                    # Drop the empty segment created when sealing
+                    self._segments.pop()
+            try:
+                os.remove(segment)
+            except OSError:
+                pass
+
+    def _rewrite(self, segment: str, remaining: List[bytes]) -> None:
+        """Atomically replace a segment with its not-yet-replayed records."""
+        with self._lock:
+            if segment not in self._segments:
+                # Evicted while we were replaying it
+                return
+        tmp_path = f"{segment}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                for payload in remaining:
+                    f.write(_RECORD_HEADER.pack(len(payload)) + payload)
+            os.replace(tmp_path, segment)
+        except OSError as e:
+            logger.warning(f"Failed to rewrite spill segment {segment}: {e}")
+
+    def is_empty(self) -> bool:
+        """Whether there are no batches waiting to be replayed."""
+        with self._lock:
+            return self._total_bytes() == 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the spill counters.
+
+        Returns:
+            Dictionary with `spilled`, `replayed`, `evicted` and `rejected` batch counts and the current
+            `bytes` on disk.
+        """
+        with self._lock:
+            return {**self._counters, "bytes": self._total_bytes()}
+
+
+class SpillReplayer:
+    """
+    Background thread that drains a SpillStore with exponential backoff.
+
+    The replayer sleeps until notified (typically after a successful live export)
+    or until the current backoff delay elapses, then attempts a drain.
+    """
+
+    def __init__(
+        self,
+        store: SpillStore,
+        send: Callable[[bytes], Union[SendResult, bool]],
+        initial_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ):
+        self._store = store
+        self._send = send
+        self._initial_backoff = initial_backoff
+        self._max_backoff = max_backoff
+        self._backoff = initial_backoff
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="agentops-spill-replayer", daemon=True)
+        self._thread.start()
+
+    def notify(self) -> None:
+        """Wake the replayer, resetting its backoff."""
+        self._backoff = self._initial_backoff
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self._backoff)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                return
+            if self._store.is_empty():
+                self._backoff = self._max_backoff
+                continue
+            try:
+                drained = self._store.drain(self._send)
+            except Exception as e:
+                logger.warning(f"Error replaying spilled spans: {e}")
+                drained = False
+            self._backoff = self._initial_backoff if drained else min(self._backoff * 2, self._max_backoff)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the replayer thread."""
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
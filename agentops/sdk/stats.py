@@ -0,0 +1,246 @@
+"""
+Self-telemetry for the span export pipeline.
+
+PipelineStats follows spans through the batch processor and the exporter:
+how many were enqueued, dropped because the queue was full, exported or
+failed, how long exports took, how large batches and payloads were, and how
+deep the queue got. Read it with `agentops.get_client().stats()`, or publish
+it as OTel metrics, to size queue and batch settings from data.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from opentelemetry.metrics import CallbackOptions, Meter, Observation
+
+from agentops.logging import logger
+
+# Bucket upper bounds, inclusive
+_DURATION_BOUNDARIES_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+_BATCH_SIZE_BOUNDARIES = (1, 8, 32, 64, 128, 256, 512, 1024, 2048)
+_PAYLOAD_BOUNDARIES = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# (counter attribute, metric name, description)
+_COUNTERS = (
+    ("spans_enqueued", "agentops.export.spans.enqueued", "Spans queued for export"),
+    ("spans_dropped", "agentops.export.spans.dropped", "Spans dropped because the export queue was full"),
+    ("spans_exported", "agentops.export.spans.exported", "Spans accepted by the export endpoint"),
+    ("spans_failed", "agentops.export.spans.failed", "Spans in batches that failed to export"),
+)
+
+
+class _Histogram:
+    """Fixed-bucket histogram with running count, sum, min and max."""
+
+    __slots__ = ("boundaries", "bucket_counts", "count", "sum", "min", "max")
+
+    def __init__(self, boundaries: Sequence[float]) -> None:
+        self.boundaries = tuple(boundaries)
+        self.bucket_counts = [0] * (len(self.boundaries) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def record(self, value: float) -> None:
+        self.bucket_counts[bisect_left(self.boundaries, value)] += 1
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        buckets: Dict[str, int] = {str(bound): count for bound, count in zip(self.boundaries, self.bucket_counts)}
+        buckets["+Inf"] = self.bucket_counts[-1]
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.sum / self.count if self.count else None,
+            "buckets": buckets,
+        }
+
+
+class PipelineStats:
+    """
+    Thread-safe counters and histograms for one export pipeline.
+
+    Processors call `record_enqueued` for every span they accept, exporters
+    call `record_export` once per batch and `record_payload` for every request
+    body they send. Other components can contribute their own counters to the
+    snapshot with `add_source`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.spans_enqueued = 0
+        self.spans_dropped = 0
+        self.spans_exported = 0
+        self.spans_failed = 0
+        self.batches_exported = 0
+        self.batches_failed = 0
+        self.queue_high_water = 0
+        self._export_duration = _Histogram(_DURATION_BOUNDARIES_MS)
+        self._batch_size = _Histogram(_BATCH_SIZE_BOUNDARIES)
+        self._payload_bytes = _Histogram(_PAYLOAD_BOUNDARIES)
+        self._queue_depth: Optional[Callable[[], int]] = None
+        self._sources: Dict[str, Callable[[], Optional[Dict[str, Any]]]] = {}
+        self._instruments: Optional[List[Any]] = None
+
+    @property
+    def queue_depth(self) -> Optional[int]:
+        """Spans currently waiting in the export queue, if the processor reports it."""
+        if self._queue_depth is None:
+            return None
+        try:
+            return self._queue_depth()
+        except Exception:
+            return None
+
+    def track_queue(self, depth: Callable[[], int]) -> None:
+        """
+        Report the export queue's depth.
+
+        Args:
+            depth: Returns the number of spans currently queued
+        """
+        self._queue_depth = depth
+
+    def add_source(self, name: str, source: Callable[[], Optional[Dict[str, Any]]]) -> None:
+        """
+        Include another component's counters in the snapshot.
+
+        Args:
+            name: Key under which the counters appear
+            source: Returns the counters, or None to leave them out
+        """
+        self._sources[name] = source
+
+    def record_enqueued(self, queue_depth: Optional[int] = None, dropped: int = 0) -> None:
+        """
+        Count a span accepted by the processor.
+
+        Args:
+            queue_depth: Queue depth after the span was added
+            dropped: Spans dropped to make room for it, or instead of it
+        """
+        with self._lock:
+            self.spans_enqueued += 1
+            self.spans_dropped += dropped
+            if queue_depth is not None and queue_depth > self.queue_high_water:
+                self.queue_high_water = queue_depth
+
+    def record_dropped(self, count: int = 1) -> None:
+        """Count spans dropped without being enqueued."""
+        with self._lock:
+            self.spans_dropped += count
+
+    def record_export(self, span_count: int, duration_ms: float, success: bool) -> None:
+        """
+        Count an export attempt.
+
+        Args:
+            span_count: Spans in the batch
+            duration_ms: Time the export took, in milliseconds
+            success: Whether the endpoint accepted the batch
+        """
+        with self._lock:
+            if success:
+                self.spans_exported += span_count
+                self.batches_exported += 1
+            else:
+                self.spans_failed += span_count
+                self.batches_failed += 1
+            self._export_duration.record(duration_ms)
+            self._batch_size.record(span_count)
+            instruments = self._instruments
+
+        if instruments is not None:
+            duration_histogram, batch_histogram, _ = instruments
+            duration_histogram.record(duration_ms, {"success": success})
+            batch_histogram.record(span_count, {"success": success})
+
+    def record_payload(self, size: int) -> None:
+        """Record the size in bytes of a request body as sent."""
+        with self._lock:
+            self._payload_bytes.record(size)
+            instruments = self._instruments
+
+        if instruments is not None:
+            instruments[2].record(size)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get a copy of all counters and histograms."""
+        with self._lock:
+            stats: Dict[str, Any] = {
+                "spans_enqueued": self.spans_enqueued,
+                "spans_dropped": self.spans_dropped,
+                "spans_exported": self.spans_exported,
+                "spans_failed": self.spans_failed,
+                "batches_exported": self.batches_exported,
+                "batches_failed": self.batches_failed,
+                "queue_high_water": self.queue_high_water,
+                "export_duration_ms": self._export_duration.snapshot(),
+                "batch_size": self._batch_size.snapshot(),
+                "payload_bytes": self._payload_bytes.snapshot(),
+            }
+        stats["queue_depth"] = self.queue_depth
+
+        for name, source in self._sources.items():
+            try:
+                source_stats = source()
+            except Exception as e:
+                logger.debug(f"Error reading {name} stats: {e}")
+                continue
+            if source_stats is not None:
+                stats[name] = source_stats
+        return stats
+
+    def register_instruments(self, meter: Meter) -> None:
+        """
+        Publish the counters, histograms and queue depth as OTel metrics.
+
+        Only exports recorded after this call reach the histograms.
+
+        Args:
+            meter: Meter to create the instruments on
+        """
+        for attribute, name, description in _COUNTERS:
+            meter.create_observable_counter(
+                name,
+                callbacks=[self._observe(lambda attribute=attribute: getattr(self, attribute))],
+                unit="{span}",
+                description=description,
+            )
+        meter.create_observable_gauge(
+            "agentops.export.queue.depth",
+            callbacks=[self._observe(lambda: self.queue_depth)],
+            unit="{span}",
+            description="Spans waiting in the export queue",
+        )
+        meter.create_observable_gauge(
+            "agentops.export.queue.high_water",
+            callbacks=[self._observe(lambda: self.queue_high_water)],
+            unit="{span}",
+            description="Most spans ever waiting in the export queue",
+        )
+
+        instruments = [
+            meter.create_histogram("agentops.export.duration", unit="ms", description="Time taken by span exports"),
+            meter.create_histogram("agentops.export.batch.size", unit="{span}", description="Spans per export batch"),
+            meter.create_histogram("agentops.export.payload.size", unit="By", description="Export request body size"),
+        ]
+        with self._lock:
+            self._instruments = instruments
+
+    @staticmethod
+    def _observe(read: Callable[[], Optional[int]]):
+        def callback(options: CallbackOptions) -> Iterable[Observation]:
+            value = read()
+            return [Observation(value)] if value is not None else []
+
+        return callback
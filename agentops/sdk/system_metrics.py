@@ -0,0 +1,179 @@
+"""
+Background sampling of host resource usage for AgentOps SDK.
+
+Session traces are tagged with CPU, memory and disk usage. Reading these from
+psutil inline is slow (a meaningful CPU percentage needs a sampling window), so a
+daemon thread refreshes a snapshot at a low frequency and trace start reads the
+latest snapshot instead. The same snapshot can back OTel observable gauges.
+"""
+
+import os
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+import psutil  #  type: ignore[import-untyped]
+from opentelemetry.metrics import CallbackOptions, Meter, Observation
+
+from agentops.helpers.fork import register_after_fork
+from agentops.logging import logger
+from agentops.semconv import ResourceAttributes
+
+# Gauges published from the snapshot: (snapshot key, instrument name, unit, description)
+_GAUGES = (
+    (ResourceAttributes.CPU_PERCENT, "agentops.system.cpu.percent", "%", "Host CPU utilization"),
+    (ResourceAttributes.MEMORY_USED, "agentops.system.memory.used", "By", "Host memory in use"),
+    (ResourceAttributes.MEMORY_PERCENT, "agentops.system.memory.percent", "%", "Host memory utilization"),
+    (ResourceAttributes.DISK_USED, "agentops.system.disk.used", "By", "Disk space in use on the root volume"),
+    (ResourceAttributes.DISK_PERCENT, "agentops.system.disk.percent", "%", "Disk utilization of the root volume"),
+    (ResourceAttributes.PROCESS_MEMORY_RSS, "agentops.process.memory.rss", "By", "Resident set size of this process"),
+)
+
+_active_sampler: Optional["SystemMetricsSampler"] = None
+
+
+def collect_system_metrics(include_process: bool = False) -> Dict[str, Any]:
+    """
+    Read current resource usage without blocking.
+
+    CPU utilization is measured since the previous call to psutil.cpu_percent,
+    so the first reading in a process is 0.0.
+
+    Args:
+        include_process: Whether to include this process's resident set size
+
+    Returns:
+        Dictionary of resource attributes; stats that cannot be read are omitted
+    """
+    metrics: Dict[str, Any] = {}
+
+    # Add CPU stats
+    try:
+        metrics[ResourceAttributes.CPU_COUNT] = os.cpu_count() or 0
+        metrics[ResourceAttributes.CPU_PERCENT] = psutil.cpu_percent(interval=None)
+    except Exception as e:
+        logger.debug(f"Error getting CPU stats: {e}")
+
+    # Add memory stats
+    try:
+        memory = psutil.virtual_memory()
+        metrics[ResourceAttributes.MEMORY_TOTAL] = memory.total
+        metrics[ResourceAttributes.MEMORY_AVAILABLE] = memory.available
+        metrics[ResourceAttributes.MEMORY_USED] = memory.used
+        metrics[ResourceAttributes.MEMORY_PERCENT] = memory.percent
+    except Exception as e:
+        logger.debug(f"Error getting memory stats: {e}")
+
+    # Add disk stats for the root volume
+    try:
+        disk = psutil.disk_usage(os.path.abspath(os.sep))
+        metrics[ResourceAttributes.DISK_TOTAL] = disk.total
+        metrics[ResourceAttributes.DISK_USED] = disk.used
+        metrics[ResourceAttributes.DISK_FREE] = disk.free
+        metrics[ResourceAttributes.DISK_PERCENT] = disk.percent
+    except Exception as e:
+        logger.debug(f"Error getting disk stats: {e}")
+
+    if include_process:
+        try:
+            metrics[ResourceAttributes.PROCESS_MEMORY_RSS] = psutil.Process().memory_info().rss
+        except Exception as e:
+            logger.debug(f"Error getting process memory stats: {e}")
+
+    return metrics
+
+
+class SystemMetricsSampler:
+    """
+    Keeps a rolling snapshot of host resource usage on a daemon thread.
+
+    `snapshot()` returns the latest reading without touching psutil, so it is
+    cheap enough to call on every trace start.
+    """
+
+    def __init__(self, interval: float = 15.0, include_process: bool = True):
+        """
+        Initialize the sampler.
+
+        Args:
+            interval: Seconds between samples
+            include_process: Whether to sample this process's resident set size
+        """
+        self._interval = interval
+        self._include_process = include_process
+        self._snapshot: Dict[str, Any] = {}
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        register_after_fork(self._at_fork_reinit)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get a copy of the latest resource usage reading."""
+        return dict(self._snapshot)
+
+    def sample(self) -> None:
+        """Take a reading now and make it the current snapshot."""
+        self._snapshot = collect_system_metrics(include_process=self._include_process)
+
+    def start(self) -> None:
+        """Take an initial reading and start sampling in the background."""
+        global _active_sampler
+        if self._thread is not None:
+            return
+
+        # Prime psutil's CPU counters so the first background reading covers a full interval
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name="agentops-system-metrics", daemon=True)
+        self._thread.start()
+        _active_sampler = self
+
+    def _at_fork_reinit(self) -> None:
+        """Restart sampling in a forked child, where the sampling thread no longer exists."""
+        if self._thread is None or self._stopped.is_set():
+            return
+        self._stopped = threading.Event()
+        self._thread = None
+        self.start()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.debug(f"Error sampling system metrics: {e}")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the sampling thread."""
+        global _active_sampler
+        if _active_sampler is self:
+            _active_sampler = None
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def register_gauges(self, meter: Meter) -> None:
+        """
+        Publish the snapshot as observable gauges.
+
+        Args:
+            meter: Meter to create the gauges on
+        """
+        for key, name, unit, description in _GAUGES:
+            meter.create_observable_gauge(name, callbacks=[self._observe(key)], unit=unit, description=description)
+
+    def _observe(self, key: str):
+        def callback(options: CallbackOptions) -> Iterable[Observation]:
+            value = self._snapshot.get(key)
+            return [Observation(value)] if value is not None else []
+
+        return callback
+
+
+def get_system_metrics_snapshot() -> Optional[Dict[str, Any]]:
+    """
+    Get the latest reading from the running sampler.
+
+    Returns:
+        The snapshot, or None if no sampler has been started
+    """
+    sampler = _active_sampler
+    return sampler.snapshot() if sampler is not None else None
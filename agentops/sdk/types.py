@@ -1,4 +1,4 @@
-from typing import Annotated, Optional, TypedDict
+from typing import Annotated, Dict, Optional, TypedDict
 
 from opentelemetry.sdk.trace import SpanProcessor
 from opentelemetry.sdk.trace.export import SpanExporter
@@ -17,5 +17,38 @@ class TracingConfig(TypedDict, total=False):
     api_key: Optional[str]  # API key for authentication with AgentOps services
     project_id: Optional[str]  # Project ID to include in resource attributes
     max_queue_size: int  # Required with a default value
+    max_export_batch_size: int  # Upper bound on spans per export request
+    max_queue_bytes: int  # Byte bound on the adaptive export queue
     max_wait_time: int  # Required with a default value
     export_flush_interval: int  # Time interval between automatic exports
+    flush_on_trace_end: bool  # Block on export when a trace ends
+    shutdown_flush_timeout: int  # Deadline in milliseconds for flushing spans, metrics and logs at shutdown
+    spill_directory: Optional[str]  # Directory for spilling failed span batches to disk
+    spill_max_bytes: int  # Size cap for the spill directory
+    export_workers: int  # Number of span batches exported concurrently
+    async_export: bool  # Export spans on an asyncio loop via the shared aiohttp session
+    system_metrics_interval: int  # Seconds between host resource samples, 0 to disable
+    system_metrics_gauges: bool  # Publish host resource samples as OTel gauges
+    log_buffer_max_bytes: int  # Byte budget for captured print/log output
+    log_buffer_policy: str  # 'drop_oldest' or 'sample' once the budget is reached
+    log_upload_chunk_bytes: int  # Size of incremental log uploads, 0 to upload only at trace end
+    log_upload_compression: bool  # Gzip log uploads
+    sampling_ratio: float  # Head sampling ratio for new traces
+    sampling_ratios_by_kind: Dict[str, float]  # Head sampling ratio for new traces by span kind
+    tail_sampling: bool  # Buffer traces and decide whether to export them when the root span ends
+    tail_sampling_ratio: float  # Fraction of unremarkable traces kept
+    tail_sampling_latency_ms: Optional[int]  # Keep traces at least this slow
+    tail_sampling_min_cost: Optional[float]  # Keep traces costing at least this much
+    tail_sampling_min_tokens: Optional[int]  # Keep traces using at least this many tokens
+    tail_sampling_max_traces: int  # Cap on traces buffered for tail sampling
+    span_relay_socket: Optional[str]  # Unix socket path for relaying spans to one exporting process
+    export_stats_metrics: bool  # Publish export pipeline stats as OTel metrics
+    adaptive_batching: bool  # Adapt batch size and flush delay to the load
+    export_reorder_window: int  # Milliseconds a span may be held to be batched with its trace
+    span_store_max_spans: int  # Spans kept in the in-process span store, 0 disables it
+    file_export_directory: Optional[str]  # Record spans to segment files here instead of sending them
+    file_export_segment_bytes: int  # Size at which a span file segment is finished
+    file_export_compression: bool  # Gzip span batches written to file
+    file_export_fsync: str  # 'always', 'rotate' or 'never'
+    prompt_dedup: bool  # Export each distinct prompt message body once per trace
+    deferred_extraction: bool  # Extract LLM span attributes on the export thread
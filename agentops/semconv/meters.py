@@ -6,6 +6,7 @@ class Meters:
     LLM_GENERATION_CHOICES = "gen_ai.client.generation.choices"
     LLM_TOKEN_USAGE = "gen_ai.client.token.usage"
     LLM_OPERATION_DURATION = "gen_ai.client.operation.duration"
+    LLM_STREAMING_INTER_TOKEN_LATENCY = "gen_ai.client.streaming.inter_token_latency"
 
     # OpenAI specific metrics
     LLM_COMPLETIONS_EXCEPTIONS = "gen_ai.openai.chat_completions.exceptions"
@@ -48,5 +48,14 @@ class ResourceAttributes:
     MEMORY_USED = "memory.used"
     MEMORY_PERCENT = "memory.percent"
 
+    # Disk attributes (root volume)
+    DISK_TOTAL = "disk.total"
+    DISK_USED = "disk.used"
+    DISK_FREE = "disk.free"
+    DISK_PERCENT = "disk.percent"
+
+    # Process attributes
+    PROCESS_MEMORY_RSS = "process.memory.rss"
+
     # Libraries
     IMPORTED_LIBRARIES = "imported_libraries"
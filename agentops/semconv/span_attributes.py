@@ -91,6 +91,7 @@ class SpanAttributes:
     AGENTOPS_DECORATOR_SPEC = "agentops.{entity_kind}.spec"
     AGENTOPS_DECORATOR_INPUT = "agentops.{entity_kind}.input"
     AGENTOPS_DECORATOR_OUTPUT = "agentops.{entity_kind}.output"
+    AGENTOPS_PIPELINE = "agentops.pipeline"  # Project pipeline the span's trace is exported through
 
     # Operation attributes
     OPERATION_NAME = "operation.name"
@@ -104,6 +105,18 @@ class SpanAttributes:
     LLM_STREAMING_TIME_TO_GENERATE = "gen_ai.streaming.time_to_generate"
     LLM_STREAMING_DURATION = "gen_ai.streaming_duration"
     LLM_STREAMING_CHUNK_COUNT = "gen_ai.streaming.chunk_count"
+    LLM_STREAMING_INTER_TOKEN_LATENCY_P50 = "gen_ai.streaming.inter_token_latency.p50"
+    LLM_STREAMING_INTER_TOKEN_LATENCY_P90 = "gen_ai.streaming.inter_token_latency.p90"
+    LLM_STREAMING_INTER_TOKEN_LATENCY_P99 = "gen_ai.streaming.inter_token_latency.p99"
+    LLM_STREAMING_INTER_TOKEN_LATENCY_MAX = "gen_ai.streaming.inter_token_latency.max"
+    LLM_STREAMING_STALL_COUNT = "gen_ai.streaming.stall_count"
+    LLM_STREAMING_TOKENS_PER_SECOND = "gen_ai.streaming.tokens_per_second"
+    LLM_STREAMING_CHUNKS_PER_SECOND_MIN = "gen_ai.streaming.chunks_per_second.min"
+    LLM_STREAMING_CHUNKS_PER_SECOND_MAX = "gen_ai.streaming.chunks_per_second.max"
+    LLM_STREAMING_CONTENT_LENGTH = "gen_ai.streaming.content_length"
+    LLM_STREAMING_CONTENT_OMITTED = "gen_ai.streaming.content_omitted"
+    LLM_STREAMING_CONTENT_OBJECT = "gen_ai.streaming.content_object"
+    LLM_STREAMING_TOOL_ARGUMENTS_OMITTED = "gen_ai.streaming.tool_arguments_omitted"
 
     # HTTP-specific attributes
     HTTP_METHOD = "http.method"
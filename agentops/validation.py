@@ -2,19 +2,23 @@
 AgentOps Validation Module
 
 This module provides functions to validate that spans have been sent to AgentOps
-using the public API. This is useful for testing and verification purposes.
+using the public API, or recorded in the in-process span store when one is
+enabled. This is useful for testing and verification purposes.
 """
 
 import asyncio
 import os
 import time
-from typing import Optional, Dict, List, Any, Tuple
+from typing import TYPE_CHECKING, Optional, Dict, List, Any, Tuple
 
 import requests
 
 from agentops.exceptions import ApiServerException
 from agentops.logging import logger
 
+if TYPE_CHECKING:
+    from agentops.sdk.span_store import SpanStore
+
 
 class ValidationError(Exception):
     """Raised when span validation fails."""
@@ -206,6 +210,40 @@ def check_llm_spans(spans: List[Dict[str, Any]]) -> Tuple[bool, List[str]]:
     return len(llm_spans) > 0, llm_spans
 
 
+def _validate_local(span_store: "SpanStore", trace_id: str, check_llm: bool, min_spans: int) -> Dict[str, Any]:
+    """Validate a trace against the in-process span store."""
+    spans = span_store.spans(trace_id=trace_id)
+    if len(spans) < min_spans:
+        raise ValidationError(
+            f"Validation failed for trace {trace_id}: found {len(spans)} span(s) in the local span store, "
+            f"expected at least {min_spans}"
+        )
+
+    metrics = span_store.trace_metrics(trace_id)
+    result = {
+        "trace_id": trace_id,
+        "span_count": len(spans),
+        "spans": spans,
+        "has_llm_spans": metrics["total_tokens"] > 0,
+        "llm_span_names": [],
+        "metrics": metrics,
+    }
+
+    if check_llm and not result["has_llm_spans"]:
+        has_llm_spans, llm_span_names = check_llm_spans(spans)
+        result["has_llm_spans"] = has_llm_spans
+        result["llm_span_names"] = llm_span_names
+
+    if check_llm and not result["has_llm_spans"]:
+        raise ValidationError(
+            f"No LLM activity detected in trace {trace_id}. "
+            f"Found spans: {[s['span_name'] for s in spans]}, "
+            f"Token usage: {metrics['total_tokens']}"
+        )
+
+    return result
+
+
 def validate_trace_spans(
     trace_id: Optional[str] = None,
     trace_context: Optional[Any] = None,
@@ -214,10 +252,14 @@ def validate_trace_spans(
     check_llm: bool = True,
     min_spans: int = 1,
     api_key: Optional[str] = None,
+    span_store: Optional["SpanStore"] = None,
 ) -> Dict[str, Any]:
     """
     Validate that spans have been sent to AgentOps.
 
+    When a span store is passed or enabled with `span_store_max_spans`, the
+    trace is checked in-process instead, without network access or retries.
+
     Args:
         trace_id: Direct trace ID to validate
         trace_context: TraceContext object from start_trace (alternative to trace_id)
@@ -226,6 +268,7 @@ def validate_trace_spans(
         check_llm: Whether to specifically check for LLM spans
         min_spans: Minimum number of spans expected
         api_key: Optional API key (uses environment variable if not provided)
+        span_store: Span store to validate against (defaults to the tracer's, if enabled)
 
     Returns:
         Dictionary containing validation results and metrics
@@ -264,6 +307,14 @@ def validate_trace_spans(
     if trace_id is None:
         raise ValueError("No trace ID found. Provide either trace_id or trace_context parameter.")
 
+    if span_store is None:
+        from agentops.sdk.core import tracer
+
+        span_store = tracer.span_store
+    if span_store is not None:
+        logger.info(f"Validating spans for trace ID {trace_id} against the local span store")
+        return _validate_local(span_store, trace_id, check_llm, min_spans)
+
     # Get JWT token
     jwt_token = get_jwt_token_sync(api_key)
     if not jwt_token:
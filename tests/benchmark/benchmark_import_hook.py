@@ -0,0 +1,144 @@
+import builtins
+import importlib
+import os
+import sys
+import tempfile
+import time
+
+
+"""
+Benchmark script comparing import overhead of the auto-instrumentation hooks.
+
+Three configurations are measured:
+- baseline: no hook installed
+- builtins hook: a `builtins.__import__` replacement doing the per-import target
+  checks of the previous import monitor
+- meta_path finder: the current `sys.meta_path` hook from agentops.instrumentation
+
+Two workloads are timed for each: re-importing an already loaded module (the
+`import x` statements that run inside hot functions) and loading fresh modules.
+"""
+
+REIMPORT_ITERATIONS = 200_000
+FRESH_MODULES = 500
+
+
+def _make_builtins_monitor(original_import, target_packages):
+    """Recreate the lookup work the previous `builtins.__import__` monitor did on every import."""
+
+    def monitor(name, globals_dict=None, locals_dict=None, fromlist=(), level=0):
+        module = original_import(name, globals_dict, locals_dict, fromlist, level)
+        packages_to_check = set()
+        if name in target_packages:
+            packages_to_check.add(name)
+        else:
+            for target in target_packages:
+                if name.startswith(target + ".") or name == target:
+                    packages_to_check.add(target)
+        if fromlist:
+            for item in fromlist:
+                if f"{name}.{item}" in target_packages:
+                    packages_to_check.add(f"{name}.{item}")
+                else:
+                    for target in target_packages:
+                        if name == target or name.startswith(target + "."):
+                            packages_to_check.add(target)
+        return module
+
+    return monitor
+
+
+def _time_reimports(repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(REIMPORT_ITERATIONS):
+            import json  # noqa: F401
+            from os import path  # noqa: F401
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _time_fresh_imports(directory: str, prefix: str) -> float:
+    names = [f"{prefix}_{i}" for i in range(FRESH_MODULES)]
+    for name in names:
+        with open(os.path.join(directory, f"{name}.py"), "w") as f:
+            f.write("VALUE = 1\n")
+    importlib.invalidate_caches()
+
+    start = time.perf_counter()
+    for name in names:
+        importlib.import_module(name)
+    elapsed = time.perf_counter() - start
+
+    for name in names:
+        sys.modules.pop(name, None)
+    return elapsed
+
+
+def run_benchmark():
+    """
+    Run the import hook benchmark.
+
+    Returns:
+        Dictionary mapping configuration name to re-import and fresh-import timings
+    """
+    from agentops.instrumentation import TARGET_PACKAGES, _import_finder
+
+    original_import = builtins.__import__
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        sys.path.insert(0, directory)
+        try:
+            results["baseline"] = {
+                "reimport": _time_reimports(),
+                "fresh": _time_fresh_imports(directory, "baseline"),
+            }
+
+            builtins.__import__ = _make_builtins_monitor(original_import, TARGET_PACKAGES)
+            try:
+                results["builtins hook"] = {
+                    "reimport": _time_reimports(),
+                    "fresh": _time_fresh_imports(directory, "builtins"),
+                }
+            finally:
+                builtins.__import__ = original_import
+
+            sys.meta_path.insert(0, _import_finder)
+            try:
+                results["meta_path finder"] = {
+                    "reimport": _time_reimports(),
+                    "fresh": _time_fresh_imports(directory, "finder"),
+                }
+            finally:
+                sys.meta_path.remove(_import_finder)
+        finally:
+            sys.path.remove(directory)
+
+    return results
+
+
+def print_results(results):
+    """
+    Print benchmark results in a formatted way.
+
+    Args:
+        results: Dictionary with timing results
+    """
+    print("\n=== BENCHMARK RESULTS ===")
+
+    baseline = results["baseline"]
+    for name, timings in results.items():
+        reimport_ns = timings["reimport"] / (REIMPORT_ITERATIONS * 2) * 1e9
+        fresh_us = timings["fresh"] / FRESH_MODULES * 1e6
+        overhead_ns = (timings["reimport"] - baseline["reimport"]) / (REIMPORT_ITERATIONS * 2) * 1e9
+        print(f"\n{name.upper()}")
+        print(f"  re-import:    {reimport_ns:8.1f} ns/import ({overhead_ns:+.1f} ns vs baseline)")
+        print(f"  fresh import: {fresh_us:8.1f} us/module")
+
+
+if __name__ == "__main__":
+    print("Running import hook benchmark...")
+    results = run_benchmark()
+    print_results(results)
@@ -0,0 +1,88 @@
+"""
+pytest-benchmark suite tracking per-call overhead of the entity decorators.
+
+Each decorated entity is benchmarked next to the same undecorated callable so
+the overhead can be read off directly. Spans go to a provider without
+processors, so export cost is not part of the measurement.
+
+Run with:
+    pytest tests/benchmark/test_decorator_overhead.py --benchmark-group-by=param:kind
+"""
+
+import asyncio
+from unittest import mock
+
+import pytest
+from opentelemetry import trace as trace_api
+from opentelemetry.sdk.trace import TracerProvider
+
+from agentops.sdk.core import tracer
+from agentops.sdk.decorators import agent, operation, tool
+from tests.unit.sdk.instrumentation_tester import reset_trace_globals
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.fixture(scope="module", autouse=True)
+def initialized_tracer():
+    reset_trace_globals()
+    provider = TracerProvider()
+    trace_api.set_tracer_provider(provider)
+
+    with mock.patch("agentops.sdk.core.setup_telemetry", return_value=(provider, mock.MagicMock())):
+        tracer._initialized = False
+        tracer.initialize(system_metrics_interval=0)
+        yield
+        tracer.shutdown()
+
+
+def plain_sync(x):
+    return x + 1
+
+
+async def plain_async(x):
+    return x + 1
+
+
+def plain_generator(n):
+    yield from range(n)
+
+
+class PlainAgent:
+    def __init__(self, name):
+        self.name = name
+
+
+traced_sync = operation(plain_sync)
+traced_async = operation(plain_async)
+traced_generator = operation(plain_generator)
+traced_tool = tool(cost=0.01)(plain_sync)
+TracedAgent = agent(PlainAgent)
+
+
+@pytest.mark.parametrize("kind", ["sync"])
+@pytest.mark.parametrize("func", [plain_sync, traced_sync, traced_tool], ids=["plain", "operation", "tool"])
+def test_sync_call(benchmark, kind, func):
+    assert benchmark(func, 1) == 2
+
+
+@pytest.mark.parametrize("kind", ["async"])
+@pytest.mark.parametrize("func", [plain_async, traced_async], ids=["plain", "operation"])
+def test_async_call(benchmark, kind, func):
+    loop = asyncio.new_event_loop()
+    try:
+        assert benchmark(lambda: loop.run_until_complete(func(1))) == 2
+    finally:
+        loop.close()
+
+
+@pytest.mark.parametrize("kind", ["generator"])
+@pytest.mark.parametrize("func", [plain_generator, traced_generator], ids=["plain", "operation"])
+def test_generator_call(benchmark, kind, func):
+    assert benchmark(lambda: sum(func(3))) == 3
+
+
+@pytest.mark.parametrize("kind", ["class"])
+@pytest.mark.parametrize("cls", [PlainAgent, TracedAgent], ids=["plain", "agent"])
+def test_class_instantiation(benchmark, kind, cls):
+    assert benchmark(cls, "bench").name == "bench"
@@ -0,0 +1,81 @@
+"""
+pytest-benchmark suite tracking per-chunk overhead of the streaming accumulator.
+
+Recorded chunk sequences of each provider (tests/benchmark/fixtures/stream_chunks.json)
+are replayed as attribute objects, with their delta chunks repeated to a long
+stream. Each replay through StreamAccumulator is benchmarked next to plain
+iteration over the same chunks; the difference divided by `extra_info["chunks"]`
+is the per-chunk overhead.
+
+Run with:
+    pytest tests/benchmark/test_stream_accumulator.py --benchmark-group-by=param:provider
+"""
+
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from agentops.instrumentation.common.streaming import StreamAccumulator
+
+pytest.importorskip("pytest_benchmark")
+
+FIXTURE = Path(__file__).parent / "fixtures" / "stream_chunks.json"
+STREAM_CHUNKS = 2000
+
+
+def _to_chunk(value):
+    if isinstance(value, dict):
+        return SimpleNamespace(**{key: _to_chunk(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [_to_chunk(item) for item in value]
+    return value
+
+
+def load_stream(provider, length=STREAM_CHUNKS):
+    """Return the decoder name and a replayable chunk sequence of about `length` chunks."""
+    recorded = json.loads(FIXTURE.read_text())[provider]
+    deltas = [_to_chunk(chunk) for chunk in recorded["deltas"]]
+    repeats = max(length // len(deltas), 1)
+    chunks = [_to_chunk(chunk) for chunk in recorded["head"]]
+    chunks += deltas * repeats
+    chunks += [_to_chunk(chunk) for chunk in recorded["tail"]]
+    return recorded["decoder"], chunks
+
+
+def replay(decoder, chunks):
+    accumulator = StreamAccumulator.for_provider(decoder)
+    for chunk in chunks:
+        accumulator.add(chunk)
+    return accumulator
+
+
+def iterate(chunks):
+    count = 0
+    for _ in chunks:
+        count += 1
+    return count
+
+
+PROVIDERS = ["openai_chat", "openai_chat_tool_calls", "openai_responses", "anthropic", "google_genai"]
+
+
+@pytest.mark.parametrize("provider", PROVIDERS)
+def test_plain_iteration(benchmark, provider):
+    _, chunks = load_stream(provider)
+    benchmark.extra_info["chunks"] = len(chunks)
+    assert benchmark(iterate, chunks) == len(chunks)
+
+
+@pytest.mark.parametrize("provider", PROVIDERS)
+def test_accumulator_replay(benchmark, provider):
+    decoder, chunks = load_stream(provider)
+    benchmark.extra_info["chunks"] = len(chunks)
+    accumulator = benchmark(replay, decoder, chunks)
+    assert accumulator.chunk_count == len(chunks)
+    assert accumulator.first_token_time is not None
+    if provider == "openai_chat_tool_calls":
+        assert accumulator.tool_calls[0].name == "get_weather"
+    else:
+        assert accumulator.content.startswith("The quick brown fox")
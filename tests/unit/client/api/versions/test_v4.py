@@ -163,6 +163,25 @@ class TestV4Client:
             assert headers["Trace-Id"] == "456"
             assert headers["Authorization"] == "Bearer test_token"
 
+    def test_upload_logfile_chunk_compressed(self):
+        """Test that a compressed logfile chunk carries its chunk index and is gzipped on the wire."""
+        import gzip
+        import json
+
+        mock_response = Mock(spec=Response)
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"url": "http://example.com/log", "size": 11}
+
+        with patch("agentops.client.api.versions.v4.HttpClient.get_session") as mock_get_session:
+            mock_get_session.return_value.post.return_value = mock_response
+            self.client.upload_logfile("log content", 789, chunk_index=2, compress=True)
+
+            kwargs = mock_get_session.return_value.post.call_args.kwargs
+            assert kwargs["headers"]["Trace-Id"] == "789"
+            assert kwargs["headers"]["Log-Chunk"] == "2"
+            assert kwargs["headers"]["Content-Encoding"] == "gzip"
+            assert json.loads(gzip.decompress(kwargs["data"])) == {"body": "log content"}
+
     def test_upload_logfile_http_error(self):
         """Test logfile upload with HTTP error."""
         mock_response = Mock(spec=Response)
@@ -0,0 +1,64 @@
+"""
+Unit tests for the JWT token manager.
+"""
+
+import base64
+import json
+import time
+from unittest.mock import AsyncMock, patch
+
+from agentops.client.auth import TokenManager, decode_jwt_expiry
+
+
+def _make_jwt(exp: float) -> str:
+    def encode(data: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+    return f"{encode({'alg': 'HS256'})}.{encode({'exp': exp})}.signature"
+
+
+def test_decode_jwt_expiry():
+    """The exp claim is read from the payload; malformed tokens yield None."""
+    assert decode_jwt_expiry(_make_jwt(1700000000)) == 1700000000
+    assert decode_jwt_expiry("not-a-jwt") is None
+    assert decode_jwt_expiry("a.!!!.c") is None
+
+
+def test_refresh_caches_token_and_schedules_ahead_of_expiry():
+    """A successful refresh caches the token and arms a refresh before it expires."""
+    token = _make_jwt(time.time() + 3600)
+    manager = TokenManager(AsyncMock(return_value={"token": token, "project_id": "p"}), refresh_margin=300)
+
+    with patch.object(manager, "_schedule") as mock_schedule:
+        assert manager.refresh().result(timeout=5) == token
+
+    assert manager.get_token() == token
+    delay = mock_schedule.call_args.args[0]
+    assert 3200 < delay < 3305
+    manager.close()
+
+
+def test_failed_refresh_keeps_current_token():
+    """A failed refresh leaves the cached token in place and schedules a retry."""
+    fetch = AsyncMock(return_value={"token": _make_jwt(time.time() + 3600), "project_id": "p"})
+    manager = TokenManager(fetch, retry_interval=2)
+
+    with patch.object(manager, "_schedule") as mock_schedule:
+        old_token = manager.refresh().result(timeout=5)
+        fetch.side_effect = ConnectionError("down")
+        assert manager.refresh().result(timeout=5) is None
+
+    assert manager.get_token() == old_token
+    mock_schedule.assert_called_with(2)
+    manager.close()
+
+
+def test_expired_token_does_not_spin():
+    """An already-expired token is refreshed after the retry interval rather than immediately."""
+    manager = TokenManager(AsyncMock(return_value=None), retry_interval=5)
+
+    with patch.object(manager, "_schedule") as mock_schedule:
+        manager.set_token(_make_jwt(time.time() - 10))
+
+    mock_schedule.assert_called_once_with(5)
+    manager.close()
@@ -0,0 +1,62 @@
+import importlib.metadata
+import sys
+from unittest.mock import MagicMock, patch
+
+from agentops.helpers.packages import PackageIndex, normalize_name
+from agentops.helpers.system import get_sys_packages
+from agentops.instrumentation.common.version import get_library_version
+
+
+def test_versions_match_importlib_metadata():
+    index = PackageIndex()
+    for name in ("requests", "opentelemetry-sdk", "packaging"):
+        assert index.version(name) == importlib.metadata.version(name)
+
+
+def test_lookup_normalizes_names():
+    index = PackageIndex()
+    assert index.version("opentelemetry_sdk") == index.version("OpenTelemetry-SDK")
+    assert normalize_name("google.genai") == "google-genai"
+
+
+def test_index_is_built_once():
+    index = PackageIndex()
+    with patch("agentops.helpers.packages.importlib.metadata.distributions", return_value=[]) as mock_dists:
+        index.version("requests")
+        index.version("packaging")
+        index.installed()
+
+    mock_dists.assert_called_once()
+
+
+def test_installed_reports_metadata_names():
+    dist = MagicMock()
+    dist._path = "/site-packages/python_dateutil-2.9.0.post0.dist-info"
+    dist.metadata.get.return_value = "python-dateutil"
+    dist.read_text.return_value = "dateutil\n"
+    index = PackageIndex()
+    with patch("agentops.helpers.packages.importlib.metadata.distributions", return_value=[dist]):
+        assert index.version("python-dateutil") == "2.9.0.post0"
+        assert index.version("Python_DateUtil") == "2.9.0.post0"
+        assert index.installed() == {"python-dateutil": "2.9.0.post0"}
+        assert index.distributions_for_module("dateutil.parser") == ["python-dateutil"]
+
+
+def test_top_level_module_maps_to_distribution():
+    index = PackageIndex()
+    assert [normalize_name(name) for name in index.distributions_for_module("yaml.loader")] == ["pyyaml"]
+
+
+def test_get_sys_packages_uses_index():
+    with patch("agentops.helpers.packages.importlib.metadata.version") as mock_version:
+        packages = get_sys_packages()
+
+    mock_version.assert_not_called()
+    assert packages["requests"] == sys.modules["requests"].__version__
+
+
+def test_get_library_version_falls_back_for_unindexed_packages():
+    with patch("agentops.instrumentation.common.version.get_package_index") as mock_index:
+        mock_index.return_value.version.return_value = None
+        with patch("importlib.metadata.version", return_value="9.9.9"):
+            assert get_library_version("installed-after-startup") == "9.9.9"
@@ -8,7 +8,13 @@ from agentops.instrumentation.common.streaming import (
     AsyncStreamWrapper,
     create_stream_wrapper_factory,
     StreamingResponseHandler,
+    StreamAccumulator,
+    InterTokenLatency,
+    CappedTextBuffer,
+    DEFAULT_CAPTURE_CHARS,
+    set_stream_capture,
 )
+from agentops.instrumentation.common.metrics import MetricsRecorder
 from agentops.instrumentation.common.token_counting import TokenUsage
 
 
@@ -579,3 +585,252 @@ class TestStreamingIntegration:
         assert wrapper.chunks_received == 3
         mock_span.set_attribute.assert_any_call("streaming.final_content", "Hello World")
         mock_span.set_attribute.assert_any_call("streaming.chunk_count", 3)
+
+
+def _openai_chunk(content=None, tool_calls=None, finish_reason=None, usage=None, choices=True):
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    choice = SimpleNamespace(index=0, delta=delta, finish_reason=finish_reason)
+    return SimpleNamespace(id="chatcmpl-1", model="gpt-4o", choices=[choice] if choices else [], usage=usage)
+
+
+class TestStreamAccumulator:
+    """Test the StreamAccumulator engine and its chunk decoders."""
+
+    def test_openai_chat_content(self):
+        """Test content deltas, first token, metadata and usage of a chat stream."""
+        acc = StreamAccumulator.for_provider("openai_chat")
+        usage = SimpleNamespace(prompt_tokens=3, completion_tokens=2, total_tokens=5)
+
+        assert acc.add(_openai_chunk(content="")) is False
+        assert acc.add(_openai_chunk(content="Hello")) is True
+        assert acc.add(_openai_chunk(content=" World", finish_reason="stop")) is False
+        acc.add(_openai_chunk(usage=usage, choices=False))
+
+        assert acc.content == "Hello World"
+        assert acc.content_length == len("Hello World")
+        assert acc.chunk_count == 4
+        assert acc.first_token_kind == "content"
+        assert acc.response_id == "chatcmpl-1"
+        assert acc.model == "gpt-4o"
+        assert acc.finish_reason == "stop"
+        assert acc.usage is usage
+
+    def test_openai_chat_tool_call_arguments(self):
+        """Test that tool call argument deltas are joined per index."""
+        acc = StreamAccumulator.for_provider("openai_chat")
+
+        def tool_call(arguments, call_id=None, name=None):
+            function = SimpleNamespace(name=name, arguments=arguments)
+            return SimpleNamespace(index=0, id=call_id, function=function)
+
+        acc.add(_openai_chunk(tool_calls=[tool_call("", call_id="call_1", name="get_weather")]))
+        acc.add(_openai_chunk(tool_calls=[tool_call('{"city": ')]))
+        acc.add(_openai_chunk(tool_calls=[tool_call('"Paris"}')], finish_reason="tool_calls"))
+
+        assert acc.first_token_kind == "tool_call"
+        assert [call.to_dict() for call in acc.tool_calls] == [
+            {
+                "id": "call_1",
+                "type": "function",
+                "function": {"name": "get_weather", "arguments": '{"city": "Paris"}'},
+            }
+        ]
+
+    def test_responses_events(self):
+        """Test Responses API text deltas and the completed response."""
+        acc = StreamAccumulator.for_provider("openai_responses")
+        response = SimpleNamespace(id="resp_1", model="gpt-4o", usage=SimpleNamespace(input_tokens=1), output=[])
+
+        acc.add(SimpleNamespace(type="response.created", response=response))
+        acc.add(SimpleNamespace(type="response.output_text.delta", delta="Hi"))
+        acc.add(SimpleNamespace(type="response.completed", response=response))
+
+        assert acc.content == "Hi"
+        assert acc.response_id == "resp_1"
+        assert acc.final_response is response
+        assert acc.usage is response.usage
+
+    def test_google_genai_chunks(self):
+        """Test text and usage metadata of Google GenAI chunks."""
+        acc = StreamAccumulator.for_provider("google_genai")
+        metadata = SimpleNamespace(prompt_token_count=1)
+
+        acc.add(SimpleNamespace(text="a", usage_metadata=None))
+        acc.add(SimpleNamespace(text="b", usage_metadata=metadata))
+        acc.add(SimpleNamespace(text=None, usage_metadata=None))
+
+        assert acc.content == "ab"
+        assert acc.usage is metadata
+
+    def test_content_is_joined_once(self):
+        """Test that reading the content compacts the part buffer."""
+        acc = StreamAccumulator(lambda chunk, acc: acc.add_content(chunk))
+        for part in ("a", "b", "c"):
+            acc.add(part)
+
+        assert acc.content == "abc"
+        acc.add("d")
+        assert acc.content == "abcd"
+
+
+class TestInterTokenLatency:
+    """Test the inter-token latency histogram."""
+
+    def test_percentiles_within_one_bucket(self):
+        """Test that percentiles land within a bucket width of the true gap."""
+        latency = InterTokenLatency()
+        now = 100.0
+        latency.start(now)
+        for gap in [0.01] * 90 + [0.1] * 9 + [2.0]:
+            now += gap
+            latency.record(now)
+
+        assert latency.count == 100
+        assert latency.percentile(0.5) == pytest.approx(0.01, rel=0.1)
+        assert latency.percentile(0.9) == pytest.approx(0.01, rel=0.1)
+        assert latency.percentile(0.99) == pytest.approx(0.1, rel=0.1)
+        assert latency.max == pytest.approx(2.0)
+        assert latency.stalls == 1
+        assert sum(count for _, count in latency.buckets()) == 100
+
+    def test_window_rates(self):
+        """Test that the lowest and highest windowed throughput are kept."""
+        latency = InterTokenLatency(window_seconds=1.0)
+        now = 0.0
+        latency.start(now)
+        for gap in [0.25] * 4 + [0.5] * 2:
+            now += gap
+            latency.record(now)
+
+        assert latency.max_rate == pytest.approx(4.0)
+        assert latency.min_rate == pytest.approx(2.0)
+
+    def test_accumulator_latency_attributes(self):
+        """Test the span attributes summarizing a stream's latency."""
+        acc = StreamAccumulator(lambda chunk, acc: acc.add_content(chunk) if chunk else None)
+        times = iter([10.0, 10.5, 11.0, 11.0])
+        with patch("agentops.instrumentation.common.streaming.time.time", side_effect=lambda: next(times)):
+            for chunk in ("a", "b", "", "c"):
+                acc.add(chunk)
+
+        attributes = acc.latency_attributes(completion_tokens=4)
+
+        assert acc.token_chunk_count == 3
+        assert attributes["gen_ai.streaming.inter_token_latency.max"] == pytest.approx(0.5)
+        assert attributes["gen_ai.streaming.stall_count"] == 0
+        assert attributes["gen_ai.streaming.tokens_per_second"] == pytest.approx(4.0)
+
+    def test_gaps_are_recorded_as_they_arrive(self):
+        """Test that the inter-token latency metric gets each gap when its chunk arrives."""
+        histogram = Mock()
+        recorder = MetricsRecorder({"inter_token_latency_histogram": histogram})
+        acc = StreamAccumulator(lambda chunk, acc: acc.add_content(chunk) if chunk else None)
+        acc.set_response_metadata(model="gpt-4o")
+        recorder.observe_inter_token_latency(acc, {"gen_ai.system": "OpenAI"})
+
+        times = iter([10.0, 10.5, 11.25])
+        with patch("agentops.instrumentation.common.streaming.time.time", side_effect=lambda: next(times)):
+            acc.add("a")
+            acc.add("b")
+            assert histogram.record.call_count == 1
+            acc.add("c")
+
+        gaps = [call.args[0] for call in histogram.record.call_args_list]
+        assert gaps == [pytest.approx(0.5), pytest.approx(0.75)]
+        assert histogram.record.call_args.kwargs["attributes"] == {
+            "gen_ai.system": "OpenAI",
+            "gen_ai.response.model": "gpt-4o",
+        }
+
+
+class TestCappedTextBuffer:
+    """Test the capture budget of streamed text."""
+
+    def test_keeps_head_and_tail(self):
+        """Test that text over the budget keeps its start and end."""
+        buffer = CappedTextBuffer(limit=10)
+        for part in ("abc", "defg", "hijk", "lmnop", "qrstu", "vwxyz"):
+            buffer.append(part)
+
+        assert buffer.length == 26
+        assert buffer.omitted == 16
+        assert buffer.text() == "abcde\n[... 16 characters omitted ...]\nvwxyz"
+
+    def test_head_only_buffer_inserts_no_marker(self):
+        """Test that without a tail the text is cut at the budget and left unmarked."""
+        buffer = CappedTextBuffer(limit=10, keep_tail=False)
+        for part in ('{"city": ', '"Amsterdam", ', '"unit": "C"}'):
+            buffer.append(part)
+
+        assert buffer.text() == '{"city": "'
+        assert buffer.omitted == buffer.length - 10
+
+    def test_tool_call_arguments_are_cut_without_marker(self):
+        """Test that tool call arguments over the budget carry no marker and report what was cut."""
+        set_stream_capture(10)
+        try:
+            acc = StreamAccumulator(lambda chunk, acc: acc.add_tool_call_delta(0, "call_1", "lookup", chunk))
+        finally:
+            set_stream_capture(DEFAULT_CAPTURE_CHARS)
+        for part in ('{"query": ', '"a long search query"}'):
+            acc.add(part)
+
+        tool_call = acc.tool_calls[0]
+        assert "omitted" not in tool_call.arguments
+        assert tool_call.arguments == '{"query": '
+        assert tool_call.arguments_omitted == 22
+
+    def test_keeps_everything_within_budget(self):
+        """Test that text within the budget, or without one, is kept whole."""
+        capped = CappedTextBuffer(limit=10)
+        unlimited = CappedTextBuffer()
+        for part in ("abc", "defg", "hij"):
+            capped.append(part)
+            unlimited.append(part)
+
+        assert capped.text() == unlimited.text() == "abcdefghij"
+        assert capped.omitted == unlimited.omitted == 0
+
+    def test_spills_full_content_over_budget(self):
+        """Test that a stream over the budget uploads its full content at export and records the object."""
+        set_stream_capture(10, spill=True)
+        try:
+            acc = StreamAccumulator(lambda chunk, acc: acc.add_content(chunk))
+        finally:
+            set_stream_capture(DEFAULT_CAPTURE_CHARS)
+        text = "0123456789" * 3
+        for i in range(0, len(text), 3):
+            acc.add(text[i : i + 3])
+
+        mock_span = Mock()
+        mock_client = Mock()
+        mock_client.api.v4.upload_object.return_value = {"url": "https://objects/1", "size": 30}
+        with patch("agentops.instrumentation.common.streaming.defer_to_export", return_value=True) as defer:
+            with patch("agentops.get_client", return_value=mock_client):
+                acc.record_capture(mock_span)
+                # Nothing is uploaded on the caller's thread
+                mock_client.api.v4.upload_object.assert_not_called()
+                upload = defer.call_args.args[1]
+                attributes = upload()
+
+        assert acc.content_length == 30
+        assert acc.content.startswith("01234\n[... 20 characters omitted ...]")
+        mock_client.api.v4.upload_object.assert_called_once_with(text)
+        mock_span.set_attribute.assert_any_call("gen_ai.streaming.content_omitted", 20)
+        assert attributes["gen_ai.streaming.content_object.object_url"] == "https://objects/1"
+
+    def test_spill_without_export_pipeline_is_discarded(self):
+        """Test that spilled content is never uploaded inline when no exporter can take the upload."""
+        set_stream_capture(10, spill=True)
+        try:
+            acc = StreamAccumulator(lambda chunk, acc: acc.add_content(chunk))
+        finally:
+            set_stream_capture(DEFAULT_CAPTURE_CHARS)
+        acc.add("0123456789" * 3)
+
+        mock_client = Mock()
+        with patch("agentops.instrumentation.common.streaming.defer_to_export", return_value=False):
+            with patch("agentops.get_client", return_value=mock_client):
+                acc.record_capture(Mock())
+
+        mock_client.api.v4.upload_object.assert_not_called()
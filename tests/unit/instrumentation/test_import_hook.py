@@ -0,0 +1,60 @@
+"""
+Tests for the auto-instrumentation import hook.
+"""
+
+import importlib
+import sys
+from importlib.machinery import SourceFileLoader
+from unittest.mock import patch
+
+import pytest
+
+import agentops.instrumentation as instrumentation
+
+
+@pytest.fixture
+def target_package(tmp_path, monkeypatch):
+    """A throwaway package named like a supported agentic library, importable from tmp_path."""
+    package_dir = tmp_path / "smolagents"
+    package_dir.mkdir()
+    (package_dir / "__init__.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "smolagents", raising=False)
+
+    sys.meta_path.insert(0, instrumentation._import_finder)
+    yield "smolagents"
+    sys.meta_path.remove(instrumentation._import_finder)
+    sys.modules.pop("smolagents", None)
+
+
+def test_instruments_target_once_after_load(target_package):
+    """The target package is instrumented once, after its module body has run."""
+    seen = []
+
+    def record(package_name):
+        seen.append((package_name, sys.modules[package_name].VALUE))
+
+    with patch.object(instrumentation, "_is_installed_package", return_value=True):
+        with patch.object(instrumentation, "_perform_instrumentation", side_effect=record):
+            module = importlib.import_module(target_package)
+            importlib.import_module(target_package)
+
+    assert seen == [(target_package, 1)]
+    # The wrapper loader does not outlive the import
+    assert isinstance(module.__loader__, SourceFileLoader)
+    assert isinstance(module.__spec__.loader, SourceFileLoader)
+
+
+def test_local_module_is_not_instrumented(target_package):
+    """A local module that shadows a target name is loaded but not instrumented."""
+    with patch.object(instrumentation, "_is_installed_package", return_value=False):
+        with patch.object(instrumentation, "_perform_instrumentation") as mock_perform:
+            importlib.import_module(target_package)
+
+    mock_perform.assert_not_called()
+
+
+def test_finder_ignores_other_modules():
+    """Modules that are not instrumentation targets are left to the regular finders."""
+    assert instrumentation._import_finder.find_spec("json", None) is None
+    assert instrumentation._import_finder.find_spec("openai_helpers", None) is None
@@ -1,8 +1,10 @@
 import builtins
 import pytest
 from unittest.mock import patch, MagicMock
-from agentops.logging.instrument_logging import setup_print_logger, upload_logfile
+from agentops.logging.instrument_logging import setup_print_logger, upload_logfile, TraceLogHandler
+import agentops.logging.instrument_logging as il
 import logging
+from opentelemetry.sdk.trace import TracerProvider
 
 
 @pytest.fixture
@@ -13,22 +15,25 @@ def reset_print():
     builtins.print = original_print
 
 
+def _make_record(message):
+    return logging.LogRecord("test", logging.INFO, __file__, 0, message, None, None)
+
+
 def test_setup_print_logger_creates_buffer_logger_and_handler():
-    """Test that setup_print_logger creates a buffer logger with a StreamHandler."""
+    """Test that setup_print_logger creates a buffer logger with a TraceLogHandler."""
     setup_print_logger()
     buffer_logger = logging.getLogger("agentops_buffer_logger")
     assert buffer_logger.level == logging.DEBUG
     assert len(buffer_logger.handlers) == 1
-    assert isinstance(buffer_logger.handlers[0], logging.StreamHandler)
+    assert isinstance(buffer_logger.handlers[0], TraceLogHandler)
 
 
-def test_print_logger_writes_message_to_stringio_buffer(reset_print):
-    """Test that the monkeypatched print function writes messages to the StringIO buffer."""
+def test_print_logger_writes_message_to_buffer(reset_print):
+    """Test that the monkeypatched print function writes messages to the trace buffer."""
     setup_print_logger()
     test_message = "Test log message"
     print(test_message)
-    buffer_logger = logging.getLogger("agentops_buffer_logger")
-    log_content = buffer_logger.handlers[0].stream.getvalue()
+    log_content, _ = il._log_handler.take(trace_id=0)
     assert test_message in log_content
 
 
@@ -53,8 +58,8 @@ def test_upload_logfile_sends_buffer_content_and_clears_buffer(mock_get_client):
     mock_get_client.return_value = mock_client
     upload_logfile(trace_id=123)
     mock_client.api.v4.upload_logfile.assert_called_once()
-    buffer_logger = logging.getLogger("agentops_buffer_logger")
-    assert buffer_logger.handlers[0].stream.getvalue() == ""
+    assert test_message in mock_client.api.v4.upload_logfile.call_args[0][0]
+    assert il._log_handler.total_bytes == 0
 
 
 def test_upload_logfile_does_nothing_when_buffer_is_empty():
@@ -62,3 +67,133 @@ def test_upload_logfile_does_nothing_when_buffer_is_empty():
     with patch("agentops.get_client") as mock_get_client:
         upload_logfile(trace_id=123)
         mock_get_client.assert_not_called()
+
+
+def test_drop_oldest_policy_keeps_buffer_within_budget():
+    """Test that the drop_oldest policy evicts the oldest lines and reports how many were dropped."""
+    handler = TraceLogHandler(max_bytes=100, chunk_bytes=0)
+    for i in range(20):
+        handler.emit(_make_record(f"line {i:02d}"))
+
+    assert handler.total_bytes <= 100
+    content, chunk_index = handler.take(trace_id=0)
+    assert "line 19" in content
+    assert "line 00" not in content
+    assert "log lines dropped" in content
+    assert chunk_index is None
+
+
+def test_sample_policy_keeps_buffered_head_once_full():
+    """Test that the sample policy never evicts buffered lines and rejects new ones that do not fit."""
+    handler = TraceLogHandler(max_bytes=30, policy="sample", chunk_bytes=0, sample_every=5)
+    for i in range(12):
+        handler.emit(_make_record(f"line {i:02d}"))
+
+    assert handler.total_bytes <= 30
+    content, _ = handler.take(trace_id=0)
+    assert content.endswith("line 00\nline 01\nline 02\n")
+    assert "line 03" not in content
+    assert "line 11" not in content
+    assert "log lines dropped" in content
+
+
+def test_sample_policy_samples_once_room_frees_up():
+    """Test that after the budget filled up, only every n-th line is admitted while it fits."""
+    tracer = TracerProvider().get_tracer("test")
+    handler = TraceLogHandler(max_bytes=25, policy="sample", chunk_bytes=0, sample_every=3)
+    with tracer.start_as_current_span("a") as span_a:
+        for i in range(2):
+            handler.emit(_make_record(f"a {i:02d}"))  # 5 bytes per line
+    for i in range(4):
+        handler.emit(_make_record(f"u {i:02d}"))  # The fourth one does not fit
+
+    handler.discard(span_a.get_span_context().trace_id)
+    for i in range(4, 13):
+        handler.emit(_make_record(f"u {i:02d}"))
+
+    content, _ = handler.take(trace_id=0)
+    lines = [line for line in content.splitlines() if line.startswith("u ")]
+    assert lines == ["u 00", "u 01", "u 02", "u 06", "u 09"]
+
+
+def test_unknown_policy_falls_back_to_drop_oldest():
+    """Test that an unknown buffer policy is reported and replaced with the default one."""
+    with patch("agentops.logging.config.logger") as mock_logger:
+        handler = TraceLogHandler(policy="newest")
+    assert handler.policy == "drop_oldest"
+    mock_logger.warning.assert_called_once()
+
+
+def test_discard_drops_only_the_trace_buffer():
+    """Test that discarding a trace keeps untraced output for the next upload."""
+    tracer = TracerProvider().get_tracer("test")
+    handler = TraceLogHandler(chunk_bytes=0)
+
+    handler.emit(_make_record("before any trace"))
+    with tracer.start_as_current_span("a") as span_a:
+        handler.emit(_make_record("from trace a"))
+    handler.discard(span_a.get_span_context().trace_id)
+
+    content, _ = handler.take(span_a.get_span_context().trace_id)
+    assert "before any trace" in content
+    assert "from trace a" not in content
+    assert handler.total_bytes == 0
+
+
+def test_records_are_buffered_per_trace():
+    """Test that output of concurrent traces is kept apart and untraced output joins the next upload."""
+    tracer = TracerProvider().get_tracer("test")
+    handler = TraceLogHandler(chunk_bytes=0)
+
+    handler.emit(_make_record("before any trace"))
+    with tracer.start_as_current_span("a") as span_a:
+        handler.emit(_make_record("from trace a"))
+    with tracer.start_as_current_span("b") as span_b:
+        handler.emit(_make_record("from trace b"))
+
+    content_a, _ = handler.take(span_a.get_span_context().trace_id)
+    content_b, _ = handler.take(span_b.get_span_context().trace_id)
+    assert "from trace a" in content_a and "before any trace" in content_a
+    assert "from trace b" not in content_a
+    assert content_b.strip().endswith("from trace b")
+    assert handler.total_bytes == 0
+
+
+def test_full_chunks_are_uploaded_in_the_background():
+    """Test that a trace exceeding chunk_bytes is uploaded in indexed chunks ahead of its final upload."""
+    tracer = TracerProvider().get_tracer("test")
+    handler = TraceLogHandler(chunk_bytes=50, compress=True)
+
+    with patch("agentops.get_client") as mock_get_client:
+        upload = mock_get_client.return_value.api.v4.upload_logfile
+        with tracer.start_as_current_span("root") as span:
+            for i in range(3):
+                handler.emit(_make_record(f"a line long enough to fill a whole fifty byte chunk {i}"))
+        trace_id = span.get_span_context().trace_id
+        handler._uploader._queue.join()
+
+        assert upload.call_count == 3
+        assert [c.kwargs["chunk_index"] for c in upload.call_args_list] == [0, 1, 2]
+        assert all(c.args[1] == trace_id and c.kwargs["compress"] for c in upload.call_args_list)
+
+        content, chunk_index = handler.take(trace_id)
+        assert content == ""
+        assert chunk_index == 3
+
+
+@patch("agentops.get_client")
+def test_uploads_deferred_at_shutdown_are_sent_by_flush_logs(mock_get_client, reset_print):
+    """Test that traces ending after defer_log_uploads are uploaded by flush_logs, not as they end."""
+    setup_print_logger()
+    print("output before exit")
+    upload = mock_get_client.return_value.api.v4.upload_logfile
+
+    il.defer_log_uploads()
+    upload_logfile(trace_id=123)
+    upload.assert_not_called()
+
+    assert il.flush_logs(timeout_millis=1000)
+    upload.assert_called_once()
+    assert "output before exit" in upload.call_args.args[0]
+    il.shutdown_print_logger()
+    assert builtins.print is il._original_print
@@ -0,0 +1,137 @@
+"""
+Unit tests for the asyncio span exporter and processor.
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExportResult
+
+from agentops.sdk.async_export import AsyncBatchSpanProcessor, AsyncOTLPSpanExporter
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield loop
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+
+
+def _make_span(sampled: bool = True) -> Mock:
+    span = Mock(spec=ReadableSpan)
+    span.context.trace_flags.sampled = sampled
+    return span
+
+
+def _make_exporter() -> Mock:
+    exporter = Mock(spec=AsyncOTLPSpanExporter)
+    exporter.export_async = AsyncMock(return_value=SpanExportResult.SUCCESS)
+    return exporter
+
+
+def test_processor_batches_and_flushes(loop):
+    """Queued spans are exported in batches of at most max_export_batch_size on flush."""
+    exporter = _make_exporter()
+    processor = AsyncBatchSpanProcessor(
+        exporter, loop=loop, max_export_batch_size=2, schedule_delay_millis=60000, max_in_flight=2
+    )
+
+    for _ in range(5):
+        processor.on_end(_make_span())
+    assert processor.force_flush(5000)
+
+    batch_sizes = [len(call.args[0]) for call in exporter.export_async.await_args_list]
+    assert sum(batch_sizes) == 5
+    assert max(batch_sizes) <= 2
+
+    processor.shutdown()
+    exporter.shutdown.assert_called_once()
+
+
+def test_flush_on_loop_thread_does_not_block_the_loop(loop):
+    """Flushing from the processor's own loop returns at once, even before the export coroutine started."""
+    exporter = _make_exporter()
+
+    async def create_and_flush():
+        processor = AsyncBatchSpanProcessor(exporter, loop=loop, schedule_delay_millis=60000)
+        processor.on_end(_make_span())
+        started = time.monotonic()
+        flushed = processor.force_flush(2000)
+        return processor, flushed, time.monotonic() - started
+
+    processor, flushed, waited = asyncio.run_coroutine_threadsafe(create_and_flush(), loop).result(5)
+
+    assert flushed and waited < 1
+    assert processor.force_flush(5000)
+    exporter.export_async.assert_awaited_once()
+    processor.shutdown()
+
+
+def test_processor_skips_unsampled_spans(loop):
+    """Unsampled spans are never queued."""
+    exporter = _make_exporter()
+    processor = AsyncBatchSpanProcessor(exporter, loop=loop, schedule_delay_millis=60000)
+
+    processor.on_end(_make_span(sampled=False))
+    assert processor.force_flush(5000)
+
+    exporter.export_async.assert_not_awaited()
+    processor.shutdown()
+
+
+def test_processor_drops_when_queue_full(loop):
+    """Spans beyond max_queue_size are dropped rather than blocking the caller."""
+    exporter = _make_exporter()
+    processor = AsyncBatchSpanProcessor(exporter, loop=loop, max_queue_size=3, schedule_delay_millis=60000)
+
+    for _ in range(5):
+        processor.on_end(_make_span())
+    processor.force_flush(5000)
+
+    assert processor._dropped == 2
+    assert sum(len(call.args[0]) for call in exporter.export_async.await_args_list) == 3
+    processor.shutdown()
+
+
+async def test_exporter_posts_with_bearer_token():
+    """The exporter posts gzip-encoded OTLP with the current JWT on the shared session."""
+    response = MagicMock(status=200)
+    session = MagicMock()
+    session.post.return_value.__aenter__ = AsyncMock(return_value=response)
+    session.post.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    exporter = AsyncOTLPSpanExporter(endpoint="https://api.agentops.ai/v1/traces", jwt_provider=lambda: "jwt")
+    with patch("agentops.sdk.async_export.HttpClient.get_async_session", AsyncMock(return_value=session)):
+        with patch("agentops.sdk.async_export.encode_spans") as mock_encode:
+            mock_encode.return_value.SerializePartialToString.return_value = b"encoded"
+            result = await exporter.export_async([_make_span()])
+
+    assert result == SpanExportResult.SUCCESS
+    headers = session.post.call_args.kwargs["headers"]
+    assert headers["Authorization"] == "Bearer jwt"
+    assert headers["Content-Encoding"] == "gzip"
+
+
+async def test_exporter_backs_off_after_auth_failure():
+    """A 401 response puts the exporter into auth backoff."""
+    response = MagicMock(status=401)
+    session = MagicMock()
+    session.post.return_value.__aenter__ = AsyncMock(return_value=response)
+    session.post.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    exporter = AsyncOTLPSpanExporter(endpoint="https://api.agentops.ai/v1/traces")
+    with patch("agentops.sdk.async_export.HttpClient.get_async_session", AsyncMock(return_value=session)):
+        with patch("agentops.sdk.async_export.encode_spans") as mock_encode:
+            mock_encode.return_value.SerializePartialToString.return_value = b"encoded"
+            assert await exporter.export_async([_make_span()]) == SpanExportResult.FAILURE
+            assert await exporter.export_async([_make_span()]) == SpanExportResult.FAILURE
+
+    assert session.post.call_count == 1
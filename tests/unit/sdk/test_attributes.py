@@ -16,6 +16,7 @@ from agentops.sdk.attributes import (
     get_span_attributes,
     get_session_end_attributes,
 )
+from agentops.sdk.system_metrics import SystemMetricsSampler
 from agentops.semconv import ResourceAttributes, SpanAttributes, CoreAttributes
 
 
@@ -44,8 +45,8 @@ class TestGetSystemResourceAttributes:
         assert attributes[ResourceAttributes.HOST_VERSION] == platform.version()
         assert attributes[ResourceAttributes.HOST_OS_RELEASE] == platform.release()
 
-    @patch("agentops.sdk.attributes.os.cpu_count")
-    @patch("agentops.sdk.attributes.psutil.cpu_percent")
+    @patch("agentops.sdk.system_metrics.os.cpu_count")
+    @patch("agentops.sdk.system_metrics.psutil.cpu_percent")
     def test_cpu_stats_success(self, mock_cpu_percent, mock_cpu_count):
         """Test CPU stats when successfully retrieved."""
         mock_cpu_count.return_value = 8
@@ -58,8 +59,8 @@ class TestGetSystemResourceAttributes:
         assert attributes[ResourceAttributes.CPU_COUNT] == 8
         assert attributes[ResourceAttributes.CPU_PERCENT] == 25.5
 
-    @patch("agentops.sdk.attributes.os.cpu_count")
-    @patch("agentops.sdk.attributes.psutil.cpu_percent")
+    @patch("agentops.sdk.system_metrics.os.cpu_count")
+    @patch("agentops.sdk.system_metrics.psutil.cpu_percent")
     def test_cpu_stats_cpu_count_none(self, mock_cpu_percent, mock_cpu_count):
         """Test CPU stats when cpu_count returns None."""
         mock_cpu_count.return_value = None
@@ -70,8 +71,8 @@ class TestGetSystemResourceAttributes:
         assert ResourceAttributes.CPU_COUNT in attributes
         assert attributes[ResourceAttributes.CPU_COUNT] == 0
 
-    @patch("agentops.sdk.attributes.os.cpu_count")
-    @patch("agentops.sdk.attributes.psutil.cpu_percent")
+    @patch("agentops.sdk.system_metrics.os.cpu_count")
+    @patch("agentops.sdk.system_metrics.psutil.cpu_percent")
     def test_cpu_stats_exception(self, mock_cpu_percent, mock_cpu_count):
         """Test CPU stats when exception occurs."""
         mock_cpu_count.side_effect = Exception("CPU count error")
@@ -83,7 +84,7 @@ class TestGetSystemResourceAttributes:
         assert ResourceAttributes.CPU_COUNT not in attributes
         assert ResourceAttributes.CPU_PERCENT not in attributes
 
-    @patch("agentops.sdk.attributes.psutil.virtual_memory")
+    @patch("agentops.sdk.system_metrics.psutil.virtual_memory")
     def test_memory_stats_success(self, mock_virtual_memory):
         """Test memory stats when successfully retrieved."""
         mock_memory = Mock()
@@ -104,7 +105,7 @@ class TestGetSystemResourceAttributes:
         assert attributes[ResourceAttributes.MEMORY_USED] == 4294967296
         assert attributes[ResourceAttributes.MEMORY_PERCENT] == 50.0
 
-    @patch("agentops.sdk.attributes.psutil.virtual_memory")
+    @patch("agentops.sdk.system_metrics.psutil.virtual_memory")
     def test_memory_stats_exception(self, mock_virtual_memory):
         """Test memory stats when exception occurs."""
         mock_virtual_memory.side_effect = Exception("Memory error")
@@ -117,6 +118,47 @@ class TestGetSystemResourceAttributes:
         assert ResourceAttributes.MEMORY_USED not in attributes
         assert ResourceAttributes.MEMORY_PERCENT not in attributes
 
+    @patch("agentops.sdk.system_metrics.psutil.cpu_percent")
+    def test_cpu_percent_does_not_block(self, mock_cpu_percent):
+        """Test that CPU usage is read without a sampling interval."""
+        mock_cpu_percent.return_value = 10.0
+
+        get_system_resource_attributes()
+
+        mock_cpu_percent.assert_called_once_with(interval=None)
+
+    def test_uses_background_sampler_snapshot(self):
+        """Test that a running sampler's snapshot is used instead of reading psutil."""
+        sampler = SystemMetricsSampler(interval=3600)
+        with patch("agentops.sdk.system_metrics.psutil.cpu_percent", return_value=42.0):
+            sampler.start()
+        try:
+            with patch("agentops.sdk.system_metrics.psutil.cpu_percent") as mock_cpu_percent:
+                attributes = get_system_resource_attributes()
+
+            mock_cpu_percent.assert_not_called()
+            assert attributes[ResourceAttributes.CPU_PERCENT] == 42.0
+            assert ResourceAttributes.PROCESS_MEMORY_RSS in attributes
+        finally:
+            sampler.stop(timeout=1.0)
+
+
+class TestSystemMetricsSampler:
+    """Test SystemMetricsSampler."""
+
+    def test_register_gauges_observes_snapshot(self):
+        """Test that gauges report values from the latest snapshot."""
+        sampler = SystemMetricsSampler(interval=3600)
+        sampler._snapshot = {ResourceAttributes.MEMORY_PERCENT: 55.0}
+        meter = Mock()
+
+        sampler.register_gauges(meter)
+
+        callbacks = {call.args[0]: call.kwargs["callbacks"][0] for call in meter.create_observable_gauge.call_args_list}
+        observations = callbacks["agentops.system.memory.percent"](Mock())
+        assert [o.value for o in observations] == [55.0]
+        assert callbacks["agentops.system.cpu.percent"](Mock()) == []
+
 
 class TestGetGlobalResourceAttributes:
     """Test get_global_resource_attributes function."""
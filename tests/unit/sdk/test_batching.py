@@ -0,0 +1,137 @@
+import threading
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from agentops.sdk.batching import AdaptiveBatchSpanProcessor, estimate_span_bytes
+from agentops.sdk.stats import PipelineStats
+
+
+class RecordingExporter(SpanExporter):
+    def __init__(self):
+        self.batches = []
+        self.exported = threading.Event()
+
+    def export(self, spans):
+        self.batches.append(list(spans))
+        self.exported.set()
+        return SpanExportResult.SUCCESS
+
+    def force_flush(self, timeout_millis=30000):
+        return True
+
+
+def _tracer(processor):
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    return provider.get_tracer("test")
+
+
+def test_estimate_span_bytes_counts_attributes():
+    tracer = _tracer(AdaptiveBatchSpanProcessor(RecordingExporter()))
+    with tracer.start_as_current_span("small") as small:
+        pass
+    with tracer.start_as_current_span("large") as large:
+        large.set_attribute("payload", "x" * 1000)
+
+    assert estimate_span_bytes(large) - estimate_span_bytes(small) >= 1000
+
+
+def test_force_flush_exports_queued_spans():
+    exporter = RecordingExporter()
+    processor = AdaptiveBatchSpanProcessor(exporter, schedule_delay_millis=60000)
+    tracer = _tracer(processor)
+    for i in range(5):
+        with tracer.start_as_current_span(f"span-{i}"):
+            pass
+
+    assert processor.force_flush()
+    assert sum(len(batch) for batch in exporter.batches) == 5
+    processor.shutdown()
+
+
+def test_drops_spans_beyond_byte_limit():
+    exporter = RecordingExporter()
+    stats = PipelineStats()
+    processor = AdaptiveBatchSpanProcessor(
+        exporter, max_queue_bytes=2000, schedule_delay_millis=60000, max_export_batch_size=100, stats=stats
+    )
+    tracer = _tracer(processor)
+    for _ in range(5):
+        with tracer.start_as_current_span("span") as span:
+            span.set_attribute("payload", "x" * 500)
+
+    snapshot = stats.snapshot()
+    assert snapshot["spans_dropped"] > 0
+    assert processor.batching_stats()["queue_bytes"] <= 2000
+    processor.shutdown()
+
+
+def test_batch_size_grows_when_batches_fill():
+    exporter = RecordingExporter()
+    processor = AdaptiveBatchSpanProcessor(exporter, max_export_batch_size=64, schedule_delay_millis=60000)
+    initial = processor.batch_size
+
+    processor._adapt(exported=initial, size_triggered=True, latency=0.01)
+
+    assert processor.batch_size == initial * 2
+    processor.shutdown()
+
+
+def test_delay_drops_under_light_traffic():
+    processor = AdaptiveBatchSpanProcessor(RecordingExporter(), schedule_delay_millis=1000)
+    processor._last_adapted -= 10  # No arrivals over ten seconds
+
+    processor._adapt(exported=0, size_triggered=False, latency=0.0)
+
+    assert processor.delay == 0.1
+    processor.shutdown()
+
+
+def test_delay_stretches_when_exports_are_slow():
+    processor = AdaptiveBatchSpanProcessor(
+        RecordingExporter(), schedule_delay_millis=1000, max_schedule_delay_millis=5000
+    )
+    processor._arrivals = 1000
+
+    processor._adapt(exported=10, size_triggered=False, latency=2.0)
+
+    assert processor.delay == 4.0
+    processor.shutdown()
+
+
+def test_reorder_window_groups_spans_by_trace():
+    exporter = RecordingExporter()
+    processor = AdaptiveBatchSpanProcessor(exporter, schedule_delay_millis=60000, reorder_window_millis=60000)
+    tracer = _tracer(processor)
+
+    # Interleave the children of two traces, then end their roots
+    root_a = tracer.start_span("root-a")
+    root_b = tracer.start_span("root-b")
+    for i in range(2):
+        for root, name in ((root_a, "a"), (root_b, "b")):
+            with tracer.start_as_current_span(f"{name}-{i}", context=trace.set_span_in_context(root)):
+                pass
+    root_b.end()
+    root_a.end()
+
+    assert processor.force_flush()
+    names = [span.name for batch in exporter.batches for span in batch]
+    assert names == ["b-0", "b-1", "root-b", "a-0", "a-1", "root-a"]
+    processor.shutdown()
+
+
+def test_reorder_window_releases_traces_without_root():
+    exporter = RecordingExporter()
+    processor = AdaptiveBatchSpanProcessor(exporter, schedule_delay_millis=10, reorder_window_millis=50)
+    tracer = _tracer(processor)
+    root = tracer.start_span("root")
+    with tracer.start_as_current_span("child", context=trace.set_span_in_context(root)):
+        pass
+
+    assert exporter.exported.wait(5)
+    assert [span.name for span in exporter.batches[0]] == ["child"]
+    assert processor.batching_stats()["held_traces"] == 0
+    root.end()
+    processor.shutdown()
@@ -761,3 +761,27 @@ class TestToolDecorator:
             span for span in spans if span.attributes.get(SpanAttributes.AGENTOPS_SPAN_KIND) == SpanKind.TOOL
         )
         assert SpanAttributes.LLM_USAGE_TOOL_COST not in tool_span.attributes
+
+    def test_oversized_output_is_recorded_as_truncated_preview(
+        self, agent_class, instrumentation: InstrumentationTester
+    ):
+        """Test that output over the size limit is recorded as a valid, truncated JSON preview."""
+        import json
+
+        from agentops.sdk.decorators.utility import MAX_CONTENT_BYTES
+
+        @tool
+        def big_tool(self):
+            return [{"id": i, "text": "x" * 100} for i in range(50_000)]
+
+        big_tool(agent_class)
+
+        spans = instrumentation.get_finished_spans()
+        tool_span = next(
+            span for span in spans if span.attributes.get(SpanAttributes.AGENTOPS_SPAN_KIND) == SpanKind.TOOL
+        )
+        output_attribute = SpanAttributes.AGENTOPS_DECORATOR_OUTPUT.format(entity_kind=SpanKind.TOOL)
+        preview = tool_span.attributes[output_attribute]
+        assert len(preview) <= MAX_CONTENT_BYTES
+        assert json.loads(preview)[-1].endswith("more items")
+        assert tool_span.attributes[f"{output_attribute}.truncated"] is True
@@ -0,0 +1,85 @@
+import pytest
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExporter, SpanExportResult
+
+from agentops.instrumentation.common.wrappers import WrapConfig, _create_wrapper
+from agentops.sdk.deferred import DeferredAttributesSpanExporter, defer_attributes, set_deferred_extraction
+
+
+class RecordingExporter(SpanExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        pass
+
+
+@pytest.fixture
+def deferred():
+    set_deferred_extraction(True)
+    yield
+    set_deferred_extraction(False)
+
+
+def _tracer(exporter):
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    return provider.get_tracer("test")
+
+
+def test_extracted_attributes_are_added_at_export(deferred):
+    raw = RecordingExporter()
+    tracer = _tracer(raw)
+
+    with tracer.start_as_current_span("llm") as span:
+        span.set_attribute("gen_ai.request.model", "set-directly")
+        assert defer_attributes(
+            span, lambda: {"gen_ai.request.model": "extracted", "gen_ai.usage.total_tokens": 12, "missing": None}
+        )
+
+    exported = RecordingExporter()
+    DeferredAttributesSpanExporter(exported).export(raw.spans)
+
+    attributes = exported.spans[0].attributes
+    assert attributes["gen_ai.usage.total_tokens"] == 12
+    assert attributes["gen_ai.request.model"] == "set-directly"
+    assert "missing" not in attributes
+    assert "gen_ai.usage.total_tokens" not in raw.spans[0].attributes
+
+
+def test_wrapper_defers_handler_until_export(deferred):
+    raw = RecordingExporter()
+    tracer = _tracer(raw)
+    calls = []
+
+    def handler(args=None, kwargs=None, return_value=None):
+        calls.append((kwargs, return_value))
+        if return_value is not None:
+            return {"gen_ai.completion.0.content": return_value}
+        return {"gen_ai.prompt.count": len(kwargs["messages"])}
+
+    config = WrapConfig(trace_name="llm", package="test", class_name="Client", method_name="create", handler=handler)
+    wrapper = _create_wrapper(config, tracer)
+    messages = ["hello"]
+
+    assert wrapper(lambda **kwargs: "hi there", None, (), {"messages": messages}) == "hi there"
+    assert calls == []
+
+    # The caller keeps appending to its history; extraction sees the request as sent
+    messages.append("next turn")
+    exported = RecordingExporter()
+    DeferredAttributesSpanExporter(exported).export(raw.spans)
+
+    attributes = exported.spans[0].attributes
+    assert attributes["gen_ai.prompt.count"] == 1
+    assert attributes["gen_ai.completion.0.content"] == "hi there"
+
+
+def test_not_deferred_when_disabled():
+    tracer = _tracer(RecordingExporter())
+    with tracer.start_as_current_span("llm") as span:
+        assert not defer_attributes(span, lambda: {"key": "value"})
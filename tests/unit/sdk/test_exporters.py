@@ -10,7 +10,11 @@ from opentelemetry.sdk.trace import ReadableSpan
 from opentelemetry.sdk.trace.export import SpanExportResult
 from opentelemetry.exporter.otlp.proto.http import Compression
 
-from agentops.sdk.exporters import AuthenticatedOTLPExporter
+from agentops.sdk.exporters import (
+    AuthenticatedOTLPExporter,
+    AuthenticatedOTLPMetricExporter,
+    ConcurrentSpanExporter,
+)
 from agentops.exceptions import AgentOpsApiJwtExpiredException, ApiServerException
 
 # these are simple tests on a simple file, basically just to get test coverage
@@ -200,6 +204,81 @@ class TestAuthenticatedOTLPExporter(unittest.TestCase):
         # Verify the exporter was created successfully
         self.assertIsInstance(exporter, AuthenticatedOTLPExporter)
 
+    def test_export_attaches_auth_per_request(self):
+        """Test that export sends the JWT per request without mutating the shared session headers."""
+        exporter = AuthenticatedOTLPExporter(endpoint=self.endpoint, jwt=self.jwt)
+        session_headers_before = dict(exporter._session.headers)
+
+        with patch.object(exporter._session, "post") as mock_post:
+            mock_post.return_value = Mock(ok=True, status_code=200)
+
+            response = exporter._export(b"payload")
+
+        self.assertTrue(response.ok)
+        self.assertEqual(mock_post.call_args.kwargs["headers"]["Authorization"], f"Bearer {self.jwt}")
+        self.assertEqual(dict(exporter._session.headers), session_headers_before)
+        self.assertNotIn("Authorization", exporter._session.headers)
+
+    def test_auth_backoff_lifts_when_token_rotates(self):
+        """Test that a refreshed token ends the auth failure backoff immediately."""
+        tokens = ["expired-token"]
+        exporter = AuthenticatedOTLPExporter(endpoint=self.endpoint, jwt_provider=lambda: tokens[-1])
+
+        exporter._record_auth_failure()
+        self.assertTrue(exporter._in_auth_backoff())
+
+        tokens.append("fresh-token")
+        self.assertFalse(exporter._in_auth_backoff())
+
+    def test_metric_exporter_reads_token_per_request(self):
+        """Test that the metric exporter picks up a token that arrives after construction."""
+        tokens = [None]
+        exporter = AuthenticatedOTLPMetricExporter(
+            endpoint="https://api.agentops.ai/v1/metrics", jwt_provider=lambda: tokens[-1]
+        )
+
+        with patch.object(exporter._session, "post") as mock_post:
+            exporter._export(b"payload")
+            self.assertNotIn("Authorization", mock_post.call_args.kwargs["headers"])
+
+            tokens.append("late-token")
+            exporter._export(b"payload")
+            self.assertEqual(mock_post.call_args.kwargs["headers"]["Authorization"], "Bearer late-token")
+
+
+class TestConcurrentSpanExporter(unittest.TestCase):
+    """Tests for ConcurrentSpanExporter."""
+
+    def test_exports_batches_on_worker_threads(self):
+        """Test that batches are delegated to the wrapped exporter and flushed."""
+        inner = Mock()
+        inner.export.return_value = SpanExportResult.SUCCESS
+        exporter = ConcurrentSpanExporter(inner, max_workers=2)
+
+        batches = [[Mock(spec=ReadableSpan)] for _ in range(5)]
+        for batch in batches:
+            self.assertEqual(exporter.export(batch), SpanExportResult.SUCCESS)
+
+        self.assertTrue(exporter.force_flush(5000))
+        self.assertEqual(inner.export.call_count, 5)
+
+        exporter.shutdown()
+        inner.shutdown.assert_called_once()
+        self.assertEqual(exporter.export(batches[0]), SpanExportResult.FAILURE)
+
+    def test_inner_exception_does_not_leak_slots(self):
+        """Test that a failing wrapped exporter releases its in-flight slot."""
+        inner = Mock()
+        inner.export.side_effect = ValueError("boom")
+        exporter = ConcurrentSpanExporter(inner, max_workers=1, max_pending=1)
+
+        for _ in range(3):
+            exporter.export([Mock(spec=ReadableSpan)])
+            self.assertTrue(exporter.force_flush(5000))
+
+        self.assertEqual(inner.export.call_count, 3)
+        exporter.shutdown()
+
 
 class TestAuthenticatedOTLPExporterIntegration(unittest.TestCase):
     """Integration-style tests for AuthenticatedOTLPExporter."""
@@ -0,0 +1,109 @@
+import os
+
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import ExportTraceServiceRequest
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+
+from agentops.sdk.file_export import FileSpanExporter, list_segments, read_segment
+from agentops.sdk.replay import CHECKPOINT_FILE, replay_directory
+from agentops.sdk.spill import SendResult
+
+
+def _record_spans(exporter, count):
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    tracer = provider.get_tracer("test")
+    for i in range(count):
+        with tracer.start_as_current_span(f"span-{i}"):
+            pass
+
+
+def _span_names(payload):
+    request = ExportTraceServiceRequest()
+    request.ParseFromString(payload)
+    return [span.name for rs in request.resource_spans for ss in rs.scope_spans for span in ss.spans]
+
+
+def test_segments_are_published_on_shutdown(tmp_path):
+    exporter = FileSpanExporter(str(tmp_path))
+    _record_spans(exporter, 3)
+
+    assert list_segments(str(tmp_path)) == []
+    assert len(list_segments(str(tmp_path), include_open=True)) == 1
+
+    exporter.shutdown()
+    (segment,) = list_segments(str(tmp_path))
+    names = [name for payload, _ in read_segment(segment) for name in _span_names(payload)]
+    assert names == ["span-0", "span-1", "span-2"]
+
+
+def test_rotation_and_compression(tmp_path):
+    exporter = FileSpanExporter(str(tmp_path), segment_max_bytes=1, compression=True, fsync="always")
+    _record_spans(exporter, 3)
+    exporter.shutdown()
+
+    segments = list_segments(str(tmp_path))
+    assert len(segments) == 3
+    assert all(segment.endswith(".otlp.gz") for segment in segments)
+    assert [_span_names(payload) for segment in segments for payload, _ in read_segment(segment)] == [
+        ["span-0"],
+        ["span-1"],
+        ["span-2"],
+    ]
+
+
+def test_read_segment_stops_at_torn_record(tmp_path):
+    exporter = FileSpanExporter(str(tmp_path))
+    _record_spans(exporter, 2)
+    exporter.shutdown()
+    (segment,) = list_segments(str(tmp_path))
+    with open(segment, "ab") as f:
+        f.write(b"\x00\x00\x01\x00partial")
+
+    assert len(list(read_segment(segment))) == 2
+
+
+def test_replay_resumes_after_failure(tmp_path):
+    exporter = FileSpanExporter(str(tmp_path), segment_max_bytes=1)
+    _record_spans(exporter, 4)
+    exporter.shutdown()
+
+    sent = []
+    fail_on = {"span-2"}
+
+    def send(payload):
+        names = _span_names(payload)
+        if fail_on.intersection(names):
+            return False
+        sent.extend(names)
+        return True
+
+    result = replay_directory(str(tmp_path), send, workers=2, retries=0)
+    assert result["failed"] == 1
+    assert sent == ["span-0", "span-1"]
+    assert os.path.exists(tmp_path / CHECKPOINT_FILE)
+
+    fail_on.clear()
+    result = replay_directory(str(tmp_path), send, workers=2, retries=0, delete=True)
+    assert result == {"segments": 2, "records": 2, "rejected": 0, "failed": 0}
+    assert sent == ["span-0", "span-1", "span-2", "span-3"]
+    assert list_segments(str(tmp_path)) == []
+
+
+def test_replay_skips_rejected_records(tmp_path):
+    exporter = FileSpanExporter(str(tmp_path), segment_max_bytes=1)
+    _record_spans(exporter, 3)
+    exporter.shutdown()
+
+    sent = []
+
+    def send(payload):
+        names = _span_names(payload)
+        if "span-1" in names:
+            return SendResult.REJECTED
+        sent.extend(names)
+        return SendResult.SENT
+
+    result = replay_directory(str(tmp_path), send, workers=2, retries=3, retry_backoff=0)
+    assert result == {"segments": 3, "records": 2, "rejected": 1, "failed": 0}
+    assert sent == ["span-0", "span-2"]
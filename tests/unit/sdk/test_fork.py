@@ -0,0 +1,111 @@
+import gc
+import os
+import weakref
+from unittest.mock import MagicMock
+
+import pytest
+from opentelemetry.sdk.trace.export import SpanExportResult
+
+from agentops.client.http.http_client import HttpClient
+from agentops.helpers.fork import register_after_fork
+from agentops.sdk.core import TraceContext, TracingCore
+from agentops.sdk.exporters import ConcurrentSpanExporter
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+
+
+def _exit_code_in_child(check) -> int:
+    """Fork, run `check` in the child, and return the child's exit code (0 if it returned True)."""
+    pid = os.fork()
+    if pid == 0:
+        try:
+            code = 0 if check() else 1
+        except BaseException:
+            code = 2
+        os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status)
+
+
+class _Counter:
+    def __init__(self):
+        self.calls = 0
+        register_after_fork(self.reinit)
+
+    def reinit(self):
+        self.calls += 1
+
+
+def test_after_fork_hook_runs_only_in_child():
+    counter = _Counter()
+
+    assert _exit_code_in_child(lambda: counter.calls == 1) == 0
+    assert counter.calls == 0
+
+
+def test_after_fork_hook_does_not_keep_object_alive():
+    counter = _Counter()
+    ref = weakref.ref(counter)
+    del counter
+    gc.collect()
+
+    assert ref() is None
+
+
+def test_http_client_session_is_not_shared_with_child():
+    parent_session = HttpClient.get_session()
+
+    def check():
+        return HttpClient._session is None and HttpClient.get_session() is not parent_session
+
+    assert _exit_code_in_child(check) == 0
+    assert HttpClient.get_session() is parent_session
+
+
+def test_concurrent_exporter_exports_in_child():
+    inner = MagicMock()
+    inner.export.return_value = SpanExportResult.SUCCESS
+    exporter = ConcurrentSpanExporter(inner, max_workers=2)
+    # Start the parent's worker threads so the child inherits a pool with dead threads
+    exporter.export([MagicMock()])
+    assert exporter.force_flush(1000)
+
+    def check():
+        inner.export.reset_mock()
+        assert exporter.export([MagicMock()]) == SpanExportResult.SUCCESS
+        return exporter.force_flush(1000) and inner.export.call_count == 1
+
+    assert _exit_code_in_child(check) == 0
+    exporter.shutdown()
+
+
+def test_child_does_not_end_traces_inherited_from_parent():
+    core = TracingCore()
+    span = MagicMock()
+    span.get_span_context.return_value.trace_id = 0xABC
+    trace_context = TraceContext(span)
+    core._active_traces["abc"] = trace_context
+
+    core._at_fork_reinit()
+    core._end_single_trace(trace_context, "Success")
+
+    assert core._active_traces == {}
+    span.set_attribute.assert_not_called()
+    span.end.assert_not_called()
+
+
+def test_grandchild_keeps_traces_inherited_from_grandparent():
+    core = TracingCore()
+    spans = {}
+    for trace_id in ("abc", "def"):
+        spans[trace_id] = MagicMock()
+        spans[trace_id].get_span_context.return_value.trace_id = int(trace_id, 16)
+    core._active_traces["abc"] = TraceContext(spans["abc"])
+
+    core._at_fork_reinit()
+    core._active_traces["def"] = TraceContext(spans["def"])
+    core._at_fork_reinit()
+
+    assert core._inherited_traces == {"abc", "def"}
+    core._end_single_trace(TraceContext(spans["abc"]), "Success")
+    spans["abc"].end.assert_not_called()
@@ -9,6 +9,7 @@ from opentelemetry.sdk.trace import Span, ReadableSpan
 
 from agentops.sdk.processors import InternalSpanProcessor
 from agentops.sdk.core import TraceContext, tracer
+from agentops.semconv import SpanAttributes
 
 
 class TestURLLogging(unittest.TestCase):
@@ -228,23 +229,22 @@ class TestInternalSpanProcessor(unittest.TestCase):
 
     def setUp(self):
         self.processor = InternalSpanProcessor()
-        # Reset the root span ID before each test
-        self.processor._root_span_id = None
 
     def test_tracks_root_span_on_start(self):
-        """Test that the processor tracks the first span as root span."""
+        """Test that the processor tracks the first span of a trace as its root span."""
         # Create a mock span
         mock_span = MagicMock(spec=Span)
         mock_context = MagicMock()
         mock_context.trace_flags.sampled = True
         mock_context.span_id = 12345
+        mock_context.trace_id = 98765
         mock_span.context = mock_context
 
         # Call on_start
         self.processor.on_start(mock_span)
 
         # Assert that root span ID was set
-        self.assertEqual(self.processor._root_span_id, 12345)
+        self.assertEqual(self.processor._root_spans, {98765: 12345})
 
     def test_ignores_unsampled_spans_on_start(self):
         """Test that unsampled spans are ignored on start."""
@@ -258,31 +258,87 @@ class TestInternalSpanProcessor(unittest.TestCase):
         self.processor.on_start(mock_span)
 
         # Assert that root span ID was not set
-        self.assertIsNone(self.processor._root_span_id)
+        self.assertEqual(self.processor._root_spans, {})
 
     def test_only_tracks_first_span_as_root(self):
-        """Test that only the first span is tracked as root span."""
+        """Test that only the first span of a trace is tracked as its root span."""
         # First span
         mock_span1 = MagicMock(spec=Span)
         mock_context1 = MagicMock()
         mock_context1.trace_flags.sampled = True
         mock_context1.span_id = 12345
+        mock_context1.trace_id = 98765
         mock_span1.context = mock_context1
 
-        # Second span
+        # Second span of the same trace
         mock_span2 = MagicMock(spec=Span)
         mock_context2 = MagicMock()
         mock_context2.trace_flags.sampled = True
         mock_context2.span_id = 67890
+        mock_context2.trace_id = 98765
         mock_span2.context = mock_context2
 
         # Start first span
         self.processor.on_start(mock_span1)
-        self.assertEqual(self.processor._root_span_id, 12345)
+        self.assertEqual(self.processor._root_spans[98765], 12345)
 
         # Start second span - should not change root span ID
         self.processor.on_start(mock_span2)
-        self.assertEqual(self.processor._root_span_id, 12345)
+        self.assertEqual(self.processor._root_spans[98765], 12345)
+
+    @patch("agentops.sdk.processors.upload_logfile")
+    def test_uploads_logfile_for_every_trace(self, mock_upload_logfile):
+        """Test that each trace uploads its logfile when its own root span ends."""
+        for trace_id, span_id in ((98765, 12345), (43210, 67890)):
+            mock_context = MagicMock()
+            mock_context.trace_flags.sampled = True
+            mock_context.span_id = span_id
+            mock_context.trace_id = trace_id
+            mock_span = MagicMock(spec=Span)
+            mock_span.context = mock_context
+            self.processor.on_start(mock_span)
+
+            mock_readable_span = MagicMock(spec=ReadableSpan)
+            mock_readable_span.context = mock_context
+            mock_readable_span.attributes = {}
+            self.processor.on_end(mock_readable_span)
+
+        self.assertEqual([c.args[0] for c in mock_upload_logfile.call_args_list], [98765, 43210])
+        self.assertEqual(self.processor._root_spans, {})
+
+    @patch("agentops.sdk.processors._MAX_OPEN_TRACES", 2)
+    def test_forgets_oldest_open_traces_beyond_limit(self):
+        """Test that traces whose root span never ends do not accumulate without bound."""
+        for trace_id in (1, 2, 3):
+            mock_context = MagicMock()
+            mock_context.trace_flags.sampled = True
+            mock_context.span_id = trace_id * 10
+            mock_context.trace_id = trace_id
+            mock_span = MagicMock(spec=Span)
+            mock_span.context = mock_context
+            self.processor.on_start(mock_span)
+
+        self.assertEqual(self.processor._root_spans, {2: 20, 3: 30})
+
+    @patch("agentops.sdk.processors.discard_logfile")
+    @patch("agentops.sdk.processors.upload_logfile")
+    def test_discards_logfile_of_trace_routed_to_another_project(self, mock_upload_logfile, mock_discard_logfile):
+        """Test that output of a trace exported with another project's credentials is not uploaded."""
+        mock_context = MagicMock()
+        mock_context.trace_flags.sampled = True
+        mock_context.span_id = 12345
+        mock_context.trace_id = 98765
+        mock_span = MagicMock(spec=Span)
+        mock_span.context = mock_context
+        self.processor.on_start(mock_span)
+
+        mock_readable_span = MagicMock(spec=ReadableSpan)
+        mock_readable_span.context = mock_context
+        mock_readable_span.attributes = {SpanAttributes.AGENTOPS_PIPELINE: "acme"}
+        self.processor.on_end(mock_readable_span)
+
+        mock_upload_logfile.assert_not_called()
+        mock_discard_logfile.assert_called_once_with(98765)
 
     @patch("agentops.sdk.processors.upload_logfile")
     def test_uploads_logfile_on_root_span_end(self, mock_upload_logfile):
@@ -301,6 +357,7 @@ class TestInternalSpanProcessor(unittest.TestCase):
         # Create readable span for end event
         mock_readable_span = MagicMock(spec=ReadableSpan)
         mock_readable_span.context = mock_context
+        mock_readable_span.attributes = {}
 
         # End the span
         self.processor.on_end(mock_readable_span)
@@ -316,6 +373,7 @@ class TestInternalSpanProcessor(unittest.TestCase):
         root_context = MagicMock()
         root_context.trace_flags.sampled = True
         root_context.span_id = 12345
+        root_context.trace_id = 98765
         root_span.context = root_context
 
         # Start root span
@@ -326,6 +384,7 @@ class TestInternalSpanProcessor(unittest.TestCase):
         non_root_context = MagicMock()
         non_root_context.trace_flags.sampled = True
         non_root_context.span_id = 67890  # Different from root
+        non_root_context.trace_id = 98765
         non_root_span.context = non_root_context
 
         # End non-root span
@@ -354,6 +413,7 @@ class TestInternalSpanProcessor(unittest.TestCase):
         # Create readable span for end event
         mock_readable_span = MagicMock(spec=ReadableSpan)
         mock_readable_span.context = mock_context
+        mock_readable_span.attributes = {}
 
         # End the span - should not raise exception
         self.processor.on_end(mock_readable_span)
@@ -383,13 +443,13 @@ class TestInternalSpanProcessor(unittest.TestCase):
 
         # Start span to set root span ID
         self.processor.on_start(mock_span)
-        self.assertEqual(self.processor._root_span_id, 12345)
+        self.assertEqual(list(self.processor._root_spans.values()), [12345])
 
         # Call shutdown
         self.processor.shutdown()
 
         # Verify root span ID was reset
-        self.assertIsNone(self.processor._root_span_id)
+        self.assertEqual(self.processor._root_spans, {})
 
     def test_force_flush_returns_true(self):
         """Test that force_flush returns True."""
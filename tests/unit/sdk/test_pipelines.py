@@ -0,0 +1,130 @@
+from unittest.mock import Mock
+
+import pytest
+from opentelemetry import context as context_api
+from opentelemetry import trace
+from opentelemetry.context import Context
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import ExportTraceServiceRequest
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from agentops.sdk.pipelines import (
+    PipelineRegistry,
+    PipelineRoutingExporter,
+    PipelineRoutingProcessor,
+    current_pipeline,
+    use_pipeline,
+)
+from agentops.semconv import ResourceAttributes
+
+
+@pytest.fixture(autouse=True)
+def empty_context():
+    # Spans left current by other test modules would otherwise parent the root spans started here
+    token = context_api.attach(Context())
+    yield
+    context_api.detach(token)
+
+
+def _setup():
+    registry = PipelineRegistry()
+    default = InMemorySpanExporter()
+    provider = TracerProvider(resource=Resource({ResourceAttributes.PROJECT_ID: "default-project"}))
+    provider.add_span_processor(PipelineRoutingProcessor(registry))
+    provider.add_span_processor(SimpleSpanProcessor(PipelineRoutingExporter(default, registry)))
+    return registry, default, provider.get_tracer("test")
+
+
+def _decode(payload):
+    request = ExportTraceServiceRequest()
+    request.ParseFromString(payload)
+    return request
+
+
+def test_use_pipeline_sets_and_restores_context():
+    assert current_pipeline() is None
+    with use_pipeline("acme"):
+        assert current_pipeline() == "acme"
+    assert current_pipeline() is None
+
+
+def test_routes_traces_to_their_pipeline():
+    registry, default, tracer = _setup()
+    pipeline = registry.add("acme", endpoint="http://localhost/v1/traces", jwt_provider=lambda: "acme-jwt")
+    registry.set_project_id("acme", "acme-project")
+    pipeline.exporter.export_serialized = Mock(return_value=True)
+
+    with use_pipeline("acme"):
+        with tracer.start_as_current_span("acme-root"):
+            with tracer.start_as_current_span("acme-child"):
+                pass
+    with tracer.start_as_current_span("default-root"):
+        pass
+
+    assert [span.name for span in default.get_finished_spans()] == ["default-root"]
+
+    payloads = [call.args[0] for call in pipeline.exporter.export_serialized.call_args_list]
+    requests = [_decode(payload) for payload in payloads]
+    names = [span.name for r in requests for rs in r.resource_spans for ss in rs.scope_spans for span in ss.spans]
+    assert names == ["acme-child", "acme-root"]
+    for request in requests:
+        attributes = {kv.key: kv.value.string_value for kv in request.resource_spans[0].resource.attributes}
+        assert attributes[ResourceAttributes.PROJECT_ID] == "acme-project"
+
+
+def test_unregistered_pipeline_spans_are_dropped():
+    registry, default, tracer = _setup()
+
+    with use_pipeline("unknown"):
+        with tracer.start_as_current_span("root"):
+            pass
+    with tracer.start_as_current_span("default-root"):
+        pass
+
+    assert [span.name for span in default.get_finished_spans()] == ["default-root"]
+
+
+def test_trace_is_released_when_root_span_ends():
+    registry, _, tracer = _setup()
+    registry.add("acme", endpoint="http://localhost/v1/traces", jwt_provider=lambda: "acme-jwt")
+
+    with use_pipeline("acme"):
+        with tracer.start_as_current_span("root") as root:
+            trace_id = root.get_span_context().trace_id
+            assert registry.trace_pipeline(trace_id) == "acme"
+    assert registry.trace_pipeline(trace_id) is None
+
+
+def test_span_ending_after_release_keeps_its_pipeline():
+    registry, default, tracer = _setup()
+    pipeline = registry.add("acme", endpoint="http://localhost/v1/traces", jwt_provider=lambda: "acme-jwt")
+    pipeline.exporter.export_serialized = Mock(return_value=True)
+
+    with use_pipeline("acme"):
+        root = tracer.start_span("root")
+    # The child starts outside the pipeline context, e.g. on a worker thread of an integration
+    with trace.use_span(root):
+        child = tracer.start_span("child")
+    registry.release_trace(root.get_span_context().trace_id)
+    child.end()
+    root.end()
+
+    assert default.get_finished_spans() == ()
+    assert pipeline.exporter.export_serialized.call_count == 2
+
+
+def test_removed_pipeline_drops_spans_of_its_open_trace():
+    registry, default, tracer = _setup()
+    pipeline = registry.add("acme", endpoint="http://localhost/v1/traces", jwt_provider=lambda: "acme-jwt")
+    pipeline.exporter.export_serialized = Mock(return_value=True)
+
+    with use_pipeline("acme"):
+        with tracer.start_as_current_span("root"):
+            registry.remove("acme")
+            with tracer.start_as_current_span("child"):
+                pass
+
+    assert default.get_finished_spans() == ()
+    pipeline.exporter.export_serialized.assert_not_called()
@@ -0,0 +1,96 @@
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExporter, SpanExportResult
+
+from agentops.sdk.prompt_dedup import PromptDedupSpanExporter, content_hash
+
+SYSTEM = "You are a careful assistant. " * 10
+QUESTION = "Summarize the quarterly report and list every open risk in detail. " * 3
+
+
+class RecordingExporter(SpanExporter):
+    def __init__(self):
+        self.spans = []
+        self.result = SpanExportResult.SUCCESS
+
+    def export(self, spans):
+        self.spans.extend(spans)
+        return self.result
+
+    def shutdown(self):
+        pass
+
+
+def _llm_span(tracer, messages):
+    with tracer.start_as_current_span("openai.chat") as span:
+        for i, content in enumerate(messages):
+            span.set_attribute(f"gen_ai.prompt.{i}.role", "user")
+            span.set_attribute(f"gen_ai.prompt.{i}.content", content)
+
+
+def _setup(exporter):
+    dedup = PromptDedupSpanExporter(exporter)
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(dedup))
+    return dedup, provider.get_tracer("test")
+
+
+def test_repeated_messages_are_sent_once_per_trace():
+    exporter = RecordingExporter()
+    dedup, tracer = _setup(exporter)
+
+    with tracer.start_as_current_span("session", context=Context()):
+        _llm_span(tracer, [SYSTEM, QUESTION])
+        _llm_span(tracer, [SYSTEM, QUESTION, "short follow-up"])
+
+    first, second = exporter.spans[0].attributes, exporter.spans[1].attributes
+    assert first["gen_ai.prompt.0.content"] == SYSTEM
+    assert first["gen_ai.prompt.0.content_hash"] == content_hash(SYSTEM)
+    assert "gen_ai.prompt.0.content" not in second
+    assert second["gen_ai.prompt.0.content_ref"] == content_hash(SYSTEM)
+    assert second["gen_ai.prompt.1.content_ref"] == content_hash(QUESTION)
+    # Short bodies are not worth a reference
+    assert second["gen_ai.prompt.2.content"] == "short follow-up"
+    assert dedup.chars_saved == len(SYSTEM) + len(QUESTION)
+
+
+def test_traces_are_deduplicated_independently():
+    exporter = RecordingExporter()
+    _, tracer = _setup(exporter)
+
+    for _ in range(2):
+        with tracer.start_as_current_span("session", context=Context()):
+            _llm_span(tracer, [SYSTEM])
+
+    llm_spans = [span for span in exporter.spans if span.name == "openai.chat"]
+    assert all(span.attributes["gen_ai.prompt.0.content"] == SYSTEM for span in llm_spans)
+
+
+def test_bodies_from_failed_exports_are_sent_again():
+    exporter = RecordingExporter()
+    dedup, tracer = _setup(exporter)
+
+    with tracer.start_as_current_span("session", context=Context()):
+        exporter.result = SpanExportResult.FAILURE
+        _llm_span(tracer, [SYSTEM])
+        exporter.result = SpanExportResult.SUCCESS
+        _llm_span(tracer, [SYSTEM])
+        _llm_span(tracer, [SYSTEM])
+
+    retried, deduplicated = exporter.spans[1].attributes, exporter.spans[2].attributes
+    assert retried["gen_ai.prompt.0.content"] == SYSTEM
+    assert deduplicated["gen_ai.prompt.0.content_ref"] == content_hash(SYSTEM)
+    assert dedup.chars_saved == len(SYSTEM)
+
+
+def test_failed_exports_do_not_count_saved_chars():
+    exporter = RecordingExporter()
+    dedup, tracer = _setup(exporter)
+
+    with tracer.start_as_current_span("session", context=Context()):
+        _llm_span(tracer, [SYSTEM])
+        exporter.result = SpanExportResult.FAILURE
+        _llm_span(tracer, [SYSTEM])
+
+    assert exporter.spans[1].attributes["gen_ai.prompt.0.content_ref"] == content_hash(SYSTEM)
+    assert dedup.chars_saved == 0
@@ -0,0 +1,118 @@
+import os
+import socket
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from opentelemetry.context import Context
+from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExportResult
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from agentops.sdk.relay import RELAY_SUPPORTED, RelaySpanExporter
+
+pytestmark = pytest.mark.skipif(not RELAY_SUPPORTED, reason="requires Unix domain sockets")
+
+
+def _spans(count=2):
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    tracer = provider.get_tracer("test")
+    for i in range(count):
+        tracer.start_span(f"span-{i}", context=Context()).end()
+    return exporter.get_finished_spans()
+
+
+def _inner_exporter():
+    inner = MagicMock()
+    inner.export.return_value = SpanExportResult.SUCCESS
+    inner.export_serialized.return_value = True
+    return inner
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "relay.sock")
+
+
+def test_first_exporter_becomes_relay_and_forwards_batches(socket_path):
+    relay_inner, worker_inner = _inner_exporter(), _inner_exporter()
+    relay = RelaySpanExporter(relay_inner, socket_path)
+    worker = RelaySpanExporter(worker_inner, socket_path)
+    spans = _spans()
+
+    try:
+        assert relay.is_relay
+        assert not worker.is_relay
+
+        assert worker.export(spans) == SpanExportResult.SUCCESS
+        assert _wait_for(lambda: relay_inner.export_serialized.called)
+        relay_inner.export_serialized.assert_called_once_with(encode_spans(spans).SerializePartialToString())
+        worker_inner.export.assert_not_called()
+
+        # The relay exports its own spans directly
+        assert relay.export(spans) == SpanExportResult.SUCCESS
+        relay_inner.export.assert_called_once_with(spans)
+    finally:
+        worker.shutdown()
+        relay.shutdown()
+
+
+def test_worker_takes_over_when_relay_exits(socket_path):
+    relay = RelaySpanExporter(_inner_exporter(), socket_path)
+    worker_inner = _inner_exporter()
+    worker = RelaySpanExporter(worker_inner, socket_path)
+    relay.shutdown()
+    spans = _spans()
+
+    try:
+        assert worker.export(spans) == SpanExportResult.SUCCESS
+        worker_inner.export.assert_called_once_with(spans)
+        assert worker.is_relay
+    finally:
+        worker.shutdown()
+
+
+def test_stale_socket_file_is_replaced(socket_path):
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(socket_path)
+    stale.close()
+
+    relay = RelaySpanExporter(_inner_exporter(), socket_path)
+    try:
+        assert relay.is_relay
+    finally:
+        relay.shutdown()
+    assert not os.path.exists(socket_path)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_forked_child_relays_to_parent(socket_path):
+    relay_inner = _inner_exporter()
+    relay = RelaySpanExporter(relay_inner, socket_path)
+    spans = _spans()
+
+    try:
+        pid = os.fork()
+        if pid == 0:
+            ok = not relay.is_relay and relay.export(spans) == SpanExportResult.SUCCESS
+            ok = ok and not relay_inner.export.called
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert _wait_for(lambda: relay_inner.export_serialized.called)
+        assert relay.is_relay
+    finally:
+        relay.shutdown()
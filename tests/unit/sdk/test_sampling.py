@@ -0,0 +1,140 @@
+from unittest.mock import MagicMock
+
+from opentelemetry.context import Context
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import Status, StatusCode
+
+from agentops.sdk.sampling import SpanKindRatioSampler, TailSamplingSpanProcessor, create_head_sampler
+from agentops.semconv import SpanAttributes, SpanKind
+
+
+# Root spans are started in an empty context so spans leaked into the ambient context by other tests don't parent them
+ROOT = Context()
+
+
+def _tail_sampled_tracer(**kwargs):
+    exporter = InMemorySpanExporter()
+    processor = TailSamplingSpanProcessor(SimpleSpanProcessor(exporter), **kwargs)
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    return provider.get_tracer("test"), processor, exporter
+
+
+def test_head_sampler_is_not_installed_when_everything_is_sampled():
+    assert create_head_sampler(1.0) is None
+    assert create_head_sampler(1.0, {SpanKind.LLM: 1.0}) is None
+    assert create_head_sampler(0.5) is not None
+
+
+def test_head_sampler_uses_kind_override_for_root_spans():
+    sampler = SpanKindRatioSampler(ratio=1.0, ratios_by_kind={SpanKind.LLM: 0.0})
+
+    llm = sampler.should_sample(None, 0x1234, "llm", attributes={SpanAttributes.AGENTOPS_SPAN_KIND: SpanKind.LLM})
+    tool = sampler.should_sample(None, 0x1234, "tool", attributes={SpanAttributes.AGENTOPS_SPAN_KIND: SpanKind.TOOL})
+
+    assert not llm.decision.is_sampled()
+    assert tool.decision.is_sampled()
+
+
+def test_head_sampler_children_follow_parent():
+    provider = TracerProvider(sampler=create_head_sampler(0.0, {SpanKind.SESSION: 1.0}))
+    tracer = provider.get_tracer("test")
+
+    with tracer.start_as_current_span(
+        "kept", attributes={SpanAttributes.AGENTOPS_SPAN_KIND: SpanKind.SESSION}, context=ROOT
+    ):
+        with tracer.start_as_current_span("child") as child:
+            assert child.get_span_context().trace_flags.sampled
+    with tracer.start_as_current_span("dropped", context=ROOT):
+        with tracer.start_as_current_span("child") as child:
+            assert not child.get_span_context().trace_flags.sampled
+
+
+def test_tail_sampling_holds_trace_until_root_ends():
+    tracer, processor, exporter = _tail_sampled_tracer(ratio=1.0)
+
+    with tracer.start_as_current_span("root", context=ROOT):
+        with tracer.start_as_current_span("child"):
+            pass
+        assert exporter.get_finished_spans() == ()
+        assert processor.buffered_traces == 1
+
+    assert [span.name for span in exporter.get_finished_spans()] == ["child", "root"]
+    assert processor.buffered_traces == 0
+
+
+def test_tail_sampling_keeps_error_costly_and_token_heavy_traces():
+    tracer, processor, exporter = _tail_sampled_tracer(ratio=0.0, min_cost=1.0, min_tokens=1000)
+
+    with tracer.start_as_current_span("healthy", context=ROOT):
+        with tracer.start_as_current_span("llm") as span:
+            span.set_attribute(SpanAttributes.LLM_USAGE_TOTAL_TOKENS, 10)
+    with tracer.start_as_current_span("failed", context=ROOT):
+        with tracer.start_as_current_span("tool") as span:
+            span.set_status(Status(StatusCode.ERROR))
+    with tracer.start_as_current_span("costly", context=ROOT):
+        for _ in range(2):
+            with tracer.start_as_current_span("tool") as span:
+                span.set_attribute(SpanAttributes.LLM_USAGE_TOOL_COST, 0.5)
+    with tracer.start_as_current_span("wordy", context=ROOT):
+        with tracer.start_as_current_span("llm") as span:
+            span.set_attribute(SpanAttributes.LLM_USAGE_PROMPT_TOKENS, 900)
+            span.set_attribute(SpanAttributes.LLM_USAGE_COMPLETION_TOKENS, 100)
+
+    roots = [span.name for span in exporter.get_finished_spans() if span.parent is None]
+    assert roots == ["failed", "costly", "wordy"]
+    assert processor.kept_traces == 3
+    assert processor.dropped_traces == 1
+
+
+def test_tail_sampling_keeps_slow_traces():
+    tracer, _, exporter = _tail_sampled_tracer(ratio=0.0, latency_ms=50)
+
+    root = tracer.start_span("slow", context=ROOT, start_time=0)
+    root.end(end_time=100 * 1_000_000)
+    root = tracer.start_span("fast", context=ROOT, start_time=0)
+    root.end(end_time=1_000_000)
+
+    assert [span.name for span in exporter.get_finished_spans()] == ["slow"]
+
+
+def test_tail_sampling_decides_oldest_trace_early_when_full():
+    tracer, processor, exporter = _tail_sampled_tracer(ratio=1.0, max_traces=2)
+
+    roots = [tracer.start_span(f"root{i}", context=ROOT) for i in range(3)]
+    for i, root in enumerate(roots):
+        with tracer.start_as_current_span(f"child{i}", context=_context_of(root)):
+            pass
+
+    # The third trace pushed the first one out of the buffer
+    assert [span.name for span in exporter.get_finished_spans()] == ["child0"]
+    assert processor.buffered_traces == 2
+
+    # Spans ending after their trace was decided follow the decision
+    roots[0].end()
+    assert [span.name for span in exporter.get_finished_spans()] == ["child0", "root0"]
+
+
+def test_tail_sampling_shutdown_releases_buffered_traces():
+    downstream = MagicMock()
+    processor = TailSamplingSpanProcessor(downstream, ratio=1.0)
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    tracer = provider.get_tracer("test")
+
+    root = tracer.start_span("root", context=ROOT)
+    with tracer.start_as_current_span("child", context=_context_of(root)):
+        pass
+    processor.shutdown()
+
+    assert downstream.on_end.call_count == 1
+    downstream.shutdown.assert_called_once()
+
+
+def _context_of(span):
+    from opentelemetry import trace
+
+    return trace.set_span_in_context(span)
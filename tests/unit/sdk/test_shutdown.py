@@ -0,0 +1,80 @@
+import threading
+import time
+
+from agentops.sdk.shutdown import run_until_deadline
+
+
+def test_steps_run_concurrently():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def step(timeout_millis):
+        barrier.wait()  # Only passes if all three steps are running at once
+        return True
+
+    report = run_until_deadline({"spans": step, "metrics": step, "logs": step}, timeout_millis=5000)
+
+    assert sorted(report["completed"]) == ["logs", "metrics", "spans"]
+    assert report["failed"] == [] and report["timed_out"] == []
+
+
+def test_reports_steps_still_running_at_deadline():
+    release = threading.Event()
+
+    def hanging(timeout_millis):
+        release.wait(10)
+        return True
+
+    started = time.monotonic()
+    report = run_until_deadline({"spans": lambda timeout_millis: True, "logs": hanging}, timeout_millis=200)
+    release.set()
+
+    assert time.monotonic() - started < 2
+    assert report["completed"] == ["spans"]
+    assert report["timed_out"] == ["logs"]
+
+
+def test_steps_get_remaining_time_and_failures_are_reported():
+    received = {}
+
+    def flush(timeout_millis):
+        received["timeout"] = timeout_millis
+        return False
+
+    def broken(timeout_millis):
+        raise RuntimeError("exporter gone")
+
+    report = run_until_deadline({"spans": flush, "metrics": broken}, timeout_millis=500)
+
+    assert 0 < received["timeout"] <= 500
+    assert sorted(report["failed"]) == ["metrics", "spans"]
+
+
+def test_inline_steps_share_the_deadline(monkeypatch):
+    def refuse(self):
+        raise RuntimeError("can't create new thread at interpreter shutdown")
+
+    monkeypatch.setattr(threading.Thread, "start", refuse)
+    received = {}
+
+    def slow(timeout_millis):
+        received["spans"] = timeout_millis
+        time.sleep(0.15)
+        return True
+
+    def fast(timeout_millis):
+        received["logs"] = timeout_millis
+        return True
+
+    def late(timeout_millis):
+        received["metrics"] = timeout_millis
+        return True
+
+    report = run_until_deadline({"spans": slow, "logs": fast}, timeout_millis=400)
+    assert report["completed"] == ["spans", "logs"]
+    assert received["logs"] <= received["spans"] - 100
+
+    received.clear()
+    report = run_until_deadline({"spans": slow, "metrics": late}, timeout_millis=100)
+    assert report["completed"] == ["spans"]
+    assert report["timed_out"] == ["metrics"]
+    assert "metrics" not in received
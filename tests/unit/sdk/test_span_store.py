@@ -0,0 +1,103 @@
+import pytest
+from opentelemetry import context as context_api
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+
+from agentops.sdk.span_store import SpanStore
+from agentops.semconv import SpanAttributes
+
+
+@pytest.fixture(autouse=True)
+def empty_context():
+    # Spans left current by other test modules would otherwise parent the root spans started here
+    token = context_api.attach(Context())
+    yield
+    context_api.detach(token)
+
+
+def _tracer(store):
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(store))
+    return provider.get_tracer("test")
+
+
+def _llm_call(tracer, model, prompt_tokens, completion_tokens, cost):
+    with tracer.start_as_current_span("llm") as span:
+        span.set_attribute(SpanAttributes.AGENTOPS_SPAN_KIND, "llm")
+        span.set_attribute(SpanAttributes.LLM_REQUEST_MODEL, model)
+        span.set_attribute(SpanAttributes.LLM_USAGE_PROMPT_TOKENS, prompt_tokens)
+        span.set_attribute(SpanAttributes.LLM_USAGE_COMPLETION_TOKENS, completion_tokens)
+        span.set_attribute(SpanAttributes.LLM_USAGE_TOOL_COST, cost)
+
+
+def test_trace_metrics_roll_up_llm_spans():
+    store = SpanStore()
+    tracer = _tracer(store)
+    with tracer.start_as_current_span("session") as root:
+        _llm_call(tracer, "gpt-4o", 10, 5, 0.01)
+        _llm_call(tracer, "claude-3", 20, 10, 0.02)
+
+    metrics = store.trace_metrics(root.get_span_context().trace_id)
+
+    assert metrics["span_count"] == 3
+    assert metrics["llm_span_count"] == 2
+    assert metrics["prompt_tokens"] == 30
+    assert metrics["completion_tokens"] == 15
+    assert metrics["total_tokens"] == 45
+    assert abs(metrics["total_cost"] - 0.03) < 1e-9
+    assert metrics["models"] == ["claude-3", "gpt-4o"]
+
+
+def test_spans_filter_by_index():
+    store = SpanStore()
+    tracer = _tracer(store)
+    with tracer.start_as_current_span("session") as root:
+        _llm_call(tracer, "gpt-4o", 1, 1, 0.0)
+        _llm_call(tracer, "claude-3", 1, 1, 0.0)
+    trace_id = format(root.get_span_context().trace_id, "032x")
+
+    assert [span["model"] for span in store.spans(trace_id=trace_id, model="gpt-4o")] == ["gpt-4o"]
+    assert len(store.spans(kind="llm")) == 2
+    assert len(store.spans(parent_span_id=root.get_span_context().span_id)) == 2
+    assert store.spans(model="unknown") == []
+
+
+def test_span_tree_nests_children():
+    store = SpanStore()
+    tracer = _tracer(store)
+    with tracer.start_as_current_span("session") as root:
+        with tracer.start_as_current_span("agent"):
+            _llm_call(tracer, "gpt-4o", 1, 1, 0.0)
+
+    (session,) = store.span_tree(root.get_span_context().trace_id)
+
+    assert session["span_name"] == "session"
+    assert session["children"][0]["span_name"] == "agent"
+    assert session["children"][0]["children"][0]["span_name"] == "llm"
+
+
+def test_retention_drops_oldest_traces():
+    store = SpanStore(max_spans=4)
+    tracer = _tracer(store)
+    roots = []
+    for _ in range(3):
+        with tracer.start_as_current_span("session") as root:
+            with tracer.start_as_current_span("child"):
+                pass
+        roots.append(format(root.get_span_context().trace_id, "032x"))
+
+    assert store.trace_ids() == roots[1:]
+    assert len(store) == 4
+    assert store.spans(trace_id=roots[0]) == []
+
+
+def test_compaction_keeps_queries_consistent():
+    store = SpanStore(max_spans=1)
+    tracer = _tracer(store)
+    for _ in range(3000):
+        _llm_call(tracer, "gpt-4o", 1, 1, 0.0)
+
+    assert len(store) == 1
+    assert len(store.spans(kind="llm")) == 1
+    assert len(store.spans(model="gpt-4o")) == 1
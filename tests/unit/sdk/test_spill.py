@@ -0,0 +1,158 @@
+"""
+Unit tests for the span export spill store.
+"""
+
+import os
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace.export import SpanExportResult
+
+from agentops.sdk.exporters import AuthenticatedOTLPExporter
+from agentops.sdk.spill import SendResult, SpillStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SpillStore(str(tmp_path / "spill"), max_bytes=1024, segment_max_bytes=256)
+
+
+def test_append_and_drain_in_order(store):
+    """Batches are replayed oldest-first and removed once sent."""
+    payloads = [f"batch-{i}".encode() for i in range(5)]
+    for payload in payloads:
+        store.append(payload)
+
+    sent = []
+    assert store.drain(lambda data: sent.append(data) or True)
+
+    assert sent == payloads
+    assert store.is_empty()
+    assert store.stats()["spilled"] == 5
+    assert store.stats()["replayed"] == 5
+
+
+def test_failed_send_keeps_remaining_batches(store):
+    """A failed send stops the drain and leaves unsent batches on disk."""
+    for i in range(3):
+        store.append(f"batch-{i}".encode())
+
+    calls = []
+
+    def send(data):
+        calls.append(data)
+        return len(calls) < 2
+
+    assert not store.drain(send)
+    assert store.stats()["replayed"] == 1
+
+    sent = []
+    assert store.drain(lambda data: sent.append(data) or True)
+    assert sent == [b"batch-1", b"batch-2"]
+
+
+def test_evicts_oldest_segments_over_cap(store):
+    """Exceeding the size cap drops the oldest segments and counts evicted batches."""
+    for i in range(20):
+        store.append(bytes([i]) * 100)
+
+    stats = store.stats()
+    assert stats["bytes"] <= store.max_bytes
+    assert stats["evicted"] > 0
+
+    sent = []
+    store.drain(lambda data: sent.append(data) or True)
+    # The newest batch always survives eviction
+    assert sent[-1] == bytes([19]) * 100
+    assert len(sent) + stats["evicted"] == 20
+
+
+def test_segments_survive_restart(tmp_path):
+    """A new store picks up segments left behind by a previous process."""
+    directory = str(tmp_path / "spill")
+    SpillStore(directory).append(b"left-over")
+
+    sent = []
+    SpillStore(directory).drain(lambda data: sent.append(data) or True)
+
+    assert sent == [b"left-over"]
+    assert os.listdir(directory) == []
+
+
+def test_exporter_spills_on_network_error(tmp_path):
+    """Network errors write the batch to the spill store instead of dropping it."""
+    store = SpillStore(str(tmp_path / "spill"))
+    exporter = AuthenticatedOTLPExporter(endpoint="https://api.agentops.ai/v1/traces", jwt="jwt", spill_store=store)
+    try:
+        with patch("opentelemetry.exporter.otlp.proto.http.trace_exporter.OTLPSpanExporter.export") as mock_export:
+            with patch("agentops.sdk.exporters.encode_spans") as mock_encode:
+                mock_export.side_effect = requests.ConnectionError("down")
+                mock_encode.return_value.SerializePartialToString.return_value = b"encoded"
+
+                result = exporter.export([Mock(spec=ReadableSpan)])
+
+        assert result == SpanExportResult.FAILURE
+        assert exporter.spill_stats()["spilled"] == 1
+    finally:
+        exporter.shutdown()
+
+
+def test_rejected_batch_does_not_block_drain(store):
+    """A batch the endpoint rejects is dropped and the drain continues with the next one."""
+    for i in range(3):
+        store.append(f"batch-{i}".encode())
+
+    sent = []
+
+    def send(data):
+        if data == b"batch-0":
+            return SendResult.REJECTED
+        sent.append(data)
+        return SendResult.SENT
+
+    assert store.drain(send)
+    assert sent == [b"batch-1", b"batch-2"]
+    assert store.stats()["rejected"] == 1
+    assert store.is_empty()
+
+
+@pytest.mark.parametrize(
+    "status_code, expected",
+    [
+        (200, SendResult.SENT),
+        (400, SendResult.REJECTED),
+        (413, SendResult.REJECTED),
+        (429, SendResult.RETRY),
+        (503, SendResult.RETRY),
+    ],
+)
+def test_send_serialized_classifies_responses(status_code, expected):
+    """Only rate limiting, auth and server errors are worth sending again."""
+    exporter = AuthenticatedOTLPExporter(endpoint="https://api.agentops.ai/v1/traces", jwt="jwt")
+    try:
+        exporter._session.post = Mock(return_value=Mock(ok=status_code < 400, status_code=status_code))
+        assert exporter.send_serialized(b"encoded") is expected
+    finally:
+        exporter.shutdown()
+
+
+def test_exporter_does_not_spill_rejected_batch(tmp_path):
+    """A batch refused with a non-retryable 4xx is dropped instead of spilled."""
+    store = SpillStore(str(tmp_path / "spill"))
+    exporter = AuthenticatedOTLPExporter(endpoint="https://api.agentops.ai/v1/traces", jwt="jwt", spill_store=store)
+
+    def rejected(spans):
+        exporter._last_response.status_code = 422
+        return SpanExportResult.FAILURE
+
+    try:
+        with patch("opentelemetry.exporter.otlp.proto.http.trace_exporter.OTLPSpanExporter.export") as mock_export:
+            mock_export.side_effect = rejected
+            result = exporter.export([Mock(spec=ReadableSpan)])
+
+        assert result == SpanExportResult.FAILURE
+        assert exporter.spill_stats()["spilled"] == 0
+    finally:
+        exporter.shutdown()
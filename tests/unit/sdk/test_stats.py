@@ -0,0 +1,154 @@
+import threading
+from collections import deque
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+from opentelemetry.context import Context
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+
+from agentops.sdk.core import TracingCore
+from agentops.sdk.exporters import AuthenticatedOTLPExporter
+from agentops.sdk.processors import InstrumentedBatchSpanProcessor
+from agentops.sdk.stats import PipelineStats
+
+
+class BlockingExporter(SpanExporter):
+    """Holds the processor's worker in export until released."""
+
+    def __init__(self):
+        self.exporting = threading.Event()
+        self.release = threading.Event()
+
+    def export(self, spans):
+        self.exporting.set()
+        self.release.wait(5)
+        return SpanExportResult.SUCCESS
+
+
+def test_snapshot_reports_export_histograms():
+    stats = PipelineStats()
+    stats.record_export(10, 12.5, success=True)
+    stats.record_export(4, 400.0, success=False)
+    stats.record_payload(2048)
+
+    snapshot = stats.snapshot()
+
+    assert snapshot["spans_exported"] == 10
+    assert snapshot["spans_failed"] == 4
+    assert snapshot["batches_exported"] == 1
+    assert snapshot["batches_failed"] == 1
+    assert snapshot["export_duration_ms"]["count"] == 2
+    assert snapshot["export_duration_ms"]["max"] == 400.0
+    assert snapshot["export_duration_ms"]["buckets"]["25"] == 1
+    assert snapshot["export_duration_ms"]["buckets"]["500"] == 1
+    assert snapshot["batch_size"]["mean"] == 7
+    assert snapshot["payload_bytes"]["buckets"]["4096"] == 1
+    assert snapshot["queue_depth"] is None
+
+
+def test_snapshot_includes_sources():
+    stats = PipelineStats()
+    stats.add_source("tail_sampling", lambda: {"kept_traces": 3})
+    stats.add_source("spill", lambda: None)
+
+    snapshot = stats.snapshot()
+
+    assert snapshot["tail_sampling"] == {"kept_traces": 3}
+    assert "spill" not in snapshot
+
+
+def test_batch_processor_counts_enqueued_and_dropped_spans():
+    stats = PipelineStats()
+    exporter = BlockingExporter()
+    processor = InstrumentedBatchSpanProcessor(
+        exporter, stats=stats, max_queue_size=2, max_export_batch_size=1, schedule_delay_millis=60000
+    )
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    tracer = provider.get_tracer("test")
+
+    try:
+        tracer.start_span("first", context=Context()).end()
+        assert exporter.exporting.wait(5)
+        # The worker is stuck exporting the first span, so these fill the queue and the last one overflows it
+        for name in ("second", "third", "fourth"):
+            tracer.start_span(name, context=Context()).end()
+
+        snapshot = stats.snapshot()
+        assert snapshot["spans_enqueued"] == 4
+        assert snapshot["spans_dropped"] == 1
+        assert snapshot["queue_depth"] == 2
+        assert snapshot["queue_high_water"] == 2
+    finally:
+        exporter.release.set()
+        provider.shutdown()
+
+
+@pytest.mark.parametrize("layout", ["sdk<=1.32", "sdk>=1.33"])
+def test_batch_processor_reads_queue_of_both_sdk_layouts(layout):
+    queue = deque([], 2)
+
+    def init(self, span_exporter, **kwargs):
+        if layout == "sdk>=1.33":
+            self._batch_processor = SimpleNamespace(_queue=queue, _shutdown=False)
+        else:
+            self.queue = queue
+            self.done = False
+
+    def on_end(self, span):
+        queue.appendleft(span)
+
+    stats = PipelineStats()
+    span = Mock()
+    span.context.trace_flags.sampled = True
+    with patch.object(BatchSpanProcessor, "__init__", init), patch.object(BatchSpanProcessor, "on_end", on_end):
+        processor = InstrumentedBatchSpanProcessor(Mock(), stats=stats)
+        for _ in range(3):
+            processor.on_end(span)
+
+    snapshot = stats.snapshot()
+    assert snapshot["spans_enqueued"] == 3
+    assert snapshot["spans_dropped"] == 1
+    assert snapshot["queue_depth"] == 2
+    assert snapshot["queue_high_water"] == 2
+
+
+def test_authenticated_exporter_records_exports_and_payload_bytes():
+    stats = PipelineStats()
+    exporter = AuthenticatedOTLPExporter(endpoint="https://test.agentops.ai/v1/traces", jwt="token", stats=stats)
+
+    with patch.object(exporter._session, "post") as mock_post:
+        mock_post.return_value = Mock(ok=True, status_code=200)
+        assert exporter.export([]) == SpanExportResult.SUCCESS
+
+    snapshot = stats.snapshot()
+    assert snapshot["batches_exported"] == 1
+    assert snapshot["payload_bytes"]["count"] == 1
+    assert snapshot["payload_bytes"]["sum"] == len(mock_post.call_args.kwargs["data"])
+
+
+def test_instruments_publish_counters_and_histograms():
+    stats = PipelineStats()
+    reader = InMemoryMetricReader()
+    stats.register_instruments(MeterProvider(metric_readers=[reader]).get_meter("test"))
+
+    stats.record_enqueued(queue_depth=1)
+    stats.record_export(1, 5.0, success=True)
+
+    metrics = {
+        metric.name: metric
+        for resource_metrics in reader.get_metrics_data().resource_metrics
+        for scope_metrics in resource_metrics.scope_metrics
+        for metric in scope_metrics.metrics
+    }
+    assert metrics["agentops.export.spans.enqueued"].data.data_points[0].value == 1
+    assert metrics["agentops.export.queue.high_water"].data.data_points[0].value == 1
+    assert metrics["agentops.export.duration"].data.data_points[0].count == 1
+
+
+def test_tracing_core_stats_are_empty_before_initialization():
+    assert TracingCore().stats() == {}
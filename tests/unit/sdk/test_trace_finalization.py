@@ -0,0 +1,101 @@
+"""
+Unit tests for trace finalization and flush behavior in TracingCore.
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from opentelemetry.sdk.trace import Span
+
+from agentops.sdk.core import TraceContext, TracingCore
+
+
+class TestTraceFinalization(unittest.TestCase):
+    """Tests for blocking and non-blocking trace finalization."""
+
+    def setUp(self):
+        self.core = TracingCore()
+        self.core._initialized = True
+        self.core._config = {"project_id": "test_project"}
+        self.core.provider = MagicMock()
+
+    def tearDown(self):
+        self.core._initialized = False
+        if self.core._flush_executor:
+            self.core._flush_executor.shutdown(wait=True)
+
+    def _make_trace_context(self) -> TraceContext:
+        mock_span = MagicMock(spec=Span)
+        mock_span.name = "test_trace"
+        mock_span.get_span_context.return_value.trace_id = 1
+        return TraceContext(mock_span, token=None)
+
+    @patch("agentops.sdk.core.log_trace_url")
+    def test_end_trace_flushes_once_by_default(self, mock_log_trace_url):
+        """Ending a trace flushes the provider exactly once in the default mode."""
+        trace_context = self._make_trace_context()
+
+        self.core.end_trace(trace_context, "Success")
+
+        trace_context.span.end.assert_called_once()
+        self.core.provider.force_flush.assert_called_once()
+
+    @patch("agentops.sdk.core.log_trace_url")
+    def test_end_trace_does_not_flush_when_disabled(self, mock_log_trace_url):
+        """With flush_on_trace_end disabled the span is ended but not flushed."""
+        self.core._config["flush_on_trace_end"] = False
+        trace_context = self._make_trace_context()
+
+        self.core.end_trace(trace_context, "Success")
+
+        trace_context.span.end.assert_called_once()
+        self.core.provider.force_flush.assert_not_called()
+
+    def test_flush_async_returns_future(self):
+        """flush_async runs the flush off the calling thread and resolves the future."""
+        self.core.provider.force_flush.return_value = True
+
+        future = self.core.flush_async(timeout_millis=100)
+
+        self.assertTrue(future.result(timeout=5))
+        self.core.provider.force_flush.assert_called_once_with(100)
+
+    @patch("agentops.sdk.core.log_trace_url")
+    def test_shutdown_uses_single_bounded_flush(self, mock_log_trace_url):
+        """Shutdown ends all traces without flushing each one, then flushes once within the deadline."""
+        self.core._config["shutdown_flush_timeout"] = 250
+        for trace_id in (1, 2, 3):
+            trace_context = self._make_trace_context()
+            self.core._active_traces[str(trace_id)] = trace_context
+
+        report = self.core.shutdown()
+
+        self.core.provider.force_flush.assert_called_once()
+        self.assertLessEqual(self.core.provider.force_flush.call_args.args[0], 250)
+        self.assertIn("spans", report["completed"])
+        self.assertFalse(self.core.initialized)
+
+    @patch("agentops.sdk.core.log_trace_url")
+    def test_shutdown_reports_pipelines_past_deadline(self, mock_log_trace_url):
+        """A pipeline that cannot flush in time is reported instead of delaying shutdown."""
+        self.core._config["shutdown_flush_timeout"] = 200
+        release = threading.Event()
+        self.core._meter_provider = MagicMock()
+        self.core._meter_provider.force_flush.side_effect = lambda timeout_millis: release.wait(10)
+        hook = MagicMock()
+        self.core.add_shutdown_hook(hook)
+
+        started = time.monotonic()
+        report = self.core.shutdown()
+        release.set()
+
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(report["timed_out"], ["metrics"])
+        self.assertIn("spans", report["completed"])
+        hook.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
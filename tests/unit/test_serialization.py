@@ -14,7 +14,9 @@ from agentops.helpers.serialization import (
     is_jsonable,
     model_to_dict,
     safe_serialize,
+    serialize_bounded,
     serialize_uuid,
+    value_size,
 )
 
 
@@ -386,6 +388,120 @@ class TestSafeSerialize:
         assert result == "ValueErrorObject representation"
 
 
+class TestSerializeBounded:
+    def test_matches_safe_serialize_within_budget(self):
+        """Test that objects within the budget serialize the same as with safe_serialize."""
+        obj = {
+            "args": (1, "two", None),
+            "kwargs": {"uuid": uuid.UUID("00000000-0000-0000-0000-000000000001"), "enum": SampleEnum.THREE},
+            "nested": {"inner": [1.5, True, {"deep": Decimal("1.1")}]},
+        }
+
+        result, truncated = serialize_bounded(obj, 10_000)
+
+        assert not truncated
+        assert json.loads(result) == json.loads(safe_serialize(obj))
+
+    def test_small_plain_objects_match_json_dumps(self):
+        """Test that small objects of plain JSON types are encoded exactly like json.dumps."""
+        obj = {"args": (1, "two", None, 2.5, True), "kwargs": {"text": "é" * 10, "items": [1, 2, 3]}}
+
+        assert serialize_bounded(obj, 10_000) == (json.dumps(obj), False)
+
+    def test_strings_are_returned_untouched(self):
+        """Test that strings are not JSON encoded, and are cut to the budget."""
+        assert serialize_bounded("plain text", 100) == ("plain text", False)
+        assert serialize_bounded("x" * 200, 100) == ("x" * 100, True)
+
+    @pytest.mark.parametrize("max_bytes", [40, 64, 100, 250, 1000])
+    def test_truncated_output_is_valid_json_within_budget(self, max_bytes):
+        """Test that truncated output never exceeds the budget and always parses."""
+        obj = {"items": [{"id": i, "name": "é" * 20} for i in range(100)], "tail": "x" * 500}
+
+        result, truncated = serialize_bounded(obj, max_bytes)
+
+        assert truncated
+        assert len(result.encode("utf-8")) <= max_bytes
+        json.loads(result)
+
+    @pytest.mark.parametrize("max_bytes", range(2, 12))
+    @pytest.mark.parametrize("obj", [None, 12345678, [1, 2, 3], {"key": "value"}, {"a": [{"b": "c" * 50}] * 20}])
+    def test_tiny_budgets_give_valid_json(self, obj, max_bytes):
+        """Test that budgets too small for a truncation marker still give valid JSON."""
+        result, _ = serialize_bounded(obj, max_bytes)
+
+        assert len(result.encode("utf-8")) <= max_bytes
+        json.loads(result)
+
+    def test_empty_strings_never_overrun_the_budget(self):
+        """Test that exact-fit budgets leave no room for trailing empty strings."""
+        obj = {"k0": {"k1": "é" * 30, "k2": "", "k3": ""}, "k4": ["", "", ""]}
+        for max_bytes in range(40, 200):
+            result, _ = serialize_bounded(obj, max_bytes)
+
+            assert len(result.encode("utf-8")) <= max_bytes
+            json.loads(result)
+
+    def test_truncated_containers_count_omitted_items(self):
+        """Test that truncated containers end with a marker counting the items left out."""
+        result, truncated = serialize_bounded(list(range(1000)), 100)
+
+        parsed = json.loads(result)
+        assert truncated
+        assert parsed[-1] == f"... {1000 - (len(parsed) - 1)} more items"
+
+    def test_stops_walking_at_budget(self):
+        """Test that items past the budget are never converted."""
+        converted = []
+
+        class Tracked:
+            def __init__(self, i):
+                self.i = i
+
+            def to_json(self):
+                converted.append(self.i)
+                return self.i
+
+        serialize_bounded([Tracked(i) for i in range(10_000)], 200)
+
+        assert len(converted) < 100
+
+    def test_dataframes_are_sliced_before_conversion(self):
+        """Test that only the rows of a DataFrame-like object that can fit are converted."""
+        converted_rows = []
+
+        class Frame:
+            def __init__(self, rows):
+                self.rows = rows
+                self.shape = (rows, 2)
+
+            def __len__(self):
+                return self.rows
+
+            def head(self, n):
+                return Frame(min(n, self.rows))
+
+            def to_json(self):
+                converted_rows.append(self.rows)
+                return json.dumps([{"a": i, "b": "x" * 10} for i in range(self.rows)])
+
+        result, truncated = serialize_bounded({"frame": Frame(1_000_000)}, 1000)
+
+        assert truncated
+        assert len(result) <= 1000
+        assert max(converted_rows) < 100
+        assert value_size(Frame(1_000_000)) == 1_000_000
+
+    def test_circular_references(self):
+        """Test that circular references are replaced instead of recursing forever."""
+        obj: Dict = {"name": "loop"}
+        obj["self"] = obj
+
+        result, _ = serialize_bounded(obj, 1000)
+
+        assert json.loads(result) == {"name": "loop", "self": "<circular reference>"}
+
+
 class TestModelToDict:
     def test_none_returns_empty_dict(self):
         """Test that None returns an empty dict."""
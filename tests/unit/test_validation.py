@@ -6,6 +6,9 @@ import pytest
 import requests
 from unittest.mock import Mock, patch
 
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+
 from agentops.exceptions import ApiServerException
 from agentops.validation import (
     get_jwt_token_sync,
@@ -15,6 +18,7 @@ from agentops.validation import (
     print_validation_summary,
     ValidationError,
 )
+from agentops.sdk.span_store import SpanStore
 from agentops.semconv import SpanAttributes, LLMRequestTypeValues
 
 
@@ -290,6 +294,29 @@ class TestValidateTraceSpans:
         result = validate_trace_spans()
         assert result["trace_id"] == "0000000000000000ab54a98ceb1f0ad2"  # hex format of trace ID
 
+    @patch("agentops.validation.get_trace_details")
+    def test_validate_trace_spans_local_store(self, mock_details):
+        """Test validating against an in-process span store without calling the API."""
+        store = SpanStore()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(store))
+        with provider.get_tracer("test").start_as_current_span("chat") as span:
+            span.set_attribute(SpanAttributes.AGENTOPS_SPAN_KIND, "llm")
+            span.set_attribute(SpanAttributes.LLM_USAGE_TOTAL_TOKENS, 42)
+        trace_id = format(span.get_span_context().trace_id, "032x")
+
+        result = validate_trace_spans(trace_id=trace_id, span_store=store)
+
+        assert result["span_count"] == 1
+        assert result["has_llm_spans"]
+        assert result["metrics"]["total_tokens"] == 42
+        mock_details.assert_not_called()
+
+    def test_validate_trace_spans_local_store_missing_spans(self):
+        """Test that a trace missing from the span store fails immediately."""
+        with pytest.raises(ValidationError, match="local span store"):
+            validate_trace_spans(trace_id="0" * 31 + "1", span_store=SpanStore())
+
 
 class TestPrintValidationSummary:
     """Test validation summary printing."""